@@ -1,53 +1,1892 @@
 
-from flask import Flask, render_template_string, request, redirect, url_for, session, abort, jsonify
+from flask import Flask, render_template, request, redirect, url_for, session, abort, jsonify, flash, g, has_request_context, Response, stream_with_context, send_from_directory
 import sqlite3
 from config import Config
 from datetime import datetime, timedelta
 import os
 import secrets
 import json
-from werkzeug.utils import secure_filename
 from flask_wtf.csrf import CSRFProtect
 from contextlib import contextmanager
 import random
 from functools import wraps
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
+from limits.storage import Storage
+from limits.storage.base import SlidingWindowCounterSupport, TimestampedSlidingWindow
 from dotenv import load_dotenv
-from werkzeug.security import generate_password_hash
+from werkzeug.security import generate_password_hash, safe_join
 import time
 import re
 from urllib.parse import urlparse
 import uuid
+import threading
+import queue
+import atexit
+import base64
+import csv
+import io
+import itertools
+import math
+import hashlib
+import gzip
+import mimetypes
+import shutil
+import tempfile
+import click
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; static assets are then gzip-only
+    brotli = None
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow is optional; pages fall back to the original images
+    Image = ImageOps = None
 
 
 # Load environment variables
 load_dotenv()
 
+class ConnectionPool:
+    """Pool of reusable SQLite connections shared by the threads of one worker.
+
+    Connections are opened lazily up to ``size`` and handed out LIFO so the
+    warmest connection is reused first. PRAGMAs are applied once when a
+    connection is opened, and idle connections are pinged before reuse.
+    The pool is per process: a forked worker starts with a fresh one.
+    """
+
+    def __init__(self, database, size=5, timeout=10.0, health_check_interval=30.0, pragmas=None):
+        self.database = database
+        self.size = size
+        self.timeout = timeout
+        self.health_check_interval = health_check_interval
+        self.pragmas = pragmas or {}
+        self._reset()
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._idle = queue.LifoQueue(maxsize=self.size)
+        self._lock = threading.Lock()
+        self._opened = 0
+
+    def _connect(self):
+        conn = sqlite3.connect(self.database, timeout=self.timeout, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        return conn
+
+    def _discard(self, conn):
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+        with self._lock:
+            self._opened -= 1
+
+    def _is_healthy(self, conn):
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def acquire(self):
+        if self._pid != os.getpid():
+            # Connections must never cross a fork; leave the parent's alone
+            self._reset()
+
+        try:
+            conn, last_used = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                can_open = self._opened < self.size
+                if can_open:
+                    self._opened += 1
+            if can_open:
+                try:
+                    return self._connect()
+                except Exception:
+                    with self._lock:
+                        self._opened -= 1
+                    raise
+            try:
+                conn, last_used = self._idle.get(timeout=self.timeout)
+            except queue.Empty:
+                raise sqlite3.OperationalError("Timed out waiting for a database connection")
+
+        if time.monotonic() - last_used > self.health_check_interval and not self._is_healthy(conn):
+            self._discard(conn)
+            return self.acquire()
+        return conn
+
+    def release(self, conn):
+        if self._pid != os.getpid():
+            return
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            # Closed or broken; let the pool open a replacement later
+            self._discard(conn)
+            return
+        self._idle.put((conn, time.monotonic()))
+
+    def close_all(self):
+        while True:
+            try:
+                conn, _ = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(conn)
+
+
+@contextmanager
+def transaction(conn, immediate=True):
+    """Run the block as one explicit transaction, committed on success.
+
+    ``BEGIN IMMEDIATE`` takes the write lock up front, so checks made inside
+    the block still hold when its writes land.
+    """
+    if conn.in_transaction:
+        conn.commit()
+    conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+    try:
+        yield conn
+    except BaseException:
+        conn.rollback()
+        raise
+    conn.commit()
+
+def storage_pragmas():
+    """Per-connection PRAGMAs of the configured storage profile."""
+    return {
+        'synchronous': Config.DB_SYNCHRONOUS,
+        'busy_timeout': Config.DB_BUSY_TIMEOUT,
+        'cache_size': Config.DB_CACHE_SIZE,
+        'mmap_size': Config.DB_MMAP_SIZE,
+        'temp_store': Config.DB_TEMP_STORE,
+    }
+
+def apply_storage_profile(conn):
+    # journal_mode is persistent in the database file; the rest are per connection
+    conn.execute(f"PRAGMA journal_mode = {Config.DB_JOURNAL_MODE}")
+    for name, value in storage_pragmas().items():
+        conn.execute(f"PRAGMA {name} = {value}")
+
+
+db_pool = ConnectionPool(Config.DATABASE_PATH,
+                         size=Config.DB_POOL_SIZE,
+                         timeout=Config.DB_POOL_TIMEOUT,
+                         health_check_interval=Config.DB_HEALTH_CHECK_INTERVAL,
+                         pragmas=storage_pragmas())
+
 @contextmanager
 def get_db():
-    conn = sqlite3.connect('ecommerce.db')
-    conn.row_factory = sqlite3.Row
+    # Nested get_db() calls within one request (e.g. product_detail ->
+    # get_related_products) share the connection instead of taking another
+    if has_request_context() and g.get('db_conn') is not None:
+        g.db_depth += 1
+        try:
+            yield g.db_conn
+        finally:
+            g.db_depth -= 1
+        return
+
+    conn = db_pool.acquire()
+    if has_request_context():
+        g.db_conn, g.db_depth = conn, 1
     try:
         yield conn
     finally:
-        conn.close()
+        if has_request_context():
+            g.db_conn = None
+        db_pool.release(conn)
 
 app = Flask(__name__)
 app.secret_key = Config.SECRET_KEY
+app.config['TEMPLATES_AUTO_RELOAD'] = Config.TEMPLATES_AUTO_RELOAD
 csrf = CSRFProtect(app)
 
-# Rate limiting for admin login
+# ==================== RATE LIMIT STORAGE ====================
+
+class SQLiteLimiterStorage(Storage, SlidingWindowCounterSupport, TimestampedSlidingWindow):
+    """flask_limiter storage shared by every worker through one SQLite file.
+
+    Registered for ``sqlite:///relative/path.db`` and
+    ``sqlite:////absolute/path.db`` URIs. Counters live in a WAL database
+    separate from the shop's, with synchronous=OFF since losing a few hits
+    in a power cut is harmless. Each thread keeps its own connection and
+    every check is one primary-key statement.
+    """
+
+    STORAGE_SCHEME = ['sqlite']
+
+    def __init__(self, uri, wrap_exceptions=False, **options):
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+        self.path = uri[len('sqlite:///'):] or ':memory:'
+        self.timeout = float(options.get('timeout', 5))
+        self._local = threading.local()
+        conn = self._connect()
+        conn.execute('''CREATE TABLE IF NOT EXISTS rate_limits
+                        (key TEXT PRIMARY KEY,
+                        count INTEGER NOT NULL,
+                        expires_at REAL NOT NULL) WITHOUT ROWID''')
+
+    @property
+    def base_exceptions(self):
+        return sqlite3.Error
+
+    def _connect(self):
+        # Threads and forked workers each open their own connection
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=OFF")
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def incr(self, key, expiry, amount=1):
+        now = time.time()
+        conn = self._connect()
+        # A key past its expiry starts a fresh window instead of adding to the old one
+        row = conn.execute('''INSERT INTO rate_limits (key, count, expires_at) VALUES (?, ?, ?)
+                              ON CONFLICT(key) DO UPDATE SET
+                                  count = CASE WHEN expires_at <= ? THEN excluded.count
+                                               ELSE count + excluded.count END,
+                                  expires_at = CASE WHEN expires_at <= ? THEN excluded.expires_at
+                                                    ELSE expires_at END
+                              RETURNING count''',
+                           (key, amount, now + expiry, now, now)).fetchone()
+        return row[0]
+
+    def get(self, key):
+        conn = self._connect()
+        row = conn.execute("SELECT count FROM rate_limits WHERE key = ? AND expires_at > ?",
+                           (key, time.time())).fetchone()
+        return row[0] if row else 0
+
+    def get_expiry(self, key):
+        now = time.time()
+        conn = self._connect()
+        row = conn.execute("SELECT expires_at FROM rate_limits WHERE key = ? AND expires_at > ?",
+                           (key, now)).fetchone()
+        return row[0] if row else now
+
+    def check(self):
+        conn = self._connect()
+        conn.execute("SELECT 1")
+        return True
+
+    def reset(self):
+        conn = self._connect()
+        return conn.execute("DELETE FROM rate_limits").rowcount
+
+    def clear(self, key):
+        conn = self._connect()
+        conn.execute("DELETE FROM rate_limits WHERE key = ?", (key,))
+
+    def purge_expired(self):
+        conn = self._connect()
+        conn.execute("DELETE FROM rate_limits WHERE expires_at <= ?", (time.time(),))
+
+    def _sliding_window(self, conn, key, expiry, now):
+        previous_key, current_key = self.sliding_window_keys(key, expiry, now)
+        counts = dict(conn.execute("SELECT key, count FROM rate_limits WHERE key IN (?, ?) AND expires_at > ?",
+                                   (previous_key, current_key, now)).fetchall())
+        previous_count = counts.get(previous_key, 0)
+        current_count = counts.get(current_key, 0)
+        previous_ttl = (1 - (((now - expiry) / expiry) % 1)) * expiry if previous_count else 0.0
+        current_ttl = (1 - ((now / expiry) % 1)) * expiry + expiry
+        return current_key, (previous_count, previous_ttl, current_count, current_ttl)
+
+    def acquire_sliding_window_entry(self, key, limit, expiry, amount=1):
+        if amount > limit:
+            return False
+        now = time.time()
+        conn = self._connect()
+        # Read and increment under one write lock, so workers racing for the
+        # last slot cannot both get it (the in-memory storage has to undo)
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            current_key, (previous_count, previous_ttl, current_count, _) = self._sliding_window(
+                conn, key, expiry, now)
+            weighted_count = previous_count * previous_ttl / expiry + current_count
+            allowed = math.floor(weighted_count) + amount <= limit
+            if allowed:
+                # The current window's counter outlives it to weight the next one
+                conn.execute('''INSERT INTO rate_limits (key, count, expires_at) VALUES (?, ?, ?)
+                                ON CONFLICT(key) DO UPDATE SET count = count + excluded.count''',
+                             (current_key, amount, now + 2 * expiry))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return allowed
+
+    def get_sliding_window(self, key, expiry):
+        conn = self._connect()
+        return self._sliding_window(conn, key, expiry, time.time())[1]
+
+    def clear_sliding_window(self, key, expiry):
+        previous_key, current_key = self.sliding_window_keys(key, expiry, time.time())
+        conn = self._connect()
+        conn.execute("DELETE FROM rate_limits WHERE key IN (?, ?)", (previous_key, current_key))
+
+# ==================== END RATE LIMIT STORAGE ====================
+
+# Rate limiting for admin login. The default sqlite:// storage is shared by
+# every worker on the box; point RATELIMIT_STORAGE_URI at redis:// to share
+# limits across machines.
 limiter = Limiter(
     app=app,
     key_func=get_remote_address,
-    storage_uri="memory://",  # For production, use Redis: 'redis://localhost:6379/0'
+    storage_uri=Config.RATELIMIT_STORAGE_URI,
+    strategy=Config.RATELIMIT_STRATEGY,
     default_limits=["200 per day", "50 per hour"]
 )
 
+# ==================== TEMPLATE REGISTRY ====================
+
+# The inline sources are indented to read well next to their routes; none of
+# them has <pre> or multi-line textarea content, so the indentation is dropped
+# before compiling instead of being sent with every response
+SOURCE_INDENT = re.compile(r'^[ \t]+', re.M)
+
+def compact_page_source(source):
+    return SOURCE_INDENT.sub('', source)
+
+class TemplateRegistry:
+    """Compiled page templates, keyed by page name.
+
+    Every page is still written inline next to its route, but the source is
+    parsed and compiled by Jinja only the first time the page is rendered.
+    With ``TEMPLATES_AUTO_RELOAD`` (or debug mode) on, the cache is bypassed
+    and pages are compiled on every request, as they were before.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._templates = {}
+        self._lock = threading.Lock()
+
+    @property
+    def auto_reload(self):
+        auto_reload = self.app.config.get('TEMPLATES_AUTO_RELOAD')
+        return self.app.debug if auto_reload is None else auto_reload
+
+    def get(self, page, source):
+        if self.auto_reload:
+            return self.app.jinja_env.from_string(compact_page_source(source))
+
+        template = self._templates.get(page)
+        if template is None:
+            with self._lock:
+                template = self._templates.get(page)
+                if template is None:
+                    template = self.app.jinja_env.from_string(compact_page_source(source))
+                    self._templates[page] = template
+        return template
+
+    def clear(self):
+        with self._lock:
+            self._templates.clear()
+
+
+page_templates = TemplateRegistry(app)
+
+def render_page(page, source, /, **context):
+    # Positional-only so pages can still pass their own ``page`` variable
+    return render_template(page_templates.get(page, source), **context)
+
+# ==================== STATIC ASSETS ====================
+
+# url_for('static', ...) emits ``name.<hash>.ext`` so a URL only ever points
+# at one version of a file and browsers can cache it for a year without
+# revalidating. Images and variants that are already content addressed keep
+# their names.
+FINGERPRINTED_NAME = re.compile(r'^(?P<stem>.+)\.(?P<digest>[0-9a-f]{10})(?P<ext>\.[A-Za-z0-9]+)$')
+
+# Text assets worth shipping precompressed; images are compressed already
+PRECOMPRESSED_EXTENSIONS = {'.css', '.js', '.svg', '.json', '.txt', '.html', '.ico', '.map'}
+
+# Sibling suffixes in order of preference, with their Content-Encoding
+PRECOMPRESSED_ENCODINGS = [('br', '.br'), ('gzip', '.gz')]
+
+class AssetManifest:
+    """Maps static filenames to their content-hashed URLs for one worker.
+
+    Digests are computed on first use and kept until the file's mtime or
+    size changes, so editing a file in place moves it to a new URL.
+    """
+
+    def __init__(self, folder):
+        self.folder = folder
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def digest(self, filename):
+        # The name comes from the URL, so never look outside the static folder
+        path = safe_join(self.folder, filename)
+        if path is None or not os.path.isfile(path):
+            return None
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        key = (stat.st_mtime_ns, stat.st_size)
+        entry = self._entries.get(filename)
+        if entry is None or entry[0] != key:
+            digest = hashlib.sha256()
+            with open(path, 'rb') as f:
+                for block in iter(lambda: f.read(1024 * 1024), b''):
+                    digest.update(block)
+            entry = (key, digest.hexdigest()[:10])
+            with self._lock:
+                self._entries[filename] = entry
+        return entry[1]
+
+    def fingerprint(self, filename):
+        """Return the hashed name for ``filename``, or it unchanged when the
+        file is missing or already immutable."""
+        if is_immutable_asset(filename):
+            return filename
+        digest = self.digest(filename)
+        if digest is None:
+            return filename
+        stem, ext = os.path.splitext(filename)
+        return f"{stem}.{digest}{ext}"
+
+    def resolve(self, requested):
+        """Split a requested name into ``(filename, immutable)``.
+
+        A fingerprint that no longer matches the file on disk is still
+        served, but without the long-lived cache headers.
+        """
+        if is_immutable_asset(requested):
+            return requested, True
+        match = FINGERPRINTED_NAME.match(requested)
+        if match:
+            filename = match.group('stem') + match.group('ext')
+            digest = self.digest(filename)
+            if digest is not None:
+                return filename, digest == match.group('digest')
+        return requested, False
+
+    def entries(self):
+        for root, dirs, files in os.walk(self.folder):
+            dirs[:] = sorted(d for d in dirs if d != VARIANTS_DIR)
+            for name in sorted(files):
+                if name.endswith(tuple(suffix for _, suffix in PRECOMPRESSED_ENCODINGS)):
+                    continue
+                filename = os.path.relpath(os.path.join(root, name), self.folder).replace(os.sep, '/')
+                yield filename, self.fingerprint(filename)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+static_assets = AssetManifest(app.static_folder)
+
+def is_immutable_asset(filename):
+    return (filename.startswith(VARIANTS_DIR + '/')
+            or CONTENT_ADDRESSED_NAME.match(os.path.basename(filename)) is not None)
+
+@app.url_defaults
+def fingerprint_static_url(endpoint, values):
+    if endpoint == 'static' and 'filename' in values:
+        values['filename'] = static_assets.fingerprint(values['filename'])
+
+def write_atomic(path, data):
+    # Readers in other workers must never see a half-written asset
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    with os.fdopen(fd, 'wb') as out:
+        out.write(data)
+    os.replace(temp_path, path)
+
+def precompress_asset(path, level=9):
+    """Write ``.gz`` (and ``.br`` when brotli is installed) next to ``path``."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    write_atomic(path + '.gz', gzip.compress(data, compresslevel=level, mtime=0))
+    if brotli is not None:
+        write_atomic(path + '.br', brotli.compress(data, quality=11))
+
+def negotiate_encoding(available):
+    """Return the entry of ``available`` (in server preference order) that
+    the client ranks highest, or None when it accepts none of them."""
+    best = max(available, key=lambda encoding: request.accept_encodings[encoding], default=None)
+    return best if best is not None and request.accept_encodings[best] > 0 else None
+
+def precompressed_sibling(filename):
+    """Pick a prebuilt ``.br``/``.gz`` next to ``filename`` that the client accepts."""
+    if os.path.splitext(filename)[1].lower() not in PRECOMPRESSED_EXTENSIONS:
+        return None, None
+    path = safe_join(app.static_folder, filename)
+    if path is None:
+        return None, None
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return None, None
+
+    def fresh():
+        found = {}
+        for encoding, suffix in PRECOMPRESSED_ENCODINGS:
+            try:
+                # A sibling older than its source is stale and ignored
+                if os.stat(path + suffix).st_mtime_ns >= mtime:
+                    found[encoding] = suffix
+            except OSError:
+                continue
+        return found
+
+    siblings = fresh()
+    if 'gzip' not in siblings:
+        # Compress once on first request instead of on every request
+        try:
+            precompress_asset(path)
+        except OSError as e:
+            print(f"Error precompressing {filename}: {e}")
+        siblings = fresh()
+    encoding = negotiate_encoding(list(siblings))
+    return (filename + siblings[encoding], encoding) if encoding else (None, None)
+
+def serve_static(filename):
+    filename, immutable = static_assets.resolve(filename)
+    compressed, encoding = precompressed_sibling(filename)
+    if compressed:
+        mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        response = send_from_directory(app.static_folder, compressed, mimetype=mimetype)
+        response.headers['Content-Encoding'] = encoding
+    else:
+        response = send_from_directory(app.static_folder, filename)
+    if os.path.splitext(filename)[1].lower() in PRECOMPRESSED_EXTENSIONS:
+        response.vary.add('Accept-Encoding')
+    if immutable:
+        # send_file marks every response no-cache; fingerprinted URLs never change
+        response.cache_control.no_cache = None
+        response.cache_control.public = True
+        response.cache_control.max_age = Config.STATIC_MAX_AGE
+        response.cache_control.immutable = True
+    else:
+        # Unversioned or outdated URL: let the browser revalidate via ETag
+        response.cache_control.no_cache = True
+    return response
+
+app.view_functions['static'] = serve_static
+
+# Shared stylesheets and scripts; each bundle is written minified to
+# static/dist/<name>. Page stylesheets under css/pages/ are single-file bundles.
+BUNDLE_DIR = 'dist'
+ASSET_BUNDLES = {
+    'store.css': ['css/store.css'],
+    'store.js': ['js/common.js', 'js/admin-lock.js', 'js/gallery.js', 'js/checkout.js', 'js/profile.js'],
+    'admin.css': ['css/admin.css'],
+    'admin.js': ['js/admin-products.js', 'js/admin-orders.js', 'js/admin-settings.js', 'js/admin-images.js'],
+    'admin-login.css': ['css/admin-login.css'],
+}
+
+CSS_TOKENS = re.compile(r'("(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\'|/\*.*?\*/)', re.S)
+
+def minify_css(text):
+    parts = []
+    for token in CSS_TOKENS.split(text):
+        if token.startswith('/*'):
+            continue
+        if token[:1] in ('"', "'"):
+            parts.append(token)
+            continue
+        token = re.sub(r'\s+', ' ', token)
+        token = re.sub(r'\s*([{};,>])\s*', r'\1', token)
+        parts.append(re.sub(r':\s+', ':', token))
+    return ''.join(parts).replace(';}', '}').strip()
+
+def minify_js(text):
+    # Whitespace only: dropping indentation, blank lines and whole-line
+    # comments is safe without a real JavaScript parser
+    lines = (line.strip() for line in text.splitlines())
+    return '\n'.join(line for line in lines if line and not line.startswith('//'))
+
+class AssetBundler:
+    """Builds minified bundles on first use and rebuilds them when a source
+    file is newer than the output, so editing a source is picked up without
+    a deploy step."""
+
+    def __init__(self, folder, bundles, output=BUNDLE_DIR):
+        self.folder = folder
+        self.bundles = bundles
+        self.output = output
+        self._lock = threading.Lock()
+
+    def names(self):
+        pages = os.path.join(self.folder, 'css', 'pages')
+        extra = sorted(f'css/pages/{name}' for name in os.listdir(pages)
+                       if name.endswith('.css')) if os.path.isdir(pages) else []
+        return list(self.bundles) + extra
+
+    def build(self, name, force=False):
+        """Return the static filename of bundle ``name``, or None when one of
+        its sources is missing."""
+        sources = [os.path.join(self.folder, source) for source in self.bundles.get(name, [name])]
+        filename = f'{self.output}/{name}'
+        target = os.path.join(self.folder, filename)
+        try:
+            newest = max(os.stat(path).st_mtime_ns for path in sources)
+        except OSError:
+            return None
+        if not force:
+            try:
+                if os.stat(target).st_mtime_ns >= newest:
+                    return filename
+            except OSError:
+                pass
+        with self._lock:
+            is_css = name.endswith('.css')
+            minify = minify_css if is_css else minify_js
+            parts = []
+            for path in sources:
+                with open(path, encoding='utf-8') as f:
+                    parts.append(minify(f.read()))
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            write_atomic(target, ('\n' if is_css else ';\n').join(parts).encode('utf-8'))
+            precompress_asset(target)
+        return filename
+
+    def url(self, name):
+        return url_for('static', filename=self.build(name) or name)
+
+
+asset_bundles = AssetBundler(app.static_folder, ASSET_BUNDLES)
+
+@app.context_processor
+def inject_asset_url():
+    return {'asset_url': asset_bundles.url}
+
+@app.cli.command('build-assets')
+@click.option('--level', default=9, show_default=True, help='gzip level; brotli always uses its best quality.')
+def build_assets_command(level):
+    """Build the CSS/JS bundles, precompress static text assets and print
+    the fingerprint manifest."""
+    for name in asset_bundles.names():
+        asset_bundles.build(name, force=True)
+    built = 0
+    for filename, hashed in static_assets.entries():
+        if os.path.splitext(filename)[1].lower() in PRECOMPRESSED_EXTENSIONS:
+            precompress_asset(os.path.join(app.static_folder, filename), level)
+            built += 1
+        click.echo(f"{filename} -> {hashed}")
+    click.echo(f"Precompressed {built} asset(s){'' if brotli is not None else ' (gzip only, brotli not installed)'}.")
+
+# ==================== END STATIC ASSETS ====================
+
+# ==================== RESPONSE COMPRESSION ====================
+
+# Dynamic responses worth compressing; static files are served from their
+# prebuilt .br/.gz siblings instead (see serve_static)
+COMPRESSIBLE_MIMETYPES = {
+    'text/html', 'text/css', 'text/plain', 'text/csv', 'text/javascript',
+    'application/javascript', 'application/json', 'application/xml', 'image/svg+xml',
+}
+
+def compress_body(data, encoding):
+    if encoding == 'br':
+        return brotli.compress(data, quality=Config.COMPRESS_BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=Config.COMPRESS_LEVEL, mtime=0)
+
+@app.after_request
+def compress_response(response):
+    if (response.mimetype not in COMPRESSIBLE_MIMETYPES
+            or response.direct_passthrough or response.is_streamed
+            or response.status_code < 200 or response.status_code in (204, 206, 304)
+            or 'Content-Encoding' in response.headers
+            or 'no-transform' in response.headers.get('Cache-Control', '')):
+        return response
+    response.vary.add('Accept-Encoding')
+    encoding = negotiate_encoding(['br', 'gzip'] if brotli is not None else ['gzip'])
+    if encoding is None:
+        return response
+    data = response.get_data()
+    if len(data) < Config.COMPRESS_MIN_SIZE:
+        return response
+    response.set_data(compress_body(data, encoding))
+    response.headers['Content-Encoding'] = encoding
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        # The compressed bytes differ, so the validator can no longer be strong
+        response.set_etag(etag, weak=True)
+    return response
+
+# ==================== END RESPONSE COMPRESSION ====================
+
+# ==================== BACKGROUND TASKS ====================
+
+class PeriodicTask:
+    """Runs ``func`` every ``interval`` seconds on a daemon thread."""
+
+    def __init__(self, name, interval, func):
+        self.name = name
+        self.interval = interval
+        self.func = func
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.func()
+            except Exception as e:
+                print(f"Error in background task {self.name}: {e}")
+
+
+background_tasks = []
+_background_tasks_pid = None
+
+@app.before_request
+def start_background_tasks():
+    # Threads do not survive a fork, so every worker starts its own set
+    global _background_tasks_pid
+    if _background_tasks_pid == os.getpid():
+        return
+    _background_tasks_pid = os.getpid()
+    for task in background_tasks:
+        if task.interval > 0:
+            task.start()
+
+def checkpoint_wal():
+    with get_db() as conn:
+        conn.execute(f"PRAGMA wal_checkpoint({Config.DB_CHECKPOINT_MODE})")
+
+if Config.DB_JOURNAL_MODE.upper() == 'WAL':
+    background_tasks.append(PeriodicTask('wal-checkpoint', Config.DB_CHECKPOINT_INTERVAL, checkpoint_wal))
+
+def purge_rate_limits():
+    if isinstance(limiter.storage, SQLiteLimiterStorage):
+        limiter.storage.purge_expired()
+
+background_tasks.append(PeriodicTask('rate-limit-purge', Config.RATELIMIT_PURGE_INTERVAL, purge_rate_limits))
+
+ORDER_STATUSES = ['Processing', 'Shipped', 'Completed', 'Cancelled']
+
+# ==================== PRODUCT SEARCH ====================
+
+def fts5_supported(c):
+    try:
+        c.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+        return bool(c.fetchone()[0])
+    except sqlite3.Error:
+        return False
+
+def create_product_search_index(c):
+    if not fts5_supported(c):
+        print("SQLite was built without FTS5; product search will use LIKE")
+        return
+
+    # External-content FTS table over products, kept in sync by triggers so
+    # every writer (admin add/edit/delete, imports) updates it in the same
+    # transaction. prefix='2 3' makes short prefix queries index lookups.
+    c.execute('''CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5(
+                    title, description, tags,
+                    content='products', content_rowid='id',
+                    tokenize='unicode61 remove_diacritics 2', prefix='2 3')''')
+    c.execute('''CREATE TRIGGER IF NOT EXISTS products_fts_insert AFTER INSERT ON products BEGIN
+                    INSERT INTO products_fts (rowid, title, description, tags)
+                    VALUES (new.id, new.title, new.description, new.tags);
+                END''')
+    c.execute('''CREATE TRIGGER IF NOT EXISTS products_fts_delete AFTER DELETE ON products BEGIN
+                    INSERT INTO products_fts (products_fts, rowid, title, description, tags)
+                    VALUES ('delete', old.id, old.title, old.description, old.tags);
+                END''')
+    c.execute('''CREATE TRIGGER IF NOT EXISTS products_fts_update AFTER UPDATE OF title, description, tags ON products BEGIN
+                    INSERT INTO products_fts (products_fts, rowid, title, description, tags)
+                    VALUES ('delete', old.id, old.title, old.description, old.tags);
+                    INSERT INTO products_fts (rowid, title, description, tags)
+                    VALUES (new.id, new.title, new.description, new.tags);
+                END''')
+    c.execute("INSERT INTO products_fts (products_fts) VALUES ('rebuild')")
+
+_product_search_fts = None
+
+def product_search_uses_fts(c):
+    global _product_search_fts
+    if _product_search_fts is None:
+        c.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'products_fts'")
+        _product_search_fts = c.fetchone() is not None
+    return _product_search_fts
+
+def build_search_query(text):
+    # Every word must match, as a whole word or as the start of one
+    terms = re.findall(r'\w+', text)
+    return ' '.join(f'"{term}"*' for term in terms)
+
+def search_products(c, text, page=1, per_page=None, category=None):
+    """Return ``(rows, total)`` for one page of products matching ``text``.
+
+    Results are ranked by BM25 with title matches weighted over tags and
+    tags over descriptions. Rows are full ``products`` rows.
+    """
+    per_page = per_page or Config.SEARCH_PAGE_SIZE
+    offset = (max(page, 1) - 1) * per_page
+
+    if product_search_uses_fts(c):
+        match = build_search_query(text)
+        if not match:
+            return [], 0
+        where = "products_fts MATCH ?"
+        params = [match]
+        if category:
+            where += " AND p.category = ?"
+            params.append(category)
+
+        c.execute(f"""SELECT COUNT(*) FROM products_fts
+                      JOIN products p ON p.id = products_fts.rowid
+                      WHERE {where}""", params)
+        total = c.fetchone()[0]
+        c.execute(f"""SELECT p.* FROM products_fts
+                      JOIN products p ON p.id = products_fts.rowid
+                      WHERE {where}
+                      ORDER BY bm25(products_fts, 10.0, 1.0, 5.0)
+                      LIMIT ? OFFSET ?""", params + [per_page, offset])
+        return c.fetchall(), total
+
+    where = "(title LIKE ? OR description LIKE ? OR tags LIKE ?)"
+    params = [f"%{text}%", f"%{text}%", f"%{text}%"]
+    if category:
+        where += " AND category = ?"
+        params.append(category)
+    c.execute(f"SELECT COUNT(*) FROM products WHERE {where}", params)
+    total = c.fetchone()[0]
+    c.execute(f"SELECT * FROM products WHERE {where} ORDER BY id DESC LIMIT ? OFFSET ?",
+              params + [per_page, offset])
+    return c.fetchall(), total
+
+# ==================== END PRODUCT SEARCH ====================
+
+ORDER_ITEM_PATTERN = re.compile(r'(?P<title>.+?) \((?P<quantity>\d+) × ₹(?P<price>[\d,]+(?:\.\d+)?)\)(?:, |$)')
+
+def backfill_order_items(c):
+    """Parse the formatted ``orders.items`` text of existing orders into order_items.
+
+    The text only has the discounted unit price, so backfilled rows store that
+    as ``unit_price`` with no discount. Products are matched by title.
+    """
+    c.execute("SELECT id, title FROM products")
+    product_ids = {title: product_id for product_id, title in c.fetchall()}
+
+    c.execute("SELECT id, items FROM orders WHERE id NOT IN (SELECT order_id FROM order_items)")
+    for order_id, items in c.fetchall():
+        rows = [(order_id, product_ids.get(match['title']), match['title'], int(match['quantity']),
+                 float(match['price'].replace(',', '')), 0)
+                for match in ORDER_ITEM_PATTERN.finditer(items or '')]
+        if not rows:
+            print(f"Could not parse items of order {order_id}: {items!r}")
+            continue
+        c.executemany('''INSERT INTO order_items (order_id, product_id, title, quantity, unit_price, discount)
+                        VALUES (?, ?, ?, ?, ?, ?)''', rows)
+
+def create_transaction_id_index(c):
+    c.execute("SELECT transaction_id FROM orders GROUP BY transaction_id HAVING COUNT(*) > 1")
+    duplicates = [row[0] for row in c.fetchall()]
+    if duplicates:
+        # Keep existing data as it is; place_order's IMMEDIATE transaction
+        # still prevents new duplicates
+        print(f"Orders share transaction ids {duplicates}; creating a non-unique index")
+        c.execute("CREATE INDEX IF NOT EXISTS idx_orders_transaction_id ON orders(transaction_id)")
+    else:
+        c.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_orders_transaction_id ON orders(transaction_id)")
+
+# ==================== DASHBOARD STATS ====================
+
+def _bump_stat(name, delta):
+    return (f"INSERT INTO dashboard_stats (name, value) VALUES ({name}, {delta}) "
+            f"ON CONFLICT(name) DO UPDATE SET value = value + excluded.value;")
+
+# Counters behind admin_dashboard, kept current by triggers so every writer
+# (checkout, cancellations, admin edits, logins, product CRUD, imports) updates
+# them in its own transaction. Revenue excludes cancelled orders.
+_ORDER_REVENUE = "CASE WHEN {row}.status = 'Cancelled' THEN 0 ELSE {row}.total_amount END"
+
+DASHBOARD_STATS_TRIGGERS = [
+    f"""CREATE TRIGGER IF NOT EXISTS stats_products_insert AFTER INSERT ON products BEGIN
+            {_bump_stat("'total_products'", 1)}
+        END""",
+    f"""CREATE TRIGGER IF NOT EXISTS stats_products_delete AFTER DELETE ON products BEGIN
+            {_bump_stat("'total_products'", -1)}
+        END""",
+    f"""CREATE TRIGGER IF NOT EXISTS stats_users_insert AFTER INSERT ON users BEGIN
+            {_bump_stat("'total_users'", 1)}
+        END""",
+    f"""CREATE TRIGGER IF NOT EXISTS stats_users_delete AFTER DELETE ON users BEGIN
+            {_bump_stat("'total_users'", -1)}
+        END""",
+    f"""CREATE TRIGGER IF NOT EXISTS stats_orders_insert AFTER INSERT ON orders BEGIN
+            {_bump_stat("'total_orders'", 1)}
+            {_bump_stat("'orders_status:' || COALESCE(NEW.status, '')", 1)}
+            {_bump_stat("'orders_on:' || substr(NEW.order_date, 1, 10)", 1)}
+            {_bump_stat("'revenue'", _ORDER_REVENUE.format(row='NEW'))}
+        END""",
+    f"""CREATE TRIGGER IF NOT EXISTS stats_orders_delete AFTER DELETE ON orders BEGIN
+            {_bump_stat("'total_orders'", -1)}
+            {_bump_stat("'orders_status:' || COALESCE(OLD.status, '')", -1)}
+            {_bump_stat("'orders_on:' || substr(OLD.order_date, 1, 10)", -1)}
+            {_bump_stat("'revenue'", '-' + _ORDER_REVENUE.format(row='OLD'))}
+        END""",
+    f"""CREATE TRIGGER IF NOT EXISTS stats_orders_update AFTER UPDATE OF status, total_amount ON orders BEGIN
+            {_bump_stat("'orders_status:' || COALESCE(OLD.status, '')", -1)}
+            {_bump_stat("'orders_status:' || COALESCE(NEW.status, '')", 1)}
+            {_bump_stat("'revenue'", _ORDER_REVENUE.format(row='NEW') + ' - ' + _ORDER_REVENUE.format(row='OLD'))}
+        END""",
+    f"""CREATE TRIGGER IF NOT EXISTS stats_orders_date AFTER UPDATE OF order_date ON orders BEGIN
+            {_bump_stat("'orders_on:' || substr(OLD.order_date, 1, 10)", -1)}
+            {_bump_stat("'orders_on:' || substr(NEW.order_date, 1, 10)", 1)}
+        END""",
+]
+
+def reconcile_dashboard_stats(c):
+    """Recompute every dashboard counter from the base tables."""
+    c.execute("DELETE FROM dashboard_stats")
+    c.execute("INSERT INTO dashboard_stats (name, value) SELECT 'total_products', COUNT(*) FROM products")
+    c.execute("INSERT INTO dashboard_stats (name, value) SELECT 'total_users', COUNT(*) FROM users")
+    c.execute("INSERT INTO dashboard_stats (name, value) SELECT 'total_orders', COUNT(*) FROM orders")
+    c.execute(f"""INSERT INTO dashboard_stats (name, value)
+                  SELECT 'revenue', COALESCE(SUM({_ORDER_REVENUE.format(row='orders')}), 0) FROM orders""")
+    c.execute("""INSERT INTO dashboard_stats (name, value)
+                 SELECT 'orders_status:' || COALESCE(status, ''), COUNT(*) FROM orders GROUP BY 1""")
+    c.execute("""INSERT INTO dashboard_stats (name, value)
+                 SELECT 'orders_on:' || substr(order_date, 1, 10), COUNT(*) FROM orders GROUP BY 1""")
+
+def read_dashboard_stats(c):
+    today = datetime.now().strftime('%Y-%m-%d')
+    names = ['total_products', 'total_users', 'total_orders', 'revenue', f'orders_on:{today}',
+             *(f'orders_status:{status}' for status in ORDER_STATUSES)]
+    c.execute(f"SELECT name, value FROM dashboard_stats WHERE name IN ({','.join('?' * len(names))})", names)
+    values = dict(c.fetchall())
+    return {
+        'total_products': int(values.get('total_products', 0)),
+        'total_users': int(values.get('total_users', 0)),
+        'total_orders': int(values.get('total_orders', 0)),
+        'revenue': values.get('revenue', 0),
+        'orders_today': int(values.get(f'orders_on:{today}', 0)),
+        'orders_by_status': {status: int(values.get(f'orders_status:{status}', 0)) for status in ORDER_STATUSES}
+    }
+
+def reconcile_dashboard_stats_job():
+    with get_db() as conn:
+        with transaction(conn):
+            reconcile_dashboard_stats(conn.cursor())
+
+# Triggers keep the counters exact; this only repairs drift from writes made
+# outside the app (e.g. editing the database by hand with the triggers dropped)
+background_tasks.append(PeriodicTask('dashboard-stats', Config.STATS_RECONCILE_INTERVAL,
+                                     reconcile_dashboard_stats_job))
+
+# ==================== END DASHBOARD STATS ====================
+
+# ==================== SALES ROLLUPS ====================
+
+# Rollup table -> number of leading order_date characters forming its period
+# ('YYYY-MM-DD HH' for hourly, 'YYYY-MM-DD' for daily)
+SALES_ROLLUPS = {
+    'hourly': ('sales_hourly', 13),
+    'daily': ('sales_daily', 10),
+}
+
+SALES_MEASURES = ['subtotal', 'delivery_charge', 'total_amount', 'advance_payment']
+
+def _rollup_table_sql(table):
+    return f'''CREATE TABLE IF NOT EXISTS {table}
+                (period TEXT NOT NULL,
+                state TEXT NOT NULL,
+                city TEXT NOT NULL,
+                status TEXT NOT NULL,
+                orders INTEGER NOT NULL DEFAULT 0,
+                subtotal REAL NOT NULL DEFAULT 0,
+                delivery_charge REAL NOT NULL DEFAULT 0,
+                total_amount REAL NOT NULL DEFAULT 0,
+                advance_payment REAL NOT NULL DEFAULT 0,
+                PRIMARY KEY (period, state, city, status)) WITHOUT ROWID'''
+
+def _rollup_apply(table, width, row, sign):
+    values = ', '.join(f"{sign}{row}.{m}" for m in SALES_MEASURES)
+    updates = ', '.join(f"{m} = {m} + excluded.{m}" for m in ['orders', *SALES_MEASURES])
+    bucket = (f"substr({row}.order_date, 1, {width}), {row}.state, {row}.city, "
+              f"COALESCE({row}.status, '')")
+    sql = (f"INSERT INTO {table} (period, state, city, status, orders, {', '.join(SALES_MEASURES)}) "
+           f"VALUES ({bucket}, {sign}1, {values}) "
+           f"ON CONFLICT(period, state, city, status) DO UPDATE SET {updates};")
+    if sign == '-':
+        # A bucket whose last order left it is dropped rather than kept at zero
+        sql += (f"\nDELETE FROM {table} "
+                f"WHERE (period, state, city, status) = ({bucket}) AND orders = 0;")
+    return sql
+
+def _rollup_trigger_body(steps):
+    return '\n'.join(_rollup_apply(table, width, row, sign)
+                     for table, width in SALES_ROLLUPS.values() for row, sign in steps)
+
+# Like dashboard_stats, the rollups move with every order write in the same
+# transaction; an update backs the old row out of its bucket and adds the new one
+SALES_ROLLUP_TRIGGERS = [
+    f"""CREATE TRIGGER IF NOT EXISTS sales_rollup_insert AFTER INSERT ON orders BEGIN
+            {_rollup_trigger_body([('NEW', '')])}
+        END""",
+    f"""CREATE TRIGGER IF NOT EXISTS sales_rollup_delete AFTER DELETE ON orders BEGIN
+            {_rollup_trigger_body([('OLD', '-')])}
+        END""",
+    f"""CREATE TRIGGER IF NOT EXISTS sales_rollup_update
+        AFTER UPDATE OF order_date, state, city, status, {', '.join(SALES_MEASURES)} ON orders BEGIN
+            {_rollup_trigger_body([('OLD', '-'), ('NEW', '')])}
+        END""",
+]
+
+def rebuild_sales_rollups(c, since=''):
+    """Recompute rollup buckets for orders placed at or after ``since``.
+
+    ``since`` is an order_date prefix; the default rebuilds everything.
+    """
+    sums = ', '.join(f"SUM({m})" for m in SALES_MEASURES)
+    for table, width in SALES_ROLLUPS.values():
+        c.execute(f"DELETE FROM {table} WHERE period >= substr(?, 1, {width})", (since,))
+        c.execute(f"""INSERT INTO {table} (period, state, city, status, orders, {', '.join(SALES_MEASURES)})
+                      SELECT substr(order_date, 1, {width}), state, city, COALESCE(status, ''), COUNT(*), {sums}
+                      FROM orders
+                      WHERE order_date >= substr(?, 1, {width})
+                      GROUP BY 1, 2, 3, 4""", (since,))
+
+def rebuild_recent_sales_rollups_job():
+    since = (datetime.now() - timedelta(days=Config.SALES_ROLLUP_REBUILD_DAYS)).strftime('%Y-%m-%d')
+    with get_db() as conn:
+        with transaction(conn):
+            rebuild_sales_rollups(conn.cursor(), since)
+
+background_tasks.append(PeriodicTask('sales-rollups', Config.SALES_ROLLUP_INTERVAL,
+                                     rebuild_recent_sales_rollups_job))
+
+# Report dimension -> rollup columns it groups by
+SALES_REPORT_GROUPS = {
+    'period': ['period'],
+    'state': ['state'],
+    'city': ['state', 'city'],
+    'status': ['status'],
+}
+
+def sales_report(c, start, end, granularity='daily', group='period', status=None, state=None):
+    """Aggregate the rollups between the ``start`` and ``end`` dates (inclusive).
+
+    Never touches the orders table, so the cost depends on the number of
+    buckets in the range rather than the number of orders.
+    """
+    table, _ = SALES_ROLLUPS[granularity]
+    columns = SALES_REPORT_GROUPS[group]
+    end_exclusive = (datetime.strptime(end, '%Y-%m-%d') + timedelta(days=1)).strftime('%Y-%m-%d')
+
+    conditions = ["period >= ?", "period < ?"]
+    params = [start, end_exclusive]
+    if status:
+        conditions.append("status = ?")
+        params.append(status)
+    if state:
+        conditions.append("state = ?")
+        params.append(state)
+
+    order_by = 'period' if group == 'period' else 'total_amount DESC'
+    c.execute(f"""SELECT {', '.join(columns)}, SUM(orders) AS orders,
+                         {', '.join(f'SUM({m}) AS {m}' for m in SALES_MEASURES)}
+                  FROM {table}
+                  WHERE {' AND '.join(conditions)}
+                  GROUP BY {', '.join(columns)}
+                  HAVING SUM(orders) != 0
+                  ORDER BY {order_by}""", params)
+    rows = [dict(row) for row in c.fetchall()]
+
+    totals = {m: sum(row[m] for row in rows) for m in ['orders', *SALES_MEASURES]}
+    return rows, totals
+
+def parse_date_arg(value, default=None):
+    """Parse a YYYY-MM-DD query argument, falling back to ``default``."""
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except (TypeError, ValueError):
+        return default
+
+def sales_report_args(args):
+    """Read and validate the analytics filters from a request's query string."""
+    today = datetime.now().date()
+    granularity = args.get('granularity', 'daily')
+    if granularity not in SALES_ROLLUPS:
+        granularity = 'daily'
+    group = args.get('group', 'period')
+    if group not in SALES_REPORT_GROUPS:
+        group = 'period'
+
+    end = parse_date_arg(args.get('end'), today)
+    start = parse_date_arg(args.get('start'), end - timedelta(days=Config.SALES_REPORT_DEFAULT_DAYS - 1))
+    if start > end:
+        start, end = end, start
+
+    status = args.get('status') if args.get('status') in ORDER_STATUSES else None
+    return {
+        'start': start.isoformat(),
+        'end': end.isoformat(),
+        'granularity': granularity,
+        'group': group,
+        'status': status,
+        'state': args.get('state') or None,
+    }
+
+# ==================== END SALES ROLLUPS ====================
+
+# ==================== DELIVERY CHARGES ====================
+
+# Seeded into the delivery_charges table on first run; edit them from
+# admin_settings afterwards
+DEFAULT_DELIVERY_CHARGES = {
+    "Madhya Pradesh": {
+        "Ambah": 500,
+        "Gwalior": 300,
+        "Bhopal": 200,
+        "Indore": 200
+    },
+    "Uttar Pradesh": {
+        "Agra": 400,
+        "Lucknow": 300,
+        "Varanasi": 350,
+        "Kanpur": 300
+    },
+    "Rajasthan": {
+        "Jaipur": 300,
+        "Udaipur": 350,
+        "Jodhpur": 400,
+        "Kota": 350
+    }
+}
+
+def seed_delivery_charges(c):
+    c.executemany("INSERT OR IGNORE INTO delivery_charges (state, city, charge) VALUES (?, ?, ?)",
+                  [(state, city, charge)
+                   for state, cities in DEFAULT_DELIVERY_CHARGES.items()
+                   for city, charge in cities.items()])
+
+class DeliveryChargeStore:
+    """Delivery charges per state and city, stored in SQLite.
+
+    Each worker keeps the whole table in memory as ``{state: {city: charge}}``
+    and reloads it only when the 'delivery_charges' cache version moves, so a
+    change saved in one worker reaches every other worker on its next lookup.
+    """
+
+    def __init__(self):
+        self._version = None
+        self._charges = {}
+        self._lock = threading.Lock()
+
+    def all(self, c):
+        version = cache_version(c, 'delivery_charges')
+        if version != self._version:
+            with self._lock:
+                if version != self._version:
+                    charges = {}
+                    c.execute("SELECT state, city, charge FROM delivery_charges ORDER BY state, city")
+                    for state, city, charge in c.fetchall():
+                        charges.setdefault(state, {})[city] = charge
+                    self._charges, self._version = charges, version
+        return self._charges
+
+    def charge_for(self, c, state, city):
+        return self.all(c).get(state, {}).get(city, 0)
+
+    def replace(self, c, charges):
+        """Overwrite every charge with ``charges``. The caller commits."""
+        c.execute("DELETE FROM delivery_charges")
+        c.executemany("INSERT INTO delivery_charges (state, city, charge) VALUES (?, ?, ?)",
+                      [(state, city, charge) for state, cities in charges.items() for city, charge in cities.items()])
+        self.invalidate()
+
+    def invalidate(self):
+        self._version = None
+
+
+delivery_charge_store = DeliveryChargeStore()
+
+def get_delivery_charges():
+    try:
+        with get_db() as conn:
+            return delivery_charge_store.all(conn.cursor())
+    except Exception as e:
+        print(f"Error fetching delivery charges: {e}")
+        return {}
+
+# ==================== END DELIVERY CHARGES ====================
+
+# ==================== IMAGE VARIANTS ====================
+
+# Variant name -> longest edge in pixels. Every variant is written as WebP
+# and JPEG under static/variants/<content hash>/, so identical uploads
+# share files and a changed image always gets new URLs.
+IMAGE_VARIANTS = {
+    'thumbnail': 150,
+    'card': 400,
+    'detail': 800,
+    'fullscreen': 1600,
+}
+
+IMAGE_VARIANT_FORMATS = {
+    'webp': {'format': 'WEBP', 'quality': 80, 'method': 4},
+    'jpeg': {'format': 'JPEG', 'quality': 82, 'optimize': True, 'progressive': True},
+}
+
+# GIFs keep their animation and videos are left alone
+IMAGE_VARIANT_SOURCES = ('.png', '.jpg', '.jpeg', '.webp')
+
+VARIANTS_DIR = 'variants'
+
+def image_content_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()[:16]
+
+def render_image_variants(source_path, target_dir):
+    """Write every variant of ``source_path`` into ``target_dir``.
+
+    Returns ``{variant: [width, height]}``. Images are only ever scaled down.
+    """
+    os.makedirs(target_dir, exist_ok=True)
+    sizes = {}
+    with Image.open(source_path) as original:
+        original = ImageOps.exif_transpose(original)
+        has_alpha = original.mode in ('RGBA', 'LA') or 'transparency' in original.info
+        base = original.convert('RGBA' if has_alpha else 'RGB')
+
+    for variant, edge in IMAGE_VARIANTS.items():
+        image = base.copy()
+        image.thumbnail((edge, edge), Image.LANCZOS)
+        sizes[variant] = list(image.size)
+        for fmt, options in IMAGE_VARIANT_FORMATS.items():
+            output = image
+            if fmt == 'jpeg' and has_alpha:
+                # JPEG has no alpha channel; flatten onto white like the page background
+                output = Image.new('RGB', image.size, (255, 255, 255))
+                output.paste(image, mask=image.getchannel('A'))
+            # Write to a temporary name first so a half-written file is never
+            # served; the name is unique because the same bytes stored in two
+            # folders share one variants directory and may render concurrently
+            fd, temp_path = tempfile.mkstemp(dir=target_dir, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as out:
+                output.save(out, **options)
+            os.replace(temp_path, os.path.join(target_dir, f'{variant}.{fmt}'))
+    return sizes
+
+class ImageVariantStore:
+    """Which static images have resized variants, cached per worker.
+
+    Generation runs on a small thread pool so uploads return immediately;
+    until a variant exists, pages keep using the original file. The table is
+    reloaded when the 'images' cache version moves, checked at most once per
+    request.
+    """
+
+    def __init__(self):
+        self._version = None
+        self._variants = {}
+        self._lock = threading.Lock()
+        self._executor = None
+        self._executor_pid = None
+
+    @property
+    def enabled(self):
+        return Image is not None
+
+    def _refresh(self):
+        if has_request_context() and g.get('image_variants_checked'):
+            return
+        with get_db() as conn:
+            c = conn.cursor()
+            version = cache_version(c, 'images')
+            if version != self._version:
+                with self._lock:
+                    if version != self._version:
+                        c.execute("SELECT source, content_hash, sizes FROM image_variants")
+                        self._variants = {source: (content_hash, json.loads(sizes))
+                                          for source, content_hash, sizes in c.fetchall()}
+                        self._version = version
+        if has_request_context():
+            g.image_variants_checked = True
+
+    def lookup(self, source):
+        """Return ``(content_hash, sizes)`` for a static path, or None."""
+        try:
+            self._refresh()
+        except Exception as e:
+            print(f"Error loading image variants: {e}")
+        return self._variants.get(source)
+
+    def generate(self, source):
+        """Build the variants for ``source`` (a path under static/) and record them."""
+        path = os.path.join(app.static_folder, source)
+        content_hash = image_content_hash(path)
+        target_dir = os.path.join(app.static_folder, VARIANTS_DIR, content_hash)
+
+        with get_db() as conn:
+            c = conn.cursor()
+            c.execute("SELECT sizes FROM image_variants WHERE content_hash = ? LIMIT 1", (content_hash,))
+            row = c.fetchone()
+        # Same bytes already rendered (a re-upload under another name): reuse them
+        sizes = json.loads(row[0]) if row and os.path.isdir(target_dir) else render_image_variants(path, target_dir)
+
+        with get_db() as conn:
+            c = conn.cursor()
+            with transaction(conn):
+                c.execute('''INSERT INTO image_variants (source, content_hash, sizes) VALUES (?, ?, ?)
+                             ON CONFLICT(source) DO UPDATE SET content_hash = excluded.content_hash,
+                                                               sizes = excluded.sizes''',
+                          (source, content_hash, json.dumps(sizes)))
+        return content_hash
+
+    def _generate_logged(self, source):
+        try:
+            self.generate(source)
+        except Exception as e:
+            print(f"Error generating variants for {source}: {e}")
+
+    def submit(self, source):
+        """Queue variant generation for ``source`` on the background pool."""
+        if not self.enabled or not source.lower().endswith(IMAGE_VARIANT_SOURCES):
+            return None
+        if self._executor_pid != os.getpid():
+            # Pool threads do not survive a fork; each worker makes its own
+            self._executor = ThreadPoolExecutor(max_workers=Config.IMAGE_VARIANT_WORKERS,
+                                                thread_name_prefix='image-variants')
+            self._executor_pid = os.getpid()
+        return self._executor.submit(self._generate_logged, source)
+
+    def remove(self, c, source):
+        """Forget ``source``'s variants, deleting the files once no image uses them."""
+        c.execute("DELETE FROM image_variants WHERE source = ? RETURNING content_hash", (source,))
+        row = c.fetchone()
+        if not row:
+            return
+        c.execute("SELECT 1 FROM image_variants WHERE content_hash = ? LIMIT 1", (row[0],))
+        if c.fetchone() is None:
+            shutil.rmtree(os.path.join(app.static_folder, VARIANTS_DIR, row[0]), ignore_errors=True)
+
+    def url(self, source, variant, fmt):
+        found = self.lookup(source)
+        if not found or variant not in found[1]:
+            return None
+        return url_for('static', filename=f'{VARIANTS_DIR}/{found[0]}/{variant}.{fmt}')
+
+    def srcset(self, source, fmt):
+        found = self.lookup(source)
+        if not found:
+            return ''
+        content_hash, sizes = found
+        return ', '.join(f"{url_for('static', filename=f'{VARIANTS_DIR}/{content_hash}/{variant}.{fmt}')} {size[0]}w"
+                         for variant, size in sizes.items())
+
+
+image_variants = ImageVariantStore()
+
+def preferred_image_format():
+    # Browsers that advertise WebP on page requests get it; the rest get JPEG
+    return 'webp' if has_request_context() and 'image/webp' in request.accept_mimetypes else 'jpeg'
+
+@app.context_processor
+def inject_image_helpers():
+    def image_url(source, variant='card'):
+        """URL of ``source`` (a path under static/) resized for ``variant``."""
+        return image_variants.url(source, variant, preferred_image_format()) or url_for('static', filename=source)
+
+    def image_srcset(source):
+        return image_variants.srcset(source, preferred_image_format())
+
+    return {'image_url': image_url, 'image_srcset': image_srcset}
+
+@app.cli.command('generate-image-variants')
+def generate_image_variants_command():
+    """Build variants for every image under static/images and static/uploads."""
+    if not image_variants.enabled:
+        raise click.ClickException("Pillow is not installed")
+    for folder in ('images', 'uploads'):
+        directory = os.path.join(app.static_folder, folder)
+        if not os.path.isdir(directory):
+            continue
+        for entry in os.scandir(directory):
+            if entry.is_file() and entry.name.lower().endswith(IMAGE_VARIANT_SOURCES):
+                source = f'{folder}/{entry.name}'
+                try:
+                    click.echo(f"{source} -> {image_variants.generate(source)}")
+                except Exception as e:
+                    click.echo(f"{source}: {e}", err=True)
+
+# ==================== END IMAGE VARIANTS ====================
+
+# ==================== IMAGE CATALOG ====================
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.gif', '.webp')
+
+def product_image_references_sql(row):
+    # product_images mirrors products.image and the products.images JSON list
+    return f"""INSERT OR IGNORE INTO product_images (name, product_id)
+               SELECT {row}.image, {row}.id WHERE COALESCE({row}.image, '') != '';
+               INSERT OR IGNORE INTO product_images (name, product_id)
+               SELECT value, {row}.id
+               FROM json_each(CASE WHEN json_valid({row}.images) THEN {row}.images ELSE '[]' END)
+               WHERE type = 'text' AND value != '';"""
+
+PRODUCT_IMAGE_TRIGGERS = [
+    f"""CREATE TRIGGER IF NOT EXISTS product_images_insert AFTER INSERT ON products BEGIN
+            {product_image_references_sql('NEW')}
+        END""",
+    """CREATE TRIGGER IF NOT EXISTS product_images_delete AFTER DELETE ON products BEGIN
+            DELETE FROM product_images WHERE product_id = OLD.id;
+        END""",
+    f"""CREATE TRIGGER IF NOT EXISTS product_images_update AFTER UPDATE OF image, images ON products BEGIN
+            DELETE FROM product_images WHERE product_id = OLD.id;
+            {product_image_references_sql('NEW')}
+        END""",
+]
+
+def backfill_product_images(c):
+    c.execute("DELETE FROM product_images")
+    c.execute("""INSERT OR IGNORE INTO product_images (name, product_id)
+                 SELECT image, id FROM products WHERE COALESCE(image, '') != ''""")
+    c.execute("""INSERT OR IGNORE INTO product_images (name, product_id)
+                 SELECT j.value, p.id
+                 FROM products p,
+                      json_each(CASE WHEN json_valid(p.images) THEN p.images ELSE '[]' END) j
+                 WHERE j.type = 'text' AND j.value != ''""")
+
+def image_dimensions(path):
+    if Image is None:
+        return None, None
+    try:
+        # Only the header is read to get the size
+        with Image.open(path) as image:
+            return image.size
+    except Exception:
+        return None, None
+
+# Every folder under static/ that uploads are written to. Product images live
+# in 'images'; 'uploads' holds files sent to /upload.
+IMAGE_FOLDERS = ('images', 'uploads')
+
+def catalog_image(c, name, stat=None, folder='images'):
+    """Record (or refresh) one file from static/<folder> in image_catalog."""
+    path = os.path.join(app.static_folder, folder, name)
+    stat = stat or os.stat(path)
+    width, height = image_dimensions(path)
+    c.execute('''INSERT INTO image_catalog (folder, name, size, mtime, width, height, content_hash)
+                 VALUES (?, ?, ?, ?, ?, ?, ?)
+                 ON CONFLICT(folder, name) DO UPDATE SET size = excluded.size, mtime = excluded.mtime,
+                     width = excluded.width, height = excluded.height,
+                     content_hash = excluded.content_hash''',
+              (folder, name, stat.st_size, stat.st_mtime, width, height, image_content_hash(path)))
+
+def reconcile_image_catalog(c):
+    """Bring image_catalog in line with the IMAGE_FOLDERS in one directory pass each.
+
+    Only files whose size or mtime changed are re-read and hashed.
+    """
+    c.execute("SELECT folder, name, size, mtime FROM image_catalog")
+    known = {(folder, name): (size, mtime) for folder, name, size, mtime in c.fetchall()}
+
+    seen = set()
+    for folder in IMAGE_FOLDERS:
+        folder_dir = os.path.join(app.static_folder, folder)
+        if not os.path.isdir(folder_dir):
+            continue
+        with os.scandir(folder_dir) as entries:
+            for entry in entries:
+                if not entry.is_file() or not entry.name.lower().endswith(IMAGE_EXTENSIONS):
+                    continue
+                seen.add((folder, entry.name))
+                stat = entry.stat()
+                if known.get((folder, entry.name)) != (stat.st_size, stat.st_mtime):
+                    catalog_image(c, entry.name, stat, folder)
+
+    gone = [key for key in known if key not in seen]
+    c.executemany("DELETE FROM image_catalog WHERE folder = ? AND name = ?", gone)
+
+def reconcile_image_catalog_job():
+    with get_db() as conn:
+        with transaction(conn):
+            reconcile_image_catalog(conn.cursor())
+
+background_tasks.append(PeriodicTask('image-catalog', Config.IMAGE_CATALOG_RECONCILE_INTERVAL,
+                                     reconcile_image_catalog_job))
+
+# ==================== END IMAGE CATALOG ====================
+
+# ==================== IMAGE STORAGE ====================
+
+# Uploaded images are stored under the first 16 hex digits of their SHA-256,
+# so the same photo uploaded twice is kept once (whatever extension it came
+# with) and a URL never changes content
+CONTENT_ADDRESSED_NAME = re.compile(r'^[0-9a-f]{16}\.[a-z0-9]+$')
+
+def content_addressed_name(content_hash, filename):
+    ext = os.path.splitext(filename)[1].lower()
+    return f"{content_hash}{'.jpg' if ext == '.jpeg' else ext}"
+
+def store_image(file, directory):
+    """Save an uploaded file under its content hash in ``directory``.
+
+    Returns ``(name, created)``; ``created`` is False when identical bytes
+    were already stored.
+    """
+    os.makedirs(directory, exist_ok=True)
+    digest = hashlib.sha256()
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.upload')
+    try:
+        with os.fdopen(fd, 'wb') as out:
+            for block in iter(lambda: file.stream.read(1024 * 1024), b''):
+                digest.update(block)
+                out.write(block)
+        content_hash = digest.hexdigest()[:16]
+        stored = [f"{content_hash}{ext}" for ext in IMAGE_EXTENSIONS
+                  if os.path.exists(os.path.join(directory, f"{content_hash}{ext}"))]
+        if stored:
+            name = stored[0]
+            path = os.path.join(directory, name)
+            os.remove(temp_path)
+            # Re-uploading an unused image restarts its GC grace period
+            os.utime(path)
+            return name, False
+        name = content_addressed_name(content_hash, file.filename)
+        path = os.path.join(directory, name)
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, path)
+        return name, True
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+def image_reference_count(c, name):
+    c.execute("SELECT COUNT(*) FROM product_images WHERE name = ?", (name,))
+    return c.fetchone()[0]
+
+def delete_stored_image(c, name, folder='images'):
+    """Remove a file from static/<folder> along with its catalog entry and variants."""
+    path = os.path.join(app.static_folder, folder, name)
+    if os.path.exists(path):
+        os.remove(path)
+    c.execute("DELETE FROM image_catalog WHERE folder = ? AND name = ?", (folder, name))
+    image_variants.remove(c, f'{folder}/{name}')
+
+def collect_orphan_images(c, dry_run=False):
+    """Delete content-addressed uploads no product references any more.
+
+    Returns the removed files as ``folder/name`` paths. Files newer than
+    IMAGE_GC_GRACE_SECONDS are kept so an image uploaded ahead of the
+    product that will use it survives. Products only reference the images
+    folder; hand-named files (icons, the payment QR code) are never collected.
+    """
+    c.execute('''SELECT folder, name FROM image_catalog
+                 WHERE mtime < ?
+                   AND NOT (folder = 'images' AND EXISTS (SELECT 1 FROM product_images pi
+                                                          WHERE pi.name = image_catalog.name))''',
+              (time.time() - Config.IMAGE_GC_GRACE_SECONDS,))
+    orphans = [(folder, name) for folder, name in c.fetchall() if CONTENT_ADDRESSED_NAME.match(name)]
+    if not dry_run:
+        for folder, name in orphans:
+            delete_stored_image(c, name, folder)
+    return [f'{folder}/{name}' for folder, name in orphans]
+
+def collect_orphan_images_job():
+    with get_db() as conn:
+        with transaction(conn):
+            orphans = collect_orphan_images(conn.cursor())
+    if orphans:
+        print(f"Removed {len(orphans)} unused image(s)")
+
+background_tasks.append(PeriodicTask('image-gc', Config.IMAGE_GC_INTERVAL, collect_orphan_images_job))
+
+def rename_product_image(c, old_name, new_name):
+    """Point every product using ``old_name`` (as image or in images) at ``new_name``."""
+    c.execute('''SELECT p.id, p.image, p.images FROM products p
+                 JOIN product_images pi ON pi.product_id = p.id
+                 WHERE pi.name = ?''', (old_name,))
+    for product_id, image, images in c.fetchall():
+        try:
+            image_list = json.loads(images) if images else []
+        except ValueError:
+            image_list = []
+        if isinstance(image_list, list):
+            images = json.dumps([new_name if item == old_name else item for item in image_list])
+        c.execute("UPDATE products SET image = ?, images = ? WHERE id = ?",
+                  (new_name if image == old_name else image, images, product_id))
+
+@app.cli.command('dedupe-images')
+@click.option('--dry-run', is_flag=True, help='Only list what would change.')
+def dedupe_images_command(dry_run):
+    """Move product images to content-addressed names, merging duplicates."""
+    with get_db() as conn:
+        c = conn.cursor()
+        c.execute('''SELECT name, content_hash FROM image_catalog
+                     WHERE folder = 'images'
+                       AND EXISTS (SELECT 1 FROM product_images pi WHERE pi.name = image_catalog.name)''')
+        for name, content_hash in c.fetchall():
+            new_name = content_addressed_name(content_hash, name)
+            if name == new_name:
+                continue
+            click.echo(f"{name} -> {new_name}")
+            if dry_run:
+                continue
+            images_dir = os.path.join(app.static_folder, 'images')
+            with transaction(conn):
+                if not os.path.exists(os.path.join(images_dir, new_name)):
+                    shutil.copy2(os.path.join(images_dir, name), os.path.join(images_dir, new_name))
+                    catalog_image(c, new_name)
+                rename_product_image(c, name, new_name)
+                delete_stored_image(c, name)
+            if image_variants.enabled:
+                image_variants.generate(f'images/{new_name}')
+
+@app.cli.command('gc-images')
+@click.option('--dry-run', is_flag=True, help='Only list the images that would be removed.')
+def gc_images_command(dry_run):
+    """Delete uploaded images that no product references."""
+    with get_db() as conn:
+        with transaction(conn):
+            for name in collect_orphan_images(conn.cursor(), dry_run=dry_run):
+                click.echo(name)
+
+# ==================== END IMAGE STORAGE ====================
+
+
+
+
+# Versioned schema migrations, applied in order by init_db(). Each step is
+# either an SQL statement or a callable taking a cursor. Never edit a migration
+# that has shipped; add a new version instead.
+MIGRATIONS = [
+    (1, 'indexes for order, user and product listings', [
+        # my_orders, admin_user_detail
+        "CREATE INDEX IF NOT EXISTS idx_orders_user_date ON orders(user_id, order_date)",
+        # admin_orders with a status filter
+        "CREATE INDEX IF NOT EXISTS idx_orders_status_date ON orders(status, order_date)",
+        # admin_orders, recent orders on admin_dashboard
+        "CREATE INDEX IF NOT EXISTS idx_orders_order_date ON orders(order_date)",
+        "CREATE INDEX IF NOT EXISTS idx_users_created_at ON users(created_at)",
+        "CREATE INDEX IF NOT EXISTS idx_products_category ON products(category)",
+        # low stock widget on admin_dashboard
+        "CREATE INDEX IF NOT EXISTS idx_products_stock ON products(stock)",
+    ]),
+    (2, 'full-text product search index', [
+        create_product_search_index,
+    ]),
+    (3, 'cache version counters', [
+        # Bumped in the same transaction as the change, so every worker can
+        # tell its in-process caches are stale with one primary-key lookup
+        '''CREATE TABLE IF NOT EXISTS cache_versions
+           (name TEXT PRIMARY KEY,
+           version INTEGER NOT NULL DEFAULT 0)''',
+        "INSERT OR IGNORE INTO cache_versions (name) VALUES ('catalog')",
+        '''CREATE TRIGGER IF NOT EXISTS catalog_version_insert AFTER INSERT ON products BEGIN
+               UPDATE cache_versions SET version = version + 1 WHERE name = 'catalog';
+           END''',
+        '''CREATE TRIGGER IF NOT EXISTS catalog_version_delete AFTER DELETE ON products BEGIN
+               UPDATE cache_versions SET version = version + 1 WHERE name = 'catalog';
+           END''',
+        '''CREATE TRIGGER IF NOT EXISTS catalog_version_update AFTER UPDATE OF category ON products BEGIN
+               UPDATE cache_versions SET version = version + 1 WHERE name = 'catalog';
+           END''',
+    ]),
+    (4, 'server-side carts', [
+        '''CREATE TABLE IF NOT EXISTS carts
+           (id TEXT PRIMARY KEY,
+           user_id INTEGER UNIQUE,
+           created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+           updated_at TEXT DEFAULT CURRENT_TIMESTAMP,
+           FOREIGN KEY(user_id) REFERENCES users(id))''',
+        '''CREATE TABLE IF NOT EXISTS cart_items
+           (cart_id TEXT NOT NULL,
+           product_id INTEGER NOT NULL,
+           quantity INTEGER NOT NULL,
+           PRIMARY KEY (cart_id, product_id),
+           FOREIGN KEY(cart_id) REFERENCES carts(id),
+           FOREIGN KEY(product_id) REFERENCES products(id)) WITHOUT ROWID''',
+    ]),
+    (5, 'order line items', [
+        # unit_price is the list price and discount the percentage off, as
+        # they were when the order was placed; title is kept for deleted products
+        '''CREATE TABLE IF NOT EXISTS order_items
+           (id INTEGER PRIMARY KEY AUTOINCREMENT,
+           order_id INTEGER NOT NULL,
+           product_id INTEGER,
+           title TEXT NOT NULL,
+           quantity INTEGER NOT NULL,
+           unit_price REAL NOT NULL,
+           discount INTEGER DEFAULT 0,
+           FOREIGN KEY(order_id) REFERENCES orders(id),
+           FOREIGN KEY(product_id) REFERENCES products(id))''',
+        "CREATE INDEX IF NOT EXISTS idx_order_items_order ON order_items(order_id)",
+        "CREATE INDEX IF NOT EXISTS idx_order_items_product ON order_items(product_id)",
+        backfill_order_items,
+    ]),
+    (6, 'unique order transaction ids', [
+        create_transaction_id_index,
+    ]),
+    (7, 'stock reservations on order lines', [
+        # 1 while the line's quantity is taken out of products.stock; orders
+        # from before stock tracking stay 0 so cancelling them releases nothing
+        "ALTER TABLE order_items ADD COLUMN stock_reserved INTEGER DEFAULT 0",
+    ]),
+    (8, 'dashboard counters', [
+        '''CREATE TABLE IF NOT EXISTS dashboard_stats
+           (name TEXT PRIMARY KEY NOT NULL,
+           value REAL NOT NULL DEFAULT 0)''',
+        *DASHBOARD_STATS_TRIGGERS,
+        reconcile_dashboard_stats,
+    ]),
+    (9, 'sales rollups', [
+        *(_rollup_table_sql(table) for table, _ in SALES_ROLLUPS.values()),
+        "CREATE INDEX IF NOT EXISTS idx_sales_daily_status ON sales_daily(status, period)",
+        *SALES_ROLLUP_TRIGGERS,
+        rebuild_sales_rollups,
+    ]),
+    (10, 'product sku', [
+        "ALTER TABLE products ADD COLUMN sku TEXT",
+        # Stable key for bulk imports; NULLs (form-added products) never clash
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_products_sku ON products(sku)",
+    ]),
+    (11, 'delivery charges table', [
+        '''CREATE TABLE IF NOT EXISTS delivery_charges
+           (state TEXT NOT NULL,
+           city TEXT NOT NULL,
+           charge INTEGER NOT NULL DEFAULT 0,
+           PRIMARY KEY (state, city)) WITHOUT ROWID''',
+        seed_delivery_charges,
+        "INSERT OR IGNORE INTO cache_versions (name) VALUES ('delivery_charges')",
+        '''CREATE TRIGGER IF NOT EXISTS delivery_charges_version_insert AFTER INSERT ON delivery_charges BEGIN
+               UPDATE cache_versions SET version = version + 1 WHERE name = 'delivery_charges';
+           END''',
+        '''CREATE TRIGGER IF NOT EXISTS delivery_charges_version_update AFTER UPDATE ON delivery_charges BEGIN
+               UPDATE cache_versions SET version = version + 1 WHERE name = 'delivery_charges';
+           END''',
+        '''CREATE TRIGGER IF NOT EXISTS delivery_charges_version_delete AFTER DELETE ON delivery_charges BEGIN
+               UPDATE cache_versions SET version = version + 1 WHERE name = 'delivery_charges';
+           END''',
+    ]),
+    (12, 'image variants', [
+        '''CREATE TABLE IF NOT EXISTS image_variants
+           (source TEXT PRIMARY KEY,
+           content_hash TEXT NOT NULL,
+           sizes TEXT NOT NULL,
+           created_at TEXT DEFAULT CURRENT_TIMESTAMP)''',
+        "CREATE INDEX IF NOT EXISTS idx_image_variants_hash ON image_variants(content_hash)",
+        "INSERT OR IGNORE INTO cache_versions (name) VALUES ('images')",
+        '''CREATE TRIGGER IF NOT EXISTS image_variants_version_insert AFTER INSERT ON image_variants BEGIN
+               UPDATE cache_versions SET version = version + 1 WHERE name = 'images';
+           END''',
+        '''CREATE TRIGGER IF NOT EXISTS image_variants_version_update AFTER UPDATE ON image_variants BEGIN
+               UPDATE cache_versions SET version = version + 1 WHERE name = 'images';
+           END''',
+        '''CREATE TRIGGER IF NOT EXISTS image_variants_version_delete AFTER DELETE ON image_variants BEGIN
+               UPDATE cache_versions SET version = version + 1 WHERE name = 'images';
+           END''',
+    ]),
+    (13, 'image catalog', [
+        '''CREATE TABLE IF NOT EXISTS product_images
+           (name TEXT NOT NULL,
+           product_id INTEGER NOT NULL,
+           PRIMARY KEY (name, product_id)) WITHOUT ROWID''',
+        "CREATE INDEX IF NOT EXISTS idx_product_images_product ON product_images(product_id)",
+        *PRODUCT_IMAGE_TRIGGERS,
+        backfill_product_images,
+        '''CREATE TABLE IF NOT EXISTS image_catalog
+           (name TEXT PRIMARY KEY,
+           size INTEGER NOT NULL,
+           mtime REAL NOT NULL,
+           width INTEGER,
+           height INTEGER,
+           content_hash TEXT)''',
+        "CREATE INDEX IF NOT EXISTS idx_image_catalog_mtime ON image_catalog(mtime, name)",
+    ]),
+    (14, 'catalog every upload folder', [
+        '''CREATE TABLE image_catalog_new
+           (folder TEXT NOT NULL DEFAULT 'images',
+           name TEXT NOT NULL,
+           size INTEGER NOT NULL,
+           mtime REAL NOT NULL,
+           width INTEGER,
+           height INTEGER,
+           content_hash TEXT,
+           PRIMARY KEY (folder, name))''',
+        '''INSERT INTO image_catalog_new (name, size, mtime, width, height, content_hash)
+           SELECT name, size, mtime, width, height, content_hash FROM image_catalog''',
+        "DROP TABLE image_catalog",
+        "ALTER TABLE image_catalog_new RENAME TO image_catalog",
+        "CREATE INDEX IF NOT EXISTS idx_image_catalog_mtime ON image_catalog(mtime, name)",
+        reconcile_image_catalog,
+    ]),
+    (15, 'drop emptied sales rollup buckets', [
+        *(f"DROP TRIGGER IF EXISTS sales_rollup_{event}" for event in ('insert', 'delete', 'update')),
+        *SALES_ROLLUP_TRIGGERS,
+        *(f"DELETE FROM {table} WHERE orders = 0" for table, _ in SALES_ROLLUPS.values()),
+    ]),
+    (16, 'move per-day order counts when order_date changes', [
+        # Only stats_orders_date is new; the others already exist
+        *DASHBOARD_STATS_TRIGGERS,
+        reconcile_dashboard_stats,
+    ]),
+]
+
+def run_migrations(conn):
+    c = conn.cursor()
+    c.execute('''CREATE TABLE IF NOT EXISTS schema_migrations
+                (version INTEGER PRIMARY KEY,
+                name TEXT NOT NULL,
+                applied_at TEXT DEFAULT CURRENT_TIMESTAMP)''')
+
+    for version, name, steps in MIGRATIONS:
+        # BEGIN IMMEDIATE so two workers starting together apply each migration once
+        c.execute("BEGIN IMMEDIATE")
+        try:
+            c.execute("SELECT 1 FROM schema_migrations WHERE version = ?", (version,))
+            if c.fetchone():
+                conn.rollback()
+                continue
+
+            for step in steps:
+                if callable(step):
+                    step(c)
+                else:
+                    c.execute(step)
+            c.execute("INSERT INTO schema_migrations (version, name) VALUES (?, ?)", (version, name))
+            conn.commit()
+            print(f"Applied migration {version}: {name}")
+        except Exception:
+            conn.rollback()
+            raise
+
 def init_db():
     try:
-        conn = sqlite3.connect('ecommerce.db')
+        conn = sqlite3.connect(Config.DATABASE_PATH)
+        apply_storage_profile(conn)
         c = conn.cursor()
         
         
@@ -119,6 +1958,10 @@ def init_db():
                          sample_products)
         
         conn.commit()
+        
+        run_migrations(conn)
+        # Refresh planner statistics for any index that needs it
+        c.execute("PRAGMA optimize")
     except Exception as e:
         print(f"Database error: {e}")
         conn.rollback()
@@ -128,26 +1971,6 @@ def init_db():
 
 init_db()
 
-DELIVERY_CHARGES = {
-    "Madhya Pradesh": {
-        "Ambah": 500,
-        "Gwalior": 300,
-        "Bhopal": 200,
-        "Indore": 200
-    },
-    "Uttar Pradesh": {
-        "Agra": 400,
-        "Lucknow": 300,
-        "Varanasi": 350,
-        "Kanpur": 300
-    },
-    "Rajasthan": {
-        "Jaipur": 300,
-        "Udaipur": 350,
-        "Jodhpur": 400,
-        "Kota": 350
-    }
-}
 
 
 app.config['UPLOAD_FOLDER'] = 'static/uploads'
@@ -160,17 +1983,65 @@ app.config['ALLOWED_EXTENSIONS'] = {'png', 'jpg', 'jpeg', 'gif', 'webp'}
 if not os.path.exists(app.config['UPLOAD_FOLDER']):
     os.makedirs(app.config['UPLOAD_FOLDER'])
 
+def cache_version(c, name):
+    c.execute("SELECT version FROM cache_versions WHERE name = ?", (name,))
+    row = c.fetchone()
+    return row[0] if row else 0
+
+
+class ProductSampler:
+    """Picks random products without sorting the products table.
+
+    Product ids are cached per category in memory and reloaded only when the
+    catalog version changes, so a random shelf costs one version lookup and
+    one primary-key fetch of the chosen rows.
+    """
+
+    # Key of the all-products pool; None is the key of uncategorized products
+    ALL = object()
+
+    def __init__(self):
+        self._version = None
+        self._ids = {}
+        self._lock = threading.Lock()
+
+    def _ids_for(self, c, category):
+        version = cache_version(c, 'catalog')
+        if version != self._version:
+            with self._lock:
+                if version != self._version:
+                    ids = {self.ALL: []}
+                    c.execute("SELECT id, category FROM products")
+                    for product_id, product_category in c.fetchall():
+                        ids[self.ALL].append(product_id)
+                        if product_category is not None:
+                            ids.setdefault(product_category, []).append(product_id)
+                    self._ids, self._version = ids, version
+        return self._ids.get(self.ALL if category is None else category, [])
+
+    def sample(self, c, limit, category=None, exclude=None):
+        ids = self._ids_for(c, category)
+        # Draw one extra so dropping the excluded id still leaves ``limit``
+        picked = random.sample(ids, min(limit + (exclude is not None), len(ids)))
+        picked = [product_id for product_id in dict.fromkeys(picked) if product_id != exclude][:limit]
+        if not picked:
+            return []
+
+        c.execute(f"SELECT * FROM products WHERE id IN ({','.join('?' * len(picked))})", picked)
+        rows = {row[0]: row for row in c.fetchall()}
+        return [rows[product_id] for product_id in picked if product_id in rows]
+
+    def invalidate(self):
+        self._version = None
+
+
+product_sampler = ProductSampler()
+
 def get_related_products(product_id, category=None, limit=4):
     try:
         with get_db() as conn:
             c = conn.cursor()
-            if category:
-                c.execute("SELECT * FROM products WHERE category = ? AND id != ? ORDER BY RANDOM() LIMIT ?", 
-                         (category, product_id, limit))
-            else:
-                c.execute("SELECT * FROM products WHERE id != ? ORDER BY RANDOM() LIMIT ?", 
-                         (product_id, limit))
-            return c.fetchall()
+            return product_sampler.sample(c, limit, category=category or None, exclude=product_id)
     except Exception as e:
         print(f"Error fetching related products: {e}")
         return []
@@ -179,8 +2050,7 @@ def get_random_products(limit=8):
     try:
         with get_db() as conn:
             c = conn.cursor()
-            c.execute("SELECT * FROM products ORDER BY RANDOM() LIMIT ?", (limit,))
-            return c.fetchall()
+            return product_sampler.sample(c, limit)
     except Exception as e:
         print(f"Error fetching random products: {e}")
         return []
@@ -199,6 +2069,375 @@ def can_cancel_order(order_date):
     order_datetime = datetime.strptime(order_date, "%Y-%m-%d %H:%M:%S")
     return datetime.now() - order_datetime < timedelta(days=1)
 
+# ==================== ORDER JOURNAL ====================
+
+class OrderJournal:
+    """Appends placed orders to orders.txt and a JSONL twin off the request path.
+
+    place_order only puts the entry on a bounded queue. A background thread
+    drains it in batches, appends both files, fsyncs at most once per
+    ``fsync_interval`` seconds and rotates the files by size and by day.
+    If the queue is full the entry is written synchronously rather than lost.
+    """
+
+    def __init__(self, path, jsonl_path, queue_size=10000, batch_size=100,
+                 fsync_interval=1.0, max_bytes=10 * 1024 * 1024, rotate_daily=True):
+        self.path = path
+        self.jsonl_path = jsonl_path
+        self.batch_size = batch_size
+        self.fsync_interval = fsync_interval
+        self.max_bytes = max_bytes
+        self.rotate_daily = rotate_daily
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._write_lock = threading.Lock()
+        self._last_fsync = time.monotonic()
+        self._dirty = False
+        self._pid = None
+
+    def record(self, entry):
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            print("Order journal queue is full; writing synchronously")
+            self._write_batch([entry], fsync=True)
+
+    def flush(self):
+        batch = []
+        while True:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        if batch or self._dirty:
+            self._write_batch(batch, fsync=True)
+
+    def _ensure_started(self):
+        if self._pid == os.getpid():
+            return
+        with self._write_lock:
+            if self._pid != os.getpid():
+                self._pid = os.getpid()
+                threading.Thread(target=self._run, name='order-journal', daemon=True).start()
+
+    def _run(self):
+        while True:
+            try:
+                batch = [self._queue.get(timeout=self.fsync_interval)]
+            except queue.Empty:
+                if self._dirty:
+                    try:
+                        self._write_batch([], fsync=True)
+                    except Exception as e:
+                        print(f"Error syncing order journal: {e}")
+                continue
+
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._write_batch(batch, fsync=time.monotonic() - self._last_fsync >= self.fsync_interval)
+            except Exception as e:
+                print(f"Error writing order journal: {e}")
+
+    def _write_batch(self, batch, fsync):
+        text = ''.join(self.format_text(entry) for entry in batch)
+        lines = ''.join(json.dumps(entry, ensure_ascii=False) + '\n' for entry in batch)
+
+        with self._write_lock, self._file_lock():
+            self._rotate_if_needed()
+            for path, data in ((self.path, text), (self.jsonl_path, lines)):
+                # One write() per batch so entries from other workers never interleave
+                with open(path, 'a', encoding='utf-8') as f:
+                    f.write(data)
+                    f.flush()
+                    if fsync:
+                        os.fsync(f.fileno())
+            if fsync:
+                self._last_fsync = time.monotonic()
+            self._dirty = not fsync
+
+    @contextmanager
+    def _file_lock(self):
+        # Serialises rotation between gunicorn workers sharing the files
+        if fcntl is None:
+            yield
+            return
+        with open(self.path + '.lock', 'w') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _rotate_if_needed(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return
+
+        day = datetime.fromtimestamp(stat.st_mtime).strftime('%Y-%m-%d')
+        if self.rotate_daily and day != datetime.now().strftime('%Y-%m-%d'):
+            suffix = day
+        elif self.max_bytes and stat.st_size >= self.max_bytes:
+            suffix = datetime.now().strftime('%Y-%m-%d-%H%M%S')
+        else:
+            return
+
+        for path in (self.path, self.jsonl_path):
+            base, ext = os.path.splitext(path)
+            if os.path.exists(path):
+                os.replace(path, f"{base}-{suffix}{ext}")
+
+    @staticmethod
+    def format_text(entry):
+        lines = [
+            "\n\n=== New Order ===",
+            f"Order Date: {entry['order_date']}",
+            f"Customer: {entry['name']} ({entry['phone']})",
+            f"Address: {entry['address']}, {entry['city']}, {entry['state']}",
+            f"Transaction ID: {entry['transaction_id']}",
+            f"Subtotal: ₹{entry['subtotal']:,.2f}",
+            f"Delivery Charge: ₹{entry['delivery_charge']:,.2f}",
+            f"Total Amount: ₹{entry['total_amount']:,.2f}",
+            f"Advance Paid: ₹{entry['advance_payment']:,.2f}",
+            "Items:",
+        ]
+        for item in entry['items']:
+            lines.append(f"- {item['title']} ({item['quantity']} × ₹{item['unit_price'] * (1 - item['discount']/100):,.2f})")
+        return '\n'.join(lines) + '\n'
+
+
+order_journal = OrderJournal(Config.ORDER_JOURNAL_PATH, Config.ORDER_JOURNAL_JSONL_PATH,
+                             queue_size=Config.ORDER_JOURNAL_QUEUE_SIZE,
+                             batch_size=Config.ORDER_JOURNAL_BATCH_SIZE,
+                             fsync_interval=Config.ORDER_JOURNAL_FSYNC_INTERVAL,
+                             max_bytes=Config.ORDER_JOURNAL_MAX_BYTES,
+                             rotate_daily=Config.ORDER_JOURNAL_ROTATE_DAILY)
+atexit.register(order_journal.flush)
+
+# ==================== ORDER IDEMPOTENCY ====================
+
+class IdempotencyCache:
+    """Small LRU of recent results keyed by an idempotency key."""
+
+    def __init__(self, max_size=1024):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+
+placed_orders = IdempotencyCache(Config.IDEMPOTENCY_CACHE_SIZE)
+
+def find_placed_order(c, transaction_id):
+    """Confirmation details of the order already placed with ``transaction_id``, if any."""
+    c.execute('''SELECT id, user_id, name, phone, address, city, state, transaction_id,
+                        delivery_charge, total_amount, advance_payment
+                 FROM orders WHERE transaction_id = ?''', (transaction_id,))
+    row = c.fetchone()
+    if not row:
+        return None
+    return {
+        'order_id': row[0],
+        'user_id': row[1],
+        'name': row[2],
+        'phone': row[3],
+        'address': row[4],
+        'city': row[5],
+        'state': row[6],
+        'transaction_id': row[7],
+        'delivery_charge': row[8],
+        'total_amount': row[9],
+        'advance_payment': row[10]
+    }
+
+# ==================== STOCK ====================
+
+class OutOfStock(Exception):
+    def __init__(self, shortages):
+        # [(product_id, title, requested, available), ...]
+        self.shortages = shortages
+        super().__init__(", ".join(f"{title}: {requested} requested, {available} left"
+                                   for _, title, requested, available in shortages)
+                         or "a product is no longer available")
+
+def reserve_stock(c, lines):
+    """Take ``lines`` ({product_id: quantity}) out of stock, all or nothing.
+
+    Must run inside a write transaction (see transaction()) and the caller
+    rolls back on OutOfStock. The write lock is held from the check to the
+    conditional UPDATE, so concurrent checkouts cannot both take the last unit.
+    """
+    product_ids = list(lines)
+    c.execute(f"SELECT id, title, stock FROM products WHERE id IN ({','.join('?' * len(product_ids))})",
+              product_ids)
+    shortages = [(product_id, title, lines[product_id], stock)
+                 for product_id, title, stock in c.fetchall() if stock < lines[product_id]]
+    if shortages:
+        raise OutOfStock(shortages)
+
+    c.executemany("UPDATE products SET stock = stock - ? WHERE id = ? AND stock >= ?",
+                  [(quantity, product_id, quantity) for product_id, quantity in lines.items()])
+    if c.rowcount != len(lines):
+        raise OutOfStock([])
+
+def release_stock(c, order_ids):
+    """Put the reserved quantities of ``order_ids`` back in stock (once per line)."""
+    if not order_ids:
+        return
+    placeholders = ','.join('?' * len(order_ids))
+    c.execute(f'''UPDATE products SET stock = stock + (
+                      SELECT SUM(quantity) FROM order_items
+                      WHERE order_id IN ({placeholders}) AND product_id = products.id AND stock_reserved = 1)
+                  WHERE id IN (SELECT product_id FROM order_items
+                               WHERE order_id IN ({placeholders}) AND stock_reserved = 1)''',
+              list(order_ids) * 2)
+    c.execute(f"UPDATE order_items SET stock_reserved = 0 WHERE order_id IN ({placeholders})", list(order_ids))
+
+def reserve_order_stock(c, order_id):
+    """Take the released lines of ``order_id`` out of stock again (see reserve_stock)."""
+    c.execute('''SELECT product_id, SUM(quantity) FROM order_items
+                 WHERE order_id = ? AND stock_reserved = 0 GROUP BY product_id''', (order_id,))
+    lines = dict(c.fetchall())
+    if not lines:
+        return
+    reserve_stock(c, lines)
+    c.execute("UPDATE order_items SET stock_reserved = 1 WHERE order_id = ?", (order_id,))
+
+# ==================== CART ====================
+
+class CartStore:
+    """Shopping carts kept in SQLite, one per user.
+
+    The session only carries the cart id. Line items are joined with
+    products on read, so titles, prices and discounts are always current.
+    Callers own the transaction and commit.
+    """
+
+    def cart_for_user(self, c, user_id):
+        # OR IGNORE + re-select so two concurrent first requests share one cart
+        c.execute("INSERT OR IGNORE INTO carts (id, user_id) VALUES (?, ?)", (uuid.uuid4().hex, user_id))
+        c.execute("SELECT id FROM carts WHERE user_id = ?", (user_id,))
+        return c.fetchone()[0]
+
+    def items(self, c, cart_id):
+        c.execute('''SELECT p.id, p.title, p.price, ci.quantity, p.image, p.max_quantity, p.discount
+                     FROM cart_items ci
+                     JOIN products p ON p.id = ci.product_id
+                     WHERE ci.cart_id = ?''', (cart_id,))
+        return {str(row[0]): {
+            'id': row[0],
+            'title': row[1],
+            'price': row[2],
+            'quantity': row[3],
+            'image': row[4],
+            'max_quantity': row[5],
+            'discount': row[6] or 0
+        } for row in c.fetchall()}
+
+    def count(self, c, cart_id):
+        c.execute("SELECT COUNT(*) FROM cart_items WHERE cart_id = ?", (cart_id,))
+        return c.fetchone()[0]
+
+    def add(self, c, cart_id, product_id, quantity):
+        c.execute('''INSERT INTO cart_items (cart_id, product_id, quantity) VALUES (?, ?, ?)
+                     ON CONFLICT(cart_id, product_id) DO UPDATE SET quantity = quantity + excluded.quantity''',
+                  (cart_id, product_id, quantity))
+        self._touch(c, cart_id)
+
+    def set_quantity(self, c, cart_id, product_id, quantity):
+        if quantity <= 0:
+            self.remove(c, cart_id, product_id)
+            return
+        c.execute("UPDATE cart_items SET quantity = ? WHERE cart_id = ? AND product_id = ?",
+                  (quantity, cart_id, product_id))
+        self._touch(c, cart_id)
+
+    def remove(self, c, cart_id, product_id):
+        c.execute("DELETE FROM cart_items WHERE cart_id = ? AND product_id = ?", (cart_id, product_id))
+        self._touch(c, cart_id)
+
+    def clear(self, c, cart_id):
+        c.execute("DELETE FROM cart_items WHERE cart_id = ?", (cart_id,))
+        self._touch(c, cart_id)
+
+    def merge(self, c, source_id, target_id):
+        """Move the items of an anonymous cart into ``target_id``, adding up quantities."""
+        c.execute("SELECT user_id FROM carts WHERE id = ?", (source_id,))
+        source = c.fetchone()
+        if not source or source[0] is not None:
+            # Never pull items out of another user's cart
+            return
+        c.execute('''INSERT INTO cart_items (cart_id, product_id, quantity)
+                     SELECT ?, product_id, quantity FROM cart_items WHERE cart_id = ?
+                     ON CONFLICT(cart_id, product_id) DO UPDATE SET quantity = quantity + excluded.quantity''',
+                  (target_id, source_id))
+        c.execute("DELETE FROM cart_items WHERE cart_id = ?", (source_id,))
+        c.execute("DELETE FROM carts WHERE id = ?", (source_id,))
+        self._touch(c, target_id)
+
+    def delete_user_cart(self, c, user_id):
+        c.execute("DELETE FROM cart_items WHERE cart_id IN (SELECT id FROM carts WHERE user_id = ?)", (user_id,))
+        c.execute("DELETE FROM carts WHERE user_id = ?", (user_id,))
+
+    def _touch(self, c, cart_id):
+        c.execute("UPDATE carts SET updated_at = CURRENT_TIMESTAMP WHERE id = ?", (cart_id,))
+
+
+cart_store = CartStore()
+
+def attach_cart(c, user_id):
+    """Point the session at ``user_id``'s cart and return its id.
+
+    Items from the cart the session carried before (if it was anonymous) and
+    from an old cookie-stored cart are merged in.
+    """
+    previous_id = session.pop('cart_id', None)
+    cart_id = cart_store.cart_for_user(c, user_id)
+    if previous_id and previous_id != cart_id:
+        cart_store.merge(c, previous_id, cart_id)
+
+    legacy_cart = session.pop('cart', None)
+    if legacy_cart:
+        for item in legacy_cart.values():
+            cart_store.add(c, cart_id, int(item['id']), int(item['quantity']))
+
+    session['cart_id'] = cart_id
+    return cart_id
+
+def current_cart_id(c):
+    if 'cart_id' in session and 'cart' not in session:
+        return session['cart_id']
+    return attach_cart(c, session['user_id'])
+
+@app.context_processor
+def inject_cart_count():
+    cart_id = session.get('cart_id')
+    if not cart_id:
+        return {'cart_count': 0}
+    try:
+        with get_db() as conn:
+            return {'cart_count': cart_store.count(conn.cursor(), cart_id)}
+    except Exception as e:
+        print(f"Error counting cart items: {e}")
+        return {'cart_count': 0}
+
 @app.route('/login', methods=['GET', 'POST'])
 def login():
     if request.method == 'POST':
@@ -219,6 +2458,8 @@ def login():
                 
                 session['user_id'] = user_id
                 session['user_phone'] = phone
+                attach_cart(c, user_id)
+                conn.commit()
                 
                 return redirect(url_for('index'))
         
@@ -226,218 +2467,15 @@ def login():
             print(f"Login error: {e}")
             return "An error occurred during login", 500
     
-    return render_template_string('''
-        <!DOCTYPE html>
-<html>
-<head>
-    <title>Login</title>
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <style>
-        :root {
-            --primary-color: #4361ee;
-            --secondary-color: #3a0ca3;
-            --accent-color: #f72585;
-            --light-color: #f8f9fa;
-            --dark-color: #212529;
-        }
-        
-        body { 
-            font-family: 'Segoe UI', Arial, sans-serif; 
-            max-width: 400px; 
-            margin: 0 auto; 
-            padding: 20px; 
-            background: linear-gradient(135deg, #f5f7fa 0%, #e4e8f0 100%);
-            min-height: 100vh;
-        }
-        
-        form { 
-            display: flex; 
-            flex-direction: column; 
-            gap: 15px;
-            background: white;
-            padding: 25px;
-            border-radius: 15px;
-            box-shadow: 0 10px 30px rgba(0,0,0,0.1);
-            border: 1px solid rgba(255,255,255,0.3);
-            transform: perspective(500px) translateZ(0);
-            transition: transform 0.3s, box-shadow 0.3s;
-        }
-        
-        form:hover {
-            transform: perspective(500px) translateZ(10px);
-            box-shadow: 0 15px 35px rgba(0,0,0,0.15);
-        }
-        
-        input, button { 
-            padding: 12px 15px;
-            border-radius: 8px;
-            border: 1px solid #e0e0e0;
-            font-size: 16px;
-            transition: all 0.3s;
-        }
-        
-        input:focus {
-            outline: none;
-            border-color: var(--primary-color);
-            box-shadow: 0 0 0 3px rgba(67, 97, 238, 0.2);
-        }
-        
-        button { 
-            background: linear-gradient(135deg, var(--primary-color) 0%, var(--secondary-color) 100%); 
-            color: white; 
-            border: none; 
-            cursor: pointer; 
-            font-weight: 600;
-            letter-spacing: 0.5px;
-            text-transform: uppercase;
-            box-shadow: 0 4px 6px rgba(0,0,0,0.1);
-            position: relative;
-            overflow: hidden;
-        }
-        
-        button:hover {
-            background: linear-gradient(135deg, var(--secondary-color) 0%, var(--primary-color) 100%);
-            box-shadow: 0 6px 12px rgba(0,0,0,0.15);
-            transform: translateY(-2px);
-        }
-        
-        button:active {
-            transform: translateY(0);
-        }
-        
-        button::after {
-            content: '';
-            position: absolute;
-            top: -50%;
-            left: -50%;
-            width: 200%;
-            height: 200%;
-            background: rgba(255,255,255,0.1);
-            transform: rotate(45deg);
-            transition: all 0.3s;
-        }
-        
-        button:hover::after {
-            left: 100%;
-        }
-        
-        .desktop-nav {
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-            padding: 15px 0;
-            margin-bottom: 30px;
-            border-bottom: 1px solid rgba(0,0,0,0.1);
-        }
-        
-        .desktop-nav a {
-            text-decoration: none;
-            color: var(--dark-color);
-            font-weight: 500;
-            margin-left: 20px;
-            padding: 8px 12px;
-            border-radius: 8px;
-            transition: all 0.3s;
-        }
-        
-        .desktop-nav a:first-child {
-            font-size: 24px;
-            font-weight: bold;
-            color: var(--primary-color);
-            margin-left: 0;
-        }
-        
-        .desktop-nav a:hover {
-            color: var(--primary-color);
-            background: rgba(67, 97, 238, 0.1);
-        }
-        
-        h2 {
-            text-align: center;
-            color: var(--dark-color);
-            margin-bottom: 25px;
-            font-size: 28px;
-            font-weight: 700;
-            background: linear-gradient(135deg, var(--primary-color) 0%, var(--accent-color) 100%);
-            -webkit-background-clip: text;
-            -webkit-text-fill-color: transparent;
-        }
-        
-        .mobile-nav { display: none; }
-        
-        @media (max-width: 768px) {
-            .desktop-nav { display: none; }
-            .mobile-nav { 
-                display: flex; 
-                position: fixed; 
-                bottom: 0; 
-                left: 0; 
-                right: 0; 
-                background: white; 
-                box-shadow: 0 -5px 15px rgba(0,0,0,0.1);
-                justify-content: space-around;
-                padding: 12px 0;
-                z-index: 1000;
-                border-top-left-radius: 15px;
-                border-top-right-radius: 15px;
-                backdrop-filter: blur(10px);
-                background: rgba(255,255,255,0.9);
-            }
-            
-            .mobile-nav a {
-                display: flex;
-                flex-direction: column;
-                align-items: center;
-                text-decoration: none;
-                color: #555;
-                font-size: 12px;
-                position: relative;
-                padding: 5px 10px;
-                border-radius: 10px;
-                transition: all 0.3s;
-            }
-            
-            .mobile-nav a:hover {
-                color: var(--primary-color);
-                background: rgba(67, 97, 238, 0.1);
-            }
-            
-            .mobile-nav i {
-                font-size: 20px;
-                margin-bottom: 5px;
-                transition: all 0.3s;
-            }
-            
-            .mobile-nav a:hover i {
-                transform: translateY(-3px);
-            }
-            
-            .cart-count {
-                position: absolute;
-                top: -5px;
-                right: -5px;
-                background: var(--accent-color);
-                color: white;
-                border-radius: 50%;
-                width: 18px;
-                height: 18px;
-                display: flex;
-                align-items: center;
-                justify-content: center;
-                font-size: 10px;
-                font-weight: bold;
-            }
-            
-            body { padding-bottom: 80px; }
-        }
-    </style>
-    <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0/css/all.min.css">
-</head>
-<body>
+    return render_page('login', '''
+        {% extends "store_layout.html" %}
+        {% block title %}Login{% endblock %}
+        {% block page_styles %}<link rel="stylesheet" href="{{ asset_url('css/pages/login.css') }}">{% endblock %}
+        {% block body %}
     <div class="desktop-nav">
         <a href="/">CRONYZO</a>
         <div>
-            <a href="{{ url_for('cart') }}">Cart (<span class="cart-count">{{ session.get('cart', {})|length }}</span>)</a>
+            <a href="{{ url_for('cart') }}">Cart (<span class="cart-count">{{ cart_count }}</span>)</a>
             {% if 'user_id' in session %}
                 <a href="{{ url_for('my_orders') }}">Orders</a>
                 <a href="{{ url_for('account') }}">Account</a>
@@ -447,14 +2485,14 @@ def login():
             {% endif %}
         </div>
     </div>
-    
+
     <h2>Login with WhatsApp</h2>
     <form method="post">
         <input type="hidden" name="csrf_token" value="{{ csrf_token() }}">
         <input type="tel" name="phone" placeholder="WhatsApp Number" required>
         <button type="submit">Continue</button>
     </form>
-    
+
     <div class="mobile-nav">
         <a href="{{ url_for('index') }}">
             <i class="fas fa-home"></i>
@@ -463,8 +2501,8 @@ def login():
         <a href="{{ url_for('cart') }}">
             <i class="fas fa-shopping-cart"></i>
             <span>Cart</span>
-            {% if session.get('cart') %}
-            <span class="cart-count">{{ session['cart']|length }}</span>
+            {% if cart_count %}
+            <span class="cart-count">{{ cart_count }}</span>
             {% endif %}
         </a>
         <a href="{{ url_for('my_orders') }}">
@@ -476,31 +2514,33 @@ def login():
             <span>Account</span>
         </a>
     </div>
-</body>
-</html>
+        {% endblock %}
     ''')
 
 @app.route('/logout')
 def logout():
     session.pop('user_id', None)
     session.pop('user_phone', None)
+    session.pop('cart_id', None)
     return redirect(url_for('index'))
 
 @app.route('/')
 def index():
     search_query = request.args.get('search', '')
+    page = max(request.args.get('page', 1, type=int), 1)
+    total_pages = 1
     try:
         with get_db() as conn:
             c = conn.cursor()
             
             if search_query:
-                c.execute("SELECT * FROM products WHERE title LIKE ? OR description LIKE ? OR tags LIKE ?", 
-                         (f"%{search_query}%", f"%{search_query}%", f"%{search_query}%"))
+                rows, total = search_products(c, search_query, page)
+                total_pages = max(-(-total // Config.SEARCH_PAGE_SIZE), 1)
             else:
-                c.execute("SELECT * FROM products ORDER BY RANDOM() LIMIT 12")
+                rows = product_sampler.sample(c, 12)
             
             products = []
-            for product in c.fetchall():
+            for product in rows:
                 products.append({
                     'id': product[0],
                     'title': product[1],
@@ -517,24 +2557,15 @@ def index():
     except Exception as e:
         print(f"Error fetching products: {e}")
         products = []
-    
-    if 'cart' not in session:
-        session['cart'] = {}
-
-
-    return render_template_string('''
-        <!DOCTYPE html>
-<html>
-<head>
-    <title>CRONYZO</title>
 
 
+    return render_page('index', '''
+        {% extends "store_layout.html" %}
+        {% block title %}CRONYZO{% endblock %}
+        {% block head %}
 <!-- CSRF Token (for Flask with Jinja2) -->
 <meta name="csrf-token" content="{{ csrf_token() }}">
 
-<!-- Viewport -->
-<meta name="viewport" content="width=device-width, initial-scale=1.0">
-
 <!-- Favicon (icon.png inside static/images/) -->
 <link rel="icon" href="{{ url_for('static', filename='images/icon.png') }}" type="image/png">
 
@@ -574,523 +2605,40 @@ def index():
   ]
 }
 </script>
-     
-    <style>
-
-        :root {
-    --primary: #4361ee;
-    --primary-dark: #3a0ca3;
-    --accent: #f72585;
-    --light: #f8f9fa;
-    --dark: #212529;
-    --success: #4cc9f0;
-    --warning: #ffba08;
-}
-
-* {
-    box-sizing: border-box;
-}
-
-body { 
-    font-family: 'Segoe UI', Arial, sans-serif; 
-    margin: 0; 
-    padding: 0; 
-    background: linear-gradient(135deg, #f5f7fa 0%, #e9ecef 100%);
-    min-height: 100vh;
-    line-height: 1.5;
-}
-
-.header { 
-    background: rgba(255,255,255,0.95); 
-    padding: 10px; 
-    box-shadow: 0 4px 30px rgba(0,0,0,0.1);
-    position: sticky; 
-    top: 0; 
-    z-index: 1000;
-    backdrop-filter: blur(10px);
-    border-bottom: 1px solid rgba(255,255,255,0.3);
-    width: 100%;
-}
-
-.navbar { 
-    display: flex; 
-    justify-content: space-between; 
-    align-items: center; 
-    max-width: 1200px; 
-    margin: 0 auto; 
-    padding: 0 15px;
-}
-
-.navbar a {
-    text-decoration: none;
-    color: var(--dark);
-    font-weight: 500;
-    padding: 8px 15px;
-    border-radius: 8px;
-    transition: all 0.3s;
-    white-space: nowrap;
-}
-
-.navbar a:first-child {
-    font-size: 24px;
-    font-weight: bold;
-    background: linear-gradient(135deg, var(--primary) 0%, var(--primary-dark) 100%);
-    -webkit-background-clip: text;
-    -webkit-text-fill-color: transparent;
-}
-
-.navbar a:hover {
-    color: var(--primary);
-    background: rgba(67, 97, 238, 0.1);
-}
-
-.products { 
-    display: grid; 
-    grid-template-columns: repeat(auto-fill, minmax(200px, 1fr)); 
-    gap: 25px; 
-    padding: 25px; 
-    max-width: 1200px; 
-    margin: 0 auto; 
-}
-
-.product-card { 
-    background: white; 
-    border-radius: 12px; 
-    overflow: hidden; 
-    box-shadow: 0 10px 20px rgba(0,0,0,0.08);
-    transition: all 0.3s cubic-bezier(0.25, 0.8, 0.25, 1);
-    position: relative;
-    transform: perspective(500px) translateZ(0);
-    display: flex;
-    flex-direction: column;
-    height: 100%;
-}
-
-.product-card:hover { 
-    transform: perspective(500px) translateZ(15px);
-    box-shadow: 0 15px 30px rgba(0,0,0,0.15);
-}
+        {% endblock %}
+        {% block page_styles %}<link rel="stylesheet" href="{{ asset_url('css/pages/index.css') }}">{% endblock %}
+        {% block body %}
+    <div class="header">
+    <div class="site-header">
+<div class="brand-header">
+  <div class="brand-container">
+    <img src="{{ url_for('static', filename='images/icon.png') }}" alt="Cronyzo Logo" class="brand-logo">
+    <h1 class="brand-title">Cronyzo</h1>
+  </div>
+</div>
+</div>
+        <div class="navbar desktop-nav">
+            <a href="/">CRONYZO</a>
+            <div>
+                <a href="{{ url_for('cart') }}">Cart (<span class="cart-count">{{ cart_count }}</span>)</a>
+                {% if 'user_id' in session %}
+                    <a href="{{ url_for('my_orders') }}">Orders</a>
+                    <a href="{{ url_for('account') }}">Account</a>
+                    <a href="{{ url_for('logout') }}">Logout</a>
+                {% else %}
+                    <a href="{{ url_for('login') }}">Login</a>
+                {% endif %}
+            </div>
+        </div>
+    </div>
 
-.product-image-container {
-    position: relative;
-    overflow: hidden;
-    flex: 0 0 auto;
-}
 
-.product-image { 
-    width: 100%; 
-    height: 200px; 
-    object-fit: cover; 
-    cursor: pointer; 
-    transition: transform 0.5s;
-    display: block;
-}
-
-.product-card:hover .product-image {
-    transform: scale(1.03);
-}
-
-.cart-count { 
-    background: var(--accent); 
-    color: white; 
-    border-radius: 50%; 
-    padding: 2px 6px; 
-    font-size: 12px; 
-    font-weight: bold;
-    display: inline-block;
-}
-
-.mobile-nav { display: none; }
-
-.search-container { 
-    max-width: 1200px; 
-    margin: 25px auto; 
-    padding: 0 25px; 
-}
-
-.search-container form {
-    display: flex;
-    gap: 15px;
-    width: 100%;
-}
-
-.search-container input {
-    flex: 1;
-    padding: 12px 20px;
-    border: 1px solid #e0e0e0;
-    border-radius: 8px;
-    font-size: 16px;
-    box-shadow: 0 2px 10px rgba(0,0,0,0.05);
-    transition: all 0.3s;
-    width: 100%;
-    min-width: 0;
-}
-
-.search-container input:focus {
-    outline: none;
-    border-color: var(--primary);
-    box-shadow: 0 0 0 3px rgba(67, 97, 238, 0.2);
-}
-
-.search-container button {
-    padding: 12px 25px;
-    background: linear-gradient(135deg, var(--primary) 0%, var(--primary-dark) 100%);
-    color: white;
-    border: none;
-    border-radius: 8px;
-    font-weight: 600;
-    cursor: pointer;
-    box-shadow: 0 4px 15px rgba(67, 97, 238, 0.3);
-    transition: all 0.3s;
-    white-space: nowrap;
-}
-
-.search-container button:hover {
-    transform: translateY(-2px);
-    box-shadow: 0 6px 20px rgba(67, 97, 238, 0.4);
-}
-
-.discount-badge { 
-    position: absolute; 
-    top: 10px; 
-    right: 10px; 
-    background: linear-gradient(135deg, #ff4757 0%, #ff6b81 100%); 
-    color: white; 
-    padding: 5px 10px; 
-    border-radius: 20px; 
-    font-size: 12px; 
-    font-weight: bold;
-    box-shadow: 0 2px 5px rgba(0,0,0,0.2);
-    z-index: 1;
-}
-
-.product-info { 
-    padding: 20px; 
-    flex: 1;
-    display: flex;
-    flex-direction: column;
-}
-
-.product-info h3 {
-    margin: 0 0 10px 0;
-    font-size: 16px;
-    color: var(--dark);
-    word-break: break-word;
-}
-
-.product-price {
-    margin: 10px 0;
-    font-weight: bold;
-    color: var(--primary-dark);
-}
-
-.product-info a {
-    display: inline-block;
-    margin-top: auto;
-    padding: 10px;
-    background: linear-gradient(135deg, var(--primary) 0%, var(--primary-dark) 100%);
-    color: white;
-    text-decoration: none;
-    border-radius: 8px;
-    width: 100%;
-    text-align: center;
-    font-weight: 500;
-    transition: all 0.3s;
-}
-
-.product-info a:hover {
-    transform: translateY(-2px);
-    box-shadow: 0 5px 15px rgba(67, 97, 238, 0.4);
-}
-
-/* Admin Access Lock Icon */
-.admin-lock-icon {
-    position: fixed;
-    bottom: 70px;
-    right: 20px;
-    width: 50px;
-    height: 50px;
-    background: linear-gradient(135deg, var(--primary) 0%, var(--primary-dark) 100%);
-    color: white;
-    border-radius: 50%;
-    display: flex;
-    align-items: center;
-    justify-content: center;
-    cursor: pointer;
-    z-index: 9999;
-    box-shadow: 0 5px 20px rgba(67, 97, 238, 0.4);
-    transition: all 0.3s;
-}
-
-.admin-lock-icon:hover {
-    transform: scale(1.1) rotate(10deg);
-    box-shadow: 0 8px 25px rgba(67, 97, 238, 0.5);
-}
-
-.click-counter {
-    position: fixed;
-    bottom: 75px;
-    right: 20px;
-    background: var(--accent);
-    color: white;
-    border-radius: 50%;
-    width: 24px;
-    height: 24px;
-    display: none;
-    align-items: center;
-    justify-content: center;
-    font-size: 12px;
-    font-weight: bold;
-    z-index: 10000;
-    box-shadow: 0 2px 5px rgba(0,0,0,0.2);
-}
-
-/* Responsive Styles */
-@media (max-width: 768px) {
-    .desktop-nav { display: none; }
-    .mobile-nav { 
-        display: flex; 
-        position: fixed; 
-        bottom: 0; 
-        left: 0; 
-        right: 0; 
-        background: rgba(255,255,255,0.95); 
-        box-shadow: 0 -5px 20px rgba(0,0,0,0.1);
-        justify-content: space-around;
-        padding: 15px 0;
-        z-index: 1000;
-        border-top-left-radius: 20px;
-        border-top-right-radius: 20px;
-        backdrop-filter: blur(10px);
-    }
-    
-    .mobile-nav a {
-        display: flex;
-        flex-direction: column;
-        align-items: center;
-        text-decoration: none;
-        color: #555;
-        font-size: 12px;
-        padding: 5px 15px;
-        border-radius: 15px;
-        transition: all 0.3s;
-    }
-    
-    .mobile-nav a:hover {
-        color: var(--primary);
-        background: rgba(67, 97, 238, 0.1);
-        transform: translateY(-5px);
-    }
-    
-    .mobile-nav i {
-        font-size: 20px;
-        margin-bottom: 5px;
-        transition: all 0.3s;
-    }
-    
-    .mobile-nav a:hover i {
-        transform: scale(1.2);
-    }
-    
-    .products { 
-        grid-template-columns: repeat(auto-fill, minmax(150px, 1fr)); 
-        gap: 15px; 
-        padding: 15px; 
-    }
-    
-    .product-image { height: 150px; }
-    
-    body { padding-bottom: 80px; }
-    
-    .search-container form {
-        flex-direction: column;
-        gap: 10px;
-    }
-    
-    .search-container button {
-        width: 100%;
-    }
-}
-
-@media (max-width: 480px) {
-    .products { 
-        grid-template-columns: repeat(auto-fill, minmax(130px, 1fr)); 
-        gap: 12px; 
-        padding: 12px; 
-    }
-    
-    .product-image { height: 130px; }
-    
-    .product-info {
-        padding: 15px;
-    }
-    
-    .product-info h3 {
-        font-size: 14px;
-    }
-    
-    .product-info a {
-        padding: 8px;
-        font-size: 14px;
-    }
-    
-    .discount-badge {
-        font-size: 10px;
-        padding: 3px 8px;
-    }
-}
-
-@media (max-width: 360px) {
-    .products { 
-        grid-template-columns: repeat(auto-fill, minmax(110px, 1fr)); 
-    }
-    
-    .product-image { height: 110px; }
-}
-
-
-.brand-header {
-  background: linear-gradient(135deg, 
-    rgba(36, 0, 70, 0.95) 0%, 
-    rgba(95, 15, 64, 0.95) 50%, 
-    rgba(63, 55, 201, 0.95) 100%);
-  padding: 15px 24px;
-  box-shadow: 0 4px 30px rgba(0, 0, 0, 0.3);
-  backdrop-filter: blur(12px) saturate(180%);
-  border-bottom: 1px solid rgba(255, 255, 255, 0.15);
-  position: sticky;
-  top: 12px; /* Added space from top */
-  z-index: 1000;
-  transition: all 0.3s cubic-bezier(0.25, 0.8, 0.25, 1);
-  border-radius: 16px; /* Rounded corners */
-  margin: 0 24px; /* Margin to prevent touching edges */
-}
-
-.brand-container {
-  max-width: 1440px;
-  margin: 0 auto;
-  display: flex;
-  align-items: center;
-  justify-content: space-between;
-}
-
-.brand-content {
-  display: flex;
-  align-items: center;
-  gap: 24px;
-}
-
-.brand-logo {
-  width: 48px;
-  height: 48px;
-  object-fit: contain;
-  border-radius: 14px; /* Slightly more rounded */
-  box-shadow: 0 6px 20px rgba(0, 0, 0, 0.2);
-  transition: all 0.4s cubic-bezier(0.165, 0.84, 0.44, 1);
-  background: rgba(255, 255, 255, 0.1);
-  padding: 4px;
-  border: 1px solid rgba(255, 255, 255, 0.08);
-}
-
-.brand-logo:hover {
-  transform: scale(1.1);
-  box-shadow: 0 8px 25px rgba(0, 0, 0, 0.3);
-  background: rgba(255, 255, 255, 0.15);
-  border-color: rgba(255, 255, 255, 0.2);
-}
-
-.brand-title {
-  margin: 0;
-  font-size: 1.8rem;
-  font-weight: 700;
-  color: #ffffff;
-  letter-spacing: 0.5px;
-  font-family: 'Poppins', -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, Oxygen, Ubuntu, Cantarell, sans-serif;
-  text-shadow: 0 2px 8px rgba(0, 0, 0, 0.3);
-  position: relative;
-}
-
-.brand-title::after {
-  content: '';
-  position: absolute;
-  bottom: -8px;
-  left: 0;
-  width: 100%;
-  height: 2px;
-  background: linear-gradient(90deg, rgba(255,255,255,0.7), transparent);
-  border-radius: 2px;
-  transform: scaleX(0);
-  transform-origin: right;
-  transition: transform 0.4s ease;
-}
-
-.brand-title:hover::after {
-  transform: scaleX(1);
-  transform-origin: left;
-}
-
-/* Mobile Responsive */
-@media (max-width: 768px) {
-  .brand-header {
-    top: 8px;
-    margin: 0 12px;
-    padding: 12px 16px;
-    border-radius: 12px;
-  }
-  
-  .brand-title {
-    font-size: 1.4rem;
-  }
-
-  .brand-logo {
-    width: 40px;
-    height: 40px;
-    border-radius: 10px;
-  }
-
-  .brand-content {
-    gap: 16px;
-  }
-}
-
-
-
-
-    </style>
-    <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0/css/all.min.css">
-</head>
-<body>
-    <div class="header">
-    <div class="site-header">
-<div class="brand-header">
-  <div class="brand-container">
-    <img src="/static/images/icon.png" alt="Cronyzo Logo" class="brand-logo">
-    <h1 class="brand-title">Cronyzo</h1>
-  </div>
-</div>
-</div>
-        <div class="navbar desktop-nav">
-            <a href="/">CRONYZO</a>
-            <div>
-                <a href="{{ url_for('cart') }}">Cart (<span class="cart-count">{{ session['cart']|length }}</span>)</a>
-                {% if 'user_id' in session %}
-                    <a href="{{ url_for('my_orders') }}">Orders</a>
-                    <a href="{{ url_for('account') }}">Account</a>
-                    <a href="{{ url_for('logout') }}">Logout</a>
-                {% else %}
-                    <a href="{{ url_for('login') }}">Login</a>
-                {% endif %}
-            </div>
-        </div>
-    </div>
-
-        
-    <div class="search-container">
-        <form method="get" action="/">
-            <input type="text" name="search" placeholder="Search products..." value="{{ search_query }}">
-            <button type="submit">Search</button>
-        </form>
-    </div>
+    <div class="search-container">
+        <form method="get" action="/">
+            <input type="text" name="search" placeholder="Search products..." value="{{ search_query }}">
+            <button type="submit">Search</button>
+        </form>
+    </div>
 
 
     <div class="products">
@@ -1100,22 +2648,24 @@ body {
                 {% if product.discount > 0 %}
                 <span class="discount-badge">{{ product.discount }}% OFF</span>
                 {% endif %}
-                <img src="{{ url_for('static', filename='images/' + product.image) if product.image else 'https://via.placeholder.com/300' }}" 
-                     class="product-image" 
+                <img src="{{ image_url('images/' + product.image, 'card') if product.image else 'https://via.placeholder.com/300' }}"
+                     {% if product.image %}srcset="{{ image_srcset('images/' + product.image) }}" sizes="(max-width: 600px) 50vw, 300px"{% endif %}
+                     loading="lazy"
+                     class="product-image"
                      alt="{{ product.title }}"
                      onclick="window.location.href='{{ url_for('product_detail', product_id=product.id) }}'">
             </div>
             <div class="product-info">
                 <h3>{{ product.title }}</h3>
-                <div style="display: flex; align-items: center; gap: 10px;">
-                    <p style="font-weight: bold; color: var(--primary);">₹{{ "{:,.2f}".format(product.price * (1 - product.discount/100)) }}</p>
+                <div class="card-price-row">
+                    <p class="card-price">₹{{ "{:,.2f}".format(product.price * (1 - product.discount/100)) }}</p>
                     {% if product.discount > 0 %}
-                    <p style="text-decoration: line-through; color: #777; font-size: 0.9em;">₹{{ "{:,.2f}".format(product.price) }}</p>
+                    <p class="card-original-price">₹{{ "{:,.2f}".format(product.price) }}</p>
                     {% endif %}
                 </div>
-                <div style="display: flex; align-items: center; margin-top: 5px;">
-                    <span style="color: var(--warning);">★</span>
-                    <span style="margin-left: 5px; font-size: 0.9em;">{{ product.rating }}</span>
+                <div class="card-rating">
+                    <span class="card-rating-star">★</span>
+                    <span class="card-rating-value">{{ product.rating }}</span>
                 </div>
                 <a href="{{ url_for('product_detail', product_id=product.id) }}">
                     View Details
@@ -1124,18 +2674,30 @@ body {
         </div>
         {% endfor %}
     </div>
-    
+
+    {% if search_query and total_pages > 1 %}
+    <div class="pagination">
+        {% if page > 1 %}
+        <a href="{{ url_for('index', search=search_query, page=page - 1) }}">&laquo; Prev</a>
+        {% endif %}
+        <span>Page {{ page }} of {{ total_pages }}</span>
+        {% if page < total_pages %}
+        <a href="{{ url_for('index', search=search_query, page=page + 1) }}">Next &raquo;</a>
+        {% endif %}
+    </div>
+    {% endif %}
+
     <div class="mobile-nav">
         <a href="{{ url_for('index') }}">
             <i class="fas fa-home"></i>
             <span>Home</span>
         </a>
-        
+
         <a href="{{ url_for('cart') }}">
             <i class="fas fa-shopping-cart"></i>
             <span>Cart</span>
-            {% if session.get('cart') %}
-            <span class="cart-count">{{ session['cart']|length }}</span>
+            {% if cart_count %}
+            <span class="cart-count">{{ cart_count }}</span>
             {% endif %}
         </a>
         <a href="{{ url_for('my_orders') }}">
@@ -1153,69 +2715,8 @@ body {
         <i class="fas fa-lock"></i>
     </div>
     <div class="click-counter" id="clickCounter"></div>
-
-   <script>
-        // Admin access functionality
-        let adminClickCount = 0;
-        const adminLock = document.getElementById('adminLock');
-        const clickCounter = document.getElementById('clickCounter');
-        let resetTimer;
-
-        adminLock.addEventListener('click', function(e) {
-            e.preventDefault();
-            e.stopPropagation();
-            
-            adminClickCount++;
-            clickCounter.textContent = adminClickCount;
-            clickCounter.style.display = 'flex';
-            
-            // Reset counter after 3 seconds of inactivity
-            clearTimeout(resetTimer);
-            resetTimer = setTimeout(() => {
-                adminClickCount = 0;
-                clickCounter.style.display = 'none';
-            }, 3000);
-            
-            if (adminClickCount >= 5) {
-                adminClickCount = 0;
-                clickCounter.style.display = 'none';
-                window.location.href = "/hidden-admin";
-            }
-        });
-
-        // Original hidden area still works as backup
-        document.addEventListener('click', function(e) {
-            if (e.clientX > window.innerWidth - 50 && e.clientY > window.innerHeight - 50) {
-                adminClickCount++;
-                if (adminClickCount >= 5) {
-                    adminClickCount = 0;
-                    window.location.href = "/hidden-admin";
-                }
-            }
-        });
-        
-        // For jQuery AJAX
-        $.ajaxSetup({
-            beforeSend: function(xhr, settings) {
-                if (!/^(GET|HEAD|OPTIONS|TRACE)$/i.test(settings.type)) {
-                    xhr.setRequestHeader("X-CSRFToken", "{{ csrf_token() }}");
-                }
-            }
-        });
-
-        // Or for individual fetch requests
-        fetch('/some-endpoint', {
-            method: 'POST',
-            headers: {
-                'Content-Type': 'application/json',
-                'X-CSRFToken': document.querySelector('meta[name="csrf-token"]').content
-            },
-            body: JSON.stringify(data)
-        });
-    </script>
-</body>
-</html>
-    ''', products=products, search_query=search_query)
+        {% endblock %}
+    ''', products=products, search_query=search_query, page=page, total_pages=total_pages)
 
 
     
@@ -1270,381 +2771,16 @@ def product_detail(product_id):
         print(f"Error fetching product: {e}")
         return "Product not found", 404
     
-    return render_template_string('''
-        <!DOCTYPE html>
-<html>
-<head>
-    <title>{{ product.title }} - CRONYZO</title>
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <style>
-        :root {
-            --primary: #4361ee;
-            --primary-dark: #3a0ca3;
-            --accent: #f72585;
-            --light: #f8f9fa;
-            --dark: #212529;
-            --success: #4cc9f0;
-            --warning: #ffba08;
-            --danger: #ff4757;
-        }
-        
-        body { 
-            font-family: 'Segoe UI', Arial, sans-serif; 
-            max-width: 1200px; 
-            margin: 0 auto; 
-            padding: 10px;
-            background: linear-gradient(135deg, #f5f7fa 0%, #e9ecef 100%);
-            min-height: 100vh;
-        }
-        
-        .header { 
-            background: rgba(255,255,255,0.95);
-            padding: 15px 0;
-            box-shadow: 0 4px 30px rgba(0,0,0,0.1);
-            position: sticky;
-            top: 0;
-            z-index: 1000;
-            backdrop-filter: blur(10px);
-            border-bottom: 1px solid rgba(255,255,255,0.3);
-            margin-bottom: 20px;
-        }
-        
-        .navbar { 
-            display: flex; 
-            justify-content: space-between; 
-            align-items: center; 
-            max-width: 1200px; 
-            margin: 0 auto;
-            padding: 0 20px;
-        }
-        
-        .navbar a {
-            text-decoration: none;
-            color: var(--dark);
-            font-weight: 500;
-            padding: 8px 15px;
-            border-radius: 8px;
-            transition: all 0.3s;
-        }
-        
-        .navbar a:first-child {
-            font-size: 24px;
-            font-weight: bold;
-            background: linear-gradient(135deg, var(--primary) 0%, var(--primary-dark) 100%);
-            -webkit-background-clip: text;
-            -webkit-text-fill-color: transparent;
-        }
-        
-        .navbar a:hover {
-            color: var(--primary);
-            background: rgba(67, 97, 238, 0.1);
-        }
-        
-        .product-container { 
-            display: grid; 
-            padding: 8px 10px;                      
-            grid-template-columns: 1fr 1fr; 
-            gap: 40px;
-            background: white;
-            border-radius: 16px;
-            overflow: hidden;
-            box-shadow: 0 15px 30px rgba(0,0,0,0.08);
-            transform: perspective(500px) translateZ(0);
-            transition: all 0.3s cubic-bezier(0.25, 0.8, 0.25, 1);
-        }
-        
-        .product-container:hover {
-            transform: perspective(500px) translateZ(10px);
-            box-shadow: 0 20px 40px rgba(0,0,0,0.12);
-        }
-        
-        .product-image { 
-            width: 100%; 
-            max-height: 500px; 
-            object-fit: contain; 
-            cursor: zoom-in;
-            transition: transform 0.5s;
-            padding: 20px;
-        }
-        
-        .product-image:hover {
-            transform: scale(1.02);
-        }
-        
-        .product-title { 
-            font-size: 28px; 
-            margin-bottom: 10px;
-            color: var(--dark);
-            font-weight: 700;
-        }
-        
-        .product-price { 
-            font-size: 24px; 
-            color: var(--primary); 
-            font-weight: bold; 
-            margin: 20px 0;
-            display: flex;
-            align-items: center;
-            gap: 15px;
-            flex-wrap: wrap;
-        }
-        
-        .original-price { 
-            text-decoration: line-through; 
-            color: #777; 
-            font-size: 18px; 
-        }
-        
-        .discount-percent { 
-            color: var(--danger); 
-            font-weight: bold;
-            background: rgba(255, 71, 87, 0.1);
-            padding: 4px 10px;
-            border-radius: 20px;
-            font-size: 16px;
-        }
-        
-        .btn { 
-            display: inline-block; 
-            padding: 12px 30px; 
-            background: linear-gradient(135deg, var(--primary) 0%, var(--primary-dark) 100%);
-            color: white; 
-            text-decoration: none; 
-            border-radius: 8px;
-            font-weight: 600;
-            border: none;
-            cursor: pointer;
-            box-shadow: 0 4px 15px rgba(67, 97, 238, 0.3);
-            transition: all 0.3s;
-            position: relative;
-            overflow: hidden;
-        }
-        
-        .btn:hover {
-            transform: translateY(-3px);
-            box-shadow: 0 8px 25px rgba(67, 97, 238, 0.4);
-        }
-        
-        .btn:active {
-            transform: translateY(0);
-        }
-        
-        .thumbnail-container { 
-            display: flex; 
-            gap: 15px; 
-            margin-top: 20px; 
-            flex-wrap: wrap;
-            padding: 0 20px 20px;
-        }
-        
-        .thumbnail { 
-            width: 80px; 
-            height: 80px; 
-            object-fit: cover; 
-            cursor: pointer; 
-            border: 2px solid transparent;
-            border-radius: 8px;
-            transition: all 0.3s;
-        }
-        
-        .thumbnail:hover {
-            transform: scale(1.05);
-            box-shadow: 0 5px 15px rgba(0,0,0,0.1);
-        }
-        
-        .thumbnail.active { 
-            border-color: var(--primary);
-            box-shadow: 0 0 0 3px rgba(67, 97, 238, 0.2);
-        }
-        
-        .video-container { 
-            margin-top: 30px;
-            padding: 0 20px 20px;
-        }
-        
-        .video-container h3 {
-            margin-bottom: 15px;
-            color: var(--dark);
-            font-size: 20px;
-        }
-        
-        .related-products { 
-            margin-top: 60px; 
-        }
-        
-        .related-title { 
-            font-size: 24px; 
-            margin-bottom: 25px; 
-            padding-bottom: 15px; 
-            border-bottom: 1px solid rgba(0,0,0,0.1);
-            color: var(--dark);
-            font-weight: 600;
-        }
-        
-        .mobile-nav { display: none; }
-        
-        .zoom-modal { 
-            display: none; 
-            position: fixed; 
-            top: 0; 
-            left: 0; 
-            right: 0; 
-            bottom: 0; 
-            background: rgba(0,0,0,0.95); 
-            z-index: 2000;
-            backdrop-filter: blur(5px);
-        }
-        
-        .zoom-image { 
-            max-width: 90%; 
-            max-height: 90%; 
-            position: absolute; 
-            top: 50%; 
-            left: 50%; 
-            transform: translate(-50%, -50%);
-            box-shadow: 0 20px 50px rgba(0,0,0,0.5);
-            border-radius: 8px;
-        }
-        
-        .close-zoom { 
-            position: absolute; 
-            top: 30px; 
-            right: 30px; 
-            color: white; 
-            font-size: 40px; 
-            cursor: pointer;
-            text-shadow: 0 2px 5px rgba(0,0,0,0.5);
-            transition: all 0.3s;
-        }
-        
-        .close-zoom:hover {
-            transform: rotate(90deg);
-            color: var(--accent);
-        }
-        
-        a[style*="Back to products"] {
-            display: inline-block;
-            margin-bottom: 25px;
-            color: var(--primary);
-            text-decoration: none;
-            font-weight: 500;
-            transition: all 0.3s;
-            padding: 8px 15px;
-            border-radius: 8px;
-        }
-        
-        a[style*="Back to products"]:hover {
-            background: rgba(67, 97, 238, 0.1);
-            transform: translateX(-5px);
-        }
-        
-        form[method="post"] {
-            margin: 30px 0;
-        }
-        
-        form[method="post"] input[type="number"] {
-            padding: 10px 15px;
-            border: 1px solid #e0e0e0;
-            border-radius: 8px;
-            font-size: 16px;
-            margin-left: 10px;
-            transition: all 0.3s;
-        }
-        
-        form[method="post"] input[type="number"]:focus {
-            outline: none;
-            border-color: var(--primary);
-            box-shadow: 0 0 0 3px rgba(67, 97, 238, 0.2);
-        }
-        
-        .tag {
-            display: inline-block; 
-            background: linear-gradient(135deg, #f1f1f1 0%, #e0e0e0 100%); 
-            padding: 5px 12px; 
-            border-radius: 20px; 
-            margin: 5px; 
-            font-size: 0.9em;
-            box-shadow: 0 2px 5px rgba(0,0,0,0.05);
-            transition: all 0.3s;
-        }
-        
-        .tag:hover {
-            transform: translateY(-2px);
-            box-shadow: 0 5px 10px rgba(0,0,0,0.1);
-        }
-        
-        @media (max-width: 768px) {
-            .product-container { 
-                grid-template-columns: 1fr;
-                border-radius: 0;
-                box-shadow: none;
-            }
-            
-            .desktop-nav { display: none; }
-            
-            .mobile-nav { 
-                display: flex; 
-                position: fixed; 
-                bottom: 0; 
-                left: 0; 
-                right: 0; 
-                background: rgba(255,255,255,0.95); 
-                box-shadow: 0 -5px 20px rgba(0,0,0,0.1);
-                justify-content: space-around;
-                padding: 15px 0;
-                z-index: 1000;
-                border-top-left-radius: 20px;
-                border-top-right-radius: 20px;
-                backdrop-filter: blur(10px);
-            }
-            
-            .mobile-nav a {
-                display: flex;
-                flex-direction: column;
-                align-items: center;
-                text-decoration: none;
-                color: #555;
-                font-size: 12px;
-                padding: 5px 15px;
-                border-radius: 15px;
-                transition: all 0.3s;
-            }
-            
-            .mobile-nav a:hover {
-                color: var(--primary);
-                background: rgba(67, 97, 238, 0.1);
-                transform: translateY(-5px);
-            }
-            
-            .mobile-nav i {
-                font-size: 20px;
-                margin-bottom: 5px;
-                transition: all 0.3s;
-            }
-            
-            .mobile-nav a:hover i {
-                transform: scale(1.2);
-            }
-            
-            body { padding-bottom: 80px; }
-            
-            .product-title {
-                font-size: 24px;
-            }
-            
-            .product-price {
-                font-size: 20px;
-            }
-        }
-    </style>
-    <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0/css/all.min.css">
-</head>
-<body>
+    return render_page('product_detail', '''
+        {% extends "store_layout.html" %}
+        {% block title %}{{ product.title }} - CRONYZO{% endblock %}
+        {% block page_styles %}<link rel="stylesheet" href="{{ asset_url('css/pages/product_detail.css') }}">{% endblock %}
+        {% block body %}
     <div class="header">
         <div class="navbar desktop-nav">
             <a href="/">CRONYZO</a>
             <div>
-                <a href="{{ url_for('cart') }}">Cart (<span class="cart-count">{{ session.get('cart', {})|length }}</span>)</a>
+                <a href="{{ url_for('cart') }}">Cart (<span class="cart-count">{{ cart_count }}</span>)</a>
                 {% if 'user_id' in session %}
                     <a href="{{ url_for('my_orders') }}">Orders</a>
                     <a href="{{ url_for('account') }}">Account</a>
@@ -1655,40 +2791,40 @@ def product_detail(product_id):
             </div>
         </div>
     </div>
-    
+
     <a href="{{ url_for('index') }}" style="display: inline-block; margin-bottom: 20px;">&larr; Back to products</a>
-    
+
     <div class="product-container">
         <div>
-            <img src="{{ url_for('static', filename='images/' + product.image) if product.image else 'https://via.placeholder.com/500' }}" 
-                 class="product-image" 
+            <img src="{{ image_url('images/' + product.image, 'detail') if product.image else 'https://via.placeholder.com/500' }}"
+                 class="product-image"
                  alt="{{ product.title }}"
                  onclick="zoomImage(this.src)">
-            
+
             {% if product.images %}
             <div class="thumbnail-container">
-                <img src="{{ url_for('static', filename='images/' + product.image) if product.image else 'https://via.placeholder.com/500' }}" 
-                     class="thumbnail active" 
+                <img src="{{ image_url('images/' + product.image, 'detail') if product.image else 'https://via.placeholder.com/500' }}"
+                     class="thumbnail active"
                      onclick="changeMainImage(this.src, this)"
                      alt="{{ product.title }}">
                 {% for img in product.images %}
-                <img src="{{ url_for('static', filename='images/' + img) }}" 
-                     class="thumbnail" 
+                <img src="{{ image_url('images/' + img, 'detail') }}"
+                     class="thumbnail"
                      onclick="changeMainImage(this.src, this)"
                      alt="{{ product.title }}">
                 {% endfor %}
             </div>
             {% endif %}
-            
+
             {% if product.youtube_url %}
             <div class="video-container">
                 <h3>Product Video</h3>
-                <iframe width="100%" height="315" src="{{ product.youtube_url.replace('youtu.be', 'youtube.com/embed') }}" 
+                <iframe width="100%" height="315" src="{{ product.youtube_url.replace('youtu.be', 'youtube.com/embed') }}"
                         frameborder="0" allowfullscreen></iframe>
             </div>
             {% endif %}
         </div>
-        
+
         <div style="padding: 30px 20px 30px 0;">
             <h1 class="product-title">{{ product.title }}</h1>
             <div style="display: flex; align-items: center; gap: 10px; margin-bottom: 15px;">
@@ -1699,7 +2835,7 @@ def product_detail(product_id):
                     {{ product.stock }} in stock
                 </span>
             </div>
-            
+
             <div class="product-price">
                 ₹{{ "{:,.2f}".format(product.price * (1 - product.discount/100)) }}
                 {% if product.discount > 0 %}
@@ -1707,19 +2843,19 @@ def product_detail(product_id):
                 <span class="discount-percent">{{ product.discount }}% OFF</span>
                 {% endif %}
             </div>
-            
+
             <p style="line-height: 1.6; color: #555;">{{ product.description }}</p>
-            
+
             <form method="post" action="{{ url_for('add_to_cart', product_id=product.id) }}" style="margin: 20px 0;">
                 <input type="hidden" name="csrf_token" value="{{ csrf_token() }}">
                 <div style="margin-bottom: 15px;">
                     <label style="font-weight: 500;">Quantity: </label>
-                    <input type="number" name="quantity" value="{{ product.min_quantity }}" 
+                    <input type="number" name="quantity" value="{{ product.min_quantity }}"
                            min="{{ product.min_quantity }}" max="{{ product.max_quantity }}" style="padding: 8px;">
                 </div>
                 <button type="submit" class="btn">Add to Cart</button>
             </form>
-            
+
             <div style="margin-top: 30px;">
                 <p><strong>Availability:</strong> <span style="color: {{ 'var(--success)' if product.stock > 0 else 'var(--danger)' }};">
                     {{ 'In Stock' if product.stock > 0 else 'Out of Stock' }}
@@ -1737,23 +2873,24 @@ def product_detail(product_id):
             </div>
         </div>
     </div>
-    
+
     {% if related_products %}
     <div class="related-products">
         <h3 class="related-title">You may also like</h3>
-        <div style="display: grid; grid-template-columns: repeat(auto-fill, minmax(200px, 1fr)); gap: 25px;">
+        <div class="related-grid">
             {% for related in related_products %}
-            <div style="background: white; border-radius: 12px; overflow: hidden; box-shadow: 0 10px 20px rgba(0,0,0,0.08); transition: all 0.3s;">
-                <img src="{{ url_for('static', filename='images/' + related[4]) if related[4] else 'https://via.placeholder.com/300' }}" 
-                     style="width: 100%; height: 200px; object-fit: cover; cursor: pointer; transition: transform 0.5s;" 
+            <div class="related-card">
+                <img src="{{ image_url('images/' + related[4], 'card') if related[4] else 'https://via.placeholder.com/300' }}"
+                     loading="lazy"
+                     class="related-image"
                      onclick="window.location.href='{{ url_for('product_detail', product_id=related[0]) }}'"
                      alt="{{ related[1] }}">
-                <div style="padding: 20px;">
-                    <h4 style="margin: 0 0 10px 0; font-size: 16px; color: var(--dark);">{{ related[1] }}</h4>
-                    <div style="display: flex; justify-content: space-between; align-items: center;">
-                        <span style="font-weight: bold; color: var(--primary);">₹{{ "{:,.2f}".format(related[3] * (1 - related[7]/100)) }}</span>
-                        <a href="{{ url_for('product_detail', product_id=related[0]) }}" 
-                           style="padding: 6px 12px; background: linear-gradient(135deg, var(--primary) 0%, var(--primary-dark) 100%); color: white; text-decoration: none; border-radius: 6px; font-size: 0.8em; transition: all 0.3s;">
+                <div class="related-info">
+                    <h4 class="related-name">{{ related[1] }}</h4>
+                    <div class="related-footer">
+                        <span class="related-price">₹{{ "{:,.2f}".format(related[3] * (1 - related[7]/100)) }}</span>
+                        <a href="{{ url_for('product_detail', product_id=related[0]) }}"
+                           class="related-link">
                             View
                         </a>
                     </div>
@@ -1763,23 +2900,23 @@ def product_detail(product_id):
         </div>
     </div>
     {% endif %}
-    
+
     <div class="zoom-modal" id="zoomModal" onclick="closeZoom()">
         <span class="close-zoom" onclick="event.stopPropagation(); closeZoom()">&times;</span>
         <img class="zoom-image" id="zoomedImage">
     </div>
-    
+
     <div class="mobile-nav">
         <a href="{{ url_for('index') }}">
             <i class="fas fa-home"></i>
             <span>Home</span>
         </a>
-        
+
         <a href="{{ url_for('cart') }}">
             <i class="fas fa-shopping-cart"></i>
             <span>Cart</span>
-            {% if session.get('cart') %}
-            <span class="cart-count">{{ session['cart']|length }}</span>
+            {% if cart_count %}
+            <span class="cart-count">{{ cart_count }}</span>
             {% endif %}
         </a>
         <a href="{{ url_for('my_orders') }}">
@@ -1791,38 +2928,7 @@ def product_detail(product_id):
             <span>Account</span>
         </a>
     </div>
-    
-    <script>
-        function changeMainImage(src, element) {
-            document.querySelector('.product-image').src = src;
-            document.querySelectorAll('.thumbnail').forEach(thumb => {
-                thumb.classList.remove('active');
-            });
-            element.classList.add('active');
-        }
-        
-        function zoomImage(src) {
-            const modal = document.getElementById('zoomModal');
-            const zoomedImg = document.getElementById('zoomedImage');
-            zoomedImg.src = src;
-            modal.style.display = 'block';
-            document.body.style.overflow = 'hidden';
-        }
-        
-        function closeZoom() {
-            document.getElementById('zoomModal').style.display = 'none';
-            document.body.style.overflow = 'auto';
-        }
-        
-        // Close modal when clicking outside the image
-        document.getElementById('zoomModal').addEventListener('click', function(e) {
-            if (e.target === this) {
-                closeZoom();
-            }
-        });
-    </script>
-</body>
-</html>
+        {% endblock %}
     ''', product=product_data, related_products=related_products)
 
 @app.route('/add_to_cart/<int:product_id>', methods=['POST'])
@@ -1835,30 +2941,20 @@ def add_to_cart(product_id):
         
         with get_db() as conn:
             c = conn.cursor()
-            c.execute("SELECT * FROM products WHERE id = ?", (product_id,))
+            c.execute("SELECT id, stock FROM products WHERE id = ?", (product_id,))
             product = c.fetchone()
             
             if not product:
                 return "Product not found", 404
             
-            if 'cart' not in session:
-                session['cart'] = {}
-            
-            cart = session['cart']
-            if str(product_id) in cart:
-                cart[str(product_id)]['quantity'] += quantity
-            else:
-                cart[str(product_id)] = {
-                    'id': product_id,
-                    'title': product[1],
-                    'price': product[3],
-                    'quantity': quantity,
-                    'image': product[4],
-                    'max_quantity': product[6],
-                    'discount': product[7]
-                }
+            cart_id = current_cart_id(c)
+            c.execute("SELECT quantity FROM cart_items WHERE cart_id = ? AND product_id = ?", (cart_id, product_id))
+            in_cart = c.fetchone()
+            if quantity + (in_cart[0] if in_cart else 0) > product['stock']:
+                return f"Only {product['stock']} left in stock", 400
             
-            session['cart'] = cart
+            cart_store.add(c, cart_id, product_id, quantity)
+            conn.commit()
             return redirect(url_for('cart'))
     
     except Exception as e:
@@ -1870,207 +2966,22 @@ def cart():
     if 'user_id' not in session:
         return redirect(url_for('login'))
     
-    if 'cart' not in session or not session['cart']:
-        return render_template_string('''
-            <!DOCTYPE html>
-<html>
-<head>
-    <title>Your Cart</title>
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <style>
-        :root {
-            --primary: #4361ee;
-            --primary-dark: #3a0ca3;
-            --accent: #f72585;
-            --light: #f8f9fa;
-            --dark: #212529;
-        }
-        
-        body { 
-            font-family: 'Segoe UI', Arial, sans-serif; 
-            max-width: 800px; 
-            margin: 0 auto; 
-            padding: 20px;
-            background: linear-gradient(135deg, #f5f7fa 0%, #e9ecef 100%);
-            min-height: 100vh;
-        }
-        
-        .header { 
-            background: rgba(255,255,255,0.95);
-            padding: 15px 0;
-            box-shadow: 0 4px 30px rgba(0,0,0,0.1);
-            position: sticky;
-            top: 0;
-            z-index: 1000;
-            backdrop-filter: blur(10px);
-            border-bottom: 1px solid rgba(255,255,255,0.3);
-            margin-bottom: 30px;
-        }
-        
-        .navbar { 
-            display: flex; 
-            justify-content: space-between; 
-            align-items: center; 
-            max-width: 800px; 
-            margin: 0 auto;
-            padding: 0 20px;
-        }
-        
-        .navbar a {
-            text-decoration: none;
-            color: var(--dark);
-            font-weight: 500;
-            padding: 8px 15px;
-            border-radius: 8px;
-            transition: all 0.3s;
-        }
-        
-        .navbar a:first-child {
-            font-size: 24px;
-            font-weight: bold;
-            background: linear-gradient(135deg, var(--primary) 0%, var(--primary-dark) 100%);
-            -webkit-background-clip: text;
-            -webkit-text-fill-color: transparent;
-        }
-        
-        .navbar a:hover {
-            color: var(--primary);
-            background: rgba(67, 97, 238, 0.1);
-        }
-        
-        .empty-cart { 
-            text-align: center; 
-            padding: 80px 0;
-            background: white;
-            border-radius: 16px;
-            box-shadow: 0 15px 30px rgba(0,0,0,0.08);
-            transform: perspective(500px) translateZ(0);
-            transition: all 0.3s;
-            margin: 20px 0;
-        }
-        
-        .empty-cart:hover {
-            transform: perspective(500px) translateZ(10px);
-            box-shadow: 0 20px 40px rgba(0,0,0,0.12);
-        }
-        
-        .empty-cart h2 {
-            font-size: 28px;
-            color: var(--dark);
-            margin-bottom: 20px;
-            font-weight: 600;
-        }
-        
-        .btn { 
-            display: inline-block; 
-            padding: 12px 30px; 
-            background: linear-gradient(135deg, var(--primary) 0%, var(--primary-dark) 100%);
-            color: white; 
-            text-decoration: none; 
-            border-radius: 8px;
-            font-weight: 600;
-            border: none;
-            cursor: pointer;
-            box-shadow: 0 4px 15px rgba(67, 97, 238, 0.3);
-            transition: all 0.3s;
-            position: relative;
-            overflow: hidden;
-        }
-        
-        .btn:hover {
-            transform: translateY(-3px);
-            box-shadow: 0 8px 25px rgba(67, 97, 238, 0.4);
-            background: linear-gradient(135deg, var(--primary-dark) 0%, var(--primary) 100%);
-        }
-        
-        .btn:active {
-            transform: translateY(0);
-        }
-        
-        .btn::after {
-            content: '';
-            position: absolute;
-            top: -50%;
-            left: -50%;
-            width: 200%;
-            height: 200%;
-            background: rgba(255,255,255,0.1);
-            transform: rotate(45deg);
-            transition: all 0.3s;
-        }
-        
-        .btn:hover::after {
-            left: 100%;
-        }
-        
-        .mobile-nav { display: none; }
-        
-        @media (max-width: 768px) {
-            .desktop-nav { display: none; }
-            
-            .mobile-nav { 
-                display: flex; 
-                position: fixed; 
-                bottom: 0; 
-                left: 0; 
-                right: 0; 
-                background: rgba(255,255,255,0.95); 
-                box-shadow: 0 -5px 20px rgba(0,0,0,0.1);
-                justify-content: space-around;
-                padding: 15px 0;
-                z-index: 1000;
-                border-top-left-radius: 20px;
-                border-top-right-radius: 20px;
-                backdrop-filter: blur(10px);
-            }
-            
-            .mobile-nav a {
-                display: flex;
-                flex-direction: column;
-                align-items: center;
-                text-decoration: none;
-                color: #555;
-                font-size: 12px;
-                padding: 5px 15px;
-                border-radius: 15px;
-                transition: all 0.3s;
-            }
-            
-            .mobile-nav a:hover {
-                color: var(--primary);
-                background: rgba(67, 97, 238, 0.1);
-                transform: translateY(-5px);
-            }
-            
-            .mobile-nav i {
-                font-size: 20px;
-                margin-bottom: 5px;
-                transition: all 0.3s;
-            }
-            
-            .mobile-nav a:hover i {
-                transform: scale(1.2);
-            }
-            
-            body { padding-bottom: 80px; }
-            
-            .empty-cart {
-                padding: 60px 20px;
-            }
-            
-            .empty-cart h2 {
-                font-size: 24px;
-            }
-        }
-    </style>
-    <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0/css/all.min.css">
-</head>
-<body>
+    with get_db() as conn:
+        c = conn.cursor()
+        cart = cart_store.items(c, current_cart_id(c))
+        conn.commit()
+    
+    if not cart:
+        return render_page('cart_empty', '''
+            {% extends "store_layout.html" %}
+            {% block title %}Your Cart{% endblock %}
+            {% block page_styles %}<link rel="stylesheet" href="{{ asset_url('css/pages/cart_empty.css') }}">{% endblock %}
+            {% block body %}
     <div class="header">
         <div class="navbar desktop-nav">
             <a href="/">CRONYZO</a>
             <div>
-                <a href="{{ url_for('cart') }}">Cart (<span class="cart-count">{{ session.get('cart', {})|length }}</span>)</a>
+                <a href="{{ url_for('cart') }}">Cart (<span class="cart-count">{{ cart_count }}</span>)</a>
                 {% if 'user_id' in session %}
                     <a href="{{ url_for('my_orders') }}">Orders</a>
                     <a href="{{ url_for('account') }}">Account</a>
@@ -2081,23 +2992,23 @@ def cart():
             </div>
         </div>
     </div>
-    
+
     <div class="empty-cart">
         <h2>Your cart is empty</h2>
         <a href="{{ url_for('index') }}" class="btn">Continue Shopping</a>
     </div>
-    
+
     <div class="mobile-nav">
         <a href="{{ url_for('index') }}">
             <i class="fas fa-home"></i>
             <span>Home</span>
         </a>
-        
+
         <a href="{{ url_for('cart') }}">
             <i class="fas fa-shopping-cart"></i>
             <span>Cart</span>
-            {% if session.get('cart') %}
-            <span class="cart-count">{{ session['cart']|length }}</span>
+            {% if cart_count %}
+            <span class="cart-count">{{ cart_count }}</span>
             {% endif %}
         </a>
         <a href="{{ url_for('my_orders') }}">
@@ -2109,369 +3020,24 @@ def cart():
             <span>Account</span>
         </a>
     </div>
-</body>
-</html>
+            {% endblock %}
         ''')
     
-    cart = session['cart']
     subtotal = sum(item['price'] * item['quantity'] * (1 - item.get('discount', 0)/100) for item in cart.values())
     
-    return render_template_string('''
-        <!DOCTYPE html>
-<html>
-<head>
-    <title>Your Cart</title>
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    return render_page('cart', '''
+        {% extends "store_layout.html" %}
+        {% block title %}Your Cart{% endblock %}
+        {% block head %}
     <meta name="csrf-token" content="{{ csrf_token() }}">
-    <style>
-        :root {
-            --primary: #4361ee;
-            --primary-dark: #3a0ca3;
-            --accent: #f72585;
-            --light: #f8f9fa;
-            --dark: #212529;
-            --success: #4cc9f0;
-            --warning: #ffba08;
-            --danger: #ff4757;
-        }
-        
-        body { 
-            font-family: 'Segoe UI', Arial, sans-serif; 
-            margin: 0;
-            padding: 0;
-            background: linear-gradient(135deg, #f5f7fa 0%, #e9ecef 100%);
-            min-height: 100vh;
-        }
-        
-        .header { 
-            background: rgba(255,255,255,0.95); 
-            padding: 15px; 
-            box-shadow: 0 4px 30px rgba(0,0,0,0.1);
-            position: sticky; 
-            top: 0; 
-            z-index: 1000;
-            backdrop-filter: blur(10px);
-            border-bottom: 1px solid rgba(255,255,255,0.3);
-        }
-        
-        .navbar { 
-            display: flex; 
-            justify-content: space-between; 
-            align-items: center; 
-            max-width: 1200px; 
-            margin: 0 auto; 
-        }
-        
-        .navbar a {
-            text-decoration: none;
-            color: var(--dark);
-            font-weight: 500;
-            padding: 8px 15px;
-            border-radius: 8px;
-            transition: all 0.3s;
-        }
-        
-        .navbar a:first-child {
-            font-size: 24px;
-            font-weight: bold;
-            background: linear-gradient(135deg, var(--primary) 0%, var(--primary-dark) 100%);
-            -webkit-background-clip: text;
-            -webkit-text-fill-color: transparent;
-        }
-        
-        .navbar a:hover {
-            color: var(--primary);
-            background: rgba(67, 97, 238, 0.1);
-        }
-        
-        .container {
-            max-width: 1200px;
-            margin: 30px auto;
-            padding: 0 20px;
-        }
-        
-        h1 {
-            color: var(--dark);
-            margin-bottom: 30px;
-            font-weight: 700;
-            position: relative;
-            display: inline-block;
-        }
-        
-        h1:after {
-            content: '';
-            position: absolute;
-            bottom: -10px;
-            left: 0;
-            width: 60px;
-            height: 4px;
-            background: linear-gradient(135deg, var(--primary) 0%, var(--primary-dark) 100%);
-            border-radius: 2px;
-        }
-        
-        .cart-item {
-            display: flex;
-            gap: 25px;
-            margin-bottom: 25px;
-            padding: 20px;
-            background: white;
-            border-radius: 12px;
-            box-shadow: 0 5px 15px rgba(0,0,0,0.05);
-            transition: all 0.3s cubic-bezier(0.25, 0.8, 0.25, 1);
-            position: relative;
-        }
-        
-        .cart-item:hover {
-            transform: translateY(-3px);
-            box-shadow: 0 8px 25px rgba(0,0,0,0.1);
-        }
-        
-        .cart-item-image {
-            width: 120px;
-            height: 120px;
-            object-fit: contain;
-            border-radius: 8px;
-            background: #f8f9fa;
-            padding: 10px;
-        }
-        
-        .cart-item-content {
-            flex: 1;
-            display: flex;
-            flex-direction: column;
-            justify-content: space-between;
-        }
-        
-        .cart-item-title {
-            margin: 0 0 10px 0;
-            font-size: 18px;
-            color: var(--dark);
-        }
-        
-        .price-container {
-            display: flex;
-            gap: 15px;
-            align-items: center;
-            margin-bottom: 15px;
-        }
-        
-        .current-price {
-            font-weight: bold;
-            color: var(--primary);
-            font-size: 18px;
-        }
-        
-        .original-price {
-            text-decoration: line-through;
-            color: #777;
-            font-size: 0.9em;
-        }
-        
-        .discount-percent {
-            color: var(--danger);
-            font-weight: bold;
-            font-size: 0.9em;
-            background: rgba(255, 71, 87, 0.1);
-            padding: 3px 8px;
-            border-radius: 12px;
-        }
-        
-        .quantity-form {
-            display: flex;
-            gap: 10px;
-            align-items: center;
-        }
-        
-        .quantity-input {
-            padding: 10px;
-            width: 70px;
-            border: 1px solid #e0e0e0;
-            border-radius: 8px;
-            font-size: 16px;
-            text-align: center;
-        }
-        
-        .btn {
-            padding: 10px 20px;
-            border: none;
-            border-radius: 8px;
-            font-weight: 600;
-            cursor: pointer;
-            transition: all 0.3s;
-        }
-        
-        .btn-primary {
-            background: linear-gradient(135deg, var(--primary) 0%, var(--primary-dark) 100%);
-            color: white;
-            box-shadow: 0 4px 15px rgba(67, 97, 238, 0.3);
-        }
-        
-        .btn-primary:hover {
-            transform: translateY(-2px);
-            box-shadow: 0 6px 20px rgba(67, 97, 238, 0.4);
-        }
-        
-        .btn-danger {
-            background: linear-gradient(135deg, var(--danger) 0%, #ff6b81 100%);
-            color: white;
-            box-shadow: 0 4px 15px rgba(255, 71, 87, 0.3);
-        }
-        
-        .btn-danger:hover {
-            transform: translateY(-2px);
-            box-shadow: 0 6px 20px rgba(255, 71, 87, 0.4);
-        }
-        
-        .summary {
-            margin-top: 40px;
-            padding: 25px;
-            background: white;
-            border-radius: 12px;
-            box-shadow: 0 5px 15px rgba(0,0,0,0.05);
-        }
-        
-        .summary p {
-            margin: 10px 0;
-            font-size: 16px;
-        }
-        
-        .summary strong {
-            color: var(--dark);
-        }
-        
-        .checkout-btn {
-            display: block;
-            width: 100%;
-            padding: 15px;
-            background: linear-gradient(135deg, #28a745 0%, #218838 100%);
-            color: white;
-            text-align: center;
-            text-decoration: none;
-            border-radius: 8px;
-            margin-top: 20px;
-            font-weight: 600;
-            transition: all 0.3s;
-            box-shadow: 0 4px 15px rgba(40, 167, 69, 0.3);
-        }
-        
-        .checkout-btn:hover:not(.disabled) {
-            transform: translateY(-2px);
-            box-shadow: 0 6px 20px rgba(40, 167, 69, 0.4);
-        }
-        
-        .checkout-btn.disabled {
-            background: #ccc;
-            cursor: not-allowed;
-            box-shadow: none;
-        }
-        
-        .continue-shopping {
-            display: inline-block;
-            margin-top: 15px;
-            color: var(--primary);
-            text-decoration: none;
-            font-weight: 500;
-            transition: all 0.3s;
-        }
-        
-        .continue-shopping:hover {
-            text-decoration: underline;
-            color: var(--primary-dark);
-        }
-        
-        .empty-cart {
-            text-align: center;
-            padding: 50px 0;
-        }
-        
-        .empty-cart i {
-            font-size: 60px;
-            color: #ddd;
-            margin-bottom: 20px;
-        }
-        
-        .empty-cart p {
-            color: #777;
-            font-size: 18px;
-            margin-bottom: 20px;
-        }
-        
-        .mobile-nav { display: none; }
-        
-        @media (max-width: 768px) {
-            .container {
-                padding: 0 15px;
-            }
-            
-            .cart-item {
-                flex-direction: column;
-                gap: 15px;
-                padding: 15px;
-            }
-            
-            .cart-item-image {
-                width: 100%;
-                height: auto;
-                max-height: 200px;
-            }
-            
-            .desktop-nav { display: none; }
-            
-            .mobile-nav { 
-                display: flex; 
-                position: fixed; 
-                bottom: 0; 
-                left: 0; 
-                right: 0; 
-                background: rgba(255,255,255,0.95); 
-                box-shadow: 0 -5px 20px rgba(0,0,0,0.1);
-                justify-content: space-around;
-                padding: 15px 0;
-                z-index: 1000;
-                border-top-left-radius: 20px;
-                border-top-right-radius: 20px;
-                backdrop-filter: blur(10px);
-            }
-            
-            .mobile-nav a {
-                display: flex;
-                flex-direction: column;
-                align-items: center;
-                text-decoration: none;
-                color: #555;
-                font-size: 12px;
-                padding: 5px 15px;
-                border-radius: 15px;
-                transition: all 0.3s;
-            }
-            
-            .mobile-nav a:hover {
-                color: var(--primary);
-                background: rgba(67, 97, 238, 0.1);
-                transform: translateY(-5px);
-            }
-            
-            .mobile-nav i {
-                font-size: 20px;
-                margin-bottom: 5px;
-                transition: all 0.3s;
-            }
-            
-            .mobile-nav a:hover i {
-                transform: scale(1.2);
-            }
-            
-            body { padding-bottom: 80px; }
-        }
-    </style>
-    <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0/css/all.min.css">
-</head>
-<body>
+        {% endblock %}
+        {% block page_styles %}<link rel="stylesheet" href="{{ asset_url('css/pages/cart.css') }}">{% endblock %}
+        {% block body %}
     <div class="header">
         <div class="navbar desktop-nav">
             <a href="/">CRONYZO</a>
             <div>
-                <a href="{{ url_for('cart') }}">Cart (<span class="cart-count">{{ session.get('cart', {})|length }}</span>)</a>
+                <a href="{{ url_for('cart') }}">Cart (<span class="cart-count">{{ cart_count }}</span>)</a>
                 {% if 'user_id' in session %}
                     <a href="{{ url_for('my_orders') }}">Orders</a>
                     <a href="{{ url_for('account') }}">Account</a>
@@ -2482,16 +3048,16 @@ def cart():
             </div>
         </div>
     </div>
-    
+
     <div class="container">
         <h1>Your Shopping Cart</h1>
-        
+
         {% if cart.values()|length > 0 %}
             {% for item in cart.values() %}
             <div class="cart-item">
-                <img src="{{ url_for('static', filename='images/' + item.image) if item.image else 'https://via.placeholder.com/100' }}" 
+                <img src="{{ image_url('images/' + item.image, 'thumbnail') if item.image else 'https://via.placeholder.com/100' }}"
                      class="cart-item-image" alt="{{ item.title }}">
-                
+
                 <div class="cart-item-content">
                     <div>
                         <h3 class="cart-item-title">{{ item.title }}</h3>
@@ -2503,14 +3069,14 @@ def cart():
                             {% endif %}
                         </div>
                     </div>
-                    
+
                     <div class="quantity-form">
                         <form method="post" action="{{ url_for('update_cart', product_id=item.id) }}">
                             <input type="hidden" name="csrf_token" value="{{ csrf_token() }}">
                             <input type="number" name="quantity" value="{{ item.quantity }}" min="1" max="{{ item.max_quantity }}" class="quantity-input">
                             <button type="submit" class="btn btn-primary">Update</button>
                         </form>
-                        
+
                         <form method="post" action="{{ url_for('remove_from_cart', product_id=item.id) }}">
                             <input type="hidden" name="csrf_token" value="{{ csrf_token() }}">
                             <button type="submit" class="btn btn-danger">Remove</button>
@@ -2519,11 +3085,11 @@ def cart():
                 </div>
             </div>
             {% endfor %}
-            
+
             <div class="summary">
                 <p><strong>Subtotal:</strong> ₹{{ "{:,.2f}".format(subtotal) }}</p>
                 <p>Delivery charge will be calculated at checkout</p>
-                
+
                 <a href="{{ url_for('checkout') }}" class="checkout-btn {% if subtotal < 5000 %}disabled{% endif %}">
                     Proceed to Checkout {% if subtotal < 5000 %}(Min ₹5,000){% endif %}
                 </a>
@@ -2537,18 +3103,18 @@ def cart():
             </div>
         {% endif %}
     </div>
-    
+
     <div class="mobile-nav">
         <a href="{{ url_for('index') }}">
             <i class="fas fa-home"></i>
             <span>Home</span>
         </a>
-        
+
         <a href="{{ url_for('cart') }}">
             <i class="fas fa-shopping-cart"></i>
             <span>Cart</span>
-            {% if session.get('cart') %}
-            <span class="cart-count">{{ session['cart']|length }}</span>
+            {% if cart_count %}
+            <span class="cart-count">{{ cart_count }}</span>
             {% endif %}
         </a>
         <a href="{{ url_for('my_orders') }}">
@@ -2560,29 +3126,21 @@ def cart():
             <span>Account</span>
         </a>
     </div>
-</body>
-</html>
-    ''', cart=session['cart'], subtotal=subtotal)
+        {% endblock %}
+    ''', cart=cart, subtotal=subtotal)
 
 @app.route('/update_cart/<int:product_id>', methods=['POST'])
 def update_cart(product_id):
     if 'user_id' not in session:
         return redirect(url_for('login'))
     
-    if 'cart' not in session:
-        return redirect(url_for('cart'))
-    
     try:
         quantity = int(request.form['quantity'])
-        cart = session['cart']
         
-        if str(product_id) in cart:
-            if quantity <= 0:
-                del cart[str(product_id)]
-            else:
-                cart[str(product_id)]['quantity'] = quantity
-            
-            session['cart'] = cart
+        with get_db() as conn:
+            c = conn.cursor()
+            cart_store.set_quantity(c, current_cart_id(c), product_id, quantity)
+            conn.commit()
     except Exception as e:
         print(f"Error updating cart: {e}")
     
@@ -2593,13 +3151,13 @@ def remove_from_cart(product_id):
     if 'user_id' not in session:
         return redirect(url_for('login'))
     
-    if 'cart' not in session:
-        return redirect(url_for('cart'))
-    
-    cart = session['cart']
-    if str(product_id) in cart:
-        del cart[str(product_id)]
-        session['cart'] = cart
+    try:
+        with get_db() as conn:
+            c = conn.cursor()
+            cart_store.remove(c, current_cart_id(c), product_id)
+            conn.commit()
+    except Exception as e:
+        print(f"Error removing from cart: {e}")
     
     return redirect(url_for('cart'))
 
@@ -2608,10 +3166,14 @@ def checkout():
     if 'user_id' not in session:
         return redirect(url_for('login'))
     
-    if 'cart' not in session or not session['cart']:
+    with get_db() as conn:
+        c = conn.cursor()
+        cart = cart_store.items(c, current_cart_id(c))
+        conn.commit()
+    
+    if not cart:
         return redirect(url_for('index'))
     
-    cart = session['cart']
     subtotal = sum(item['price'] * item['quantity'] * (1 - item.get('discount', 0)/100) for item in cart.values())
     
     if subtotal < 5000:
@@ -2619,303 +3181,19 @@ def checkout():
     
     user_profile = get_user_profile(session['user_id'])
     
-    return render_template_string('''
-        <!DOCTYPE html>
-<html>
-<head>
-    <title>Checkout</title>
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    return render_page('checkout', '''
+        {% extends "store_layout.html" %}
+        {% block title %}Checkout{% endblock %}
+        {% block head %}
     <meta name="csrf-token" content="{{ csrf_token() }}">
-    <style>
-        :root {
-            --primary: #4361ee;
-            --primary-dark: #3a0ca3;
-            --accent: #f72585;
-            --light: #f8f9fa;
-            --dark: #212529;
-            --success: #4cc9f0;
-            --warning: #ffba08;
-            --danger: #ff4757;
-        }
-        
-        body { 
-            font-family: 'Segoe UI', Arial, sans-serif; 
-            margin: 0;
-            padding: 0;
-            background: linear-gradient(135deg, #f5f7fa 0%, #e9ecef 100%);
-            min-height: 100vh;
-        }
-        
-        .header { 
-            background: rgba(255,255,255,0.95); 
-            padding: 15px; 
-            box-shadow: 0 4px 30px rgba(0,0,0,0.1);
-            position: sticky; 
-            top: 0; 
-            z-index: 1000;
-            backdrop-filter: blur(10px);
-            border-bottom: 1px solid rgba(255,255,255,0.3);
-        }
-        
-        .navbar { 
-            display: flex; 
-            justify-content: space-between; 
-            align-items: center; 
-            max-width: 1200px; 
-            margin: 0 auto; 
-        }
-        
-        .navbar a {
-            text-decoration: none;
-            color: var(--dark);
-            font-weight: 500;
-            padding: 8px 15px;
-            border-radius: 8px;
-            transition: all 0.3s;
-        }
-        
-        .navbar a:first-child {
-            font-size: 24px;
-            font-weight: bold;
-            background: linear-gradient(135deg, var(--primary) 0%, var(--primary-dark) 100%);
-            -webkit-background-clip: text;
-            -webkit-text-fill-color: transparent;
-        }
-        
-        .navbar a:hover {
-            color: var(--primary);
-            background: rgba(67, 97, 238, 0.1);
-        }
-        
-        .container {
-            max-width: 1200px;
-            margin: 30px auto;
-            padding: 0 20px;
-        }
-        
-        h1 {
-            color: var(--dark);
-            margin-bottom: 30px;
-            font-weight: 700;
-            position: relative;
-            display: inline-block;
-        }
-        
-        h1:after {
-            content: '';
-            position: absolute;
-            bottom: -10px;
-            left: 0;
-            width: 60px;
-            height: 4px;
-            background: linear-gradient(135deg, var(--primary) 0%, var(--primary-dark) 100%);
-            border-radius: 2px;
-        }
-        
-        h2 {
-            color: var(--dark);
-            margin-top: 0;
-            margin-bottom: 25px;
-            padding-bottom: 10px;
-            border-bottom: 1px solid #eee;
-        }
-        
-        .checkout-container {
-            display: grid;
-            grid-template-columns: 1fr 1fr;
-            gap: 30px;
-        }
-        
-        .checkout-section {
-            background: white;
-            padding: 25px;
-            border-radius: 12px;
-            box-shadow: 0 5px 15px rgba(0,0,0,0.05);
-        }
-        
-        .form-group {
-            margin-bottom: 20px;
-        }
-        
-        .form-group label {
-            display: block;
-            margin-bottom: 8px;
-            font-weight: 500;
-            color: #555;
-        }
-        
-        .form-group input,
-        .form-group select {
-            width: 100%;
-            padding: 12px 15px;
-            border: 1px solid #e0e0e0;
-            border-radius: 8px;
-            font-size: 16px;
-            transition: all 0.3s;
-        }
-        
-        .form-group input:focus,
-        .form-group select:focus {
-            outline: none;
-            border-color: var(--primary);
-            box-shadow: 0 0 0 3px rgba(67, 97, 238, 0.2);
-        }
-        
-        .payment-section {
-            margin: 30px 0;
-            padding: 25px;
-            background: #f5f7fb;
-            border-radius: 12px;
-        }
-        
-        .payment-section h3 {
-            margin-top: 0;
-            color: var(--primary-dark);
-        }
-        
-        .qr-code {
-            text-align: center;
-            margin: 20px 0;
-            padding: 15px;
-            background: white;
-            border-radius: 8px;
-            box-shadow: 0 2px 10px rgba(0,0,0,0.05);
-        }
-        
-        .qr-code img {
-            max-width: 200px;
-            border-radius: 4px;
-        }
-        
-        .order-summary {
-            background: #f9f9f9;
-        }
-        
-        .order-item {
-            display: flex;
-            justify-content: space-between;
-            margin-bottom: 15px;
-            padding-bottom: 15px;
-            border-bottom: 1px solid #eee;
-        }
-        
-        .order-item:last-child {
-            border-bottom: none;
-        }
-        
-        .order-total {
-            margin-top: 20px;
-            padding-top: 20px;
-            border-top: 1px solid #ddd;
-            font-weight: bold;
-        }
-        
-        .payment-summary {
-            margin: 20px 0;
-            padding: 20px;
-            background: #e9f7ef;
-            border-radius: 12px;
-        }
-        
-        .payment-summary div {
-            display: flex;
-            justify-content: space-between;
-            margin-bottom: 10px;
-        }
-        
-        .payment-summary div:last-child {
-            margin-bottom: 0;
-        }
-        
-        .btn {
-            display: block;
-            width: 100%;
-            padding: 15px;
-            background: linear-gradient(135deg, var(--primary) 0%, var(--primary-dark) 100%);
-            color: white;
-            text-align: center;
-            border: none;
-            border-radius: 8px;
-            font-weight: 600;
-            cursor: pointer;
-            transition: all 0.3s;
-            box-shadow: 0 4px 15px rgba(67, 97, 238, 0.3);
-        }
-        
-        .btn:hover {
-            transform: translateY(-2px);
-            box-shadow: 0 6px 20px rgba(67, 97, 238, 0.4);
-        }
-        
-        .mobile-nav { display: none; }
-        
-        @media (max-width: 768px) {
-            .checkout-container {
-                grid-template-columns: 1fr;
-            }
-            
-            .container {
-                padding: 0 15px;
-            }
-            
-            .desktop-nav { display: none; }
-            
-            .mobile-nav { 
-                display: flex; 
-                position: fixed; 
-                bottom: 0; 
-                left: 0; 
-                right: 0; 
-                background: rgba(255,255,255,0.95); 
-                box-shadow: 0 -5px 20px rgba(0,0,0,0.1);
-                justify-content: space-around;
-                padding: 15px 0;
-                z-index: 1000;
-                border-top-left-radius: 20px;
-                border-top-right-radius: 20px;
-                backdrop-filter: blur(10px);
-            }
-            
-            .mobile-nav a {
-                display: flex;
-                flex-direction: column;
-                align-items: center;
-                text-decoration: none;
-                color: #555;
-                font-size: 12px;
-                padding: 5px 15px;
-                border-radius: 15px;
-                transition: all 0.3s;
-            }
-            
-            .mobile-nav a:hover {
-                color: var(--primary);
-                background: rgba(67, 97, 238, 0.1);
-                transform: translateY(-5px);
-            }
-            
-            .mobile-nav i {
-                font-size: 20px;
-                margin-bottom: 5px;
-                transition: all 0.3s;
-            }
-            
-            .mobile-nav a:hover i {
-                transform: scale(1.2);
-            }
-            
-            body { padding-bottom: 80px; }
-        }
-    </style>
-    <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0/css/all.min.css">
-</head>
-
-  <body>
+        {% endblock %}
+        {% block page_styles %}<link rel="stylesheet" href="{{ asset_url('css/pages/checkout.css') }}">{% endblock %}
+        {% block body %}
     <div class="header">
         <div class="navbar desktop-nav">
             <a href="/">CRONYZO</a>
             <div>
-                <a href="{{ url_for('cart') }}">Cart (<span class="cart-count">{{ session.get('cart', {})|length }}</span>)</a>
+                <a href="{{ url_for('cart') }}">Cart (<span class="cart-count">{{ cart_count }}</span>)</a>
                 {% if 'user_id' in session %}
                     <a href="{{ url_for('my_orders') }}">Orders</a>
                     <a href="{{ url_for('account') }}">Account</a>
@@ -2926,10 +3204,10 @@ def checkout():
             </div>
         </div>
     </div>
-    
+
     <div class="container">
         <h1>Checkout</h1>
-        
+
         <div class="checkout-container">
             <div class="checkout-section">
                 <h2>Shipping Information</h2>
@@ -2939,12 +3217,12 @@ def checkout():
                         <label>Full Name</label>
                         <input type="text" name="name" value="{{ user_profile['name'] if user_profile and user_profile['name'] else '' }}" required>
                     </div>
-                    
+
                     <div class="form-group">
                         <label>WhatsApp Number</label>
                         <input type="tel" name="phone" value="{{ user_profile['phone'] if user_profile else '' }}" required>
                     </div>
-                    
+
                     <div class="form-group">
                         <label>State</label>
                         <input type="text" id="state-search" placeholder="Type to search state..." class="search-input" onkeyup="filterDropdown('state-search', 'state')">
@@ -2955,7 +3233,7 @@ def checkout():
                             {% endfor %}
                         </select>
                     </div>
-                    
+
                     <div class="form-group">
                         <label>City</label>
                         <input type="text" id="city-search" placeholder="Type to search city..." class="search-input" onkeyup="filterDropdown('city-search', 'city')">
@@ -2968,12 +3246,12 @@ def checkout():
                             {% endif %}
                         </select>
                     </div>
-                    
+
                     <div class="form-group">
                         <label>Full Address</label>
                         <input type="text" name="address" value="{{ user_profile['address'] if user_profile and user_profile['address'] else '' }}" required>
                     </div>
-                    
+
                     <div class="payment-section">
                         <h3>Advance Payment (Delivery Charge Only)</h3>
                         <p>Please pay the delivery charge via PhonePe QR code:</p>
@@ -2985,7 +3263,7 @@ def checkout():
                             <input type="text" name="transaction_id" required>
                         </div>
                     </div>
-                    
+
                     <div class="payment-summary">
                         <div id="delivery-charge-display">
                             <span>Delivery Charge (Advance Payment):</span>
@@ -3000,11 +3278,11 @@ def checkout():
                             <strong>₹{{ "{:,.2f}".format(subtotal) }}</strong>
                         </div>
                     </div>
-                    
+
                     <button type="submit" class="btn">Place Order</button>
                 </form>
             </div>
-            
+
             <div class="checkout-section order-summary">
                 <h2>Order Summary</h2>
                 {% for item in cart.values() %}
@@ -3013,7 +3291,7 @@ def checkout():
                     <span>₹{{ "{:,.2f}".format(item.price * (1 - item.get('discount', 0)/100) * item.quantity) }}</span>
                 </div>
                 {% endfor %}
-                
+
                 <div class="order-item order-total">
                     <strong>Subtotal:</strong>
                     <strong>₹{{ "{:,.2f}".format(subtotal) }}</strong>
@@ -3021,18 +3299,18 @@ def checkout():
             </div>
         </div>
     </div>
-    
+
     <div class="mobile-nav">
         <a href="{{ url_for('index') }}">
             <i class="fas fa-home"></i>
             <span>Home</span>
         </a>
-        
+
         <a href="{{ url_for('cart') }}">
             <i class="fas fa-shopping-cart"></i>
             <span>Cart</span>
-            {% if session.get('cart') %}
-            <span class="cart-count">{{ session['cart']|length }}</span>
+            {% if cart_count %}
+            <span class="cart-count">{{ cart_count }}</span>
             {% endif %}
         </a>
         <a href="{{ url_for('my_orders') }}">
@@ -3045,521 +3323,151 @@ def checkout():
         </a>
     </div>
 
-    
-    <style>
-        .search-input {
-            width: 100%;
-            padding: 12px;
-            margin-bottom: 8px;
-            border: 2px solid #e2e8f0;
-            border-radius: 6px;
-            font-size: 16px;
-            transition: all 0.3s;
-        }
-        
-        .search-input:focus {
-            border-color: #4299e1;
-            box-shadow: 0 0 0 3px rgba(66, 153, 225, 0.2);
-            outline: none;
-        }
-        
-        .dropdown-select {
-            width: 100%;
-            padding: 10px;
-            border: 2px solid #e2e8f0;
-            border-radius: 6px;
-            font-size: 16px;
-            max-height: 250px;
-            overflow-y: auto;
-        }
-        
-        .dropdown-select option {
-            padding: 10px;
-            border-bottom: 1px solid #eee;
-            transition: all 0.2s;
-        }
-        
-        .dropdown-select option:hover {
-            background-color: #ebf8ff;
-        }
-        
-        .no-match {
-            color: #a0aec0 !important;
-        }
-        
-        .no-match-message {
-            color: #e53e3e !important;
-            font-style: italic;
-            padding: 10px;
-        }
-    </style>
-    
-    <script>
-        const deliveryCharges = {{ delivery_charges|tojson }};
-        const subtotal = {{ subtotal }};
-        let allCities = {};
-        
-        // Initialize all cities data
-        document.addEventListener('DOMContentLoaded', function() {
-            // Store all cities data for each state
-            for (const state in deliveryCharges) {
-                allCities[state] = Object.keys(deliveryCharges[state]);
-            }
-            
-            // If state is pre-selected, load its cities
-            const stateSelect = document.getElementById('state');
-            if (stateSelect.value) {
-                loadCities();
-            }
-            
-            updateDeliveryCharge();
-            
-            // Add event listeners for better UX
-            document.getElementById('state-search').addEventListener('focus', function() {
-                this.select();
-            });
-            
-            document.getElementById('city-search').addEventListener('focus', function() {
-                this.select();
-            });
-        });
-        
-        // Smart search function with fuzzy matching
-        function filterDropdown(searchId, dropdownId) {
-            const input = document.getElementById(searchId);
-            const searchTerm = input.value.trim().toLowerCase().replace(/\s+/g, ' ');
-            const select = document.getElementById(dropdownId);
-            const options = select.options;
-            
-            // Remove previous no-match message if exists
-            const existingNoMatch = select.querySelector('.no-match-message');
-            if (existingNoMatch) {
-                select.removeChild(existingNoMatch);
-            }
-            
-            // Show all options when search is empty
-            if (searchTerm === '') {
-                for (let i = 0; i < options.length; i++) {
-                    options[i].style.display = '';
-                    options[i].classList.remove('no-match');
-                    options[i].innerHTML = options[i].textContent; // Remove highlighting
-                }
-                return;
-            }
-            
-            // Smart matching algorithm
-            let hasMatches = false;
-            for (let i = 0; i < options.length; i++) {
-                const option = options[i];
-                if (option.value === '') continue; // Skip the "Select" option
-                
-                const optionText = (option.textContent || option.innerText)
-                    .toLowerCase()
-                    .normalize("NFD")
-                    .replace(/[\u0300-\u036f]/g, "") // Remove accents
-                    .replace(/\s+/g, ' '); // Normalize spaces
-                
-                // Remove all non-alphanumeric characters for better matching
-                const cleanOptionText = optionText.replace(/[^a-z0-9\s]/g, '');
-                const cleanSearchTerm = searchTerm.replace(/[^a-z0-9\s]/g, '');
-                
-                // Smart matching conditions:
-                const searchWords = cleanSearchTerm.split(' ');
-                const optionWords = cleanOptionText.split(' ');
-                
-                // 1. Check if all search words are present in option (in any order)
-                const allWordsMatch = searchWords.every(word => 
-                    word.length > 0 && optionWords.some(optionWord => optionWord.includes(word))
-                );
-                
-                // 2. Check for fuzzy match (partial character sequence)
-                const fuzzyMatch = cleanSearchTerm.length > 2 && 
-                    cleanSearchTerm.split('').every((char, index) => 
-                        index === 0 || cleanOptionText.includes(char)
-                    );
-                
-                if (allWordsMatch || fuzzyMatch) {
-                    option.style.display = '';
-                    option.classList.remove('no-match');
-                    hasMatches = true;
-                    
-                    // Highlight matching parts
-                    const regex = new RegExp(`(${searchWords.join('|')})`, 'gi');
-                    option.innerHTML = option.textContent.replace(regex, '<strong>$1</strong>');
-                } else {
-                    option.style.display = 'none';
-                    option.classList.add('no-match');
-                }
-            }
-            
-            // If no matches, show a helpful message
-            if (!hasMatches && searchTerm.length > 1) {
-                const noResults = document.createElement('option');
-                noResults.value = '';
-                noResults.innerHTML = 'No matching results found for "<strong>' + 
-                    searchTerm + '</strong>"';
-                noResults.classList.add('no-match-message');
-                noResults.style.display = '';
-                select.appendChild(noResults);
-            }
-        }
-        
-        function loadCities() {
-            const stateSelect = document.getElementById('state');
-            const citySelect = document.getElementById('city');
-            const state = stateSelect.value;
-            
-            citySelect.innerHTML = '<option value="">Select City</option>';
-            
-            if (state && allCities[state]) {
-                allCities[state].forEach(city => {
-                    const option = document.createElement('option');
-                    option.value = city;
-                    option.textContent = city;
-                    citySelect.appendChild(option);
-                });
-            }
-            
-            // Reset city search input
-            document.getElementById('city-search').value = '';
-        }
-        
-        function updateDeliveryCharge() {
-            const state = document.getElementById('state').value;
-            const city = document.getElementById('city').value;
-            let charge = 0;
-            
-            if (state && city && deliveryCharges[state] && deliveryCharges[state][city]) {
-                charge = deliveryCharges[state][city];
-            }
-            
-            document.getElementById('delivery-charge-value').textContent = `₹${charge.toLocaleString('en-IN')}`;
-        }
-    </script>
-</body>
-            
-        
-</html>
-                    
-                
-    ''', cart=session['cart'], subtotal=subtotal, delivery_charges=DELIVERY_CHARGES, user_profile=user_profile)
-
-@app.route('/place_order', methods=['POST'])
-def place_order():
-    if 'user_id' not in session:
-        return redirect(url_for('login'))
-    
-    if 'cart' not in session or not session['cart']:
-        return redirect(url_for('index'))
-    
-    try:
-        name = request.form['name']
-        phone = relquest.form['phone']
-        state = request.form['state']
-        city = request.form['city']
-        address = request.form['address']
-        transaction_id = request.form['transaction_id']
-        
-        cart = session['cart']
-        subtotal = sum(item['price'] * item['quantity'] * (1 - item.get('discount', 0)/100) for item in cart.values())
-        delivery_charge = DELIVERY_CHARGES.get(state, {}).get(city, 0)
-        total_amount = subtotal + delivery_charge
-        advance_payment = total_amount * 0.5
-        
-        items = ", ".join([f"{item['title']} ({item['quantity']} × ₹{item['price'] * (1 - item.get('discount', 0)/100):,.2f})" for item in cart.values()])
-        
-        with get_db() as conn:
-            c = conn.cursor()
-            
-            c.execute("SELECT id FROM users WHERE phone = ?", (phone,))
-            user = c.fetchone()
-            
-            if not user:
-                c.execute("INSERT INTO users (phone, name, address, state, city) VALUES (?, ?, ?, ?, ?)", 
-                         (phone, name, address, state, city))
-                conn.commit()
-                user_id = c.lastrowid
-            else:
-                user_id = user[0]
-                # Update user profile with latest information
-                c.execute("UPDATE users SET name = ?, address = ?, state = ?, city = ? WHERE id = ?",
-                         (name, address, state, city, user_id))
-                conn.commit()
-            
-            c.execute('''INSERT INTO orders 
-            (order_date, name, phone, state, city, address, 
-             transaction_id, subtotal, delivery_charge, 
-             total_amount, advance_payment, items, user_id, status, can_cancel)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''',
-        (datetime.now().strftime("%Y-%m-%d %H:%M:%S"), name, phone, 
-         state, city, address, transaction_id, subtotal, 
-         delivery_charge, total_amount, advance_payment, 
-         items, user_id, 'Processing', 1))
-            
-            conn.commit()
-            order_id = c.lastrowid
-            
-            with open('orders.txt', 'a', encoding='utf-8') as f:
-                f.write("\n\n=== New Order ===\n")
-                f.write(f"Order Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                f.write(f"Customer: {name} ({phone})\n")
-                f.write(f"Address: {address}, {city}, {state}\n")
-                f.write(f"Transaction ID: {transaction_id}\n")
-                f.write(f"Subtotal: ₹{subtotal:,.2f}\n")
-                f.write(f"Delivery Charge: ₹{delivery_charge:,.2f}\n")
-                f.write(f"Total Amount: ₹{total_amount:,.2f}\n")
-                f.write(f"Advance Paid: ₹{advance_payment:,.2f}\n")
-                f.write("Items:\n")
-                for item in cart.values():
-                    f.write(f"- {item['title']} ({item['quantity']} × ₹{item['price'] * (1 - item.get('discount', 0)/100):,.2f})\n")
-        
-        session['user_id'] = user_id
-        session['user_phone'] = phone
-        
-        session.pop('cart', None)
-        
-        return render_template_string('''
-            <!DOCTYPE html>
-<html>
-<head>
-    <title>Order Confirmed</title>
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <meta name="csrf-token" content="{{ csrf_token() }}">
-    <style>
-        :root {
-            --primary: #4361ee;
-            --primary-dark: #3a0ca3;
-            --accent: #f72585;
-            --light: #f8f9fa;
-            --dark: #212529;
-            --success: #4cc9f0;
-            --warning: #ffba08;
-            --danger: #ff4757;
-        }
-        
-        body { 
-            font-family: 'Segoe UI', Arial, sans-serif; 
-            margin: 0;
-            padding: 0;
-            background: linear-gradient(135deg, #f5f7fa 0%, #e9ecef 100%);
-            min-height: 100vh;
-            text-align: center;
-        }
-        
-        .header { 
-            background: rgba(255,255,255,0.95); 
-            padding: 15px; 
-            box-shadow: 0 4px 30px rgba(0,0,0,0.1);
-            position: sticky; 
-            top: 0; 
-            z-index: 1000;
-            backdrop-filter: blur(10px);
-            border-bottom: 1px solid rgba(255,255,255,0.3);
-        }
-        
-        .navbar { 
-            display: flex; 
-            justify-content: space-between; 
-            align-items: center; 
-            max-width: 1200px; 
-            margin: 0 auto; 
-        }
-        
-        .navbar a {
-            text-decoration: none;
-            color: var(--dark);
-            font-weight: 500;
-            padding: 8px 15px;
-            border-radius: 8px;
-            transition: all 0.3s;
-        }
-        
-        .navbar a:first-child {
-            font-size: 24px;
-            font-weight: bold;
-            background: linear-gradient(135deg, var(--primary) 0%, var(--primary-dark) 100%);
-            -webkit-background-clip: text;
-            -webkit-text-fill-color: transparent;
-        }
-        
-        .navbar a:hover {
-            color: var(--primary);
-            background: rgba(67, 97, 238, 0.1);
-        }
-        
-        .container {
-            max-width: 600px;
-            margin: 30px auto;
-            padding: 0 20px;
-        }
-        
-        .confirmation-icon {
-            font-size: 80px;
-            color: #28a745;
-            margin: 30px 0;
-            width: 100px;
-            height: 100px;
-            background: white;
-            border-radius: 50%;
-            display: inline-flex;
-            align-items: center;
-            justify-content: center;
-            box-shadow: 0 5px 20px rgba(40, 167, 69, 0.3);
-            animation: bounce 0.5s ease;
-        }
-        
-        @keyframes bounce {
-            0%, 100% { transform: scale(1); }
-            50% { transform: scale(1.1); }
-        }
-        
-        h1 {
-            color: var(--dark);
-            margin-bottom: 20px;
-            font-weight: 700;
-        }
-        
-        p {
-            color: #555;
-            font-size: 16px;
-            line-height: 1.6;
-            margin-bottom: 20px;
-        }
-        
-        .order-detail {
-            background: white;
-            padding: 25px;
-            border-radius: 12px;
-            margin: 30px 0;
-            text-align: left;
-            box-shadow: 0 5px 15px rgba(0,0,0,0.05);
-        }
-        
-        .order-detail h3 {
-            margin-top: 0;
-            color: var(--dark);
-            padding-bottom: 10px;
-            border-bottom: 1px solid #eee;
-        }
-        
-        .detail-row {
-            display: flex;
-            margin-bottom: 15px;
-            padding-bottom: 15px;
-            border-bottom: 1px solid #f5f5f5;
-        }
-        
-        .detail-row:last-child {
-            border-bottom: none;
-            margin-bottom: 0;
-            padding-bottom: 0;
-        }
-        
-        .detail-label {
-            font-weight: bold;
-            width: 150px;
-            color: #555;
-        }
+    <script type="application/json" id="delivery-charges">{{ delivery_charges|tojson }}</script>
+        {% endblock %}
+    ''', cart=cart, subtotal=subtotal, delivery_charges=get_delivery_charges(), user_profile=user_profile)
+
+@app.route('/place_order', methods=['POST'])
+def place_order():
+    if 'user_id' not in session:
+        return redirect(url_for('login'))
+    
+    try:
+        name = request.form['name']
+        phone = request.form['phone']
+        state = request.form['state']
+        city = request.form['city']
+        address = request.form['address']
+        transaction_id = request.form['transaction_id']
         
-        .btn {
-            display: inline-block;
-            padding: 12px 30px;
-            background: linear-gradient(135deg, var(--primary) 0%, var(--primary-dark) 100%);
-            color: white;
-            text-decoration: none;
-            border-radius: 8px;
-            margin-top: 20px;
-            font-weight: 600;
-            transition: all 0.3s;
-            box-shadow: 0 4px 15px rgba(67, 97, 238, 0.3);
-        }
+        # A resubmitted form (slow client, double click, retry) gets the
+        # original order back instead of creating a duplicate
+        confirmation = placed_orders.get(transaction_id)
+        journal_entry = None
         
-        .btn:hover {
-            transform: translateY(-2px);
-            box-shadow: 0 6px 20px rgba(67, 97, 238, 0.4);
-        }
+        if confirmation is None:
+            with get_db() as conn:
+                c = conn.cursor()
+                
+                # One write transaction for the user, order, line items and
+                # cart; IMMEDIATE so the transaction_id check cannot race
+                with transaction(conn):
+                    confirmation = find_placed_order(c, transaction_id)
+                    
+                    if confirmation is None:
+                        cart_id = current_cart_id(c)
+                        cart = cart_store.items(c, cart_id)
+                        if not cart:
+                            return redirect(url_for('index'))
+                        
+                        subtotal = sum(item['price'] * item['quantity'] * (1 - item.get('discount', 0)/100) for item in cart.values())
+                        delivery_charge = delivery_charge_store.charge_for(c, state, city)
+                        total_amount = subtotal + delivery_charge
+                        advance_payment = total_amount * 0.5
+                        
+                        items = ", ".join([f"{item['title']} ({item['quantity']} × ₹{item['price'] * (1 - item.get('discount', 0)/100):,.2f})" for item in cart.values()])
+                        order_date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                        
+                        reserve_stock(c, {item['id']: item['quantity'] for item in cart.values()})
+                        
+                        c.execute("SELECT id FROM users WHERE phone = ?", (phone,))
+                        user = c.fetchone()
+                        
+                        if not user:
+                            c.execute("INSERT INTO users (phone, name, address, state, city) VALUES (?, ?, ?, ?, ?)", 
+                                     (phone, name, address, state, city))
+                            user_id = c.lastrowid
+                        else:
+                            user_id = user[0]
+                            # Update user profile with latest information
+                            c.execute("UPDATE users SET name = ?, address = ?, state = ?, city = ? WHERE id = ?",
+                                     (name, address, state, city, user_id))
+                        
+                        c.execute('''INSERT INTO orders 
+                        (order_date, name, phone, state, city, address, 
+                         transaction_id, subtotal, delivery_charge, 
+                         total_amount, advance_payment, items, user_id, status, can_cancel)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''',
+                    (order_date, name, phone, 
+                     state, city, address, transaction_id, subtotal, 
+                     delivery_charge, total_amount, advance_payment, 
+                     items, user_id, 'Processing', 1))
+                        order_id = c.lastrowid
+                        
+                        c.executemany('''INSERT INTO order_items (order_id, product_id, title, quantity, unit_price, discount, stock_reserved)
+                                        VALUES (?, ?, ?, ?, ?, ?, 1)''',
+                                      [(order_id, item['id'], item['title'], item['quantity'], item['price'], item['discount'])
+                                       for item in cart.values()])
+                        
+                        cart_store.clear(c, cart_id)
+                        
+                        confirmation = {
+                            'order_id': order_id,
+                            'user_id': user_id,
+                            'name': name,
+                            'phone': phone,
+                            'address': address,
+                            'city': city,
+                            'state': state,
+                            'transaction_id': transaction_id,
+                            'delivery_charge': delivery_charge,
+                            'total_amount': total_amount,
+                            'advance_payment': advance_payment
+                        }
+                        journal_entry = {
+                            'order_id': order_id,
+                            'order_date': order_date,
+                            'name': name,
+                            'phone': phone,
+                            'address': address,
+                            'city': city,
+                            'state': state,
+                            'transaction_id': transaction_id,
+                            'subtotal': subtotal,
+                            'delivery_charge': delivery_charge,
+                            'total_amount': total_amount,
+                            'advance_payment': advance_payment,
+                            'items': [{
+                                'product_id': item['id'],
+                                'title': item['title'],
+                                'quantity': item['quantity'],
+                                'unit_price': item['price'],
+                                'discount': item['discount']
+                            } for item in cart.values()]
+                        }
+            
+            placed_orders.put(transaction_id, confirmation)
+            if journal_entry:
+                order_journal.record(journal_entry)
         
-        .redirect-notice {
-            margin-top: 15px;
-            color: #777;
-            font-size: 14px;
-        }
+        if confirmation['phone'] != phone:
+            # Someone else's transaction id; never show their order
+            raise ValueError(f"Transaction ID {transaction_id} was already used for another order")
         
-        .mobile-nav { display: none; }
+        session['user_id'] = confirmation['user_id']
+        session['user_phone'] = phone
+        # The order may have been placed under a different phone/user
+        session.pop('cart_id', None)
         
-        @media (max-width: 768px) {
-            .container {
-                padding: 0 15px;
-            }
-            
-            .confirmation-icon {
-                font-size: 60px;
-                width: 80px;
-                height: 80px;
-            }
-            
-            .desktop-nav { display: none; }
-            
-            .mobile-nav { 
-                display: flex; 
-                position: fixed; 
-                bottom: 0; 
-                left: 0; 
-                right: 0; 
-                background: rgba(255,255,255,0.95); 
-                box-shadow: 0 -5px 20px rgba(0,0,0,0.1);
-                justify-content: space-around;
-                padding: 15px 0;
-                z-index: 1000;
-                border-top-left-radius: 20px;
-                border-top-right-radius: 20px;
-                backdrop-filter: blur(10px);
-            }
-            
-            .mobile-nav a {
-                display: flex;
-                flex-direction: column;
-                align-items: center;
-                text-decoration: none;
-                color: #555;
-                font-size: 12px;
-                padding: 5px 15px;
-                border-radius: 15px;
-                transition: all 0.3s;
-            }
-            
-            .mobile-nav a:hover {
-                color: var(--primary);
-                background: rgba(67, 97, 238, 0.1);
-                transform: translateY(-5px);
-            }
-            
-            .mobile-nav i {
-                font-size: 20px;
-                margin-bottom: 5px;
-                transition: all 0.3s;
-            }
-            
-            .mobile-nav a:hover i {
-                transform: scale(1.2);
-            }
-            
-            body { padding-bottom: 80px; }
-        }
-    </style>
-    <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0/css/all.min.css">
+        return render_page('order_confirmation', '''
+            {% extends "store_layout.html" %}
+            {% block title %}Order Confirmed{% endblock %}
+            {% block head %}
+    <meta name="csrf-token" content="{{ csrf_token() }}">
+
     <script>
         setTimeout(function() {
             window.location.href = "{{ url_for('index') }}";
         }, 8000);
     </script>
-</head>
-<body>
+            {% endblock %}
+            {% block page_styles %}<link rel="stylesheet" href="{{ asset_url('css/pages/order_confirmation.css') }}">{% endblock %}
+            {% block body %}
     <div class="header">
         <div class="navbar desktop-nav">
             <a href="/">CRONYZO</a>
             <div>
-                <a href="{{ url_for('cart') }}">Cart (<span class="cart-count">{{ session.get('cart', {})|length }}</span>)</a>
+                <a href="{{ url_for('cart') }}">Cart (<span class="cart-count">{{ cart_count }}</span>)</a>
                 {% if 'user_id' in session %}
                     <a href="{{ url_for('my_orders') }}">Orders</a>
                     <a href="{{ url_for('account') }}">Account</a>
@@ -3570,12 +3478,12 @@ def place_order():
             </div>
         </div>
     </div>
-    
+
     <div class="container">
         <div class="confirmation-icon">✓</div>
         <h1>Order Confirmed!</h1>
         <p>Thank you for your purchase. Your order has been placed successfully.</p>
-        
+
         <div class="order-detail">
             <h3>Order Details</h3>
             <div class="detail-row">
@@ -3611,25 +3519,25 @@ def place_order():
                 <span>₹{{ delivery_charge }}</span>
             </div>
         </div>
-        
+
         <p>We've sent the order details to your WhatsApp number {{ phone }}.</p>
         <p>Our team will contact you shortly for delivery updates.</p>
-        
+
         <a href="{{ url_for('index') }}" class="btn">Continue Shopping</a>
         <p class="redirect-notice">(You will be automatically redirected to home page in 8 seconds)</p>
     </div>
-    
+
     <div class="mobile-nav">
         <a href="{{ url_for('index') }}">
             <i class="fas fa-home"></i>
             <span>Home</span>
         </a>
-        
+
         <a href="{{ url_for('cart') }}">
             <i class="fas fa-shopping-cart"></i>
             <span>Cart</span>
-            {% if session.get('cart') %}
-            <span class="cart-count">{{ session['cart']|length }}</span>
+            {% if cart_count %}
+            <span class="cart-count">{{ cart_count }}</span>
             {% endif %}
         </a>
         <a href="{{ url_for('my_orders') }}">
@@ -3641,199 +3549,25 @@ def place_order():
             <span>Account</span>
         </a>
     </div>
-</body>
-</html>
-        ''', order_id=order_id, name=name, phone=phone, address=address,
-       city=city, state=state, transaction_id=transaction_id,
-       total_amount=total_amount, advance_payment=advance_payment,
-       delivery_charge=delivery_charge)
+            {% endblock %}
+        ''', **confirmation)
     
     except Exception as e:
         print(f"Error placing order: {e}")
-        return render_template_string('''
-            <!DOCTYPE html>
-            <html>
-            <head>
-                <title>Order Failed</title>
-                <meta name="viewport" content="width=device-width, initial-scale=1.0">
-                <style>
-                    
-        :root {
-            --primary: #4361ee;
-            --primary-dark: #3a0ca3;
-            --accent: #f72585;
-            --light: #f8f9fa;
-            --dark: #212529;
-            --success: #4cc9f0;
-            --warning: #ffba08;
-            --error: #dc3545;
-        }
-        
-        body { 
-            font-family: 'Segoe UI', Arial, sans-serif; 
-            margin: 0; 
-            padding: 0; 
-            background: linear-gradient(135deg, #f5f7fa 0%, #e9ecef 100%);
-            min-height: 100vh;
-            text-align: center;
-        }
-        
-        .header { 
-            background: rgba(255,255,255,0.95); 
-            padding: 15px; 
-            box-shadow: 0 4px 30px rgba(0,0,0,0.1);
-            position: sticky; 
-            top: 0; 
-            z-index: 1000;
-            backdrop-filter: blur(10px);
-            border-bottom: 1px solid rgba(255,255,255,0.3);
-        }
-        
-        .navbar { 
-            display: flex; 
-            justify-content: space-between; 
-            align-items: center; 
-            max-width: 1200px; 
-            margin: 0 auto; 
-        }
-        
-        .navbar a {
-            text-decoration: none;
-            color: var(--dark);
-            font-weight: 500;
-            padding: 8px 15px;
-            border-radius: 8px;
-            transition: all 0.3s;
-        }
-        
-        .navbar a:first-child {
-            font-size: 24px;
-            font-weight: bold;
-            background: linear-gradient(135deg, var(--primary) 0%, var(--primary-dark) 100%);
-            -webkit-background-clip: text;
-            -webkit-text-fill-color: transparent;
-        }
-        
-        .navbar a:hover {
-            color: var(--primary);
-            background: rgba(67, 97, 238, 0.1);
-        }
-        
-        .content-container {
-            max-width: 600px;
-            margin: 50px auto;
-            padding: 0 20px;
-        }
-        
-        .error-icon { 
-            font-size: 80px; 
-            color: var(--error);
-            margin: 20px 0;
-            animation: pulse 1.5s infinite;
-        }
-        
-        @keyframes pulse {
-            0% { transform: scale(1); }
-            50% { transform: scale(1.1); }
-            100% { transform: scale(1); }
-        }
-        
-        h1 {
-            color: var(--dark);
-            margin-bottom: 15px;
-        }
-        
-        p {
-            color: #555;
-            font-size: 18px;
-            margin-bottom: 30px;
-        }
-        
-        .btn {
-            display: inline-block;
-            padding: 12px 30px;
-            background: linear-gradient(135deg, var(--primary) 0%, var(--primary-dark) 100%);
-            color: white;
-            text-decoration: none;
-            border-radius: 8px;
-            font-weight: 500;
-            transition: all 0.3s;
-            box-shadow: 0 4px 15px rgba(67, 97, 238, 0.3);
-        }
-        
-        .btn:hover {
-            transform: translateY(-2px);
-            box-shadow: 0 6px 20px rgba(67, 97, 238, 0.4);
-        }
-        
-        .mobile-nav { display: none; }
-        
-        @media (max-width: 768px) {
-            .desktop-nav { display: none; }
-            .mobile-nav { 
-                display: flex; 
-                position: fixed; 
-                bottom: 0; 
-                left: 0; 
-                right: 0; 
-                background: rgba(255,255,255,0.95); 
-                box-shadow: 0 -5px 20px rgba(0,0,0,0.1);
-                justify-content: space-around;
-                padding: 15px 0;
-                z-index: 1000;
-                border-top-left-radius: 20px;
-                border-top-right-radius: 20px;
-                backdrop-filter: blur(10px);
-            }
-            
-            .mobile-nav a {
-                display: flex;
-                flex-direction: column;
-                align-items: center;
-                text-decoration: none;
-                color: #555;
-                font-size: 12px;
-                padding: 5px 15px;
-                border-radius: 15px;
-                transition: all 0.3s;
-            }
-            
-            .mobile-nav a:hover {
-                color: var(--primary);
-                background: rgba(67, 97, 238, 0.1);
-                transform: translateY(-5px);
-            }
-            
-            .mobile-nav i {
-                font-size: 20px;
-                margin-bottom: 5px;
-                transition: all 0.3s;
-            }
-            
-            .mobile-nav a:hover i {
-                transform: scale(1.2);
-            }
-            
-            body { padding-bottom: 80px; }
-            
-            .content-container {
-                margin: 30px auto;
-            }
-            
-            .error-icon {
-                font-size: 60px;
-            }
-        }
-                </style>
-                <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0/css/all.min.css">
-            </head>
-            <body>
+        error = None
+        if isinstance(e, OutOfStock):
+            error = f"Sorry, some items are no longer available in that quantity ({e}). Please update your cart."
+        return render_page('order_error', '''
+            {% extends "store_layout.html" %}
+            {% block title %}Order Failed{% endblock %}
+            {% block page_styles %}<link rel="stylesheet" href="{{ asset_url('css/pages/order_error.css') }}">{% endblock %}
+            {% block body %}
                 <div class="header">
                     <div class="navbar desktop-nav">
                         <a href="/">CRONYZO</a>
                         <div>
-                            
-                            <a href="{{ url_for('cart') }}">Cart (<span class="cart-count">{{ session.get('cart', {})|length }}</span>)</a>
+
+                            <a href="{{ url_for('cart') }}">Cart (<span class="cart-count">{{ cart_count }}</span>)</a>
                             {% if 'user_id' in session %}
                                 <a href="{{ url_for('my_orders') }}">Orders</a>
                                 <a href="{{ url_for('account') }}">Account</a>
@@ -3844,23 +3578,23 @@ def place_order():
                         </div>
                     </div>
                 </div>
-                
+
                 <div class="error-icon">⚠️</div>
                 <h1>Order Failed</h1>
-                <p>An error occurred while processing your order. Please try again.</p>
+                <p>{{ error or 'An error occurred while processing your order. Please try again.' }}</p>
                 <a href="{{ url_for('cart') }}" class="btn">Back to Cart</a>
-                
+
                 <div class="mobile-nav">
                     <a href="{{ url_for('index') }}">
                         <i class="fas fa-home"></i>
                         <span>Home</span>
                     </a>
-                    
+
                     <a href="{{ url_for('cart') }}">
                         <i class="fas fa-shopping-cart"></i>
                         <span>Cart</span>
-                        {% if session.get('cart') %}
-                        <span class="cart-count">{{ session['cart']|length }}</span>
+                        {% if cart_count %}
+                        <span class="cart-count">{{ cart_count }}</span>
                         {% endif %}
                     </a>
                     <a href="{{ url_for('my_orders') }}">
@@ -3872,12 +3606,8 @@ def place_order():
                         <span>Account</span>
                     </a>
                 </div>
-            </body>
-            </html>
-        ''')
-    finally:
-        if 'conn' in locals():
-            conn.close()
+            {% endblock %}
+        ''', error=error)
 
 @app.route('/my_orders')
 def my_orders():
@@ -3906,261 +3636,17 @@ def my_orders():
         print(f"Error fetching orders: {e}")
         orders = []
     
-    return render_template_string('''
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <title>My Orders</title>
-            <meta name="viewport" content="width=device-width, initial-scale=1.0">
-            <style>
-                :root {
-            --primary: #4361ee;
-            --primary-dark: #3a0ca3;
-            --accent: #f72585;
-            --light: #f8f9fa;
-            --dark: #212529;
-            --success: #4cc9f0;
-            --warning: #ffba08;
-            --error: #dc3545;
-        }
-        
-        body { 
-            font-family: 'Segoe UI', Arial, sans-serif; 
-            margin: 0; 
-            padding: 0; 
-            background: linear-gradient(135deg, #f5f7fa 0%, #e9ecef 100%);
-            min-height: 100vh;
-        }
-        
-        .header { 
-            background: rgba(255,255,255,0.95); 
-            padding: 15px; 
-            box-shadow: 0 4px 30px rgba(0,0,0,0.1);
-            position: sticky; 
-            top: 0; 
-            z-index: 1000;
-            backdrop-filter: blur(10px);
-            border-bottom: 1px solid rgba(255,255,255,0.3);
-        }
-        
-        .navbar { 
-            display: flex; 
-            justify-content: space-between; 
-            align-items: center; 
-            max-width: 1200px; 
-            margin: 0 auto; 
-        }
-        
-        .navbar a {
-            text-decoration: none;
-            color: var(--dark);
-            font-weight: 500;
-            padding: 8px 15px;
-            border-radius: 8px;
-            transition: all 0.3s;
-        }
-        
-        .navbar a:first-child {
-            font-size: 24px;
-            font-weight: bold;
-            background: linear-gradient(135deg, var(--primary) 0%, var(--primary-dark) 100%);
-            -webkit-background-clip: text;
-            -webkit-text-fill-color: transparent;
-        }
-        
-        .navbar a:hover {
-            color: var(--primary);
-            background: rgba(67, 97, 238, 0.1);
-        }
-        
-        .content-container {
-            max-width: 800px;
-            margin: 30px auto;
-            padding: 0 20px;
-        }
-        
-        h1 {
-            color: var(--dark);
-            margin-bottom: 10px;
-        }
-        
-        .order-card { 
-            background: white; 
-            padding: 25px; 
-            margin-bottom: 25px; 
-            border-radius: 12px; 
-            box-shadow: 0 10px 20px rgba(0,0,0,0.08);
-            transition: all 0.3s cubic-bezier(0.25, 0.8, 0.25, 1);
-            position: relative;
-            transform: perspective(500px) translateZ(0);
-        }
-        
-        .order-card:hover {
-            transform: perspective(500px) translateZ(10px);
-            box-shadow: 0 15px 30px rgba(0,0,0,0.15);
-        }
-        
-        .order-header { 
-            display: flex; 
-            justify-content: space-between; 
-            margin-bottom: 20px; 
-            align-items: center;
-        }
-        
-        .order-header h3 {
-            margin: 0;
-            color: var(--dark);
-        }
-        
-        .status { 
-            padding: 6px 15px; 
-            border-radius: 20px; 
-            font-size: 14px; 
-            font-weight: 500;
-            box-shadow: 0 2px 5px rgba(0,0,0,0.1);
-        }
-        
-        .status-processing { 
-            background: linear-gradient(135deg, #fff3cd 0%, #ffe69c 100%); 
-            color: #856404; 
-        }
-        
-        .status-completed { 
-            background: linear-gradient(135deg, #d4edda 0%, #b8e0be 100%); 
-            color: #155724; 
-        }
-        
-        .status-shipped { 
-            background: linear-gradient(135deg, #cce5ff 0%, #a8d0ff 100%); 
-            color: #004085; 
-        }
-        
-        .status-cancelled { 
-            background: linear-gradient(135deg, #f8d7da 0%, #f5b5ba 100%); 
-            color: #721c24; 
-        }
-        
-        .btn { 
-            display: inline-block; 
-            padding: 12px 30px; 
-            background: linear-gradient(135deg, var(--primary) 0%, var(--primary-dark) 100%);
-            color: white; 
-            text-decoration: none; 
-            border-radius: 8px; 
-            font-weight: 500;
-            transition: all 0.3s;
-            border: none;
-            cursor: pointer;
-            box-shadow: 0 4px 15px rgba(67, 97, 238, 0.3);
-        }
-        
-        .btn:hover {
-            transform: translateY(-2px);
-            box-shadow: 0 6px 20px rgba(67, 97, 238, 0.4);
-        }
-        
-        .no-orders { 
-            text-align: center; 
-            padding: 60px 0; 
-            background: white;
-            border-radius: 12px;
-            box-shadow: 0 10px 20px rgba(0,0,0,0.08);
-            margin-bottom: 30px;
-        }
-        
-        .no-orders h2 {
-            color: var(--dark);
-            margin-bottom: 15px;
-        }
-        
-        .no-orders p {
-            color: #666;
-            margin-bottom: 25px;
-        }
-        
-        .order-actions { 
-            margin-top: 20px; 
-            display: flex; 
-            gap: 15px; 
-        }
-        
-        .btn-cancel { 
-            background: linear-gradient(135deg, var(--error) 0%, #c82333 100%);
-            box-shadow: 0 4px 15px rgba(220, 53, 69, 0.3);
-        }
-        
-        .btn-cancel:hover {
-            box-shadow: 0 6px 20px rgba(220, 53, 69, 0.4);
-        }
-        
-        .mobile-nav { display: none; }
-        
-        @media (max-width: 768px) {
-            .desktop-nav { display: none; }
-            .mobile-nav { 
-                display: flex; 
-                position: fixed; 
-                bottom: 0; 
-                left: 0; 
-                right: 0; 
-                background: rgba(255,255,255,0.95); 
-                box-shadow: 0 -5px 20px rgba(0,0,0,0.1);
-                justify-content: space-around;
-                padding: 15px 0;
-                z-index: 1000;
-                border-top-left-radius: 20px;
-                border-top-right-radius: 20px;
-                backdrop-filter: blur(10px);
-            }
-            
-            .mobile-nav a {
-                display: flex;
-                flex-direction: column;
-                align-items: center;
-                text-decoration: none;
-                color: #555;
-                font-size: 12px;
-                padding: 5px 15px;
-                border-radius: 15px;
-                transition: all 0.3s;
-            }
-            
-            .mobile-nav a:hover {
-                color: var(--primary);
-                background: rgba(67, 97, 238, 0.1);
-                transform: translateY(-5px);
-            }
-            
-            .mobile-nav i {
-                font-size: 20px;
-                margin-bottom: 5px;
-                transition: all 0.3s;
-            }
-            
-            .mobile-nav a:hover i {
-                transform: scale(1.2);
-            }
-            
-            body { padding-bottom: 80px; }
-            
-            .content-container {
-                padding: 0 15px;
-            }
-            
-            .order-card {
-                padding: 20px;
-            }
-        }
-            </style>
-            <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0/css/all.min.css">
-        </head>
-        <body>
+    return render_page('my_orders', '''
+        {% extends "store_layout.html" %}
+        {% block title %}My Orders{% endblock %}
+        {% block page_styles %}<link rel="stylesheet" href="{{ asset_url('css/pages/my_orders.css') }}">{% endblock %}
+        {% block body %}
             <div class="header">
                 <div class="navbar desktop-nav">
                     <a href="/">CRONYZO</a>
                     <div>
-                        
-                        <a href="{{ url_for('cart') }}">Cart (<span class="cart-count">{{ session.get('cart', {})|length }}</span>)</a>
+
+                        <a href="{{ url_for('cart') }}">Cart (<span class="cart-count">{{ cart_count }}</span>)</a>
                         {% if 'user_id' in session %}
                             <a href="{{ url_for('my_orders') }}">Orders</a>
                             <a href="{{ url_for('account') }}">Account</a>
@@ -4171,10 +3657,10 @@ def my_orders():
                     </div>
                 </div>
             </div>
-            
+
             <h1>My Orders</h1>
             <p>Logged in as: {{ session['user_phone'] }}</p>
-            
+
             {% if not orders %}
                 <div class="no-orders">
                     <h2>No orders found</h2>
@@ -4190,16 +3676,16 @@ def my_orders():
                             {{ order.status }}
                         </span>
                     </div>
-                    
+
                     <div style="margin-bottom: 15px;">
                         <p><strong>Date:</strong> {{ order.date }}</p>
                         <p><strong>Total:</strong> ₹{{ "{:,.2f}".format(order.total) }}</p>
                     </div>
-                    
+
                     <div>
                         <p><strong>Items:</strong> {{ order.items }}</p>
                     </div>
-                    
+
                     {% if order.can_cancel %}
                     <div class="order-actions">
                         <form method="post" action="{{ url_for('cancel_order', order_id=order.id) }}">
@@ -4211,20 +3697,20 @@ def my_orders():
                 </div>
                 {% endfor %}
             {% endif %}
-            
+
             <a href="{{ url_for('index') }}" class="btn">Continue Shopping</a>
-            
+
             <div class="mobile-nav">
                 <a href="{{ url_for('index') }}">
                     <i class="fas fa-home"></i>
                     <span>Home</span>
                 </a>
-                
+
                 <a href="{{ url_for('cart') }}">
                     <i class="fas fa-shopping-cart"></i>
                     <span>Cart</span>
-                    {% if session.get('cart') %}
-                    <span class="cart-count">{{ session['cart']|length }}</span>
+                    {% if cart_count %}
+                    <span class="cart-count">{{ cart_count }}</span>
                     {% endif %}
                 </a>
                 <a href="{{ url_for('my_orders') }}">
@@ -4236,8 +3722,7 @@ def my_orders():
                     <span>Account</span>
                 </a>
             </div>
-        </body>
-        </html>
+        {% endblock %}
     ''', orders=orders)
 
 @app.route('/cancel_order/<int:order_id>', methods=['POST'])
@@ -4256,9 +3741,10 @@ def cancel_order(order_id):
                 
             if not can_cancel_order(order['order_date']):
                 return "Cancellation period has expired", 400
-                
-            c.execute("UPDATE orders SET status = 'Cancelled', can_cancel = 0 WHERE id = ?", (order_id,))
-            conn.commit()
+            
+            with transaction(conn):
+                c.execute("UPDATE orders SET status = 'Cancelled', can_cancel = 0 WHERE id = ?", (order_id,))
+                release_stock(c, [order_id])
             
             return redirect(url_for('my_orders'))
     except Exception as e:
@@ -4272,252 +3758,17 @@ def account():
     
     user_profile = get_user_profile(session['user_id'])
     
-    return render_template_string('''
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <title>My Account</title>
-            <meta name="viewport" content="width=device-width, initial-scale=1.0">
-            <style>
-                :root {
-            --primary: #4361ee;
-            --primary-dark: #3a0ca3;
-            --accent: #f72585;
-            --light: #f8f9fa;
-            --dark: #212529;
-            --success: #4cc9f0;
-            --warning: #ffba08;
-            --error: #dc3545;
-        }
-        
-        body { 
-            font-family: 'Segoe UI', Arial, sans-serif; 
-            margin: 0; 
-            padding: 0; 
-            background: linear-gradient(135deg, #f5f7fa 0%, #e9ecef 100%);
-            min-height: 100vh;
-        }
-        
-        .header { 
-            background: rgba(255,255,255,0.95); 
-            padding: 15px; 
-            box-shadow: 0 4px 30px rgba(0,0,0,0.1);
-            position: sticky; 
-            top: 0; 
-            z-index: 1000;
-            backdrop-filter: blur(10px);
-            border-bottom: 1px solid rgba(255,255,255,0.3);
-        }
-        
-        .navbar { 
-            display: flex; 
-            justify-content: space-between; 
-            align-items: center; 
-            max-width: 1200px; 
-            margin: 0 auto; 
-        }
-        
-        .navbar a {
-            text-decoration: none;
-            color: var(--dark);
-            font-weight: 500;
-            padding: 8px 15px;
-            border-radius: 8px;
-            transition: all 0.3s;
-        }
-        
-        .navbar a:first-child {
-            font-size: 24px;
-            font-weight: bold;
-            background: linear-gradient(135deg, var(--primary) 0%, var(--primary-dark) 100%);
-            -webkit-background-clip: text;
-            -webkit-text-fill-color: transparent;
-        }
-        
-        .navbar a:hover {
-            color: var(--primary);
-            background: rgba(67, 97, 238, 0.1);
-        }
-        
-        .content-container {
-            max-width: 800px;
-            margin: 30px auto;
-            padding: 0 20px;
-        }
-        
-        .account-container { 
-            background: white; 
-            padding: 30px; 
-            border-radius: 12px; 
-            box-shadow: 0 10px 20px rgba(0,0,0,0.08);
-            transition: all 0.3s cubic-bezier(0.25, 0.8, 0.25, 1);
-        }
-        
-        .profile-header { 
-            display: flex; 
-            justify-content: space-between; 
-            align-items: center; 
-            margin-bottom: 25px; 
-            border-bottom: 1px solid rgba(0,0,0,0.05);
-            padding-bottom: 20px;
-        }
-        
-        .profile-header h1 {
-            color: var(--dark);
-            margin: 0;
-        }
-        
-        .btn { 
-            display: inline-block; 
-            padding: 12px 25px; 
-            background: linear-gradient(135deg, var(--primary) 0%, var(--primary-dark) 100%);
-            color: white; 
-            text-decoration: none; 
-            border-radius: 8px; 
-            font-weight: 500;
-            transition: all 0.3s;
-            border: none;
-            cursor: pointer;
-            box-shadow: 0 4px 15px rgba(67, 97, 238, 0.3);
-        }
-        
-        .btn:hover {
-            transform: translateY(-2px);
-            box-shadow: 0 6px 20px rgba(67, 97, 238, 0.4);
-        }
-        
-        .profile-info { 
-            margin-bottom: 30px; 
-        }
-        
-        .profile-info h3 {
-            color: var(--dark);
-            margin-bottom: 20px;
-            padding-bottom: 10px;
-            border-bottom: 1px solid rgba(0,0,0,0.05);
-        }
-        
-        .info-row { 
-            display: flex; 
-            margin-bottom: 15px; 
-            padding: 10px 0;
-            border-bottom: 1px solid rgba(0,0,0,0.03);
-        }
-        
-        .info-label { 
-            font-weight: 600; 
-            width: 150px; 
-            color: #555;
-        }
-        
-        .btn-danger { 
-            background: linear-gradient(135deg, var(--error) 0%, #c82333 100%);
-            box-shadow: 0 4px 15px rgba(220, 53, 69, 0.3);
-        }
-        
-        .btn-danger:hover {
-            box-shadow: 0 6px 20px rgba(220, 53, 69, 0.4);
-        }
-        
-        .account-actions {
-            margin-top: 30px;
-        }
-        
-        .account-actions h3 {
-            color: var(--dark);
-            margin-bottom: 20px;
-            padding-bottom: 10px;
-            border-bottom: 1px solid rgba(0,0,0,0.05);
-        }
-        
-        .action-buttons {
-            display: flex; 
-            gap: 15px; 
-            margin-top: 20px;
-        }
-        
-        .mobile-nav { display: none; }
-        
-        @media (max-width: 768px) {
-            .desktop-nav { display: none; }
-            .mobile-nav { 
-                display: flex; 
-                position: fixed; 
-                bottom: 0; 
-                left: 0; 
-                right: 0; 
-                background: rgba(255,255,255,0.95); 
-                box-shadow: 0 -5px 20px rgba(0,0,0,0.1);
-                justify-content: space-around;
-                padding: 15px 0;
-                z-index: 1000;
-                border-top-left-radius: 20px;
-                border-top-right-radius: 20px;
-                backdrop-filter: blur(10px);
-            }
-            
-            .mobile-nav a {
-                display: flex;
-                flex-direction: column;
-                align-items: center;
-                text-decoration: none;
-                color: #555;
-                font-size: 12px;
-                padding: 5px 15px;
-                border-radius: 15px;
-                transition: all 0.3s;
-            }
-            
-            .mobile-nav a:hover {
-                color: var(--primary);
-                background: rgba(67, 97, 238, 0.1);
-                transform: translateY(-5px);
-            }
-            
-            .mobile-nav i {
-                font-size: 20px;
-                margin-bottom: 5px;
-                transition: all 0.3s;
-            }
-            
-            .mobile-nav a:hover i {
-                transform: scale(1.2);
-            }
-            
-            body { padding-bottom: 80px; }
-            
-            .content-container {
-                padding: 0 15px;
-            }
-            
-            .account-container {
-                padding: 20px;
-            }
-            
-            .info-row {
-                flex-direction: column;
-                gap: 5px;
-            }
-            
-            .info-label {
-                width: 100%;
-            }
-            
-            .action-buttons {
-                flex-direction: column;
-                gap: 10px;
-            }
-        }
-            </style>
-            <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0/css/all.min.css">
-        </head>
-        <body>
+    return render_page('account', '''
+        {% extends "store_layout.html" %}
+        {% block title %}My Account{% endblock %}
+        {% block page_styles %}<link rel="stylesheet" href="{{ asset_url('css/pages/account.css') }}">{% endblock %}
+        {% block body %}
             <div class="header">
                 <div class="navbar desktop-nav">
                     <a href="/">CRONYZO</a>
                     <div>
-                        
-                        <a href="{{ url_for('cart') }}">Cart (<span class="cart-count">{{ session.get('cart', {})|length }}</span>)</a>
+
+                        <a href="{{ url_for('cart') }}">Cart (<span class="cart-count">{{ cart_count }}</span>)</a>
                         {% if 'user_id' in session %}
                             <a href="{{ url_for('my_orders') }}">Orders</a>
                             <a href="{{ url_for('account') }}">Account</a>
@@ -4528,13 +3779,13 @@ def account():
                     </div>
                 </div>
             </div>
-            
+
             <div class="account-container">
                 <div class="profile-header">
                     <h1>My Account</h1>
                     <a href="{{ url_for('edit_profile') }}" class="btn">Edit Profile</a>
                 </div>
-                
+
                 <div class="profile-info">
                     <h3>Profile Information</h3>
                     <div class="info-row">
@@ -4560,7 +3811,7 @@ def account():
                         </span>
                     </div>
                 </div>
-                
+
                 <div>
                     <h3>Account Actions</h3>
                     <div style="display: flex; gap: 10px; margin-top: 20px;">
@@ -4571,18 +3822,18 @@ def account():
                     </div>
                 </div>
             </div>
-            
+
             <div class="mobile-nav">
                 <a href="{{ url_for('index') }}">
                     <i class="fas fa-home"></i>
                     <span>Home</span>
                 </a>
-                
+
                 <a href="{{ url_for('cart') }}">
                     <i class="fas fa-shopping-cart"></i>
                     <span>Cart</span>
-                    {% if session.get('cart') %}
-                    <span class="cart-count">{{ session['cart']|length }}</span>
+                    {% if cart_count %}
+                    <span class="cart-count">{{ cart_count }}</span>
                     {% endif %}
                 </a>
                 <a href="{{ url_for('my_orders') }}">
@@ -4594,8 +3845,7 @@ def account():
                     <span>Account</span>
                 </a>
             </div>
-        </body>
-        </html>
+        {% endblock %}
     ''', user_profile=user_profile)
 
 @app.route('/edit_profile', methods=['GET', 'POST'])
@@ -4623,234 +3873,20 @@ def edit_profile():
                 
                 return redirect(url_for('account'))
         except Exception as e:
-            print(f"Error updating profile: {e}")
-            return "An error occurred", 500
-    
-    return render_template_string('''
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <title>Edit Profile</title>
-            <meta name="viewport" content="width=device-width, initial-scale=1.0">
-            <style>
-                :root {
-            --primary: #4361ee;
-            --primary-dark: #3a0ca3;
-            --accent: #f72585;
-            --light: #f8f9fa;
-            --dark: #212529;
-            --success: #4cc9f0;
-            --warning: #ffba08;
-            --error: #dc3545;
-            --secondary: #6c757d;
-        }
-        
-        body { 
-            font-family: 'Segoe UI', Arial, sans-serif; 
-            margin: 0; 
-            padding: 0; 
-            background: linear-gradient(135deg, #f5f7fa 0%, #e9ecef 100%);
-            min-height: 100vh;
-        }
-        
-        .header { 
-            background: rgba(255,255,255,0.95); 
-            padding: 15px; 
-            box-shadow: 0 4px 30px rgba(0,0,0,0.1);
-            position: sticky; 
-            top: 0; 
-            z-index: 1000;
-            backdrop-filter: blur(10px);
-            border-bottom: 1px solid rgba(255,255,255,0.3);
-        }
-        
-        .navbar { 
-            display: flex; 
-            justify-content: space-between; 
-            align-items: center; 
-            max-width: 1200px; 
-            margin: 0 auto; 
-        }
-        
-        .navbar a {
-            text-decoration: none;
-            color: var(--dark);
-            font-weight: 500;
-            padding: 8px 15px;
-            border-radius: 8px;
-            transition: all 0.3s;
-        }
-        
-        .navbar a:first-child {
-            font-size: 24px;
-            font-weight: bold;
-            background: linear-gradient(135deg, var(--primary) 0%, var(--primary-dark) 100%);
-            -webkit-background-clip: text;
-            -webkit-text-fill-color: transparent;
-        }
-        
-        .navbar a:hover {
-            color: var(--primary);
-            background: rgba(67, 97, 238, 0.1);
-        }
-        
-        .content-container {
-            max-width: 800px;
-            margin: 30px auto;
-            padding: 0 20px;
-        }
-        
-        .edit-form { 
-            background: white; 
-            padding: 30px; 
-            border-radius: 12px; 
-            box-shadow: 0 10px 20px rgba(0,0,0,0.08);
-            transition: all 0.3s cubic-bezier(0.25, 0.8, 0.25, 1);
-        }
-        
-        .edit-form h1 {
-            color: var(--dark);
-            margin-bottom: 25px;
-            padding-bottom: 15px;
-            border-bottom: 1px solid rgba(0,0,0,0.05);
-        }
-        
-        .form-group { 
-            margin-bottom: 20px; 
-        }
-        
-        .form-group label { 
-            display: block; 
-            margin-bottom: 8px; 
-            font-weight: 600; 
-            color: #555;
-        }
-        
-        .form-group input, 
-        .form-group select { 
-            width: 100%; 
-            padding: 12px 15px; 
-            border: 1px solid #e0e0e0; 
-            border-radius: 8px; 
-            font-size: 16px;
-            transition: all 0.3s;
-            box-shadow: 0 2px 10px rgba(0,0,0,0.05);
-        }
-        
-        .form-group input:focus, 
-        .form-group select:focus {
-            outline: none;
-            border-color: var(--primary);
-            box-shadow: 0 0 0 3px rgba(67, 97, 238, 0.2);
-        }
-        
-        .btn { 
-            display: inline-block; 
-            padding: 12px 25px; 
-            background: linear-gradient(135deg, var(--primary) 0%, var(--primary-dark) 100%);
-            color: white; 
-            text-decoration: none; 
-            border: none;
-            border-radius: 8px; 
-            font-weight: 500;
-            cursor: pointer;
-            transition: all 0.3s;
-            box-shadow: 0 4px 15px rgba(67, 97, 238, 0.3);
-        }
-        
-        .btn:hover {
-            transform: translateY(-2px);
-            box-shadow: 0 6px 20px rgba(67, 97, 238, 0.4);
-        }
-        
-        .btn-secondary { 
-            background: linear-gradient(135deg, var(--secondary) 0%, #5a6268 100%);
-            box-shadow: 0 4px 15px rgba(108, 117, 125, 0.3);
-        }
-        
-        .btn-secondary:hover {
-            box-shadow: 0 6px 20px rgba(108, 117, 125, 0.4);
-        }
-        
-        .form-actions { 
-            margin-top: 30px; 
-            display: flex; 
-            gap: 15px; 
-        }
-        
-        .mobile-nav { display: none; }
-        
-        @media (max-width: 768px) {
-            .desktop-nav { display: none; }
-            .mobile-nav { 
-                display: flex; 
-                position: fixed; 
-                bottom: 0; 
-                left: 0; 
-                right: 0; 
-                background: rgba(255,255,255,0.95); 
-                box-shadow: 0 -5px 20px rgba(0,0,0,0.1);
-                justify-content: space-around;
-                padding: 15px 0;
-                z-index: 1000;
-                border-top-left-radius: 20px;
-                border-top-right-radius: 20px;
-                backdrop-filter: blur(10px);
-            }
-            
-            .mobile-nav a {
-                display: flex;
-                flex-direction: column;
-                align-items: center;
-                text-decoration: none;
-                color: #555;
-                font-size: 12px;
-                padding: 5px 15px;
-                border-radius: 15px;
-                transition: all 0.3s;
-            }
-            
-            .mobile-nav a:hover {
-                color: var(--primary);
-                background: rgba(67, 97, 238, 0.1);
-                transform: translateY(-5px);
-            }
-            
-            .mobile-nav i {
-                font-size: 20px;
-                margin-bottom: 5px;
-                transition: all 0.3s;
-            }
-            
-            .mobile-nav a:hover i {
-                transform: scale(1.2);
-            }
-            
-            body { padding-bottom: 80px; }
-            
-            .content-container {
-                padding: 0 15px;
-            }
-            
-            .edit-form {
-                padding: 20px;
-            }
-            
-            .form-actions {
-                flex-direction: column;
-                gap: 10px;
-            }
-        }
-            </style>
-            <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0/css/all.min.css">
-        </head>
-        <body>
+            print(f"Error updating profile: {e}")
+            return "An error occurred", 500
+    
+    return render_page('edit_profile', '''
+        {% extends "store_layout.html" %}
+        {% block title %}Edit Profile{% endblock %}
+        {% block page_styles %}<link rel="stylesheet" href="{{ asset_url('css/pages/edit_profile.css') }}">{% endblock %}
+        {% block body %}
             <div class="header">
                 <div class="navbar desktop-nav">
                     <a href="/">CRONYZO</a>
                     <div>
-                        
-                        <a href="{{ url_for('cart') }}">Cart (<span class="cart-count">{{ session.get('cart', {})|length }}</span>)</a>
+
+                        <a href="{{ url_for('cart') }}">Cart (<span class="cart-count">{{ cart_count }}</span>)</a>
                         {% if 'user_id' in session %}
                             <a href="{{ url_for('my_orders') }}">Orders</a>
                             <a href="{{ url_for('account') }}">Account</a>
@@ -4861,28 +3897,28 @@ def edit_profile():
                     </div>
                 </div>
             </div>
-            
+
             <div class="edit-form">
                 <h1>Edit Profile</h1>
-                
+
                 <form method="post">
                     <input type="hidden" name="csrf_token" value="{{ csrf_token() }}">
-                    
+
                     <div class="form-group">
                         <label for="name">Full Name</label>
                         <input type="text" id="name" name="name" value="{{ user_profile['name'] if user_profile and user_profile['name'] else '' }}">
                     </div>
-                    
+
                     <div class="form-group">
                         <label for="email">Email</label>
                         <input type="email" id="email" name="email" value="{{ user_profile['email'] if user_profile and user_profile['email'] else '' }}">
                     </div>
-                    
+
                     <div class="form-group">
                         <label for="address">Address</label>
                         <input type="text" id="address" name="address" value="{{ user_profile['address'] if user_profile and user_profile['address'] else '' }}">
                     </div>
-                    
+
                     <div class="form-group">
                         <label for="state">State</label>
                         <select id="state" name="state" onchange="updateCities()">
@@ -4892,7 +3928,7 @@ def edit_profile():
                             {% endfor %}
                         </select>
                     </div>
-                    
+
                     <div class="form-group">
                         <label for="city">City</label>
                         <select id="city" name="city">
@@ -4904,25 +3940,25 @@ def edit_profile():
                             {% endif %}
                         </select>
                     </div>
-                    
+
                     <div style="margin-top: 20px; display: flex; gap: 10px;">
                         <button type="submit" class="btn">Save Changes</button>
                         <a href="{{ url_for('account') }}" class="btn btn-secondary">Cancel</a>
                     </div>
                 </form>
             </div>
-            
+
             <div class="mobile-nav">
                 <a href="{{ url_for('index') }}">
                     <i class="fas fa-home"></i>
                     <span>Home</span>
                 </a>
-                
+
                 <a href="{{ url_for('cart') }}">
                     <i class="fas fa-shopping-cart"></i>
                     <span>Cart</span>
-                    {% if session.get('cart') %}
-                    <span class="cart-count">{{ session['cart']|length }}</span>
+                    {% if cart_count %}
+                    <span class="cart-count">{{ cart_count }}</span>
                     {% endif %}
                 </a>
                 <a href="{{ url_for('my_orders') }}">
@@ -4934,29 +3970,10 @@ def edit_profile():
                     <span>Account</span>
                 </a>
             </div>
-            
-            <script>
-                const deliveryCharges = {{ delivery_charges|tojson }};
-                
-                function updateCities() {
-                    const state = document.getElementById('state').value;
-                    const citySelect = document.getElementById('city');
-                    
-                    citySelect.innerHTML = '<option value="">Select City</option>';
-                    
-                    if (state && deliveryCharges[state]) {
-                        for (const city in deliveryCharges[state]) {
-                            const option = document.createElement('option');
-                            option.value = city;
-                            option.textContent = city;
-                            citySelect.appendChild(option);
-                        }
-                    }
-                }
-            </script>
-        </body>
-        </html>
-    ''', user_profile=user_profile, delivery_charges=DELIVERY_CHARGES)
+
+            <script type="application/json" id="delivery-charges">{{ delivery_charges|tojson }}</script>
+        {% endblock %}
+    ''', user_profile=user_profile, delivery_charges=get_delivery_charges())
 
 @app.route('/delete_account', methods=['POST'])
 def delete_account():
@@ -4966,8 +3983,11 @@ def delete_account():
     try:
         with get_db() as conn:
             c = conn.cursor()
-            # Delete user's orders first to maintain foreign key constraint
+            # Delete user's orders and cart first to maintain foreign key constraints
+            c.execute("DELETE FROM order_items WHERE order_id IN (SELECT id FROM orders WHERE user_id = ?)",
+                      (session['user_id'],))
             c.execute("DELETE FROM orders WHERE user_id = ?", (session['user_id'],))
+            cart_store.delete_user_cart(c, session['user_id'])
             # Then delete the user
             c.execute("DELETE FROM users WHERE id = ?", (session['user_id'],))
             conn.commit()
@@ -4991,9 +4011,13 @@ def upload_file():
     if file.filename == '':
         return {'error': 'No selected file'}, 400
     if file and allowed_file(file.filename):
-        filename = secure_filename(file.filename)
-        filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        file.save(filepath)
+        filename, created = store_image(file, app.config['UPLOAD_FOLDER'])
+        with get_db() as conn:
+            c = conn.cursor()
+            with transaction(conn):
+                catalog_image(c, filename, folder='uploads')
+        if created:
+            image_variants.submit(f'uploads/{filename}')
         return {'filename': filename}, 200
     return {'error': 'Invalid file type'}, 400
 
@@ -5011,170 +4035,17 @@ def product_fullscreen(product_id):
     if not product:
         return "Product not found", 404
     
-    return render_template_string('''
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <title>{{ product[1] }} - Full Screen</title>
-            <meta name="viewport" content="width=device-width, initial-scale=1.0">
-            <style>
-                :root {
-            --primary: #4361ee;
-            --primary-dark: #3a0ca3;
-            --accent: #f72585;
-            --light: #f8f9fa;
-            --dark: #212529;
-        }
-        
-        body { 
-            margin: 0; 
-            padding: 0; 
-            background: rgba(0,0,0,0.95);
-            display: flex;
-            justify-content: center;
-            align-items: center;
-            height: 100vh;
-            overflow: hidden;
-            touch-action: none;
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, Oxygen, Ubuntu, Cantarell, sans-serif;
-        }
-        
-        .image-container {
-            position: relative;
-            width: 100%;
-            height: 100%;
-            display: flex;
-            justify-content: center;
-            align-items: center;
-            overflow: hidden;
-        }
-        
-        .fullscreen-image {
-            max-width: 100%;
-            max-height: 100%;
-            object-fit: contain;
-            transition: transform 0.3s ease;
-            transform-origin: center center;
-            cursor: grab;
-            user-select: none;
-            -webkit-user-drag: none;
-        }
-        
-        .fullscreen-image.grabbing {
-            cursor: grabbing;
-        }
-        
-        .control-bar {
-            position: fixed;
-            bottom: 20px;
-            left: 50%;
-            transform: translateX(-50%);
-            display: flex;
-            gap: 15px;
-            background: rgba(0,0,0,0.7);
-            padding: 12px 20px;
-            border-radius: 50px;
-            backdrop-filter: blur(10px);
-            z-index: 100;
-            box-shadow: 0 5px 15px rgba(0,0,0,0.3);
-        }
-        
-        .control-btn {
-            width: 40px;
-            height: 40px;
-            border-radius: 50%;
-            background: rgba(255,255,255,0.1);
-            color: white;
-            border: none;
-            display: flex;
-            justify-content: center;
-            align-items: center;
-            cursor: pointer;
-            transition: all 0.2s;
-        }
-        
-        .control-btn:hover {
-            background: var(--primary);
-            transform: scale(1.1);
-        }
-        
-        .control-btn:active {
-            transform: scale(0.95);
-        }
-        
-        .close-btn {
-            position: fixed;
-            top: 20px;
-            right: 20px;
-            width: 50px;
-            height: 50px;
-            background: rgba(255,255,255,0.1);
-            color: white;
-            border-radius: 50%;
-            display: flex;
-            justify-content: center;
-            align-items: center;
-            cursor: pointer;
-            z-index: 100;
-            backdrop-filter: blur(10px);
-            border: none;
-            transition: all 0.3s;
-        }
-        
-        .close-btn:hover {
-            background: var(--accent);
-            transform: rotate(90deg);
-        }
-        
-        .zoom-level {
-            position: fixed;
-            top: 20px;
-            left: 20px;
-            background: rgba(0,0,0,0.7);
-            color: white;
-            padding: 8px 15px;
-            border-radius: 20px;
-            font-size: 14px;
-            backdrop-filter: blur(10px);
-            z-index: 100;
-        }
-        
-        @media (max-width: 768px) {
-            .control-bar {
-                bottom: 10px;
-                padding: 10px 15px;
-                gap: 10px;
-            }
-            
-            .control-btn {
-                width: 36px;
-                height: 36px;
-                font-size: 14px;
-            }
-            
-            .close-btn {
-                width: 44px;
-                height: 44px;
-                top: 15px;
-                right: 15px;
-            }
-            
-            .zoom-level {
-                top: 15px;
-                left: 15px;
-                font-size: 12px;
-                padding: 6px 12px;
-            }
-        }
-            </style>
-        </head>
-        <body>
-            <img src="{{ url_for('static', filename='images/' + product[4]) }}" 
-                 class="fullscreen-image" 
+    return render_page('product_fullscreen', '''
+        {% extends "layout.html" %}
+        {% block title %}{{ product[1] }} - Full Screen{% endblock %}
+        {% block icons %}{% endblock %}
+        {% block styles %}<link rel="stylesheet" href="{{ asset_url('css/pages/product_fullscreen.css') }}">{% endblock %}
+        {% block body %}
+            <img src="{{ image_url('images/' + product[4], 'fullscreen') }}"
+                 class="fullscreen-image"
                  onclick="window.close()"
                  alt="{{ product[1] }}">
-        </body>
-        </html>
+        {% endblock %}
     ''', product=product)
 
 # Add this at the end of your app.py file, before the if __name__ == '__main__':
@@ -5198,6 +4069,61 @@ def admin_required(f):
             return redirect(url_for('admin_login', next=request.url))
         return f(*args, **kwargs)
     return decorated_function
+
+def encode_cursor(values):
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip('=')
+
+def decode_cursor(cursor, length):
+    """The ``length`` key values in ``cursor``, or None when it was not made
+    by encode_cursor for these keys (so the caller starts from page one)."""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except ValueError:
+        return None
+    if not isinstance(values, list) or len(values) != length:
+        return None
+    # Only scalars can be bound as SQL parameters
+    if not all(isinstance(value, (str, int, float)) and not isinstance(value, bool) for value in values):
+        return None
+    return values
+
+def keyset_page(c, query, params, keys, after=None, before=None, page_size=None):
+    """Fetch one page of ``query``, newest first by the ``keys`` columns.
+
+    ``keys`` must end in a unique column (e.g. ``['o.order_date', 'o.id']``)
+    and be selected by ``query`` under their bare names. ``query`` may end in
+    a WHERE clause. Returns ``(rows, next_cursor, prev_cursor)``; pass a
+    cursor back as ``after`` (older rows) or ``before`` (newer rows). Only
+    ``page_size + 1`` rows are read, however deep the page is.
+    """
+    page_size = page_size or Config.ADMIN_PAGE_SIZE
+    names = [key.split('.')[-1] for key in keys]
+    backwards = before is not None
+    position = decode_cursor(before if backwards else after, len(keys)) if (before or after) else None
+
+    sql = query
+    params = list(params)
+    if position is not None:
+        sql += " AND " if " WHERE " in query.upper() else " WHERE "
+        sql += f"({', '.join(keys)}) {'>' if backwards else '<'} ({', '.join('?' * len(keys))})"
+        params.extend(position)
+    order = 'ASC' if backwards else 'DESC'
+    sql += " ORDER BY " + ", ".join(f"{key} {order}" for key in keys) + " LIMIT ?"
+    c.execute(sql, params + [page_size + 1])
+
+    rows = c.fetchall()
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    if backwards:
+        rows.reverse()
+    if not rows:
+        return rows, None, None
+
+    first = encode_cursor([rows[0][name] for name in names])
+    last = encode_cursor([rows[-1][name] for name in names])
+    if backwards:
+        return rows, last, first if has_more else None
+    return rows, last if has_more else None, first if position is not None else None
 # Add these routes anywhere between existing routes
 @app.route('/hidden-admin', methods=['GET'])
 def hidden_admin():
@@ -5213,117 +4139,13 @@ def hidden_admin():
     if admin_click_count >= 5:
         admin_click_count = 0
         # Return the admin login page with CSRF token
-        return render_template_string('''
-            <!DOCTYPE html>
-            <html>
-            <head>
-                <title>Admin Login</title>
-                <style>:root {
-            --primary: #4361ee;
-            --primary-dark: #3a0ca3;
-            --accent: #f72585;
-            --light: #f8f9fa;
-            --dark: #212529;
-            --success: #4cc9f0;
-            --warning: #ffba08;
-        }
-        
-        body { 
-            font-family: 'Segoe UI', Arial, sans-serif; 
-            margin: 0;
-            padding: 0;
-            background: linear-gradient(135deg, #f5f7fa 0%, #e9ecef 100%);
-            min-height: 100vh;
-            display: flex;
-            align-items: center;
-            justify-content: center;
-        }
-        
-        .login-form { 
-            background: rgba(255,255,255,0.95); 
-            padding: 40px;
-            border-radius: 16px;
-            box-shadow: 0 15px 35px rgba(0,0,0,0.1);
-            width: 100%;
-            max-width: 450px;
-            backdrop-filter: blur(10px);
-            border: 1px solid rgba(255,255,255,0.3);
-            transform: perspective(500px) translateZ(0);
-            transition: all 0.3s cubic-bezier(0.25, 0.8, 0.25, 1);
-        }
-        
-        .login-form:hover {
-            transform: perspective(500px) translateZ(10px);
-            box-shadow: 0 20px 40px rgba(0,0,0,0.15);
-        }
-        
-        .login-form h2 {
-            color: var(--primary-dark);
-            text-align: center;
-            margin-bottom: 30px;
-            font-size: 28px;
-            background: linear-gradient(135deg, var(--primary) 0%, var(--primary-dark) 100%);
-            -webkit-background-clip: text;
-            -webkit-text-fill-color: transparent;
-        }
-        
-        .form-group { 
-            margin-bottom: 25px; 
-        }
-        
-        .form-group label {
-            display: block;
-            margin-bottom: 8px;
-            font-weight: 500;
-            color: var(--dark);
-        }
-        
-        .form-group input {
-            width: 100%;
-            padding: 14px 20px;
-            border: 1px solid #e0e0e0;
-            border-radius: 8px;
-            font-size: 16px;
-            background: rgba(255,255,255,0.8);
-            transition: all 0.3s;
-            box-sizing: border-box;
-        }
-        
-        .form-group input:focus {
-            outline: none;
-            border-color: var(--primary);
-            box-shadow: 0 0 0 3px rgba(67, 97, 238, 0.2);
-        }
-        
-        .btn {
-            background: linear-gradient(135deg, var(--primary) 0%, var(--primary-dark) 100%);
-            color: white;
-            border: none;
-            padding: 14px;
-            width: 100%;
-            border-radius: 8px;
-            font-size: 16px;
-            font-weight: 600;
-            cursor: pointer;
-            transition: all 0.3s;
-            box-shadow: 0 4px 15px rgba(67, 97, 238, 0.3);
-            margin-top: 10px;
-        }
-        
-        .btn:hover {
-            transform: translateY(-2px);
-            box-shadow: 0 6px 20px rgba(67, 97, 238, 0.4);
-        }
-        
-        @media (max-width: 768px) {
-            .login-form {
-                padding: 30px 20px;
-                margin: 20px;
-            }
-        }
-                                      </style>
-            </head>
-            <body>
+        return render_page('hidden_admin', '''
+            {% extends "layout.html" %}
+            {% block title %}Admin Login{% endblock %}
+            {% block meta %}{% endblock %}
+            {% block icons %}{% endblock %}
+            {% block styles %}<link rel="stylesheet" href="{{ asset_url('css/pages/hidden_admin.css') }}">{% endblock %}
+            {% block body %}
                 <div class="login-form">
                     <h2>Admin Login</h2>
                     <form method="post" action="/admin/verify">
@@ -5339,8 +4161,7 @@ def hidden_admin():
                         <button type="submit" class="btn">Login</button>
                     </form>
                 </div>
-            </body>
-            </html>
+            {% endblock %}
         ''')
     
     return jsonify({"status": f"Need {5-admin_click_count} more clicks"}), 200
@@ -5384,110 +4205,13 @@ def admin_login():
             )
             return resp
         
-        return render_template_string('''
-            <!DOCTYPE html>
-            <html>
-            <head>
-                <title>Admin Login - CRONYZO</title>
-                <style>
-                    :root {
-            --primary: #4361ee;
-            --primary-dark: #3a0ca3;
-            --accent: #f72585;
-            --light: #f8f9fa;
-            --dark: #212529;
-            --error: #dc3545;
-        }
-        
-        body {
-            font-family: 'Segoe UI', Arial, sans-serif;
-            background: linear-gradient(135deg, #f5f7fa 0%, #e9ecef 100%);
-            min-height: 100vh;
-            margin: 0;
-            padding: 20px;
-            display: flex;
-            align-items: center;
-            justify-content: center;
-        }
-        
-        .login-form {
-            background: white;
-            padding: 40px;
-            border-radius: 12px;
-            box-shadow: 0 15px 30px rgba(0,0,0,0.08);
-            width: 100%;
-            max-width: 400px;
-            transition: all 0.3s ease;
-        }
-        
-        .login-form:hover {
-            box-shadow: 0 20px 40px rgba(0,0,0,0.12);
-        }
-        
-        .login-form h2 {
-            text-align: center;
-            margin-bottom: 25px;
-            color: var(--primary-dark);
-            font-size: 28px;
-            background: linear-gradient(135deg, var(--primary) 0%, var(--primary-dark) 100%);
-            -webkit-background-clip: text;
-            -webkit-text-fill-color: transparent;
-        }
-        
-        .form-group {
-            margin-bottom: 20px;
-        }
-        
-        .form-group label {
-            display: block;
-            margin-bottom: 8px;
-            font-weight: 600;
-            color: var(--dark);
-        }
-        
-        .form-group input {
-            width: 100%;
-            padding: 12px 15px;
-            border: 1px solid #e0e0e0;
-            border-radius: 8px;
-            font-size: 16px;
-            transition: all 0.3s;
-        }
-        
-        .form-group input:focus {
-            outline: none;
-            border-color: var(--primary);
-            box-shadow: 0 0 0 3px rgba(67, 97, 238, 0.2);
-        }
-        
-        .btn {
-            width: 100%;
-            padding: 14px;
-            background: linear-gradient(135deg, var(--primary) 0%, var(--primary-dark) 100%);
-            color: white;
-            border: none;
-            border-radius: 8px;
-            cursor: pointer;
-            font-size: 16px;
-            font-weight: 600;
-            transition: all 0.3s;
-            box-shadow: 0 4px 15px rgba(67, 97, 238, 0.3);
-        }
-        
-        .btn:hover {
-            transform: translateY(-2px);
-            box-shadow: 0 6px 20px rgba(67, 97, 238, 0.4);
-        }
-        
-        .error {
-            color: var(--error);
-            margin-top: 15px;
-            text-align: center;
-            font-size: 14px;
-        }
-                </style>
-            </head>
-            <body>
+        return render_page('admin_login_failed', '''
+            {% extends "layout.html" %}
+            {% block title %}Admin Login - CRONYZO{% endblock %}
+            {% block meta %}{% endblock %}
+            {% block icons %}{% endblock %}
+            {% block styles %}<link rel="stylesheet" href="{{ asset_url('admin-login.css') }}"><link rel="stylesheet" href="{{ asset_url('css/pages/admin_login_failed.css') }}">{% endblock %}
+            {% block body %}
                 <div class="login-form">
                     <h2 style="text-align: center; margin-bottom: 25px;">Admin Login</h2>
                     <form method="post">
@@ -5504,9 +4228,7 @@ def admin_login():
                         <p class="error">Invalid credentials. Please try again.</p>
                     </form>
                 </div>
-                
-            </body>
-            </html>
+            {% endblock %}
         ''')
     
     # Hide admin login page from unauthorized access
@@ -5514,105 +4236,13 @@ def admin_login():
         
         abort(404)
     print("Admin Secret Token:", secrets.token_urlsafe(16))
-    return render_template_string('''
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <title>Admin Login - CRONYZO</title>
-            <style>
-                :root {
-            --primary: #4361ee;
-            --primary-dark: #3a0ca3;
-            --accent: #f72585;
-            --light: #f8f9fa;
-            --dark: #212529;
-        }
-        
-        body {
-            font-family: 'Segoe UI', Arial, sans-serif;
-            background: linear-gradient(135deg, #f5f7fa 0%, #e9ecef 100%);
-            min-height: 100vh;
-            margin: 0;
-            padding: 20px;
-            display: flex;
-            align-items: center;
-            justify-content: center;
-        }
-        
-        .login-form {
-            background: rgba(255,255,255,0.95);
-            padding: 40px;
-            border-radius: 16px;
-            box-shadow: 0 15px 35px rgba(0,0,0,0.1);
-            width: 100%;
-            max-width: 400px;
-            backdrop-filter: blur(10px);
-            border: 1px solid rgba(255,255,255,0.3);
-            transition: all 0.3s cubic-bezier(0.25, 0.8, 0.25, 1);
-        }
-        
-        .login-form:hover {
-            transform: perspective(500px) translateZ(10px);
-            box-shadow: 0 20px 40px rgba(0,0,0,0.15);
-        }
-        
-        .login-form h2 {
-            text-align: center;
-            margin-bottom: 25px;
-            font-size: 28px;
-            background: linear-gradient(135deg, var(--primary) 0%, var(--primary-dark) 100%);
-            -webkit-background-clip: text;
-            -webkit-text-fill-color: transparent;
-        }
-        
-        .form-group {
-            margin-bottom: 20px;
-        }
-        
-        .form-group label {
-            display: block;
-            margin-bottom: 8px;
-            font-weight: 600;
-            color: var(--dark);
-        }
-        
-        .form-group input {
-            width: 100%;
-            padding: 12px 15px;
-            border: 1px solid #e0e0e0;
-            border-radius: 8px;
-            font-size: 16px;
-            transition: all 0.3s;
-            background: rgba(255,255,255,0.8);
-        }
-        
-        .form-group input:focus {
-            outline: none;
-            border-color: var(--primary);
-            box-shadow: 0 0 0 3px rgba(67, 97, 238, 0.2);
-        }
-        
-        .btn {
-            width: 100%;
-            padding: 14px;
-            background: linear-gradient(135deg, var(--primary) 0%, var(--primary-dark) 100%);
-            color: white;
-            border: none;
-            border-radius: 8px;
-            cursor: pointer;
-            font-size: 16px;
-            font-weight: 600;
-            transition: all 0.3s;
-            box-shadow: 0 4px 15px rgba(67, 97, 238, 0.3);
-        }
-        
-        .btn:hover {
-            transform: translateY(-2px);
-            box-shadow: 0 6px 20px rgba(67, 97, 238, 0.4);
-        }
-            </style>
-        </head>
-        <body>
+    return render_page('admin_login', '''
+        {% extends "layout.html" %}
+        {% block title %}Admin Login - CRONYZO{% endblock %}
+        {% block meta %}{% endblock %}
+        {% block icons %}{% endblock %}
+        {% block styles %}<link rel="stylesheet" href="{{ asset_url('admin-login.css') }}"><link rel="stylesheet" href="{{ asset_url('css/pages/admin_login.css') }}">{% endblock %}
+        {% block body %}
             <div class="login-form">
                 <h2 style="text-align: center; margin-bottom: 25px;">Admin Login</h2>
                 <form method="post">
@@ -5628,8 +4258,7 @@ def admin_login():
                     <button type="submit" class="btn">Login</button>
                 </form>
             </div>
-        </body>
-        </html>
+        {% endblock %}
     ''')
 
 @app.route('/admin/logout')
@@ -5656,17 +4285,8 @@ def admin_dashboard():
             # Get stats for dashboard
             c = conn.cursor()
             
-            # Total products
-            c.execute("SELECT COUNT(*) FROM products")
-            total_products = c.fetchone()[0]
-            
-            # Total orders
-            c.execute("SELECT COUNT(*) FROM orders")
-            total_orders = c.fetchone()[0]
-            
-            # Total users
-            c.execute("SELECT COUNT(*) FROM users")
-            total_users = c.fetchone()[0]
+            # Precomputed counters (see DASHBOARD_STATS_TRIGGERS)
+            stats = read_dashboard_stats(c)
             
             # Recent orders
             c.execute("""
@@ -5684,363 +4304,16 @@ def admin_dashboard():
             
     except Exception as e:
         print(f"Error fetching dashboard data: {e}")
-        total_products = 0
-        total_orders = 0
-        total_users = 0
+        stats = {'total_products': 0, 'total_orders': 0, 'total_users': 0, 'revenue': 0,
+                 'orders_today': 0, 'orders_by_status': {}}
         recent_orders = []
         low_stock = []
     
-    return render_template_string('''
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <title>Admin Dashboard - CRONYZO</title>
-            <meta name="viewport" content="width=device-width, initial-scale=1.0">
-            <style>
-                :root {
-            --primary: #4361ee;
-            --primary-dark: #3a0ca3;
-            --accent: #f72585;
-            --light: #f8f9fa;
-            --dark: #212529;
-            --success: #28a745;
-            --danger: #dc3545;
-            --warning: #ffc107;
-            --info: #17a2b8;
-        }
-        
-        body {
-            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-            margin: 0;
-            padding: 0;
-            background: linear-gradient(135deg, #f5f7fa 0%, #e9ecef 100%);
-            color: var(--dark);
-        }
-        
-        .admin-header {
-            background: linear-gradient(135deg, var(--primary) 0%, var(--primary-dark) 100%);
-            color: white;
-            padding: 15px 30px;
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-            box-shadow: 0 4px 20px rgba(0,0,0,0.1);
-            position: sticky;
-            top: 0;
-            z-index: 1000;
-        }
-        
-        .admin-container {
-            display: flex;
-            min-height: calc(100vh - 65px);
-        }
-        
-        .admin-sidebar {
-            width: 280px;
-            background: rgba(255,255,255,0.95);
-            box-shadow: 2px 0 15px rgba(0,0,0,0.05);
-            padding: 25px 0;
-            backdrop-filter: blur(10px);
-            border-right: 1px solid rgba(255,255,255,0.3);
-            transition: all 0.3s ease;
-        }
-        
-        .sidebar-menu {
-            list-style: none;
-            padding: 0;
-            margin: 0;
-        }
-        
-        .sidebar-menu li a {
-            display: flex;
-            align-items: center;
-            padding: 14px 25px;
-            color: var(--dark);
-            text-decoration: none;
-            transition: all 0.3s cubic-bezier(0.25, 0.8, 0.25, 1);
-            font-weight: 500;
-            margin: 5px 15px;
-            border-radius: 8px;
-        }
-        
-        .sidebar-menu li a:hover {
-            background: rgba(67, 97, 238, 0.1);
-            color: var(--primary);
-            transform: translateX(5px);
-        }
-        
-        .sidebar-menu li a.active {
-            background: linear-gradient(135deg, var(--primary) 0%, var(--primary-dark) 100%);
-            color: white;
-            box-shadow: 0 4px 15px rgba(67, 97, 238, 0.3);
-        }
-        
-        .sidebar-menu li a i {
-            margin-right: 12px;
-            width: 20px;
-            text-align: center;
-            font-size: 18px;
-        }
-        
-        .admin-content {
-            flex: 1;
-            padding: 30px;
-        }
-        
-        .stats-container {
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(280px, 1fr));
-            gap: 25px;
-            margin-bottom: 35px;
-        }
-        
-        .stat-card {
-            background: rgba(255,255,255,0.95);
-            border-radius: 12px;
-            padding: 25px;
-            box-shadow: 0 10px 20px rgba(0,0,0,0.05);
-            transition: all 0.3s cubic-bezier(0.25, 0.8, 0.25, 1);
-            backdrop-filter: blur(10px);
-            border: 1px solid rgba(255,255,255,0.3);
-        }
-        
-        .stat-card:hover {
-            transform: translateY(-5px);
-            box-shadow: 0 15px 30px rgba(0,0,0,0.1);
-        }
-        
-        .stat-card h3 {
-            margin-top: 0;
-            color: #666;
-            font-size: 16px;
-            font-weight: 500;
-        }
-        
-        .stat-card p {
-            font-size: 32px;
-            margin: 15px 0 0;
-            font-weight: bold;
-            color: var(--primary);
-            background: linear-gradient(135deg, var(--primary) 0%, var(--primary-dark) 100%);
-            -webkit-background-clip: text;
-            -webkit-text-fill-color: transparent;
-        }
-        
-        .card {
-            background: rgba(255,255,255,0.95);
-            border-radius: 12px;
-            padding: 25px;
-            margin-bottom: 25px;
-            box-shadow: 0 10px 20px rgba(0,0,0,0.05);
-            backdrop-filter: blur(10px);
-            border: 1px solid rgba(255,255,255,0.3);
-        }
-        
-        .card-header {
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-            margin-bottom: 25px;
-            padding-bottom: 15px;
-            border-bottom: 1px solid rgba(0,0,0,0.05);
-        }
-        
-        .card-header h2 {
-            margin: 0;
-            font-size: 22px;
-            font-weight: 600;
-            color: var(--primary-dark);
-        }
-        
-        .btn {
-            display: inline-flex;
-            align-items: center;
-            justify-content: center;
-            padding: 10px 20px;
-            background: linear-gradient(135deg, var(--primary) 0%, var(--primary-dark) 100%);
-            color: white;
-            text-decoration: none;
-            border-radius: 8px;
-            font-size: 14px;
-            font-weight: 500;
-            transition: all 0.3s;
-            box-shadow: 0 4px 15px rgba(67, 97, 238, 0.3);
-            border: none;
-            cursor: pointer;
-        }
-        
-        .btn:hover {
-            transform: translateY(-2px);
-            box-shadow: 0 6px 20px rgba(67, 97, 238, 0.4);
-        }
-        
-        .btn-sm {
-            padding: 8px 15px;
-            font-size: 13px;
-        }
-        
-        .btn-danger {
-            background: linear-gradient(135deg, var(--danger) 0%, #c82333 100%);
-            box-shadow: 0 4px 15px rgba(220, 53, 69, 0.3);
-        }
-        
-        .btn-danger:hover {
-            box-shadow: 0 6px 20px rgba(220, 53, 69, 0.4);
-        }
-        
-        .btn-success {
-            background: linear-gradient(135deg, var(--success) 0%, #1e7e34 100%);
-            box-shadow: 0 4px 15px rgba(40, 167, 69, 0.3);
-        }
-        
-        .table {
-            width: 100%;
-            border-collapse: separate;
-            border-spacing: 0;
-        }
-        
-        .table th {
-            background: rgba(248, 249, 250, 0.8);
-            font-weight: 600;
-            padding: 15px;
-            text-align: left;
-            border-bottom: 1px solid rgba(0,0,0,0.05);
-        }
-        
-        .table td {
-            padding: 15px;
-            border-bottom: 1px solid rgba(0,0,0,0.05);
-        }
-        
-        .table tr:hover {
-            background: rgba(248, 250, 255, 0.8);
-        }
-        
-        .status-badge {
-            padding: 6px 12px;
-            border-radius: 20px;
-            font-size: 12px;
-            font-weight: 500;
-        }
-        
-        .status-processing {
-            background: rgba(255, 243, 205, 0.8);
-            color: #856404;
-        }
-        
-        .status-completed {
-            background: rgba(212, 237, 218, 0.8);
-            color: #155724;
-        }
-        
-        .status-shipped {
-            background: rgba(204, 229, 255, 0.8);
-            color: #004085;
-        }
-        
-        .status-cancelled {
-            background: rgba(248, 215, 218, 0.8);
-            color: #721c24;
-        }
-        
-        .badge {
-            display: inline-block;
-            padding: 4px 10px;
-            border-radius: 6px;
-            font-size: 12px;
-            font-weight: 500;
-        }
-        
-        .badge-warning {
-            background: rgba(255, 193, 7, 0.8);
-            color: #333;
-        }
-        
-        .badge-danger {
-            background: rgba(220, 53, 69, 0.8);
-            color: white;
-        }
-        
-        .form-group {
-            margin-bottom: 20px;
-        }
-        
-        .form-group label {
-            display: block;
-            margin-bottom: 8px;
-            font-weight: 600;
-        }
-        
-        .form-control, .form-select {
-            width: 100%;
-            padding: 12px 15px;
-            border: 1px solid rgba(0,0,0,0.1);
-            border-radius: 8px;
-            background: rgba(255,255,255,0.8);
-            transition: all 0.3s;
-        }
-        
-        .form-control:focus, .form-select:focus {
-            outline: none;
-            border-color: var(--primary);
-            box-shadow: 0 0 0 3px rgba(67, 97, 238, 0.2);
-        }
-        
-        .text-right {
-            text-align: right;
-        }
-        
-        .alert {
-            padding: 15px;
-            border-radius: 8px;
-            margin-bottom: 25px;
-        }
-        
-        .alert-success {
-            background: rgba(212, 237, 218, 0.8);
-            color: #155724;
-        }
-        
-        .alert-danger {
-            background: rgba(248, 215, 218, 0.8);
-            color: #721c24;
-        }
-        
-        @media (max-width: 992px) {
-            .admin-sidebar {
-                width: 220px;
-            }
-        }
-        
-        @media (max-width: 768px) {
-            .admin-container {
-                flex-direction: column;
-            }
-            
-            .admin-sidebar {
-                width: 100%;
-                padding: 15px 0;
-            }
-            
-            .sidebar-menu {
-                display: flex;
-                overflow-x: auto;
-                padding: 0 15px;
-            }
-            
-            .sidebar-menu li {
-                flex: 0 0 auto;
-            }
-            
-            .sidebar-menu li a {
-                margin: 0 5px;
-                padding: 10px 15px;
-            }
-        }
-            </style>
-            <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0/css/all.min.css">
-        </head>
-        <body>
+    return render_page('admin_dashboard', '''
+        {% extends "admin_layout.html" %}
+        {% block title %}Admin Dashboard - CRONYZO{% endblock %}
+        {% block page_styles %}<link rel="stylesheet" href="{{ asset_url('css/pages/admin_dashboard.css') }}">{% endblock %}
+        {% block body %}
             <div class="admin-header">
                 <h1>CRONYZO Admin</h1>
                 <div>
@@ -6049,7 +4322,7 @@ def admin_dashboard():
                     </a>
                 </div>
             </div>
-            
+
             <div class="admin-container">
                 <div class="admin-sidebar">
                     <ul class="sidebar-menu">
@@ -6057,10 +4330,11 @@ def admin_dashboard():
                         <li><a href="{{ url_for('admin_products') }}"><i class="fas fa-box-open"></i> Products</a></li>
                         <li><a href="{{ url_for('admin_orders') }}"><i class="fas fa-shopping-bag"></i> Orders</a></li>
                         <li><a href="{{ url_for('admin_users') }}"><i class="fas fa-users"></i> Users</a></li>
+                        <li><a href="{{ url_for('admin_analytics') }}"><i class="fas fa-chart-line"></i> Analytics</a></li>
                         <li><a href="{{ url_for('admin_settings') }}"><i class="fas fa-cog"></i> Settings</a></li>
                     </ul>
                 </div>
-                
+
                 <div class="admin-content">
                     <div class="stats-container">
                         <div class="stat-card">
@@ -6075,8 +4349,20 @@ def admin_dashboard():
                             <h3>Total Users</h3>
                             <p>{{ total_users }}</p>
                         </div>
+                        <div class="stat-card">
+                            <h3>Revenue</h3>
+                            <p>₹{{ "{:,.0f}".format(revenue) }}</p>
+                        </div>
+                        <div class="stat-card">
+                            <h3>Orders Today</h3>
+                            <p>{{ orders_today }}</p>
+                        </div>
+                        <div class="stat-card">
+                            <h3>Processing</h3>
+                            <p>{{ orders_by_status.get('Processing', 0) }}</p>
+                        </div>
                     </div>
-                    
+
                     <div class="card">
                         <div class="card-header">
                             <h2>Recent Orders</h2>
@@ -6115,7 +4401,7 @@ def admin_dashboard():
                             </tbody>
                         </table>
                     </div>
-                    
+
                     <div class="card">
                         <div class="card-header">
                             <h2>Low Stock Products</h2>
@@ -6152,43 +4438,38 @@ def admin_dashboard():
                     </div>
                 </div>
             </div>
-        </body>
-        </html>
-    ''', total_products=total_products, total_orders=total_orders, 
-       total_users=total_users, recent_orders=recent_orders, low_stock=low_stock)
+        {% endblock %}
+    ''', total_products=stats['total_products'], total_orders=stats['total_orders'], 
+       total_users=stats['total_users'], revenue=stats['revenue'], orders_today=stats['orders_today'],
+       orders_by_status=stats['orders_by_status'], recent_orders=recent_orders, low_stock=low_stock)
 
 @app.route('/admin/products')
 @admin_required
 def admin_products():
     search_query = request.args.get('search', '')
     category_filter = request.args.get('category', '')
+    page = max(request.args.get('page', 1, type=int), 1)
+    total_pages = 1
+    next_cursor = prev_cursor = None
     
     try:
         with get_db() as conn:
             c = conn.cursor()
             
-            query = "SELECT * FROM products"
-            params = []
-            
-            if search_query or category_filter:
-                query += " WHERE "
-                conditions = []
-                
-                if search_query:
-                    conditions.append("(title LIKE ? OR description LIKE ? OR tags LIKE ?)")
-                    params.extend([f"%{search_query}%", f"%{search_query}%", f"%{search_query}%"])
+            if search_query:
+                products, total = search_products(c, search_query, page, category=category_filter)
+                total_pages = max(-(-total // Config.SEARCH_PAGE_SIZE), 1)
+            else:
+                query = "SELECT * FROM products"
+                params = []
                 
                 if category_filter:
-                    if search_query:
-                        conditions.append("AND")
-                    conditions.append("category = ?")
+                    query += " WHERE category = ?"
                     params.append(category_filter)
                 
-                query += " ".join(conditions)
-            
-            query += " ORDER BY id DESC"
-            c.execute(query, params)
-            products = c.fetchall()
+                products, next_cursor, prev_cursor = keyset_page(
+                    c, query, params, ['id'],
+                    after=request.args.get('after'), before=request.args.get('before'))
             
             # Get all categories for filter
             c.execute("SELECT DISTINCT category FROM products WHERE category IS NOT NULL AND category != ''")
@@ -6199,327 +4480,11 @@ def admin_products():
         products = []
         categories = []
     
-    return render_template_string('''
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <title>Manage Products - CRONYZO Admin</title>
-            <meta name="viewport" content="width=device-width, initial-scale=1.0">
-            <style>
-                :root {
-            --primary: #4361ee;
-            --primary-dark: #3a0ca3;
-            --accent: #f72585;
-            --light: #f8f9fa;
-            --dark: #212529;
-            --success: #28a745;
-            --danger: #dc3545;
-            --warning: #ffc107;
-        }
-        
-        body {
-            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-            margin: 0;
-            padding: 0;
-            background: linear-gradient(135deg, #f5f7fa 0%, #e9ecef 100%);
-            color: var(--dark);
-        }
-        
-        .admin-header {
-            background: linear-gradient(135deg, var(--primary) 0%, var(--primary-dark) 100%);
-            color: white;
-            padding: 15px 30px;
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-            box-shadow: 0 4px 20px rgba(0,0,0,0.1);
-            position: sticky;
-            top: 0;
-            z-index: 1000;
-        }
-        
-        .admin-container {
-            display: flex;
-            min-height: calc(100vh - 65px);
-        }
-        
-        .admin-sidebar {
-            width: 280px;
-            background: rgba(255,255,255,0.95);
-            box-shadow: 2px 0 15px rgba(0,0,0,0.05);
-            padding: 25px 0;
-            backdrop-filter: blur(10px);
-            border-right: 1px solid rgba(255,255,255,0.3);
-        }
-        
-        .sidebar-menu {
-            list-style: none;
-            padding: 0;
-            margin: 0;
-        }
-        
-        .sidebar-menu li a {
-            display: flex;
-            align-items: center;
-            padding: 14px 25px;
-            color: var(--dark);
-            text-decoration: none;
-            transition: all 0.3s cubic-bezier(0.25, 0.8, 0.25, 1);
-            font-weight: 500;
-            margin: 5px 15px;
-            border-radius: 8px;
-        }
-        
-        .sidebar-menu li a:hover {
-            background: rgba(67, 97, 238, 0.1);
-            color: var(--primary);
-            transform: translateX(5px);
-        }
-        
-        .sidebar-menu li a.active {
-            background: linear-gradient(135deg, var(--primary) 0%, var(--primary-dark) 100%);
-            color: white;
-            box-shadow: 0 4px 15px rgba(67, 97, 238, 0.3);
-        }
-        
-        .sidebar-menu li a i {
-            margin-right: 12px;
-            width: 20px;
-            text-align: center;
-            font-size: 18px;
-        }
-        
-        .admin-content {
-            flex: 1;
-            padding: 30px;
-        }
-        
-        .card {
-            background: rgba(255,255,255,0.95);
-            border-radius: 12px;
-            padding: 25px;
-            margin-bottom: 25px;
-            box-shadow: 0 10px 20px rgba(0,0,0,0.05);
-            backdrop-filter: blur(10px);
-            border: 1px solid rgba(255,255,255,0.3);
-        }
-        
-        .card-header {
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-            margin-bottom: 25px;
-            padding-bottom: 15px;
-            border-bottom: 1px solid rgba(0,0,0,0.05);
-        }
-        
-        .card-header h2 {
-            margin: 0;
-            font-size: 22px;
-            font-weight: 600;
-            color: var(--primary-dark);
-        }
-        
-        .btn {
-            display: inline-flex;
-            align-items: center;
-            justify-content: center;
-            padding: 10px 20px;
-            background: linear-gradient(135deg, var(--primary) 0%, var(--primary-dark) 100%);
-            color: white;
-            text-decoration: none;
-            border-radius: 8px;
-            font-size: 14px;
-            font-weight: 500;
-            transition: all 0.3s;
-            box-shadow: 0 4px 15px rgba(67, 97, 238, 0.3);
-            border: none;
-            cursor: pointer;
-        }
-        
-        .btn:hover {
-            transform: translateY(-2px);
-            box-shadow: 0 6px 20px rgba(67, 97, 238, 0.4);
-        }
-        
-        .btn-sm {
-            padding: 8px 15px;
-            font-size: 13px;
-        }
-        
-        .btn-danger {
-            background: linear-gradient(135deg, var(--danger) 0%, #c82333 100%);
-            box-shadow: 0 4px 15px rgba(220, 53, 69, 0.3);
-        }
-        
-        .btn-danger:hover {
-            box-shadow: 0 6px 20px rgba(220, 53, 69, 0.4);
-        }
-        
-        .btn-success {
-            background: linear-gradient(135deg, var(--success) 0%, #1e7e34 100%);
-            box-shadow: 0 4px 15px rgba(40, 167, 69, 0.3);
-        }
-        
-        .btn-success:hover {
-            box-shadow: 0 6px 20px rgba(40, 167, 69, 0.4);
-        }
-        
-        .search-form {
-            display: flex;
-            gap: 15px;
-            margin-bottom: 25px;
-            flex-wrap: wrap;
-        }
-        
-        .search-form input, 
-        .search-form select {
-            flex: 1;
-            min-width: 200px;
-            padding: 12px 15px;
-            border: 1px solid rgba(0,0,0,0.1);
-            border-radius: 8px;
-            background: rgba(255,255,255,0.8);
-            transition: all 0.3s;
-        }
-        
-        .search-form input:focus, 
-        .search-form select:focus {
-            outline: none;
-            border-color: var(--primary);
-            box-shadow: 0 0 0 3px rgba(67, 97, 238, 0.2);
-        }
-        
-        .table {
-            width: 100%;
-            border-collapse: separate;
-            border-spacing: 0;
-        }
-        
-        .table th {
-            background: rgba(248, 249, 250, 0.8);
-            font-weight: 600;
-            padding: 15px;
-            text-align: left;
-            border-bottom: 1px solid rgba(0,0,0,0.05);
-        }
-        
-        .table td {
-            padding: 15px;
-            border-bottom: 1px solid rgba(0,0,0,0.05);
-        }
-        
-        .table tr:hover {
-            background: rgba(248, 250, 255, 0.8);
-        }
-        
-        .badge {
-            display: inline-block;
-            padding: 6px 12px;
-            border-radius: 6px;
-            font-size: 12px;
-            font-weight: 500;
-        }
-        
-        .badge-success {
-            background: rgba(40, 167, 69, 0.8);
-            color: white;
-        }
-        
-        .badge-warning {
-            background: rgba(255, 193, 7, 0.8);
-            color: #333;
-        }
-        
-        .badge-danger {
-            background: rgba(220, 53, 69, 0.8);
-            color: white;
-        }
-        
-        .product-image {
-    width: 100%;
-    height: 200px;
-    object-fit: contain;
-    cursor: pointer;
-    background: #f5f5f5;
-    border-radius: 5px;
-}
-
-.additional-images-preview img {
-    transition: transform 0.2s;
-}
-
-.additional-images-preview img:hover {
-    transform: scale(1.1);
-    z-index: 1;
-}
-        
-        .product-image:hover {
-            transform: scale(1.1);
-            box-shadow: 0 5px 15px rgba(0,0,0,0.2);
-        }
-        
-        .actions-container {
-            display: flex;
-            gap: 8px;
-        }
-        
-        @media (max-width: 992px) {
-            .admin-sidebar {
-                width: 220px;
-            }
-        }
-        
-        @media (max-width: 768px) {
-            .admin-container {
-                flex-direction: column;
-            }
-            
-            .admin-sidebar {
-                width: 100%;
-                padding: 15px 0;
-            }
-            
-            .sidebar-menu {
-                display: flex;
-                overflow-x: auto;
-                padding: 0 15px;
-            }
-            
-            .sidebar-menu li {
-                flex: 0 0 auto;
-            }
-            
-            .sidebar-menu li a {
-                margin: 0 5px;
-                padding: 10px 15px;
-            }
-            
-            .search-form {
-                flex-direction: column;
-                gap: 10px;
-            }
-            
-            .search-form input,
-            .search-form select,
-            .search-form button {
-                width: 100%;
-            }
-            
-            .table {
-                display: block;
-                overflow-x: auto;
-            }
-            
-            .actions-container {
-                flex-direction: column;
-                gap: 5px;
-            }
-        }
-            </style>
-            <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0/css/all.min.css">
-        </head>
-        <body>
+    return render_page('admin_products', '''
+        {% extends "admin_layout.html" %}
+        {% block title %}Manage Products - CRONYZO Admin{% endblock %}
+        {% block page_styles %}<link rel="stylesheet" href="{{ asset_url('css/pages/admin_products.css') }}">{% endblock %}
+        {% block body %}
             <div class="admin-header">
                 <h1>CRONYZO Admin</h1>
                 <div>
@@ -6528,7 +4493,7 @@ def admin_products():
                     </a>
                 </div>
             </div>
-            
+
             <div class="admin-container">
                 <div class="admin-sidebar">
                     <ul class="sidebar-menu">
@@ -6536,19 +4501,30 @@ def admin_products():
                         <li><a href="{{ url_for('admin_products') }}" class="active"><i class="fas fa-box-open"></i> Products</a></li>
                         <li><a href="{{ url_for('admin_orders') }}"><i class="fas fa-shopping-bag"></i> Orders</a></li>
                         <li><a href="{{ url_for('admin_users') }}"><i class="fas fa-users"></i> Users</a></li>
+                        <li><a href="{{ url_for('admin_analytics') }}"><i class="fas fa-chart-line"></i> Analytics</a></li>
                         <li><a href="{{ url_for('admin_settings') }}"><i class="fas fa-cog"></i> Settings</a></li>
                     </ul>
                 </div>
-                
+
                 <div class="admin-content">
                     <div class="card">
                         <div class="card-header">
                             <h2>Manage Products</h2>
-                            <a href="{{ url_for('admin_add_product') }}" class="btn btn-success">
-                                <i class="fas fa-plus"></i> Add Product
-                            </a>
+                            <div>
+                                <a href="{{ url_for('admin_export', dataset='products', fmt='csv') }}" class="btn">
+                                    <i class="fas fa-file-csv"></i> Export CSV
+                                </a>
+                                <input type="file" id="importFile" accept=".csv,.jsonl" style="display: none;" onchange="importProducts(this)"
+                                       data-url="{{ url_for('admin_import_products') }}" data-csrf-token="{{ csrf_token() }}">
+                                <button type="button" class="btn" onclick="document.getElementById('importFile').click()">
+                                    <i class="fas fa-file-import"></i> Import
+                                </button>
+                                <a href="{{ url_for('admin_add_product') }}" class="btn btn-success">
+                                    <i class="fas fa-plus"></i> Add Product
+                                </a>
+                            </div>
                         </div>
-                        
+
                         <form method="get" class="search-form">
                             <input type="text" name="search" placeholder="Search products..." value="{{ search_query }}">
                             <select name="category">
@@ -6564,7 +4540,7 @@ def admin_products():
                                 <i class="fas fa-times"></i> Clear
                             </a>
                         </form>
-                        
+
                         <table class="table">
                             <thead>
                                 <tr>
@@ -6582,7 +4558,7 @@ def admin_products():
                                 <tr>
                                     <td>#{{ product[0] }}</td>
                                     <td>
-                                        <img src="{{ url_for('static', filename='images/' + product[4]) if product[4] else 'https://via.placeholder.com/60' }}" 
+                                        <img src="{{ image_url('images/' + product[4], 'thumbnail') if product[4] else 'https://via.placeholder.com/60' }}"
                                              class="product-image" alt="{{ product[1] }}">
                                     </td>
                                     <td>{{ product[1] }}</td>
@@ -6608,13 +4584,45 @@ def admin_products():
                                 {% endfor %}
                             </tbody>
                         </table>
+
+                        {% if total_pages > 1 %}
+                        <div class="pagination">
+                            {% if page > 1 %}
+                            <a href="{{ url_for('admin_products', search=search_query, category=category_filter, page=page - 1) }}" class="btn btn-sm">
+                                <i class="fas fa-chevron-left"></i> Prev
+                            </a>
+                            {% endif %}
+                            <span>Page {{ page }} of {{ total_pages }}</span>
+                            {% if page < total_pages %}
+                            <a href="{{ url_for('admin_products', search=search_query, category=category_filter, page=page + 1) }}" class="btn btn-sm">
+                                Next <i class="fas fa-chevron-right"></i>
+                            </a>
+                            {% endif %}
+                        </div>
+                        {% endif %}
+
+                        {% if prev_cursor or next_cursor %}
+                        <div class="pagination">
+                            {% if prev_cursor %}
+                            <a href="{{ url_for('admin_products', category=category_filter, before=prev_cursor) }}" class="btn btn-sm">
+                                <i class="fas fa-chevron-left"></i> Newer
+                            </a>
+                            {% endif %}
+                            {% if next_cursor %}
+                            <a href="{{ url_for('admin_products', category=category_filter, after=next_cursor) }}" class="btn btn-sm">
+                                Older <i class="fas fa-chevron-right"></i>
+                            </a>
+                            {% endif %}
+                        </div>
+                        {% endif %}
                     </div>
                 </div>
             </div>
-        </body>
-        </html>
+        {% endblock %}
     ''', products=products, search_query=search_query, 
-       category_filter=category_filter, categories=categories)
+       category_filter=category_filter, categories=categories,
+       page=page, total_pages=total_pages,
+       next_cursor=next_cursor, prev_cursor=prev_cursor)
 
 @app.route('/admin/products/add', methods=['GET', 'POST'])
 @admin_required
@@ -6655,306 +4663,11 @@ def admin_add_product():
             print(f"Error adding product: {e}")
             error = str(e)
     
-    return render_template_string('''
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <title>Add Product - CRONYZO Admin</title>
-            <meta name="viewport" content="width=device-width, initial-scale=1.0">
-            <style>
-                :root {
-            --primary: #4361ee;
-            --primary-dark: #3a0ca3;
-            --accent: #f72585;
-            --light: #f8f9fa;
-            --dark: #212529;
-            --success: #28a745;
-            --danger: #dc3545;
-            --warning: #ffc107;
-        }
-        
-        body {
-            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-            margin: 0;
-            padding: 0;
-            background: linear-gradient(135deg, #f5f7fa 0%, #e9ecef 100%);
-            color: var(--dark);
-        }
-        
-        .admin-header {
-            background: linear-gradient(135deg, var(--primary) 0%, var(--primary-dark) 100%);
-            color: white;
-            padding: 15px 30px;
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-            box-shadow: 0 4px 20px rgba(0,0,0,0.1);
-            position: sticky;
-            top: 0;
-            z-index: 1000;
-        }
-        
-        .admin-container {
-            display: flex;
-            min-height: calc(100vh - 65px);
-        }
-        
-        .admin-sidebar {
-            width: 280px;
-            background: rgba(255,255,255,0.95);
-            box-shadow: 2px 0 15px rgba(0,0,0,0.05);
-            padding: 25px 0;
-            backdrop-filter: blur(10px);
-            border-right: 1px solid rgba(255,255,255,0.3);
-        }
-        
-        .sidebar-menu {
-            list-style: none;
-            padding: 0;
-            margin: 0;
-        }
-        
-        .sidebar-menu li a {
-            display: flex;
-            align-items: center;
-            padding: 14px 25px;
-            color: var(--dark);
-            text-decoration: none;
-            transition: all 0.3s cubic-bezier(0.25, 0.8, 0.25, 1);
-            font-weight: 500;
-            margin: 5px 15px;
-            border-radius: 8px;
-        }
-        
-        .sidebar-menu li a:hover {
-            background: rgba(67, 97, 238, 0.1);
-            color: var(--primary);
-            transform: translateX(5px);
-        }
-        
-        .sidebar-menu li a.active {
-            background: linear-gradient(135deg, var(--primary) 0%, var(--primary-dark) 100%);
-            color: white;
-            box-shadow: 0 4px 15px rgba(67, 97, 238, 0.3);
-        }
-        
-        .sidebar-menu li a i {
-            margin-right: 12px;
-            width: 20px;
-            text-align: center;
-            font-size: 18px;
-        }
-        
-        .admin-content {
-            flex: 1;
-            padding: 30px;
-        }
-        
-        .card {
-            background: rgba(255,255,255,0.95);
-            border-radius: 12px;
-            padding: 25px;
-            margin-bottom: 25px;
-            box-shadow: 0 10px 20px rgba(0,0,0,0.05);
-            backdrop-filter: blur(10px);
-            border: 1px solid rgba(255,255,255,0.3);
-        }
-        
-        .card-header {
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-            margin-bottom: 25px;
-            padding-bottom: 15px;
-            border-bottom: 1px solid rgba(0,0,0,0.05);
-        }
-        
-        .card-header h2 {
-            margin: 0;
-            font-size: 22px;
-            font-weight: 600;
-            color: var(--primary-dark);
-        }
-        
-        .btn {
-            display: inline-flex;
-            align-items: center;
-            justify-content: center;
-            padding: 10px 20px;
-            background: linear-gradient(135deg, var(--primary) 0%, var(--primary-dark) 100%);
-            color: white;
-            text-decoration: none;
-            border-radius: 8px;
-            font-size: 14px;
-            font-weight: 500;
-            transition: all 0.3s;
-            box-shadow: 0 4px 15px rgba(67, 97, 238, 0.3);
-            border: none;
-            cursor: pointer;
-        }
-        
-        .btn:hover {
-            transform: translateY(-2px);
-            box-shadow: 0 6px 20px rgba(67, 97, 238, 0.4);
-        }
-        
-        .btn-success {
-            background: linear-gradient(135deg, var(--success) 0%, #1e7e34 100%);
-            box-shadow: 0 4px 15px rgba(40, 167, 69, 0.3);
-        }
-        
-        .btn-success:hover {
-            box-shadow: 0 6px 20px rgba(40, 167, 69, 0.4);
-        }
-        
-        .alert {
-            padding: 15px;
-            border-radius: 8px;
-            margin-bottom: 25px;
-            transition: all 0.3s;
-        }
-        
-        .alert-danger {
-            background: rgba(248, 215, 218, 0.9);
-            color: #721c24;
-            border-left: 4px solid var(--danger);
-        }
-        
-        .form-group {
-            margin-bottom: 20px;
-        }
-        
-        .form-group label {
-            display: block;
-            margin-bottom: 8px;
-            font-weight: 600;
-            color: var(--dark);
-        }
-        
-        .form-control, .form-select, textarea {
-            width: 100%;
-            padding: 12px 15px;
-            border: 1px solid rgba(0,0,0,0.1);
-            border-radius: 8px;
-            background: rgba(255,255,255,0.8);
-            transition: all 0.3s;
-            font-family: inherit;
-        }
-        
-        .form-control:focus, .form-select:focus, textarea:focus {
-            outline: none;
-            border-color: var(--primary);
-            box-shadow: 0 0 0 3px rgba(67, 97, 238, 0.2);
-        }
-        
-        .file-input-wrapper {
-            margin-bottom: 20px;
-        }
-        
-        .file-input-label {
-            display: block;
-            margin-bottom: 8px;
-            font-weight: 600;
-            color: var(--dark);
-        }
-        
-        .file-input-info {
-            font-size: 13px;
-            color: #666;
-            margin-top: 5px;
-        }
-        
-        .image-preview {
-            max-width: 200px;
-            max-height: 200px;
-            margin-top: 15px;
-            border-radius: 8px;
-            box-shadow: 0 4px 10px rgba(0,0,0,0.1);
-            display: none;
-            transition: all 0.3s;
-        }
-        
-        .additional-images-preview {
-            display: flex;
-            flex-wrap: wrap;
-            gap: 15px;
-            margin-top: 15px;
-        }
-        
-        .additional-image-preview {
-            max-width: 120px;
-            max-height: 120px;
-            border-radius: 8px;
-            box-shadow: 0 4px 10px rgba(0,0,0,0.1);
-            transition: all 0.3s;
-        }
-        
-        .additional-image-preview:hover {
-            transform: scale(1.05);
-            box-shadow: 0 6px 15px rgba(0,0,0,0.15);
-        }
-        
-        .text-right {
-            text-align: right;
-            margin-top: 30px;
-        }
-        
-        small {
-            font-size: 12px;
-            color: #666;
-            display: block;
-            margin-top: 5px;
-        }
-        
-        @media (max-width: 992px) {
-            .admin-sidebar {
-                width: 220px;
-            }
-        }
-        
-        @media (max-width: 768px) {
-            .admin-container {
-                flex-direction: column;
-            }
-            
-            .admin-sidebar {
-                width: 100%;
-                padding: 15px 0;
-            }
-            
-            .sidebar-menu {
-                display: flex;
-                overflow-x: auto;
-                padding: 0 15px;
-            }
-            
-            .sidebar-menu li {
-                flex: 0 0 auto;
-            }
-            
-            .sidebar-menu li a {
-                margin: 0 5px;
-                padding: 10px 15px;
-            }
-            
-            .card-header {
-                flex-direction: column;
-                align-items: flex-start;
-                gap: 15px;
-            }
-            
-            .image-preview {
-                max-width: 150px;
-            }
-            
-            .additional-image-preview {
-                max-width: 80px;
-            }
-        }
-            </style>
-            <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0/css/all.min.css">
-        </head>
-        <body>
+    return render_page('admin_add_product', '''
+        {% extends "admin_layout.html" %}
+        {% block title %}Add Product - CRONYZO Admin{% endblock %}
+        {% block page_styles %}<link rel="stylesheet" href="{{ asset_url('css/pages/admin_add_product.css') }}">{% endblock %}
+        {% block body %}
             <div class="admin-header">
                 <h1>CRONYZO Admin</h1>
                 <div>
@@ -6963,7 +4676,7 @@ def admin_add_product():
                     </a>
                 </div>
             </div>
-            
+
             <div class="admin-container">
                 <div class="admin-sidebar">
                     <ul class="sidebar-menu">
@@ -6971,10 +4684,11 @@ def admin_add_product():
                         <li><a href="{{ url_for('admin_products') }}" class="active"><i class="fas fa-box-open"></i> Products</a></li>
                         <li><a href="{{ url_for('admin_orders') }}"><i class="fas fa-shopping-bag"></i> Orders</a></li>
                         <li><a href="{{ url_for('admin_users') }}"><i class="fas fa-users"></i> Users</a></li>
+                        <li><a href="{{ url_for('admin_analytics') }}"><i class="fas fa-chart-line"></i> Analytics</a></li>
                         <li><a href="{{ url_for('admin_settings') }}"><i class="fas fa-cog"></i> Settings</a></li>
                     </ul>
                 </div>
-                
+
                 <div class="admin-content">
                     <div class="card">
                         <div class="card-header">
@@ -6983,84 +4697,84 @@ def admin_add_product():
                                 <i class="fas fa-arrow-left"></i> Back to Products
                             </a>
                         </div>
-                        
+
                         {% if error %}
                         <div class="alert alert-danger">
                             <i class="fas fa-exclamation-circle"></i> {{ error }}
                         </div>
                         {% endif %}
-                        
+
                         <form method="post" enctype="multipart/form-data">
                             <input type="hidden" name="csrf_token" value="{{ csrf_token() }}">
-                            
+
                             <div class="form-group">
                                 <label for="title">Product Title</label>
                                 <input type="text" id="title" name="title" class="form-control" required>
                             </div>
-                            
+
                             <div class="form-group">
                                 <label for="description">Description</label>
                                 <textarea id="description" name="description" class="form-control" rows="4"></textarea>
                             </div>
-                            
+
                             <div class="form-group">
                                 <label for="price">Price (₹)</label>
                                 <input type="number" id="price" name="price" class="form-control" step="0.01" min="0" required>
                                                         </div>
-                            
+
                             <div class="form-group">
                                 <label for="image">Main Image URL</label>
                                 <input type="text" id="image" name="image" class="form-control">
                                 <small>Enter the filename (e.g. product1.jpg) - upload the file to static/images first</small>
                             </div>
-                            
+
                             <div class="form-group">
                                 <label for="min_quantity">Minimum Quantity</label>
                                 <input type="number" id="min_quantity" name="min_quantity" class="form-control" min="1" value="1">
                             </div>
-                            
+
                             <div class="form-group">
                                 <label for="max_quantity">Maximum Quantity</label>
                                 <input type="number" id="max_quantity" name="max_quantity" class="form-control" min="1" value="10">
                             </div>
-                            
+
                             <div class="form-group">
                                 <label for="discount">Discount (%)</label>
                                 <input type="number" id="discount" name="discount" class="form-control" min="0" max="100" value="0">
                             </div>
-                            
+
                             <div class="form-group">
                                 <label for="rating">Rating (0-5)</label>
                                 <input type="number" id="rating" name="rating" class="form-control" min="0" max="5" step="0.1" value="0">
                             </div>
-                            
+
                             <div class="form-group">
                                 <label for="stock">Stock Quantity</label>
                                 <input type="number" id="stock" name="stock" class="form-control" min="0" value="100">
                             </div>
-                            
+
                             <div class="form-group">
                                 <label for="images">Additional Images (JSON array)</label>
                                 <textarea id="images" name="images" class="form-control" rows="2" placeholder='["image1.jpg", "image2.jpg"]'></textarea>
                                 <small>Enter as JSON array of filenames</small>
                             </div>
-                            
+
                             <div class="form-group">
                                 <label for="youtube_url">YouTube URL</label>
                                 <input type="url" id="youtube_url" name="youtube_url" class="form-control" placeholder="https://youtu.be/...">
                             </div>
-                            
+
                             <div class="form-group">
                                 <label for="category">Category</label>
                                 <input type="text" id="category" name="category" class="form-control">
                             </div>
-                            
+
                             <div class="form-group">
                                 <label for="tags">Tags (JSON array)</label>
                                 <textarea id="tags" name="tags" class="form-control" rows="2" placeholder='["tag1", "tag2"]'></textarea>
                                 <small>Enter as JSON array of tags</small>
                             </div>
-                            
+
                             <div class="text-right">
                                 <button type="submit" class="btn btn-success">
                                     <i class="fas fa-save"></i> Save Product
@@ -7070,8 +4784,7 @@ def admin_add_product():
                     </div>
                 </div>
             </div>
-        </body>
-        </html>
+        {% endblock %}
     ''', error=error if 'error' in locals() else None)
 
 @app.route('/admin/products/edit/<int:product_id>', methods=['GET', 'POST'])
@@ -7118,214 +4831,11 @@ def admin_edit_product(product_id):
     except Exception as e:
         print(f"Error editing product: {e}")
         error = str(e)
-        return render_template_string('''
-            <!DOCTYPE html>
-            <html>
-            <head>
-                <title>Edit Product - CRONYZO Admin</title>
-                <meta name="viewport" content="width=device-width, initial-scale=1.0">
-                <style>
-                   :root {
-            --primary: #4361ee;
-            --primary-dark: #3a0ca3;
-            --accent: #f72585;
-            --light: #f8f9fa;
-            --dark: #212529;
-            --success: #28a745;
-            --danger: #dc3545;
-            --warning: #ffc107;
-            --info: #17a2b8;
-        }
-        
-        body {
-            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-            margin: 0;
-            padding: 0;
-            background: linear-gradient(135deg, #f5f7fa 0%, #e9ecef 100%);
-            color: var(--dark);
-        }
-        
-        .admin-header {
-            background: linear-gradient(135deg, var(--primary) 0%, var(--primary-dark) 100%);
-            color: white;
-            padding: 15px 30px;
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-            box-shadow: 0 4px 20px rgba(0,0,0,0.1);
-            position: sticky;
-            top: 0;
-            z-index: 1000;
-        }
-        
-        .admin-container {
-            display: flex;
-            min-height: calc(100vh - 65px);
-        }
-        
-        .admin-sidebar {
-            width: 280px;
-            background: rgba(255,255,255,0.95);
-            box-shadow: 2px 0 15px rgba(0,0,0,0.05);
-            padding: 25px 0;
-            backdrop-filter: blur(10px);
-            border-right: 1px solid rgba(255,255,255,0.3);
-            transition: all 0.3s ease;
-        }
-        
-        .sidebar-menu {
-            list-style: none;
-            padding: 0;
-            margin: 0;
-        }
-        
-        .sidebar-menu li a {
-            display: flex;
-            align-items: center;
-            padding: 14px 25px;
-            color: var(--dark);
-            text-decoration: none;
-            transition: all 0.3s cubic-bezier(0.25, 0.8, 0.25, 1);
-            font-weight: 500;
-            margin: 5px 15px;
-            border-radius: 8px;
-        }
-        
-        .sidebar-menu li a:hover {
-            background: rgba(67, 97, 238, 0.1);
-            color: var(--primary);
-            transform: translateX(5px);
-        }
-        
-        .sidebar-menu li a.active {
-            background: linear-gradient(135deg, var(--primary) 0%, var(--primary-dark) 100%);
-            color: white;
-            box-shadow: 0 4px 15px rgba(67, 97, 238, 0.3);
-        }
-        
-        .sidebar-menu li a i {
-            margin-right: 12px;
-            width: 20px;
-            text-align: center;
-            font-size: 18px;
-        }
-        
-        .admin-content {
-            flex: 1;
-            padding: 30px;
-        }
-        
-        .card {
-            background: rgba(255,255,255,0.95);
-            border-radius: 12px;
-            padding: 25px;
-            margin-bottom: 25px;
-            box-shadow: 0 10px 20px rgba(0,0,0,0.05);
-            backdrop-filter: blur(10px);
-            border: 1px solid rgba(255,255,255,0.3);
-        }
-        
-        .card-header {
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-            margin-bottom: 25px;
-            padding-bottom: 15px;
-            border-bottom: 1px solid rgba(0,0,0,0.05);
-        }
-        
-        .card-header h2 {
-            margin: 0;
-            font-size: 22px;
-            font-weight: 600;
-            color: var(--primary-dark);
-        }
-        
-        .btn {
-            display: inline-flex;
-            align-items: center;
-            justify-content: center;
-            padding: 10px 20px;
-            background: linear-gradient(135deg, var(--primary) 0%, var(--primary-dark) 100%);
-            color: white;
-            text-decoration: none;
-            border-radius: 8px;
-            font-size: 14px;
-            font-weight: 500;
-            transition: all 0.3s;
-            box-shadow: 0 4px 15px rgba(67, 97, 238, 0.3);
-            border: none;
-            cursor: pointer;
-        }
-        
-        .btn:hover {
-            transform: translateY(-2px);
-            box-shadow: 0 6px 20px rgba(67, 97, 238, 0.4);
-        }
-        
-        .btn-sm {
-            padding: 8px 15px;
-            font-size: 13px;
-        }
-        
-        .btn-danger {
-            background: linear-gradient(135deg, var(--danger) 0%, #c82333 100%);
-            box-shadow: 0 4px 15px rgba(220, 53, 69, 0.3);
-        }
-        
-        .btn-danger:hover {
-            box-shadow: 0 6px 20px rgba(220, 53, 69, 0.4);
-        }
-        
-        .alert {
-            padding: 15px;
-            border-radius: 8px;
-            margin-bottom: 25px;
-        }
-        
-        .alert-danger {
-            background: rgba(248, 215, 218, 0.8);
-            color: #721c24;
-            display: flex;
-            align-items: center;
-            gap: 10px;
-        }
-        
-        @media (max-width: 992px) {
-            .admin-sidebar {
-                width: 220px;
-            }
-        }
-        
-        @media (max-width: 768px) {
-            .admin-container {
-                flex-direction: column;
-            }
-            
-            .admin-sidebar {
-                width: 100%;
-                padding: 15px 0;
-            }
-            
-            .sidebar-menu {
-                display: flex;
-                overflow-x: auto;
-                padding: 0 15px;
-            }
-            
-            .sidebar-menu li {
-                flex: 0 0 auto;
-            }
-            
-            .sidebar-menu li a {
-                margin: 0 5px;
-                padding: 10px 15px;
-            }
-        }
-                </style>
-                <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0/css/all.min.css">
-            </head>
-            <body>
+        return render_page('admin_edit_product_error', '''
+            {% extends "admin_layout.html" %}
+            {% block title %}Edit Product - CRONYZO Admin{% endblock %}
+            {% block page_styles %}<link rel="stylesheet" href="{{ asset_url('css/pages/admin_edit_product_error.css') }}">{% endblock %}
+            {% block body %}
                 <div class="admin-header">
                     <h1>CRONYZO Admin</h1>
                     <div>
@@ -7334,7 +4844,7 @@ def admin_edit_product(product_id):
                         </a>
                     </div>
                 </div>
-                
+
                 <div class="admin-container">
                     <div class="admin-sidebar">
                         <ul class="sidebar-menu">
@@ -7342,10 +4852,11 @@ def admin_edit_product(product_id):
                             <li><a href="{{ url_for('admin_products') }}" class="active"><i class="fas fa-box-open"></i> Products</a></li>
                             <li><a href="{{ url_for('admin_orders') }}"><i class="fas fa-shopping-bag"></i> Orders</a></li>
                             <li><a href="{{ url_for('admin_users') }}"><i class="fas fa-users"></i> Users</a></li>
+                            <li><a href="{{ url_for('admin_analytics') }}"><i class="fas fa-chart-line"></i> Analytics</a></li>
                             <li><a href="{{ url_for('admin_settings') }}"><i class="fas fa-cog"></i> Settings</a></li>
                         </ul>
                     </div>
-                    
+
                     <div class="admin-content">
                         <div class="card">
                             <div class="card-header">
@@ -7354,269 +4865,21 @@ def admin_edit_product(product_id):
                                     <i class="fas fa-arrow-left"></i> Back to Products
                                 </a>
                             </div>
-                            
+
                             <div class="alert alert-danger">
                                 <i class="fas fa-exclamation-circle"></i> {{ error }}
                             </div>
                         </div>
                     </div>
                 </div>
-            </body>
-            </html>
+            {% endblock %}
         ''', error=error)
     
-    return render_template_string('''
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <title>Edit Product - CRONYZO Admin</title>
-            <meta name="viewport" content="width=device-width, initial-scale=1.0">
-            <style>
-               :root {
-            --primary: #4361ee;
-            --primary-dark: #3a0ca3;
-            --accent: #f72585;
-            --light: #f8f9fa;
-            --dark: #212529;
-            --success: #28a745;
-            --danger: #dc3545;
-            --warning: #ffc107;
-            --info: #17a2b8;
-        }
-        
-        body {
-            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-            margin: 0;
-            padding: 0;
-            background: linear-gradient(135deg, #f5f7fa 0%, #e9ecef 100%);
-            color: var(--dark);
-        }
-        
-        .admin-header {
-            background: linear-gradient(135deg, var(--primary) 0%, var(--primary-dark) 100%);
-            color: white;
-            padding: 15px 30px;
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-            box-shadow: 0 4px 20px rgba(0,0,0,0.1);
-            position: sticky;
-            top: 0;
-            z-index: 1000;
-        }
-        
-        .admin-container {
-            display: flex;
-            min-height: calc(100vh - 65px);
-        }
-        
-        .admin-sidebar {
-            width: 280px;
-            background: rgba(255,255,255,0.95);
-            box-shadow: 2px 0 15px rgba(0,0,0,0.05);
-            padding: 25px 0;
-            backdrop-filter: blur(10px);
-            border-right: 1px solid rgba(255,255,255,0.3);
-            transition: all 0.3s ease;
-        }
-        
-        .sidebar-menu {
-            list-style: none;
-            padding: 0;
-            margin: 0;
-        }
-        
-        .sidebar-menu li a {
-            display: flex;
-            align-items: center;
-            padding: 14px 25px;
-            color: var(--dark);
-            text-decoration: none;
-            transition: all 0.3s cubic-bezier(0.25, 0.8, 0.25, 1);
-            font-weight: 500;
-            margin: 5px 15px;
-            border-radius: 8px;
-        }
-        
-        .sidebar-menu li a:hover {
-            background: rgba(67, 97, 238, 0.1);
-            color: var(--primary);
-            transform: translateX(5px);
-        }
-        
-        .sidebar-menu li a.active {
-            background: linear-gradient(135deg, var(--primary) 0%, var(--primary-dark) 100%);
-            color: white;
-            box-shadow: 0 4px 15px rgba(67, 97, 238, 0.3);
-        }
-        
-        .sidebar-menu li a i {
-            margin-right: 12px;
-            width: 20px;
-            text-align: center;
-            font-size: 18px;
-        }
-        
-        .admin-content {
-            flex: 1;
-            padding: 30px;
-        }
-        
-        .card {
-            background: rgba(255,255,255,0.95);
-            border-radius: 12px;
-            padding: 25px;
-            margin-bottom: 25px;
-            box-shadow: 0 10px 20px rgba(0,0,0,0.05);
-            backdrop-filter: blur(10px);
-            border: 1px solid rgba(255,255,255,0.3);
-        }
-        
-        .card-header {
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-            margin-bottom: 25px;
-            padding-bottom: 15px;
-            border-bottom: 1px solid rgba(0,0,0,0.05);
-        }
-        
-        .card-header h2 {
-            margin: 0;
-            font-size: 22px;
-            font-weight: 600;
-            color: var(--primary-dark);
-        }
-        
-        .btn {
-            display: inline-flex;
-            align-items: center;
-            justify-content: center;
-            padding: 10px 20px;
-            background: linear-gradient(135deg, var(--primary) 0%, var(--primary-dark) 100%);
-            color: white;
-            text-decoration: none;
-            border-radius: 8px;
-            font-size: 14px;
-            font-weight: 500;
-            transition: all 0.3s;
-            box-shadow: 0 4px 15px rgba(67, 97, 238, 0.3);
-            border: none;
-            cursor: pointer;
-        }
-        
-        .btn:hover {
-            transform: translateY(-2px);
-            box-shadow: 0 6px 20px rgba(67, 97, 238, 0.4);
-        }
-        
-        .btn-sm {
-            padding: 8px 15px;
-            font-size: 13px;
-        }
-        
-        .btn-danger {
-            background: linear-gradient(135deg, var(--danger) 0%, #c82333 100%);
-            box-shadow: 0 4px 15px rgba(220, 53, 69, 0.3);
-        }
-        
-        .btn-danger:hover {
-            box-shadow: 0 6px 20px rgba(220, 53, 69, 0.4);
-        }
-        
-        .btn-success {
-            background: linear-gradient(135deg, var(--success) 0%, #1e7e34 100%);
-            box-shadow: 0 4px 15px rgba(40, 167, 69, 0.3);
-        }
-        
-        .btn-success:hover {
-            box-shadow: 0 6px 20px rgba(40, 167, 69, 0.4);
-        }
-        
-        .form-group {
-            margin-bottom: 20px;
-        }
-        
-        .form-group label {
-            display: block;
-            margin-bottom: 8px;
-            font-weight: 600;
-        }
-        
-        .form-control, .form-select {
-            width: 100%;
-            padding: 12px 15px;
-            border: 1px solid rgba(0,0,0,0.1);
-            border-radius: 8px;
-            background: rgba(255,255,255,0.8);
-            transition: all 0.3s;
-        }
-        
-        .form-control:focus, .form-select:focus {
-            outline: none;
-            border-color: var(--primary);
-            box-shadow: 0 0 0 3px rgba(67, 97, 238, 0.2);
-        }
-        
-        textarea.form-control {
-            min-height: 100px;
-            resize: vertical;
-        }
-        
-        small {
-            display: block;
-            margin-top: 5px;
-            font-size: 12px;
-            color: #666;
-        }
-        
-        .preview-image {
-            max-width: 200px;
-            max-height: 200px;
-            margin-top: 10px;
-            border-radius: 8px;
-            box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-        }
-        
-        .text-right {
-            text-align: right;
-        }
-        
-        @media (max-width: 992px) {
-            .admin-sidebar {
-                width: 220px;
-            }
-        }
-        
-        @media (max-width: 768px) {
-            .admin-container {
-                flex-direction: column;
-            }
-            
-            .admin-sidebar {
-                width: 100%;
-                padding: 15px 0;
-            }
-            
-            .sidebar-menu {
-                display: flex;
-                overflow-x: auto;
-                padding: 0 15px;
-            }
-            
-            .sidebar-menu li {
-                flex: 0 0 auto;
-            }
-            
-            .sidebar-menu li a {
-                margin: 0 5px;
-                padding: 10px 15px;
-            }
-        }
-            </style>
-            <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0/css/all.min.css">
-        </head>
-        <body>
+    return render_page('admin_edit_product', '''
+        {% extends "admin_layout.html" %}
+        {% block title %}Edit Product - CRONYZO Admin{% endblock %}
+        {% block page_styles %}<link rel="stylesheet" href="{{ asset_url('css/pages/admin_edit_product.css') }}">{% endblock %}
+        {% block body %}
             <div class="admin-header">
                 <h1>CRONYZO Admin</h1>
                 <div>
@@ -7625,7 +4888,7 @@ def admin_edit_product(product_id):
                     </a>
                 </div>
             </div>
-            
+
             <div class="admin-container">
                 <div class="admin-sidebar">
                     <ul class="sidebar-menu">
@@ -7633,10 +4896,11 @@ def admin_edit_product(product_id):
                         <li><a href="{{ url_for('admin_products') }}" class="active"><i class="fas fa-box-open"></i> Products</a></li>
                         <li><a href="{{ url_for('admin_orders') }}"><i class="fas fa-shopping-bag"></i> Orders</a></li>
                         <li><a href="{{ url_for('admin_users') }}"><i class="fas fa-users"></i> Users</a></li>
+                        <li><a href="{{ url_for('admin_analytics') }}"><i class="fas fa-chart-line"></i> Analytics</a></li>
                         <li><a href="{{ url_for('admin_settings') }}"><i class="fas fa-cog"></i> Settings</a></li>
                     </ul>
                 </div>
-                
+
                 <div class="admin-content">
                     <div class="card">
                         <div class="card-header">
@@ -7645,25 +4909,25 @@ def admin_edit_product(product_id):
                                 <i class="fas fa-arrow-left"></i> Back to Products
                             </a>
                         </div>
-                        
+
                         <form method="post">
                             <input type="hidden" name="csrf_token" value="{{ csrf_token() }}">
-                            
+
                             <div class="form-group">
                                 <label for="title">Product Title</label>
                                 <input type="text" id="title" name="title" class="form-control" value="{{ product[1] }}" required>
                             </div>
-                            
+
                             <div class="form-group">
                                 <label for="description">Description</label>
                                 <textarea id="description" name="description" class="form-control" rows="4">{{ product[2] }}</textarea>
                             </div>
-                            
+
                             <div class="form-group">
                                 <label for="price">Price (₹)</label>
                                 <input type="number" id="price" name="price" class="form-control" step="0.01" min="0" value="{{ product[3] }}" required>
                             </div>
-                            
+
                             <div class="form-group">
                                 <label for="image">Main Image URL</label>
                                 <input type="text" id="image" name="image" class="form-control" value="{{ product[4] }}">
@@ -7674,54 +4938,54 @@ def admin_edit_product(product_id):
                                 </div>
                                 {% endif %}
                             </div>
-                            
+
                             <div class="form-group">
                                 <label for="min_quantity">Minimum Quantity</label>
                                 <input type="number" id="min_quantity" name="min_quantity" class="form-control" min="1" value="{{ product[5] }}">
                             </div>
-                            
+
                             <div class="form-group">
                                 <label for="max_quantity">Maximum Quantity</label>
                                 <input type="number" id="max_quantity" name="max_quantity" class="form-control" min="1" value="{{ product[6] }}">
                             </div>
-                            
+
                             <div class="form-group">
                                 <label for="discount">Discount (%)</label>
                                 <input type="number" id="discount" name="discount" class="form-control" min="0" max="100" value="{{ product[7] }}">
                             </div>
-                            
+
                             <div class="form-group">
                                 <label for="rating">Rating (0-5)</label>
                                 <input type="number" id="rating" name="rating" class="form-control" min="0" max="5" step="0.1" value="{{ product[8] }}">
                             </div>
-                            
+
                             <div class="form-group">
                                 <label for="stock">Stock Quantity</label>
                                 <input type="number" id="stock" name="stock" class="form-control" min="0" value="{{ product[9] }}">
                             </div>
-                            
+
                             <div class="form-group">
                                 <label for="images">Additional Images (JSON array)</label>
                                 <textarea id="images" name="images" class="form-control" rows="2">{{ product[10] if product[10] else '[]' }}</textarea>
                                 <small>Enter as JSON array of filenames</small>
                             </div>
-                            
+
                             <div class="form-group">
                                 <label for="youtube_url">YouTube URL</label>
                                 <input type="url" id="youtube_url" name="youtube_url" class="form-control" value="{{ product[11] if product[11] else '' }}" placeholder="https://youtu.be/...">
                             </div>
-                            
+
                             <div class="form-group">
                                 <label for="category">Category</label>
                                 <input type="text" id="category" name="category" class="form-control" value="{{ product[12] if product[12] else '' }}">
                             </div>
-                            
+
                             <div class="form-group">
                                 <label for="tags">Tags (JSON array)</label>
                                 <textarea id="tags" name="tags" class="form-control" rows="2">{{ product[13] if product[13] else '[]' }}</textarea>
                                 <small>Enter as JSON array of tags</small>
                             </div>
-                            
+
                             <div class="text-right">
                                 <button type="submit" class="btn btn-success">
                                     <i class="fas fa-save"></i> Update Product
@@ -7731,8 +4995,7 @@ def admin_edit_product(product_id):
                     </div>
                 </div>
             </div>
-        </body>
-        </html>
+        {% endblock %}
     ''', product=product)
 
 @app.route('/admin/products/delete/<int:product_id>', methods=['POST'])
@@ -7753,6 +5016,7 @@ def admin_delete_product(product_id):
 @admin_required
 def admin_orders():
     status_filter = request.args.get('status', '')
+    next_cursor = prev_cursor = None
     
     try:
         with get_db() as conn:
@@ -7770,280 +5034,19 @@ def admin_orders():
                 query += " WHERE o.status = ?"
                 params.append(status_filter)
             
-            query += " ORDER BY o.order_date DESC"
-            c.execute(query, params)
-            orders = c.fetchall()
+            orders, next_cursor, prev_cursor = keyset_page(
+                c, query, params, ['o.order_date', 'o.id'],
+                after=request.args.get('after'), before=request.args.get('before'))
             
     except Exception as e:
         print(f"Error fetching orders: {e}")
         orders = []
     
-    return render_template_string('''
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <title>Manage Orders - CRONYZO Admin</title>
-            <meta name="viewport" content="width=device-width, initial-scale=1.0">
-            <style>
-                :root {
-            --primary: #4361ee;
-            --primary-dark: #3a0ca3;
-            --accent: #f72585;
-            --light: #f8f9fa;
-            --dark: #212529;
-            --success: #28a745;
-            --danger: #dc3545;
-            --warning: #ffc107;
-            --info: #17a2b8;
-        }
-        
-        body {
-            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-            margin: 0;
-            padding: 0;
-            background: linear-gradient(135deg, #f5f7fa 0%, #e9ecef 100%);
-            color: var(--dark);
-        }
-        
-        .admin-header {
-            background: linear-gradient(135deg, var(--primary) 0%, var(--primary-dark) 100%);
-            color: white;
-            padding: 15px 30px;
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-            box-shadow: 0 4px 20px rgba(0,0,0,0.1);
-            position: sticky;
-            top: 0;
-            z-index: 1000;
-        }
-        
-        .admin-container {
-            display: flex;
-            min-height: calc(100vh - 65px);
-        }
-        
-        .admin-sidebar {
-            width: 280px;
-            background: rgba(255,255,255,0.95);
-            box-shadow: 2px 0 15px rgba(0,0,0,0.05);
-            padding: 25px 0;
-            backdrop-filter: blur(10px);
-            border-right: 1px solid rgba(255,255,255,0.3);
-            transition: all 0.3s ease;
-        }
-        
-        .sidebar-menu {
-            list-style: none;
-            padding: 0;
-            margin: 0;
-        }
-        
-        .sidebar-menu li a {
-            display: flex;
-            align-items: center;
-            padding: 14px 25px;
-            color: var(--dark);
-            text-decoration: none;
-            transition: all 0.3s cubic-bezier(0.25, 0.8, 0.25, 1);
-            font-weight: 500;
-            margin: 5px 15px;
-            border-radius: 8px;
-        }
-        
-        .sidebar-menu li a:hover {
-            background: rgba(67, 97, 238, 0.1);
-            color: var(--primary);
-            transform: translateX(5px);
-        }
-        
-        .sidebar-menu li a.active {
-            background: linear-gradient(135deg, var(--primary) 0%, var(--primary-dark) 100%);
-            color: white;
-            box-shadow: 0 4px 15px rgba(67, 97, 238, 0.3);
-        }
-        
-        .sidebar-menu li a i {
-            margin-right: 12px;
-            width: 20px;
-            text-align: center;
-            font-size: 18px;
-        }
-        
-        .admin-content {
-            flex: 1;
-            padding: 30px;
-        }
-        
-        .card {
-            background: rgba(255,255,255,0.95);
-            border-radius: 12px;
-            padding: 25px;
-            margin-bottom: 25px;
-            box-shadow: 0 10px 20px rgba(0,0,0,0.05);
-            backdrop-filter: blur(10px);
-            border: 1px solid rgba(255,255,255,0.3);
-        }
-        
-        .card-header {
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-            margin-bottom: 25px;
-            padding-bottom: 15px;
-            border-bottom: 1px solid rgba(0,0,0,0.05);
-        }
-        
-        .card-header h2 {
-            margin: 0;
-            font-size: 22px;
-            font-weight: 600;
-            color: var(--primary-dark);
-        }
-        
-        .btn {
-            display: inline-flex;
-            align-items: center;
-            justify-content: center;
-            padding: 10px 20px;
-            background: linear-gradient(135deg, var(--primary) 0%, var(--primary-dark) 100%);
-            color: white;
-            text-decoration: none;
-            border-radius: 8px;
-            font-size: 14px;
-            font-weight: 500;
-            transition: all 0.3s;
-            box-shadow: 0 4px 15px rgba(67, 97, 238, 0.3);
-            border: none;
-            cursor: pointer;
-        }
-        
-        .btn:hover {
-            transform: translateY(-2px);
-            box-shadow: 0 6px 20px rgba(67, 97, 238, 0.4);
-        }
-        
-        .btn-sm {
-            padding: 8px 15px;
-            font-size: 13px;
-            margin-right: 8px;
-        }
-        
-        .btn-danger {
-            background: linear-gradient(135deg, var(--danger) 0%, #c82333 100%);
-            box-shadow: 0 4px 15px rgba(220, 53, 69, 0.3);
-        }
-        
-        .btn-danger:hover {
-            box-shadow: 0 6px 20px rgba(220, 53, 69, 0.4);
-        }
-        
-        .table {
-            width: 100%;
-            border-collapse: separate;
-            border-spacing: 0;
-        }
-        
-        .table th {
-            background: rgba(248, 249, 250, 0.8);
-            font-weight: 600;
-            padding: 15px;
-            text-align: left;
-            border-bottom: 1px solid rgba(0,0,0,0.05);
-        }
-        
-        .table td {
-            padding: 15px;
-            border-bottom: 1px solid rgba(0,0,0,0.05);
-        }
-        
-        .table tr:hover {
-            background: rgba(248, 250, 255, 0.8);
-        }
-        
-        .status-badge {
-            padding: 6px 12px;
-            border-radius: 20px;
-            font-size: 12px;
-            font-weight: 500;
-        }
-        
-        .status-processing {
-            background: rgba(255, 243, 205, 0.8);
-            color: #856404;
-        }
-        
-        .status-completed {
-            background: rgba(212, 237, 218, 0.8);
-            color: #155724;
-        }
-        
-        .status-shipped {
-            background: rgba(204, 229, 255, 0.8);
-            color: #004085;
-        }
-        
-        .status-cancelled {
-            background: rgba(248, 215, 218, 0.8);
-            color: #721c24;
-        }
-        
-        select {
-            padding: 10px 15px;
-            border: 1px solid rgba(0,0,0,0.1);
-            border-radius: 8px;
-            background: rgba(255,255,255,0.8);
-            transition: all 0.3s;
-            font-size: 14px;
-            box-shadow: 0 2px 5px rgba(0,0,0,0.05);
-        }
-        
-        select:focus {
-            outline: none;
-            border-color: var(--primary);
-            box-shadow: 0 0 0 3px rgba(67, 97, 238, 0.2);
-        }
-        
-        @media (max-width: 992px) {
-            .admin-sidebar {
-                width: 220px;
-            }
-        }
-        
-        @media (max-width: 768px) {
-            .admin-container {
-                flex-direction: column;
-            }
-            
-            .admin-sidebar {
-                width: 100%;
-                padding: 15px 0;
-            }
-            
-            .sidebar-menu {
-                display: flex;
-                overflow-x: auto;
-                padding: 0 15px;
-            }
-            
-            .sidebar-menu li {
-                flex: 0 0 auto;
-            }
-            
-            .sidebar-menu li a {
-                margin: 0 5px;
-                padding: 10px 15px;
-            }
-            
-            .table {
-                display: block;
-                overflow-x: auto;
-            }
-        }
-            </style>
-            <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0/css/all.min.css">
-        </head>
-        <body>
+    return render_page('admin_orders', '''
+        {% extends "admin_layout.html" %}
+        {% block title %}Manage Orders - CRONYZO Admin{% endblock %}
+        {% block page_styles %}<link rel="stylesheet" href="{{ asset_url('css/pages/admin_orders.css') }}">{% endblock %}
+        {% block body %}
             <div class="admin-header">
                 <h1>CRONYZO Admin</h1>
                 <div>
@@ -8052,7 +5055,7 @@ def admin_orders():
                     </a>
                 </div>
             </div>
-            
+
             <div class="admin-container">
                 <div class="admin-sidebar">
                     <ul class="sidebar-menu">
@@ -8060,28 +5063,68 @@ def admin_orders():
                         <li><a href="{{ url_for('admin_products') }}"><i class="fas fa-box-open"></i> Products</a></li>
                         <li><a href="{{ url_for('admin_orders') }}" class="active"><i class="fas fa-shopping-bag"></i> Orders</a></li>
                         <li><a href="{{ url_for('admin_users') }}"><i class="fas fa-users"></i> Users</a></li>
+                        <li><a href="{{ url_for('admin_analytics') }}"><i class="fas fa-chart-line"></i> Analytics</a></li>
                         <li><a href="{{ url_for('admin_settings') }}"><i class="fas fa-cog"></i> Settings</a></li>
                     </ul>
                 </div>
-                
+
                 <div class="admin-content">
                     <div class="card">
                         <div class="card-header">
                             <h2>Manage Orders</h2>
                             <div>
-                                <select id="statusFilter" onchange="filterOrders()" style="padding: 8px; border-radius: 4px;">
+                                <select id="statusFilter" onchange="filterOrders()" data-url="{{ url_for('admin_orders') }}" style="padding: 8px; border-radius: 4px;">
                                     <option value="">All Statuses</option>
                                     <option value="Processing" {% if status_filter == "Processing" %}selected{% endif %}>Processing</option>
                                     <option value="Shipped" {% if status_filter == "Shipped" %}selected{% endif %}>Shipped</option>
                                     <option value="Completed" {% if status_filter == "Completed" %}selected{% endif %}>Completed</option>
                                     <option value="Cancelled" {% if status_filter == "Cancelled" %}selected{% endif %}>Cancelled</option>
                                 </select>
+                                <a href="{{ url_for('admin_export', dataset='orders', fmt='csv', status=status_filter or None) }}" class="btn btn-sm">
+                                    <i class="fas fa-file-csv"></i> CSV
+                                </a>
+                                <a href="{{ url_for('admin_export', dataset='orders', fmt='jsonl', status=status_filter or None) }}" class="btn btn-sm">
+                                    <i class="fas fa-file-code"></i> JSONL
+                                </a>
                             </div>
                         </div>
-                        
+
+                        {% if message %}
+                        <div class="alert alert-success">
+                            <i class="fas fa-check-circle"></i> {{ message }}
+                        </div>
+                        {% endif %}
+                        {% if error %}
+                        <div class="alert alert-danger">
+                            <i class="fas fa-exclamation-circle"></i> {{ error }}
+                        </div>
+                        {% endif %}
+
+                        <form method="post" action="{{ url_for('admin_bulk_order_status') }}" id="bulkForm" class="bulk-actions"
+                              onsubmit="return confirmBulkUpdate()">
+                            <input type="hidden" name="csrf_token" value="{{ csrf_token() }}">
+                            <input type="hidden" name="filter_status" value="{{ status_filter }}">
+                            <select name="status" required>
+                                <option value="">Set status...</option>
+                                {% for status in statuses %}
+                                <option value="{{ status }}">{{ status }}</option>
+                                {% endfor %}
+                            </select>
+                            <select name="scope" id="bulkScope" onchange="toggleBulkDates()">
+                                <option value="selected">Selected orders</option>
+                                <option value="filter">All {{ status_filter or '' }} orders in date range</option>
+                            </select>
+                            <input type="date" name="start" class="bulk-date" disabled>
+                            <input type="date" name="end" class="bulk-date" disabled>
+                            <button type="submit" class="btn btn-sm">
+                                <i class="fas fa-check-double"></i> Apply
+                            </button>
+                        </form>
+
                         <table class="table">
                             <thead>
                                 <tr>
+                                    <th><input type="checkbox" id="selectAll" onchange="toggleAll(this)"></th>
                                     <th>Order ID</th>
                                     <th>Date</th>
                                     <th>Customer</th>
@@ -8094,6 +5137,7 @@ def admin_orders():
                             <tbody>
                                 {% for order in orders %}
                                 <tr>
+                                    <td><input type="checkbox" name="order_ids" value="{{ order[0] }}" form="bulkForm" class="order-select"></td>
                                     <td>#{{ order[0] }}</td>
                                     <td>{{ order[1] }}</td>
                                     <td>{{ order[5] or 'Guest' }} ({{ order[6] }})</td>
@@ -8116,23 +5160,120 @@ def admin_orders():
                                 {% endfor %}
                             </tbody>
                         </table>
+
+                        {% if prev_cursor or next_cursor %}
+                        <div class="pagination">
+                            {% if prev_cursor %}
+                            <a href="{{ url_for('admin_orders', status=status_filter, before=prev_cursor) }}" class="btn btn-sm">
+                                <i class="fas fa-chevron-left"></i> Newer
+                            </a>
+                            {% endif %}
+                            {% if next_cursor %}
+                            <a href="{{ url_for('admin_orders', status=status_filter, after=next_cursor) }}" class="btn btn-sm">
+                                Older <i class="fas fa-chevron-right"></i>
+                            </a>
+                            {% endif %}
+                        </div>
+                        {% endif %}
                     </div>
                 </div>
             </div>
-            
-            <script>
-                function filterOrders() {
-                    const status = document.getElementById('statusFilter').value;
-                    let url = "{{ url_for('admin_orders') }}";
-                    if (status) {
-                        url += "?status=" + status;
-                    }
-                    window.location.href = url;
-                }
-            </script>
-        </body>
-        </html>
-    ''', orders=orders, status_filter=status_filter)
+        {% endblock %}
+    ''', orders=orders, status_filter=status_filter,
+       next_cursor=next_cursor, prev_cursor=prev_cursor, statuses=ORDER_STATUSES,
+       message=request.args.get('message'), error=request.args.get('error'))
+
+def bulk_update_order_status(c, status, order_ids=None, from_status=None, start=None, end=None, can_cancel=None):
+    """Move many orders to ``status`` with one UPDATE and return their ids.
+
+    Matches ``order_ids`` (when given) and whichever of the ``from_status``,
+    ``start`` and ``end`` filters are set. Orders already in ``status`` are
+    left alone; cancelling returns reserved stock like admin_edit_order does.
+    Cancelled orders are skipped: their stock was already released, and
+    admin_edit_order reopens one by reserving it again.
+    """
+    conditions, params = ["status IS NOT ?", "status IS NOT 'Cancelled'"], [status]
+    if order_ids is not None:
+        # One bound JSON array instead of a placeholder per id
+        conditions.append("id IN (SELECT value FROM json_each(?))")
+        params.append(json.dumps(order_ids))
+    if from_status:
+        conditions.append("status = ?")
+        params.append(from_status)
+    if start:
+        conditions.append("order_date >= ?")
+        params.append(start.isoformat())
+    if end:
+        conditions.append("order_date < ?")
+        params.append((end + timedelta(days=1)).isoformat())
+    
+    assignments, values = ["status = ?"], [status]
+    if can_cancel is not None:
+        assignments.append("can_cancel = ?")
+        values.append(1 if can_cancel else 0)
+    
+    c.execute(f"UPDATE orders SET {', '.join(assignments)} WHERE {' AND '.join(conditions)} RETURNING id",
+              values + params)
+    updated = [row[0] for row in c.fetchall()]
+    
+    if status == 'Cancelled':
+        for i in range(0, len(updated), 500):
+            release_stock(c, updated[i:i + 500])
+    return updated
+
+@app.route('/admin/orders/bulk-status', methods=['POST'])
+@admin_required
+def admin_bulk_order_status():
+    # JSON for API clients, a form post (redirecting back) from admin_orders
+    data = (request.get_json(silent=True) or {}) if request.is_json else request.form
+    filter_status = data.get('filter_status') if data.get('filter_status') in ORDER_STATUSES else None
+    
+    def respond(code=200, **result):
+        if request.is_json:
+            return jsonify(result), code
+        message = result.get('error') or f"{result['updated']} order(s) marked {result['status']}"
+        return redirect(url_for('admin_orders', status=filter_status,
+                                **{'error' if 'error' in result else 'message': message}))
+    
+    try:
+        status = data.get('status')
+        if status not in ORDER_STATUSES:
+            raise ValueError("Unknown status")
+        
+        order_ids = None
+        if request.is_json:
+            order_ids = data.get('order_ids')
+        elif data.get('scope', 'selected') == 'selected':
+            order_ids = data.getlist('order_ids')
+        if order_ids is not None:
+            if not isinstance(order_ids, list) or not order_ids:
+                raise ValueError("No orders selected")
+            if not all(str(order_id).isdigit() for order_id in order_ids):
+                raise ValueError("order_ids must be order numbers")
+            order_ids = [int(order_id) for order_id in order_ids]
+        
+        start = parse_date_arg(data.get('start'))
+        end = parse_date_arg(data.get('end'))
+        if order_ids is None and not (filter_status or start or end):
+            # Refuse to touch every order in the shop by accident
+            raise ValueError("Select orders or give a status or date range")
+        
+        can_cancel = data.get('can_cancel')
+        if can_cancel is not None and not isinstance(can_cancel, bool):
+            can_cancel = str(can_cancel).lower() in ('1', 'true', 'on', 'yes')
+        
+        with get_db() as conn:
+            c = conn.cursor()
+            with transaction(conn):
+                updated = bulk_update_order_status(c, status, order_ids=order_ids, from_status=filter_status,
+                                                   start=start, end=end, can_cancel=can_cancel)
+    except ValueError as e:
+        return respond(400, error=str(e))
+    except Exception as e:
+        print(f"Error updating orders: {e}")
+        return respond(500, error="Error updating orders")
+    
+    return respond(status=status, updated=len(updated), order_ids=updated)
 
 @app.route('/admin/orders/<int:order_id>')
 @admin_required
@@ -8156,296 +5297,11 @@ def admin_order_detail(order_id):
         print(f"Error fetching order: {e}")
         return "Error fetching order details", 500
     
-    return render_template_string('''
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <title>Order Details - CRONYZO Admin</title>
-            <meta name="viewport" content="width=device-width, initial-scale=1.0">
-            <style>
-                :root {
-            --primary: #4361ee;
-            --primary-dark: #3a0ca3;
-            --accent: #f72585;
-            --light: #f8f9fa;
-            --dark: #212529;
-            --success: #28a745;
-            --danger: #dc3545;
-            --warning: #ffc107;
-            --info: #17a2b8;
-        }
-        
-        body {
-            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-            margin: 0;
-            padding: 0;
-            background: linear-gradient(135deg, #f5f7fa 0%, #e9ecef 100%);
-            color: var(--dark);
-        }
-        
-        .admin-header {
-            background: linear-gradient(135deg, var(--primary) 0%, var(--primary-dark) 100%);
-            color: white;
-            padding: 15px 30px;
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-            box-shadow: 0 4px 20px rgba(0,0,0,0.1);
-            position: sticky;
-            top: 0;
-            z-index: 1000;
-        }
-        
-        .admin-container {
-            display: flex;
-            min-height: calc(100vh - 65px);
-        }
-        
-        .admin-sidebar {
-            width: 280px;
-            background: rgba(255,255,255,0.95);
-            box-shadow: 2px 0 15px rgba(0,0,0,0.05);
-            padding: 25px 0;
-            backdrop-filter: blur(10px);
-            border-right: 1px solid rgba(255,255,255,0.3);
-            transition: all 0.3s ease;
-        }
-        
-        .sidebar-menu {
-            list-style: none;
-            padding: 0;
-            margin: 0;
-        }
-        
-        .sidebar-menu li a {
-            display: flex;
-            align-items: center;
-            padding: 14px 25px;
-            color: var(--dark);
-            text-decoration: none;
-            transition: all 0.3s cubic-bezier(0.25, 0.8, 0.25, 1);
-            font-weight: 500;
-            margin: 5px 15px;
-            border-radius: 8px;
-        }
-        
-        .sidebar-menu li a:hover {
-            background: rgba(67, 97, 238, 0.1);
-            color: var(--primary);
-            transform: translateX(5px);
-        }
-        
-        .sidebar-menu li a.active {
-            background: linear-gradient(135deg, var(--primary) 0%, var(--primary-dark) 100%);
-            color: white;
-            box-shadow: 0 4px 15px rgba(67, 97, 238, 0.3);
-        }
-        
-        .sidebar-menu li a i {
-            margin-right: 12px;
-            width: 20px;
-            text-align: center;
-            font-size: 18px;
-        }
-        
-        .admin-content {
-            flex: 1;
-            padding: 30px;
-        }
-        
-        .card {
-            background: rgba(255,255,255,0.95);
-            border-radius: 12px;
-            padding: 25px;
-            margin-bottom: 25px;
-            box-shadow: 0 10px 20px rgba(0,0,0,0.05);
-            backdrop-filter: blur(10px);
-            border: 1px solid rgba(255,255,255,0.3);
-        }
-        
-        .card-header {
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-            margin-bottom: 25px;
-            padding-bottom: 15px;
-            border-bottom: 1px solid rgba(0,0,0,0.05);
-        }
-        
-        .card-header h2 {
-            margin: 0;
-            font-size: 22px;
-            font-weight: 600;
-            color: var(--primary-dark);
-        }
-        
-        .btn {
-            display: inline-flex;
-            align-items: center;
-            justify-content: center;
-            padding: 10px 20px;
-            background: linear-gradient(135deg, var(--primary) 0%, var(--primary-dark) 100%);
-            color: white;
-            text-decoration: none;
-            border-radius: 8px;
-            font-size: 14px;
-            font-weight: 500;
-            transition: all 0.3s;
-            box-shadow: 0 4px 15px rgba(67, 97, 238, 0.3);
-            border: none;
-            cursor: pointer;
-        }
-        
-        .btn:hover {
-            transform: translateY(-2px);
-            box-shadow: 0 6px 20px rgba(67, 97, 238, 0.4);
-        }
-        
-        .btn-sm {
-            padding: 8px 15px;
-            font-size: 13px;
-            margin-right: 8px;
-        }
-        
-        .btn-danger {
-            background: linear-gradient(135deg, var(--danger) 0%, #c82333 100%);
-            box-shadow: 0 4px 15px rgba(220, 53, 69, 0.3);
-        }
-        
-        .btn-danger:hover {
-            box-shadow: 0 6px 20px rgba(220, 53, 69, 0.4);
-        }
-        
-        .status-badge {
-            padding: 6px 12px;
-            border-radius: 20px;
-            font-size: 12px;
-            font-weight: 500;
-        }
-        
-        .status-processing {
-            background: rgba(255, 243, 205, 0.8);
-            color: #856404;
-        }
-        
-        .status-completed {
-            background: rgba(212, 237, 218, 0.8);
-            color: #155724;
-        }
-        
-        .status-shipped {
-            background: rgba(204, 229, 255, 0.8);
-            color: #004085;
-        }
-        
-        .status-cancelled {
-            background: rgba(248, 215, 218, 0.8);
-            color: #721c24;
-        }
-        
-        .order-details {
-            display: grid;
-            grid-template-columns: 1fr 1fr;
-            gap: 30px;
-        }
-        
-        .order-section {
-            margin-bottom: 25px;
-            background: rgba(248, 249, 250, 0.5);
-            padding: 20px;
-            border-radius: 10px;
-            box-shadow: 0 2px 10px rgba(0,0,0,0.03);
-        }
-        
-        .order-section h3 {
-            margin-top: 0;
-            margin-bottom: 15px;
-            padding-bottom: 10px;
-            border-bottom: 1px solid rgba(0,0,0,0.05);
-            color: var(--primary-dark);
-            font-size: 18px;
-        }
-        
-        .detail-row {
-            display: flex;
-            margin-bottom: 12px;
-            padding-bottom: 12px;
-            border-bottom: 1px solid rgba(0,0,0,0.03);
-        }
-        
-        .detail-label {
-            font-weight: 600;
-            width: 150px;
-            color: #555;
-        }
-        
-        .items-list {
-            list-style: none;
-            padding: 0;
-            margin: 0;
-        }
-        
-        .items-list li {
-            padding: 12px 0;
-            border-bottom: 1px solid rgba(0,0,0,0.05);
-            display: flex;
-            justify-content: space-between;
-        }
-        
-        @media (max-width: 992px) {
-            .admin-sidebar {
-                width: 220px;
-            }
-            
-            .order-details {
-                grid-template-columns: 1fr;
-            }
-        }
-        
-        @media (max-width: 768px) {
-            .admin-container {
-                flex-direction: column;
-            }
-            
-            .admin-sidebar {
-                width: 100%;
-                padding: 15px 0;
-            }
-            
-            .sidebar-menu {
-                display: flex;
-                overflow-x: auto;
-                padding: 0 15px;
-            }
-            
-            .sidebar-menu li {
-                flex: 0 0 auto;
-            }
-            
-            .sidebar-menu li a {
-                margin: 0 5px;
-                padding: 10px 15px;
-            }
-            
-            .card-header {
-                flex-direction: column;
-                align-items: flex-start;
-                gap: 15px;
-            }
-            
-            .detail-row {
-                flex-direction: column;
-                gap: 5px;
-            }
-            
-            .detail-label {
-                width: 100%;
-            }
-        }
-            </style>
-            <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0/css/all.min.css">
-        </head>
-        <body>
+    return render_page('admin_order_detail', '''
+        {% extends "admin_layout.html" %}
+        {% block title %}Order Details - CRONYZO Admin{% endblock %}
+        {% block page_styles %}<link rel="stylesheet" href="{{ asset_url('css/pages/admin_order_detail.css') }}">{% endblock %}
+        {% block body %}
             <div class="admin-header">
                 <h1>CRONYZO Admin</h1>
                 <div>
@@ -8454,7 +5310,7 @@ def admin_order_detail(order_id):
                     </a>
                 </div>
             </div>
-            
+
             <div class="admin-container">
                 <div class="admin-sidebar">
                     <ul class="sidebar-menu">
@@ -8462,10 +5318,11 @@ def admin_order_detail(order_id):
                         <li><a href="{{ url_for('admin_products') }}"><i class="fas fa-box-open"></i> Products</a></li>
                         <li><a href="{{ url_for('admin_orders') }}" class="active"><i class="fas fa-shopping-bag"></i> Orders</a></li>
                         <li><a href="{{ url_for('admin_users') }}"><i class="fas fa-users"></i> Users</a></li>
+                        <li><a href="{{ url_for('admin_analytics') }}"><i class="fas fa-chart-line"></i> Analytics</a></li>
                         <li><a href="{{ url_for('admin_settings') }}"><i class="fas fa-cog"></i> Settings</a></li>
                     </ul>
                 </div>
-                
+
                 <div class="admin-content">
                     <div class="card">
                         <div class="card-header">
@@ -8479,7 +5336,7 @@ def admin_order_detail(order_id):
                                 </a>
                             </div>
                         </div>
-                        
+
                         <div class="order-details">
                             <div>
                                 <div class="order-section">
@@ -8503,7 +5360,7 @@ def admin_order_detail(order_id):
                                         <span>{{ "Yes" if order[15] else "No" }}</span>
                                     </div>
                                 </div>
-                                
+
                                 <div class="order-section">
                                     <h3>Customer Information</h3>
                                     <div class="detail-row">
@@ -8519,7 +5376,7 @@ def admin_order_detail(order_id):
                                         <span>{{ order[17] or 'Not provided' }}</span>
                                     </div>
                                 </div>
-                                
+
                                 <div class="order-section">
                                     <h3>Shipping Information</h3>
                                     <div class="detail-row">
@@ -8536,7 +5393,7 @@ def admin_order_detail(order_id):
                                     </div>
                                 </div>
                             </div>
-                            
+
                             <div>
                                 <div class="order-section">
                                     <h3>Order Summary</h3>
@@ -8561,7 +5418,7 @@ def admin_order_detail(order_id):
                                         <span>₹{{ "{:,.2f}".format(order[10] - order[11]) }}</span>
                                     </div>
                                 </div>
-                                
+
                                 <div class="order-section">
                                     <h3>Order Items</h3>
                                     <ul class="items-list">
@@ -8575,8 +5432,7 @@ def admin_order_detail(order_id):
                     </div>
                 </div>
             </div>
-        </body>
-        </html>
+        {% endblock %}
     ''', order=order)
 
 @app.route('/admin/orders/edit/<int:order_id>', methods=['GET', 'POST'])
@@ -8585,19 +5441,30 @@ def admin_edit_order(order_id):
     try:
         with get_db() as conn:
             c = conn.cursor()
+            error = None
             
             if request.method == 'POST':
                 status = request.form['status']
                 can_cancel = 1 if request.form.get('can_cancel') else 0
                 
-                c.execute("""
-                    UPDATE orders SET 
-                    status = ?, can_cancel = ?
-                    WHERE id = ?
-                """, (status, can_cancel, order_id))
-                conn.commit()
-                
-                return redirect(url_for('admin_order_detail', order_id=order_id))
+                try:
+                    with transaction(conn):
+                        c.execute("SELECT status FROM orders WHERE id = ?", (order_id,))
+                        current = c.fetchone()
+                        if current and current[0] == 'Cancelled' and status != 'Cancelled':
+                            # Cancelling gave the stock back, so reopening takes it again
+                            reserve_order_stock(c, order_id)
+                        c.execute("""
+                            UPDATE orders SET 
+                            status = ?, can_cancel = ?
+                            WHERE id = ?
+                        """, (status, can_cancel, order_id))
+                        if status == 'Cancelled':
+                            release_stock(c, [order_id])
+                    
+                    return redirect(url_for('admin_order_detail', order_id=order_id))
+                except OutOfStock as e:
+                    error = f"This order cannot be reopened: {e}"
             
             c.execute("""
                 SELECT o.*, u.name, u.email, u.phone, u.address, u.state, u.city
@@ -8614,257 +5481,11 @@ def admin_edit_order(order_id):
         print(f"Error editing order: {e}")
         return "Error editing order", 500
     
-    return render_template_string('''
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <title>Edit Order - CRONYZO Admin</title>
-            <meta name="viewport" content="width=device-width, initial-scale=1.0">
-            <style>
-                :root {
-            --primary: #4361ee;
-            --primary-dark: #3a0ca3;
-            --accent: #f72585;
-            --light: #f8f9fa;
-            --dark: #212529;
-            --success: #28a745;
-            --danger: #dc3545;
-            --warning: #ffc107;
-            --info: #17a2b8;
-        }
-        
-        body {
-            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-            margin: 0;
-            padding: 0;
-            background: linear-gradient(135deg, #f5f7fa 0%, #e9ecef 100%);
-            color: var(--dark);
-        }
-        
-        .admin-header {
-            background: linear-gradient(135deg, var(--primary) 0%, var(--primary-dark) 100%);
-            color: white;
-            padding: 15px 30px;
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-            box-shadow: 0 4px 20px rgba(0,0,0,0.1);
-            position: sticky;
-            top: 0;
-            z-index: 1000;
-        }
-        
-        .admin-container {
-            display: flex;
-            min-height: calc(100vh - 65px);
-        }
-        
-        .admin-sidebar {
-            width: 280px;
-            background: rgba(255,255,255,0.95);
-            box-shadow: 2px 0 15px rgba(0,0,0,0.05);
-            padding: 25px 0;
-            backdrop-filter: blur(10px);
-            border-right: 1px solid rgba(255,255,255,0.3);
-            transition: all 0.3s ease;
-        }
-        
-        .sidebar-menu {
-            list-style: none;
-            padding: 0;
-            margin: 0;
-        }
-        
-        .sidebar-menu li a {
-            display: flex;
-            align-items: center;
-            padding: 14px 25px;
-            color: var(--dark);
-            text-decoration: none;
-            transition: all 0.3s cubic-bezier(0.25, 0.8, 0.25, 1);
-            font-weight: 500;
-            margin: 5px 15px;
-            border-radius: 8px;
-        }
-        
-        .sidebar-menu li a:hover {
-            background: rgba(67, 97, 238, 0.1);
-            color: var(--primary);
-            transform: translateX(5px);
-        }
-        
-        .sidebar-menu li a.active {
-            background: linear-gradient(135deg, var(--primary) 0%, var(--primary-dark) 100%);
-            color: white;
-            box-shadow: 0 4px 15px rgba(67, 97, 238, 0.3);
-        }
-        
-        .sidebar-menu li a i {
-            margin-right: 12px;
-            width: 20px;
-            text-align: center;
-            font-size: 18px;
-        }
-        
-        .admin-content {
-            flex: 1;
-            padding: 30px;
-        }
-        
-        .card {
-            background: rgba(255,255,255,0.95);
-            border-radius: 12px;
-            padding: 25px;
-            margin-bottom: 25px;
-            box-shadow: 0 10px 20px rgba(0,0,0,0.05);
-            backdrop-filter: blur(10px);
-            border: 1px solid rgba(255,255,255,0.3);
-        }
-        
-        .card-header {
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-            margin-bottom: 25px;
-            padding-bottom: 15px;
-            border-bottom: 1px solid rgba(0,0,0,0.05);
-        }
-        
-        .card-header h2 {
-            margin: 0;
-            font-size: 22px;
-            font-weight: 600;
-            color: var(--primary-dark);
-        }
-        
-        .btn {
-            display: inline-flex;
-            align-items: center;
-            justify-content: center;
-            padding: 10px 20px;
-            background: linear-gradient(135deg, var(--primary) 0%, var(--primary-dark) 100%);
-            color: white;
-            text-decoration: none;
-            border-radius: 8px;
-            font-size: 14px;
-            font-weight: 500;
-            transition: all 0.3s;
-            box-shadow: 0 4px 15px rgba(67, 97, 238, 0.3);
-            border: none;
-            cursor: pointer;
-        }
-        
-        .btn:hover {
-            transform: translateY(-2px);
-            box-shadow: 0 6px 20px rgba(67, 97, 238, 0.4);
-        }
-        
-        .btn-sm {
-            padding: 8px 15px;
-            font-size: 13px;
-        }
-        
-        .btn-danger {
-            background: linear-gradient(135deg, var(--danger) 0%, #c82333 100%);
-            box-shadow: 0 4px 15px rgba(220, 53, 69, 0.3);
-        }
-        
-        .btn-danger:hover {
-            box-shadow: 0 6px 20px rgba(220, 53, 69, 0.4);
-        }
-        
-        .btn-success {
-            background: linear-gradient(135deg, var(--success) 0%, #1e7e34 100%);
-            box-shadow: 0 4px 15px rgba(40, 167, 69, 0.3);
-        }
-        
-        .btn-success:hover {
-            box-shadow: 0 6px 20px rgba(40, 167, 69, 0.4);
-        }
-        
-        .form-group {
-            margin-bottom: 20px;
-        }
-        
-        .form-group label {
-            display: block;
-            margin-bottom: 8px;
-            font-weight: 600;
-        }
-        
-        .form-control, .form-select {
-            width: 100%;
-            padding: 12px 15px;
-            border: 1px solid rgba(0,0,0,0.1);
-            border-radius: 8px;
-            background: rgba(255,255,255,0.8);
-            transition: all 0.3s;
-        }
-        
-        .form-control:focus, .form-select:focus {
-            outline: none;
-            border-color: var(--primary);
-            box-shadow: 0 0 0 3px rgba(67, 97, 238, 0.2);
-        }
-        
-        input[type="checkbox"] {
-            width: 18px;
-            height: 18px;
-            margin-right: 10px;
-            accent-color: var(--primary);
-        }
-        
-        .form-group label {
-            display: flex;
-            align-items: center;
-            cursor: pointer;
-        }
-        
-        .text-right {
-            text-align: right;
-        }
-        
-        @media (max-width: 992px) {
-            .admin-sidebar {
-                width: 220px;
-            }
-        }
-        
-        @media (max-width: 768px) {
-            .admin-container {
-                flex-direction: column;
-            }
-            
-            .admin-sidebar {
-                width: 100%;
-                padding: 15px 0;
-            }
-            
-            .sidebar-menu {
-                display: flex;
-                overflow-x: auto;
-                padding: 0 15px;
-            }
-            
-            .sidebar-menu li {
-                flex: 0 0 auto;
-            }
-            
-            .sidebar-menu li a {
-                margin: 0 5px;
-                padding: 10px 15px;
-            }
-            
-            .card-header {
-                flex-direction: column;
-                align-items: flex-start;
-                gap: 15px;
-            }
-        }
-            </style>
-            <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0/css/all.min.css">
-        </head>
-        <body>
+    return render_page('admin_edit_order', '''
+        {% extends "admin_layout.html" %}
+        {% block title %}Edit Order - CRONYZO Admin{% endblock %}
+        {% block page_styles %}<link rel="stylesheet" href="{{ asset_url('css/pages/admin_edit_order.css') }}">{% endblock %}
+        {% block body %}
             <div class="admin-header">
                 <h1>CRONYZO Admin</h1>
                 <div>
@@ -8873,7 +5494,7 @@ def admin_edit_order(order_id):
                     </a>
                 </div>
             </div>
-            
+
             <div class="admin-container">
                 <div class="admin-sidebar">
                     <ul class="sidebar-menu">
@@ -8881,10 +5502,11 @@ def admin_edit_order(order_id):
                         <li><a href="{{ url_for('admin_products') }}"><i class="fas fa-box-open"></i> Products</a></li>
                         <li><a href="{{ url_for('admin_orders') }}" class="active"><i class="fas fa-shopping-bag"></i> Orders</a></li>
                         <li><a href="{{ url_for('admin_users') }}"><i class="fas fa-users"></i> Users</a></li>
+                        <li><a href="{{ url_for('admin_analytics') }}"><i class="fas fa-chart-line"></i> Analytics</a></li>
                         <li><a href="{{ url_for('admin_settings') }}"><i class="fas fa-cog"></i> Settings</a></li>
                     </ul>
                 </div>
-                
+
                 <div class="admin-content">
                     <div class="card">
                         <div class="card-header">
@@ -8895,10 +5517,16 @@ def admin_edit_order(order_id):
                                 </a>
                             </div>
                         </div>
-                        
+
+                        {% if error %}
+                        <div class="alert alert-danger">
+                            <i class="fas fa-exclamation-circle"></i> {{ error }}
+                        </div>
+                        {% endif %}
+
                         <form method="post">
                             <input type="hidden" name="csrf_token" value="{{ csrf_token() }}">
-                            
+
                             <div class="form-group">
                                 <label for="status">Order Status</label>
                                 <select id="status" name="status" class="form-select">
@@ -8908,14 +5536,14 @@ def admin_edit_order(order_id):
                                     <option value="Cancelled" {% if order[14] == "Cancelled" %}selected{% endif %}>Cancelled</option>
                                 </select>
                             </div>
-                            
+
                             <div class="form-group">
                                 <label>
                                     <input type="checkbox" name="can_cancel" {% if order[15] %}checked{% endif %}>
                                     Allow customer to cancel this order
                                 </label>
                             </div>
-                            
+
                             <div class="text-right">
                                 <button type="submit" class="btn btn-success">
                                     <i class="fas fa-save"></i> Update Order
@@ -8925,290 +5553,39 @@ def admin_edit_order(order_id):
                     </div>
                 </div>
             </div>
-        </body>
-        </html>
-    ''', order=order)
+        {% endblock %}
+    ''', order=order, error=error)
 
 @app.route('/admin/users')
 @admin_required
 def admin_users():
     search_query = request.args.get('search', '')
+    next_cursor = prev_cursor = None
     
     try:
         with get_db() as conn:
             c = conn.cursor()
             
+            query = "SELECT * FROM users"
+            params = []
+            
             if search_query:
-                c.execute("""
-                    SELECT * FROM users 
-                    WHERE phone LIKE ? OR name LIKE ? OR email LIKE ?
-                    ORDER BY created_at DESC
-                """, (f"%{search_query}%", f"%{search_query}%", f"%{search_query}%"))
-            else:
-                c.execute("SELECT * FROM users ORDER BY created_at DESC")
+                query += " WHERE (phone LIKE ? OR name LIKE ? OR email LIKE ?)"
+                params.extend([f"%{search_query}%", f"%{search_query}%", f"%{search_query}%"])
             
-            users = c.fetchall()
+            users, next_cursor, prev_cursor = keyset_page(
+                c, query, params, ['created_at', 'id'],
+                after=request.args.get('after'), before=request.args.get('before'))
             
     except Exception as e:
         print(f"Error fetching users: {e}")
         users = []
     
-    return render_template_string('''
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <title>Manage Users - CRONYZO Admin</title>
-            <meta name="viewport" content="width=device-width, initial-scale=1.0">
-            <style>
-               :root {
-            --primary: #4361ee;
-            --primary-dark: #3a0ca3;
-            --accent: #f72585;
-            --light: #f8f9fa;
-            --dark: #212529;
-            --success: #28a745;
-            --danger: #dc3545;
-            --warning: #ffc107;
-            --info: #17a2b8;
-        }
-        
-        body {
-            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-            margin: 0;
-            padding: 0;
-            background: linear-gradient(135deg, #f5f7fa 0%, #e9ecef 100%);
-            color: var(--dark);
-        }
-        
-        .admin-header {
-            background: linear-gradient(135deg, var(--primary) 0%, var(--primary-dark) 100%);
-            color: white;
-            padding: 15px 30px;
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-            box-shadow: 0 4px 20px rgba(0,0,0,0.1);
-            position: sticky;
-            top: 0;
-            z-index: 1000;
-        }
-        
-        .admin-container {
-            display: flex;
-            min-height: calc(100vh - 65px);
-        }
-        
-        .admin-sidebar {
-            width: 280px;
-            background: rgba(255,255,255,0.95);
-            box-shadow: 2px 0 15px rgba(0,0,0,0.05);
-            padding: 25px 0;
-            backdrop-filter: blur(10px);
-            border-right: 1px solid rgba(255,255,255,0.3);
-            transition: all 0.3s ease;
-        }
-        
-        .sidebar-menu {
-            list-style: none;
-            padding: 0;
-            margin: 0;
-        }
-        
-        .sidebar-menu li a {
-            display: flex;
-            align-items: center;
-            padding: 14px 25px;
-            color: var(--dark);
-            text-decoration: none;
-            transition: all 0.3s cubic-bezier(0.25, 0.8, 0.25, 1);
-            font-weight: 500;
-            margin: 5px 15px;
-            border-radius: 8px;
-        }
-        
-        .sidebar-menu li a:hover {
-            background: rgba(67, 97, 238, 0.1);
-            color: var(--primary);
-            transform: translateX(5px);
-        }
-        
-        .sidebar-menu li a.active {
-            background: linear-gradient(135deg, var(--primary) 0%, var(--primary-dark) 100%);
-            color: white;
-            box-shadow: 0 4px 15px rgba(67, 97, 238, 0.3);
-        }
-        
-        .sidebar-menu li a i {
-            margin-right: 12px;
-            width: 20px;
-            text-align: center;
-            font-size: 18px;
-        }
-        
-        .admin-content {
-            flex: 1;
-            padding: 30px;
-        }
-        
-        .card {
-            background: rgba(255,255,255,0.95);
-            border-radius: 12px;
-            padding: 25px;
-            margin-bottom: 25px;
-            box-shadow: 0 10px 20px rgba(0,0,0,0.05);
-            backdrop-filter: blur(10px);
-            border: 1px solid rgba(255,255,255,0.3);
-        }
-        
-        .card-header {
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-            margin-bottom: 25px;
-            padding-bottom: 15px;
-            border-bottom: 1px solid rgba(0,0,0,0.05);
-            flex-wrap: wrap;
-            gap: 15px;
-        }
-        
-        .card-header h2 {
-            margin: 0;
-            font-size: 22px;
-            font-weight: 600;
-            color: var(--primary-dark);
-        }
-        
-        .btn {
-            display: inline-flex;
-            align-items: center;
-            justify-content: center;
-            padding: 10px 20px;
-            background: linear-gradient(135deg, var(--primary) 0%, var(--primary-dark) 100%);
-            color: white;
-            text-decoration: none;
-            border-radius: 8px;
-            font-size: 14px;
-            font-weight: 500;
-            transition: all 0.3s;
-            box-shadow: 0 4px 15px rgba(67, 97, 238, 0.3);
-            border: none;
-            cursor: pointer;
-        }
-        
-        .btn:hover {
-            transform: translateY(-2px);
-            box-shadow: 0 6px 20px rgba(67, 97, 238, 0.4);
-        }
-        
-        .btn-sm {
-            padding: 8px 15px;
-            font-size: 13px;
-        }
-        
-        .btn-danger {
-            background: linear-gradient(135deg, var(--danger) 0%, #c82333 100%);
-            box-shadow: 0 4px 15px rgba(220, 53, 69, 0.3);
-        }
-        
-        .btn-danger:hover {
-            box-shadow: 0 6px 20px rgba(220, 53, 69, 0.4);
-        }
-        
-        .table {
-            width: 100%;
-            border-collapse: separate;
-            border-spacing: 0;
-        }
-        
-        .table th {
-            background: rgba(248, 249, 250, 0.8);
-            font-weight: 600;
-            padding: 15px;
-            text-align: left;
-            border-bottom: 1px solid rgba(0,0,0,0.05);
-        }
-        
-        .table td {
-            padding: 15px;
-            border-bottom: 1px solid rgba(0,0,0,0.05);
-        }
-        
-        .table tr:hover {
-            background: rgba(248, 250, 255, 0.8);
-        }
-        
-        .search-form {
-            display: flex;
-            gap: 10px;
-            flex: 1;
-            min-width: 300px;
-            max-width: 600px;
-        }
-        
-        .search-form input[type="text"] {
-            flex: 1;
-            padding: 10px 15px;
-            border: 1px solid rgba(0,0,0,0.1);
-            border-radius: 8px;
-            background: rgba(255,255,255,0.8);
-            transition: all 0.3s;
-        }
-        
-        .search-form input[type="text"]:focus {
-            outline: none;
-            border-color: var(--primary);
-            box-shadow: 0 0 0 3px rgba(67, 97, 238, 0.2);
-        }
-        
-        @media (max-width: 992px) {
-            .admin-sidebar {
-                width: 220px;
-            }
-        }
-        
-        @media (max-width: 768px) {
-            .admin-container {
-                flex-direction: column;
-            }
-            
-            .admin-sidebar {
-                width: 100%;
-                padding: 15px 0;
-            }
-            
-            .sidebar-menu {
-                display: flex;
-                overflow-x: auto;
-                padding: 0 15px;
-            }
-            
-            .sidebar-menu li {
-                flex: 0 0 auto;
-            }
-            
-            .sidebar-menu li a {
-                margin: 0 5px;
-                padding: 10px 15px;
-            }
-            
-            .table {
-                display: block;
-                overflow-x: auto;
-            }
-            
-            .card-header {
-                flex-direction: column;
-                align-items: stretch;
-            }
-            
-            .search-form {
-                width: 100%;
-            }
-        }
-            </style>
-            <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0/css/all.min.css">
-        </head>
-        <body>
+    return render_page('admin_users', '''
+        {% extends "admin_layout.html" %}
+        {% block title %}Manage Users - CRONYZO Admin{% endblock %}
+        {% block page_styles %}<link rel="stylesheet" href="{{ asset_url('css/pages/admin_users.css') }}">{% endblock %}
+        {% block body %}
             <div class="admin-header">
                 <h1>CRONYZO Admin</h1>
                 <div>
@@ -9217,7 +5594,7 @@ def admin_users():
                     </a>
                 </div>
             </div>
-            
+
             <div class="admin-container">
                 <div class="admin-sidebar">
                     <ul class="sidebar-menu">
@@ -9225,10 +5602,11 @@ def admin_users():
                         <li><a href="{{ url_for('admin_products') }}"><i class="fas fa-box-open"></i> Products</a></li>
                         <li><a href="{{ url_for('admin_orders') }}"><i class="fas fa-shopping-bag"></i> Orders</a></li>
                         <li><a href="{{ url_for('admin_users') }}" class="active"><i class="fas fa-users"></i> Users</a></li>
+                        <li><a href="{{ url_for('admin_analytics') }}"><i class="fas fa-chart-line"></i> Analytics</a></li>
                         <li><a href="{{ url_for('admin_settings') }}"><i class="fas fa-cog"></i> Settings</a></li>
                     </ul>
                 </div>
-                
+
                 <div class="admin-content">
                     <div class="card">
                         <div class="card-header">
@@ -9241,9 +5619,12 @@ def admin_users():
                                 <a href="{{ url_for('admin_users') }}" class="btn btn-danger">
                                     <i class="fas fa-times"></i> Clear
                                 </a>
+                                <a href="{{ url_for('admin_export', dataset='users', fmt='csv') }}" class="btn">
+                                    <i class="fas fa-file-csv"></i> Export CSV
+                                </a>
                             </form>
                         </div>
-                        
+
                         <table class="table">
                             <thead>
                                 <tr>
@@ -9280,344 +5661,60 @@ def admin_users():
                                 {% endfor %}
                             </tbody>
                         </table>
+
+                        {% if prev_cursor or next_cursor %}
+                        <div class="pagination">
+                            {% if prev_cursor %}
+                            <a href="{{ url_for('admin_users', search=search_query, before=prev_cursor) }}" class="btn btn-sm">
+                                <i class="fas fa-chevron-left"></i> Newer
+                            </a>
+                            {% endif %}
+                            {% if next_cursor %}
+                            <a href="{{ url_for('admin_users', search=search_query, after=next_cursor) }}" class="btn btn-sm">
+                                Older <i class="fas fa-chevron-right"></i>
+                            </a>
+                            {% endif %}
+                        </div>
+                        {% endif %}
                     </div>
                 </div>
             </div>
-        </body>
-        </html>
-    ''', users=users, search_query=search_query)
+        {% endblock %}
+    ''', users=users, search_query=search_query,
+       next_cursor=next_cursor, prev_cursor=prev_cursor)
 
-@app.route('/admin/users/<int:user_id>')
-@admin_required
-def admin_user_detail(user_id):
-    try:
-        with get_db() as conn:
-            c = conn.cursor()
-            
-            # Get user details
-            c.execute("SELECT * FROM users WHERE id = ?", (user_id,))
-            user = c.fetchone()
-            
-            if not user:
-                return "User not found", 404
-            
-            # Get user's orders
-            c.execute("""
-                SELECT id, order_date, status, total_amount 
-                FROM orders 
-                WHERE user_id = ?
-                ORDER BY order_date DESC
-            """, (user_id,))
-            orders = c.fetchall()
-            
-    except Exception as e:
-        print(f"Error fetching user details: {e}")
-        return "Error fetching user details", 500
-    
-    return render_template_string('''
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <title>User Details - CRONYZO Admin</title>
-            <meta name="viewport" content="width=device-width, initial-scale=1.0">
-            <style>
-                :root {
-            --primary: #4361ee;
-            --primary-dark: #3a0ca3;
-            --accent: #f72585;
-            --light: #f8f9fa;
-            --dark: #212529;
-            --success: #28a745;
-            --danger: #dc3545;
-            --warning: #ffc107;
-            --info: #17a2b8;
-        }
-        
-        body {
-            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-            margin: 0;
-            padding: 0;
-            background: linear-gradient(135deg, #f5f7fa 0%, #e9ecef 100%);
-            color: var(--dark);
-        }
-        
-        .admin-header {
-            background: linear-gradient(135deg, var(--primary) 0%, var(--primary-dark) 100%);
-            color: white;
-            padding: 15px 30px;
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-            box-shadow: 0 4px 20px rgba(0,0,0,0.1);
-            position: sticky;
-            top: 0;
-            z-index: 1000;
-        }
-        
-        .admin-container {
-            display: flex;
-            min-height: calc(100vh - 65px);
-        }
-        
-        .admin-sidebar {
-            width: 280px;
-            background: rgba(255,255,255,0.95);
-            box-shadow: 2px 0 15px rgba(0,0,0,0.05);
-            padding: 25px 0;
-            backdrop-filter: blur(10px);
-            border-right: 1px solid rgba(255,255,255,0.3);
-            transition: all 0.3s ease;
-        }
-        
-        .sidebar-menu {
-            list-style: none;
-            padding: 0;
-            margin: 0;
-        }
-        
-        .sidebar-menu li a {
-            display: flex;
-            align-items: center;
-            padding: 14px 25px;
-            color: var(--dark);
-            text-decoration: none;
-            transition: all 0.3s cubic-bezier(0.25, 0.8, 0.25, 1);
-            font-weight: 500;
-            margin: 5px 15px;
-            border-radius: 8px;
-        }
-        
-        .sidebar-menu li a:hover {
-            background: rgba(67, 97, 238, 0.1);
-            color: var(--primary);
-            transform: translateX(5px);
-        }
-        
-        .sidebar-menu li a.active {
-            background: linear-gradient(135deg, var(--primary) 0%, var(--primary-dark) 100%);
-            color: white;
-            box-shadow: 0 4px 15px rgba(67, 97, 238, 0.3);
-        }
-        
-        .sidebar-menu li a i {
-            margin-right: 12px;
-            width: 20px;
-            text-align: center;
-            font-size: 18px;
-        }
-        
-        .admin-content {
-            flex: 1;
-            padding: 30px;
-        }
-        
-        .card {
-            background: rgba(255,255,255,0.95);
-            border-radius: 12px;
-            padding: 25px;
-            margin-bottom: 25px;
-            box-shadow: 0 10px 20px rgba(0,0,0,0.05);
-            backdrop-filter: blur(10px);
-            border: 1px solid rgba(255,255,255,0.3);
-        }
-        
-        .card-header {
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-            margin-bottom: 25px;
-            padding-bottom: 15px;
-            border-bottom: 1px solid rgba(0,0,0,0.05);
-        }
-        
-        .card-header h2 {
-            margin: 0;
-            font-size: 22px;
-            font-weight: 600;
-            color: var(--primary-dark);
-        }
-        
-        .btn {
-            display: inline-flex;
-            align-items: center;
-            justify-content: center;
-            padding: 10px 20px;
-            background: linear-gradient(135deg, var(--primary) 0%, var(--primary-dark) 100%);
-            color: white;
-            text-decoration: none;
-            border-radius: 8px;
-            font-size: 14px;
-            font-weight: 500;
-            transition: all 0.3s;
-            box-shadow: 0 4px 15px rgba(67, 97, 238, 0.3);
-            border: none;
-            cursor: pointer;
-        }
-        
-        .btn:hover {
-            transform: translateY(-2px);
-            box-shadow: 0 6px 20px rgba(67, 97, 238, 0.4);
-        }
-        
-        .btn-sm {
-            padding: 8px 15px;
-            font-size: 13px;
-        }
-        
-        .btn-danger {
-            background: linear-gradient(135deg, var(--danger) 0%, #c82333 100%);
-            box-shadow: 0 4px 15px rgba(220, 53, 69, 0.3);
-        }
-        
-        .btn-danger:hover {
-            box-shadow: 0 6px 20px rgba(220, 53, 69, 0.4);
-        }
-        
-        .user-details {
-            display: grid;
-            grid-template-columns: 1fr 1fr;
-            gap: 30px;
-        }
-        
-        .user-section {
-            margin-bottom: 25px;
-            background: rgba(248, 249, 250, 0.5);
-            padding: 20px;
-            border-radius: 10px;
-            box-shadow: 0 2px 10px rgba(0,0,0,0.03);
-        }
-        
-        .user-section h3 {
-            margin-top: 0;
-            margin-bottom: 15px;
-            padding-bottom: 10px;
-            border-bottom: 1px solid rgba(0,0,0,0.05);
-            color: var(--primary-dark);
-            font-size: 18px;
-        }
-        
-        .detail-row {
-            display: flex;
-            margin-bottom: 12px;
-            padding-bottom: 12px;
-            border-bottom: 1px solid rgba(0,0,0,0.03);
-        }
-        
-        .detail-label {
-            font-weight: 600;
-            width: 150px;
-            color: #555;
-        }
-        
-        .orders-table {
-            width: 100%;
-            border-collapse: separate;
-            border-spacing: 0;
-        }
-        
-        .orders-table th {
-            background: rgba(248, 249, 250, 0.8);
-            font-weight: 600;
-            padding: 12px 15px;
-            text-align: left;
-            border-bottom: 1px solid rgba(0,0,0,0.05);
-        }
-        
-        .orders-table td {
-            padding: 12px 15px;
-            border-bottom: 1px solid rgba(0,0,0,0.05);
-        }
-        
-        .orders-table tr:hover {
-            background: rgba(248, 250, 255, 0.8);
-        }
-        
-        .status-badge {
-            padding: 6px 12px;
-            border-radius: 20px;
-            font-size: 12px;
-            font-weight: 500;
-        }
-        
-        .status-processing {
-            background: rgba(255, 243, 205, 0.8);
-            color: #856404;
-        }
-        
-        .status-completed {
-            background: rgba(212, 237, 218, 0.8);
-            color: #155724;
-        }
-        
-        .status-shipped {
-            background: rgba(204, 229, 255, 0.8);
-            color: #004085;
-        }
-        
-        .status-cancelled {
-            background: rgba(248, 215, 218, 0.8);
-            color: #721c24;
-        }
-        
-        @media (max-width: 992px) {
-            .admin-sidebar {
-                width: 220px;
-            }
-            
-            .user-details {
-                grid-template-columns: 1fr;
-            }
-        }
-        
-        @media (max-width: 768px) {
-            .admin-container {
-                flex-direction: column;
-            }
-            
-            .admin-sidebar {
-                width: 100%;
-                padding: 15px 0;
-            }
-            
-            .sidebar-menu {
-                display: flex;
-                overflow-x: auto;
-                padding: 0 15px;
-            }
-            
-            .sidebar-menu li {
-                flex: 0 0 auto;
-            }
-            
-            .sidebar-menu li a {
-                margin: 0 5px;
-                padding: 10px 15px;
-            }
+@app.route('/admin/users/<int:user_id>')
+@admin_required
+def admin_user_detail(user_id):
+    try:
+        with get_db() as conn:
+            c = conn.cursor()
             
-            .card-header {
-                flex-direction: column;
-                align-items: flex-start;
-                gap: 15px;
-            }
+            # Get user details
+            c.execute("SELECT * FROM users WHERE id = ?", (user_id,))
+            user = c.fetchone()
             
-            .detail-row {
-                flex-direction: column;
-                gap: 5px;
-            }
+            if not user:
+                return "User not found", 404
             
-            .detail-label {
-                width: 100%;
-            }
+            # Get user's orders
+            c.execute("""
+                SELECT id, order_date, status, total_amount 
+                FROM orders 
+                WHERE user_id = ?
+                ORDER BY order_date DESC
+            """, (user_id,))
+            orders = c.fetchall()
             
-            .orders-table {
-                display: block;
-                overflow-x: auto;
-            }
-        }
-            </style>
-            <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0/css/all.min.css">
-        </head>
-        <body>
+    except Exception as e:
+        print(f"Error fetching user details: {e}")
+        return "Error fetching user details", 500
+    
+    return render_page('admin_user_detail', '''
+        {% extends "admin_layout.html" %}
+        {% block title %}User Details - CRONYZO Admin{% endblock %}
+        {% block page_styles %}<link rel="stylesheet" href="{{ asset_url('css/pages/admin_user_detail.css') }}">{% endblock %}
+        {% block body %}
             <div class="admin-header">
                 <h1>CRONYZO Admin</h1>
                 <div>
@@ -9626,7 +5723,7 @@ def admin_user_detail(user_id):
                     </a>
                 </div>
             </div>
-            
+
             <div class="admin-container">
                 <div class="admin-sidebar">
                     <ul class="sidebar-menu">
@@ -9634,10 +5731,11 @@ def admin_user_detail(user_id):
                         <li><a href="{{ url_for('admin_products') }}"><i class="fas fa-box-open"></i> Products</a></li>
                         <li><a href="{{ url_for('admin_orders') }}"><i class="fas fa-shopping-bag"></i> Orders</a></li>
                         <li><a href="{{ url_for('admin_users') }}" class="active"><i class="fas fa-users"></i> Users</a></li>
+                        <li><a href="{{ url_for('admin_analytics') }}"><i class="fas fa-chart-line"></i> Analytics</a></li>
                         <li><a href="{{ url_for('admin_settings') }}"><i class="fas fa-cog"></i> Settings</a></li>
                     </ul>
                 </div>
-                
+
                 <div class="admin-content">
                     <div class="card">
                         <div class="card-header">
@@ -9648,7 +5746,7 @@ def admin_user_detail(user_id):
                                 </a>
                             </div>
                         </div>
-                        
+
                         <div class="user-details">
                             <div>
                                 <div class="user-section">
@@ -9670,7 +5768,7 @@ def admin_user_detail(user_id):
                                         <span>{{ user[7] }}</span>
                                     </div>
                                 </div>
-                                
+
                                 <div class="user-section">
                                     <h3>Address Information</h3>
                                     <div class="detail-row">
@@ -9687,7 +5785,7 @@ def admin_user_detail(user_id):
                                     </div>
                                 </div>
                             </div>
-                            
+
                             <div>
                                 <div class="user-section">
                                     <h3>Order History</h3>
@@ -9731,8 +5829,7 @@ def admin_user_detail(user_id):
                     </div>
                 </div>
             </div>
-        </body>
-        </html>
+        {% endblock %}
     ''', user=user, orders=orders)
 
 @app.route('/admin/settings', methods=['GET', 'POST'])
@@ -9755,10 +5852,11 @@ def admin_settings():
                     new_charges[state] = {}
                 new_charges[state][city] = charge
             
-            # In a real application, you would save this to a database or config file
-            # For this example, we'll just update the global variable
-            global DELIVERY_CHARGES
-            DELIVERY_CHARGES = new_charges
+            # Saved once for every worker; each sees the new version on its next lookup
+            with get_db() as conn:
+                c = conn.cursor()
+                with transaction(conn):
+                    delivery_charge_store.replace(c, new_charges)
             
             return redirect(url_for('admin_settings'))
         
@@ -9766,272 +5864,11 @@ def admin_settings():
             print(f"Error updating settings: {e}")
             error = "Error updating settings"
     
-    return render_template_string('''
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <title>Settings - CRONYZO Admin</title>
-            <meta name="viewport" content="width=device-width, initial-scale=1.0">
-            <style>
-                :root {
-            --primary: #4361ee;
-            --primary-dark: #3a0ca3;
-            --accent: #f72585;
-            --light: #f8f9fa;
-            --dark: #212529;
-            --success: #28a745;
-            --danger: #dc3545;
-            --warning: #ffc107;
-            --info: #17a2b8;
-        }
-        
-        body {
-            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-            margin: 0;
-            padding: 0;
-            background: linear-gradient(135deg, #f5f7fa 0%, #e9ecef 100%);
-            color: var(--dark);
-        }
-        
-        .admin-header {
-            background: linear-gradient(135deg, var(--primary) 0%, var(--primary-dark) 100%);
-            color: white;
-            padding: 15px 30px;
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-            box-shadow: 0 4px 20px rgba(0,0,0,0.1);
-            position: sticky;
-            top: 0;
-            z-index: 1000;
-        }
-        
-        .admin-container {
-            display: flex;
-            min-height: calc(100vh - 65px);
-        }
-        
-        .admin-sidebar {
-            width: 280px;
-            background: rgba(255,255,255,0.95);
-            box-shadow: 2px 0 15px rgba(0,0,0,0.05);
-            padding: 25px 0;
-            backdrop-filter: blur(10px);
-            border-right: 1px solid rgba(255,255,255,0.3);
-            transition: all 0.3s ease;
-        }
-        
-        .sidebar-menu {
-            list-style: none;
-            padding: 0;
-            margin: 0;
-        }
-        
-        .sidebar-menu li a {
-            display: flex;
-            align-items: center;
-            padding: 14px 25px;
-            color: var(--dark);
-            text-decoration: none;
-            transition: all 0.3s cubic-bezier(0.25, 0.8, 0.25, 1);
-            font-weight: 500;
-            margin: 5px 15px;
-            border-radius: 8px;
-        }
-        
-        .sidebar-menu li a:hover {
-            background: rgba(67, 97, 238, 0.1);
-            color: var(--primary);
-            transform: translateX(5px);
-        }
-        
-        .sidebar-menu li a.active {
-            background: linear-gradient(135deg, var(--primary) 0%, var(--primary-dark) 100%);
-            color: white;
-            box-shadow: 0 4px 15px rgba(67, 97, 238, 0.3);
-        }
-        
-        .sidebar-menu li a i {
-            margin-right: 12px;
-            width: 20px;
-            text-align: center;
-            font-size: 18px;
-        }
-        
-        .admin-content {
-            flex: 1;
-            padding: 30px;
-        }
-        
-        .card {
-            background: rgba(255,255,255,0.95);
-            border-radius: 12px;
-            padding: 25px;
-            margin-bottom: 25px;
-            box-shadow: 0 10px 20px rgba(0,0,0,0.05);
-            backdrop-filter: blur(10px);
-            border: 1px solid rgba(255,255,255,0.3);
-        }
-        
-        .card-header {
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-            margin-bottom: 25px;
-            padding-bottom: 15px;
-            border-bottom: 1px solid rgba(0,0,0,0.05);
-        }
-        
-        .card-header h2 {
-            margin: 0;
-            font-size: 22px;
-            font-weight: 600;
-            color: var(--primary-dark);
-        }
-        
-        .btn {
-            display: inline-flex;
-            align-items: center;
-            justify-content: center;
-            padding: 10px 20px;
-            background: linear-gradient(135deg, var(--primary) 0%, var(--primary-dark) 100%);
-            color: white;
-            text-decoration: none;
-            border-radius: 8px;
-            font-size: 14px;
-            font-weight: 500;
-            transition: all 0.3s;
-            box-shadow: 0 4px 15px rgba(67, 97, 238, 0.3);
-            border: none;
-            cursor: pointer;
-        }
-        
-        .btn:hover {
-            transform: translateY(-2px);
-            box-shadow: 0 6px 20px rgba(67, 97, 238, 0.4);
-        }
-        
-        .btn-sm {
-            padding: 8px 15px;
-            font-size: 13px;
-        }
-        
-        .btn-danger {
-            background: linear-gradient(135deg, var(--danger) 0%, #c82333 100%);
-            box-shadow: 0 4px 15px rgba(220, 53, 69, 0.3);
-        }
-        
-        .btn-danger:hover {
-            box-shadow: 0 6px 20px rgba(220, 53, 69, 0.4);
-        }
-        
-        .btn-success {
-            background: linear-gradient(135deg, var(--success) 0%, #1e7e34 100%);
-            box-shadow: 0 4px 15px rgba(40, 167, 69, 0.3);
-        }
-        
-        .btn-success:hover {
-            box-shadow: 0 6px 20px rgba(40, 167, 69, 0.4);
-        }
-        
-        .alert {
-            padding: 15px;
-            border-radius: 8px;
-            margin-bottom: 25px;
-            display: flex;
-            align-items: center;
-            gap: 10px;
-        }
-        
-        .alert-danger {
-            background: rgba(248, 215, 218, 0.8);
-            color: #721c24;
-        }
-        
-        .delivery-charge-form {
-            margin-bottom: 30px;
-        }
-        
-        .delivery-charge-row {
-            display: flex;
-            gap: 15px;
-            margin-bottom: 15px;
-            align-items: center;
-        }
-        
-        .delivery-charge-row input,
-        .delivery-charge-row select {
-            padding: 12px 15px;
-            border: 1px solid rgba(0,0,0,0.1);
-            border-radius: 8px;
-            background: rgba(255,255,255,0.8);
-            flex: 1;
-            min-width: 150px;
-        }
-        
-        .delivery-charge-row input:focus,
-        .delivery-charge-row select:focus {
-            outline: none;
-            border-color: var(--primary);
-            box-shadow: 0 0 0 3px rgba(67, 97, 238, 0.2);
-        }
-        
-        #deliveryChargesContainer {
-            margin-top: 20px;
-        }
-        
-        h3 {
-            color: var(--primary-dark);
-            margin-top: 25px;
-            margin-bottom: 15px;
-            font-size: 18px;
-        }
-        
-        .text-right {
-            text-align: right;
-        }
-        
-        @media (max-width: 992px) {
-            .admin-sidebar {
-                width: 220px;
-            }
-        }
-        
-        @media (max-width: 768px) {
-            .admin-container {
-                flex-direction: column;
-            }
-            
-            .admin-sidebar {
-                width: 100%;
-                padding: 15px 0;
-            }
-            
-            .sidebar-menu {
-                display: flex;
-                overflow-x: auto;
-                padding: 0 15px;
-            }
-            
-            .sidebar-menu li {
-                flex: 0 0 auto;
-            }
-            
-            .sidebar-menu li a {
-                margin: 0 5px;
-                padding: 10px 15px;
-            }
-            
-            .delivery-charge-row {
-                flex-direction: column;
-                align-items: stretch;
-                gap: 10px;
-            }
-        }
-            </style>
-            <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0/css/all.min.css">
-        </head>
-        <body>
+    return render_page('admin_settings', '''
+        {% extends "admin_layout.html" %}
+        {% block title %}Settings - CRONYZO Admin{% endblock %}
+        {% block page_styles %}<link rel="stylesheet" href="{{ asset_url('css/pages/admin_settings.css') }}">{% endblock %}
+        {% block body %}
             <div class="admin-header">
                 <h1>CRONYZO Admin</h1>
                 <div>
@@ -10040,7 +5877,7 @@ def admin_settings():
                     </a>
                 </div>
             </div>
-            
+
             <div class="admin-container">
                 <div class="admin-sidebar">
                     <ul class="sidebar-menu">
@@ -10048,27 +5885,28 @@ def admin_settings():
                         <li><a href="{{ url_for('admin_products') }}"><i class="fas fa-box-open"></i> Products</a></li>
                         <li><a href="{{ url_for('admin_orders') }}"><i class="fas fa-shopping-bag"></i> Orders</a></li>
                         <li><a href="{{ url_for('admin_users') }}"><i class="fas fa-users"></i> Users</a></li>
+                        <li><a href="{{ url_for('admin_analytics') }}"><i class="fas fa-chart-line"></i> Analytics</a></li>
                         <li><a href="{{ url_for('admin_settings') }}" class="active"><i class="fas fa-cog"></i> Settings</a></li>
                         <!-- यह नया लिंक जोड़ें -->
     <li><a href="{{ url_for('admin_images') }}" class="active"><i class="fas fa-images"></i> Images</a></li>
                     </ul>
                 </div>
-                
+
                 <div class="admin-content">
                     <div class="card">
                         <div class="card-header">
                             <h2>System Settings</h2>
                         </div>
-                        
+
                         {% if error %}
                         <div class="alert alert-danger">
                             <i class="fas fa-exclamation-circle"></i> {{ error }}
                         </div>
                         {% endif %}
-                        
+
                         <form method="post">
                             <input type="hidden" name="csrf_token" value="{{ csrf_token() }}">
-                            
+
                             <h3>Delivery Charges</h3>
                             <div id="deliveryChargesContainer">
                                 {% for state, cities in delivery_charges.items() %}
@@ -10084,11 +5922,11 @@ def admin_settings():
                                     {% endfor %}
                                 {% endfor %}
                             </div>
-                            
+
                             <button type="button" class="btn" onclick="addDeliveryCharge()" style="margin-top: 10px;">
                                 <i class="fas fa-plus"></i> Add Delivery Charge
                             </button>
-                            
+
                             <div class="text-right" style="margin-top: 30px;">
                                 <button type="submit" class="btn btn-success">
                                     <i class="fas fa-save"></i> Save Settings
@@ -10098,31 +5936,572 @@ def admin_settings():
                     </div>
                 </div>
             </div>
+        {% endblock %}
+    ''', delivery_charges=get_delivery_charges(), error=error if 'error' in locals() else None)
+
+
+
+# ==================== DATA EXPORT ====================
+
+# Each export is one query streamed row by row; date filters apply to
+# ``date_column`` and the status filter only to datasets that have one
+EXPORT_DATASETS = {
+    'orders': {
+        'query': '''SELECT o.id, o.order_date, o.status, o.name, o.phone, o.state, o.city,
+                           o.address, o.transaction_id, o.subtotal, o.delivery_charge,
+                           o.total_amount, o.advance_payment, o.items, o.user_id,
+                           u.name AS user_name, u.email AS user_email, u.phone AS user_phone
+                    FROM orders o
+                    LEFT JOIN users u ON o.user_id = u.id''',
+        'date_column': 'o.order_date',
+        'status_column': 'o.status',
+        'order_by': 'o.id',
+    },
+    'users': {
+        'query': '''SELECT id, phone, name, email, address, state, city, created_at
+                    FROM users''',
+        'date_column': 'created_at',
+        'status_column': None,
+        'order_by': 'id',
+    },
+    'products': {
+        'query': '''SELECT id, sku, title, description, price, image, min_quantity, max_quantity,
+                           discount, rating, stock, images, youtube_url, category, tags, created_at
+                    FROM products''',
+        'date_column': 'created_at',
+        'status_column': None,
+        'order_by': 'id',
+    },
+}
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'jsonl': 'application/x-ndjson',
+}
+
+def export_rows(dataset, start=None, end=None, status=None):
+    """Yield the column names, then every matching row.
+
+    Rows are pulled from the cursor ``EXPORT_BATCH_SIZE`` at a time, so
+    memory use stays flat however large the table is.
+    """
+    spec = EXPORT_DATASETS[dataset]
+    conditions, params = [], []
+    if start:
+        conditions.append(f"{spec['date_column']} >= ?")
+        params.append(start.isoformat())
+    if end:
+        conditions.append(f"{spec['date_column']} < ?")
+        params.append((end + timedelta(days=1)).isoformat())
+    if status and spec['status_column']:
+        conditions.append(f"{spec['status_column']} = ?")
+        params.append(status)
+
+    query = spec['query']
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    query += f" ORDER BY {spec['order_by']}"
+
+    with get_db() as conn:
+        c = conn.cursor()
+        c.execute(query, params)
+        yield [column[0] for column in c.description]
+        while True:
+            batch = c.fetchmany(Config.EXPORT_BATCH_SIZE)
+            if not batch:
+                break
+            yield from batch
+
+def _export_chunks(rows, make_writer):
+    # Emit output in roughly EXPORT_CHUNK_BYTES pieces rather than per row
+    buffer = io.StringIO()
+    write_row = make_writer(buffer)
+    try:
+        for row in rows:
+            write_row(row)
+            if buffer.tell() >= Config.EXPORT_CHUNK_BYTES:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+    except Exception as e:
+        # Headers are already sent; re-raising aborts the chunked response so
+        # the download fails instead of looking complete
+        print(f"Error streaming export: {e}")
+        raise
+    yield buffer.getvalue()
+
+def csv_export(rows):
+    return _export_chunks(rows, lambda buffer: csv.writer(buffer).writerow)
+
+def jsonl_export(rows):
+    def make_writer(buffer):
+        columns = []
+
+        def write_row(row):
+            if not columns:
+                columns.extend(row)
+                return
+            buffer.write(json.dumps(dict(zip(columns, row)), ensure_ascii=False) + '\n')
+
+        return write_row
+
+    return _export_chunks(rows, make_writer)
+
+EXPORT_WRITERS = {
+    'csv': csv_export,
+    'jsonl': jsonl_export,
+}
+
+@app.route('/admin/export/<dataset>.<fmt>')
+@admin_required
+def admin_export(dataset, fmt):
+    if dataset not in EXPORT_DATASETS or fmt not in EXPORT_FORMATS:
+        abort(404)
+    
+    start = parse_date_arg(request.args.get('start'))
+    end = parse_date_arg(request.args.get('end'))
+    status = request.args.get('status') if request.args.get('status') in ORDER_STATUSES else None
+    
+    filename = f"{dataset}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.{fmt}"
+    rows = export_rows(dataset, start=start, end=end, status=status)
+    return Response(stream_with_context(EXPORT_WRITERS[fmt](rows)),
+                    mimetype=EXPORT_FORMATS[fmt],
+                    headers={
+                        'Content-Disposition': f'attachment; filename="{filename}"',
+                        # Let nginx pass chunks through instead of buffering the file
+                        'X-Accel-Buffering': 'no',
+                    })
+
+# ==================== PRODUCT IMPORT ====================
+
+class ImportRowError(ValueError):
+    pass
+
+def _import_int(value, field, minimum=None, maximum=None):
+    try:
+        number = int(float(value))
+    except (TypeError, ValueError, OverflowError):
+        # OverflowError covers inf, nan is a ValueError
+        raise ImportRowError(f"{field} must be a whole number")
+    if (minimum is not None and number < minimum) or (maximum is not None and number > maximum):
+        raise ImportRowError(f"{field} must be between {minimum} and {maximum}")
+    return number
+
+def _import_float(value, field, minimum=None, maximum=None):
+    try:
+        number = float(value)
+    except (TypeError, ValueError, OverflowError):
+        raise ImportRowError(f"{field} must be a number")
+    if not math.isfinite(number):
+        raise ImportRowError(f"{field} must be a number")
+    if (minimum is not None and number < minimum) or (maximum is not None and number > maximum):
+        raise ImportRowError(f"{field} must be between {minimum} and {maximum}")
+    return number
+
+def _import_list(value, field):
+    # JSONL rows carry real lists; CSV cells may hold a JSON array or a
+    # comma-separated list. Stored as JSON text like the admin form does.
+    if isinstance(value, str):
+        value = value.strip()
+        if value.startswith('['):
+            try:
+                value = json.loads(value)
+            except ValueError:
+                raise ImportRowError(f"{field} is not a valid JSON list")
+        else:
+            value = [item.strip() for item in value.split(',') if item.strip()]
+    if not isinstance(value, list):
+        raise ImportRowError(f"{field} must be a list")
+    return json.dumps([str(item) for item in value])
+
+def _import_text(value, field):
+    return str(value).strip()
+
+# Importable column -> converter; rows may carry any subset beyond the
+# required ones, and only the columns present are written on update
+PRODUCT_IMPORT_FIELDS = {
+    'sku': _import_text,
+    'title': _import_text,
+    'description': _import_text,
+    'price': lambda value, field: _import_float(value, field, minimum=0),
+    'image': _import_text,
+    'min_quantity': lambda value, field: _import_int(value, field, minimum=1),
+    'max_quantity': lambda value, field: _import_int(value, field, minimum=1),
+    'discount': lambda value, field: _import_int(value, field, minimum=0, maximum=100),
+    'rating': lambda value, field: _import_float(value, field, minimum=0, maximum=5),
+    'stock': lambda value, field: _import_int(value, field, minimum=0),
+    'images': _import_list,
+    'youtube_url': _import_text,
+    'category': _import_text,
+    'tags': _import_list,
+}
+
+PRODUCT_IMPORT_REQUIRED = ['sku', 'title', 'price']
+
+# Used for blank or missing optional cells of new products, matching the
+# products table and admin form; existing products keep their stored value
+PRODUCT_IMPORT_DEFAULTS = {
+    'description': '',
+    'image': '',
+    'min_quantity': 1,
+    'max_quantity': 10,
+    'discount': 0,
+    'rating': 0,
+    'stock': 100,
+    'images': '[]',
+    'youtube_url': '',
+    'category': '',
+    'tags': '[]',
+}
+
+def read_product_rows(stream, fmt):
+    """Yield ``(line_number, row)`` pairs from a CSV or JSONL text stream."""
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+    elif fmt == 'jsonl':
+        for line_number, line in enumerate(stream, 1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                row = None
+            yield line_number, row if isinstance(row, dict) else "Line is not a JSON object"
+    else:
+        raise ValueError(f"Unsupported import format: {fmt}")
+
+def validate_product_row(row, columns):
+    if not isinstance(row, dict):
+        raise ImportRowError(row)
+    for field in PRODUCT_IMPORT_REQUIRED:
+        if row.get(field) in (None, ''):
+            raise ImportRowError(f"{field} is required")
+
+    # Blank cells stay NULL so the upsert can tell them apart from real values
+    values = []
+    for field in columns:
+        value = row.get(field)
+        values.append(None if value in (None, '') else PRODUCT_IMPORT_FIELDS[field](value, field))
+    return values
+
+def _product_upsert_sql(columns):
+    # ?1..?n are the row's values; a NULL takes the default on insert and
+    # leaves the stored value alone on update
+    inserts = ', '.join(f"COALESCE(?{i}, {_sql_literal(PRODUCT_IMPORT_DEFAULTS.get(column))})"
+                        for i, column in enumerate(columns, 1))
+    updates = ', '.join(f"{column} = COALESCE(?{i}, {column})"
+                        for i, column in enumerate(columns, 1) if column != 'sku')
+    return (f"INSERT INTO products ({', '.join(columns)}) VALUES ({inserts}) "
+            f"ON CONFLICT(sku) DO UPDATE SET {updates}")
+
+def _sql_literal(value):
+    if value is None:
+        return 'NULL'
+    if isinstance(value, str):
+        return "'" + value.replace("'", "''") + "'"
+    return repr(value)
+
+def _write_product_batch(conn, sql, batch, result):
+    c = conn.cursor()
+    skus = list({values[0] for _, values in batch})
+    try:
+        with transaction(conn):
+            c.execute(f"SELECT COUNT(*) FROM products WHERE sku IN ({','.join('?' * len(skus))})", skus)
+            existing = c.fetchone()[0]
+            c.executemany(sql, [values for _, values in batch])
+        # Count rows, not skus: a sku repeated in the batch is created once
+        # and updated by every later row
+        result['created'] += len(skus) - existing
+        result['updated'] += len(batch) - (len(skus) - existing)
+    except sqlite3.Error:
+        # Find the offending rows one at a time so the rest of the batch still lands
+        for line_number, values in batch:
+            try:
+                with transaction(conn):
+                    c.execute("SELECT 1 FROM products WHERE sku = ?", (values[0],))
+                    exists = c.fetchone() is not None
+                    c.execute(sql, values)
+                result['updated' if exists else 'created'] += 1
+            except sqlite3.Error as e:
+                _record_import_error(result, line_number, values[0], str(e))
+
+def _record_import_error(result, line_number, sku, message):
+    result['failed'] += 1
+    if len(result['errors']) < Config.IMPORT_MAX_ERRORS:
+        result['errors'].append({'line': line_number, 'sku': sku, 'error': message})
+
+def import_products(stream, fmt):
+    """Upsert products keyed on ``sku`` from a CSV or JSONL stream.
+
+    Rows are validated one by one and written IMPORT_BATCH_SIZE at a time,
+    each batch in its own transaction. Blank or missing optional cells take
+    their default on new products and leave existing products unchanged.
+    Returns counts and per-row errors.
+    """
+    result = {'created': 0, 'updated': 0, 'failed': 0, 'errors': []}
+    rows = read_product_rows(stream, fmt)
+
+    # The CSV header (or the first JSONL object's keys) must carry the
+    # required columns; unknown columns are ignored
+    first = next(rows, None)
+    header = first[1].keys() if first and isinstance(first[1], dict) else []
+    rows = itertools.chain([first] if first else [], rows)
+    columns = list(PRODUCT_IMPORT_FIELDS)
+
+    missing = [field for field in PRODUCT_IMPORT_REQUIRED if field not in header]
+    if missing:
+        raise ValueError(f"Missing required columns: {', '.join(missing)}")
+
+    sql = _product_upsert_sql(columns)
+    with get_db() as conn:
+        batch = []
+        for line_number, row in rows:
+            try:
+                batch.append((line_number, validate_product_row(row, columns)))
+            except ImportRowError as e:
+                sku = row.get('sku') if isinstance(row, dict) else None
+                _record_import_error(result, line_number, sku, str(e))
+                continue
+            if len(batch) >= Config.IMPORT_BATCH_SIZE:
+                _write_product_batch(conn, sql, batch, result)
+                batch = []
+        if batch:
+            _write_product_batch(conn, sql, batch, result)
+
+        # One index merge and cache refresh for the whole file instead of per row
+        if result['created'] or result['updated']:
+            c = conn.cursor()
+            if product_search_uses_fts(c):
+                c.execute("INSERT INTO products_fts (products_fts) VALUES ('optimize')")
+            c.execute("PRAGMA optimize")
+            conn.commit()
+            product_sampler.invalidate()
+
+    return result
+
+PRODUCT_IMPORT_FORMATS = {'.csv': 'csv', '.jsonl': 'jsonl', '.json': 'jsonl', '.ndjson': 'jsonl'}
+
+@app.route('/admin/products/import', methods=['POST'])
+@admin_required
+def admin_import_products():
+    upload = request.files.get('file')
+    if not upload or not upload.filename:
+        return jsonify({"error": "No file uploaded"}), 400
+    
+    fmt = request.form.get('format') or PRODUCT_IMPORT_FORMATS.get(os.path.splitext(upload.filename)[1].lower())
+    if fmt not in ('csv', 'jsonl'):
+        return jsonify({"error": "File must be .csv or .jsonl"}), 400
+    
+    try:
+        stream = io.TextIOWrapper(upload.stream, encoding='utf-8-sig', newline='')
+        result = import_products(stream, fmt)
+    except (ValueError, UnicodeDecodeError) as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        print(f"Error importing products: {e}")
+        return jsonify({"error": "Error importing products"}), 500
+    
+    return jsonify(result)
+
+@app.cli.command('import-products')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'fmt', type=click.Choice(['csv', 'jsonl']),
+              help='File format; guessed from the extension when omitted.')
+def import_products_command(path, fmt):
+    """Bulk upsert products from a CSV or JSONL file."""
+    fmt = fmt or PRODUCT_IMPORT_FORMATS.get(os.path.splitext(path)[1].lower())
+    if not fmt:
+        raise click.UsageError("Cannot tell the file format; pass --format")
+    
+    started = time.time()
+    with open(path, encoding='utf-8-sig', newline='') as stream:
+        result = import_products(stream, fmt)
+    click.echo(f"Created {result['created']}, updated {result['updated']}, "
+               f"failed {result['failed']} in {time.time() - started:.1f}s")
+    for error in result['errors']:
+        click.echo(f"  line {error['line']} ({error['sku'] or 'no sku'}): {error['error']}", err=True)
+
+# ==================== SALES ANALYTICS ====================
+
+@app.route('/admin/analytics')
+@admin_required
+def admin_analytics():
+    filters = sales_report_args(request.args)
+    try:
+        with get_db() as conn:
+            c = conn.cursor()
+            rows, totals = sales_report(c, **filters)
             
-            <script>
-                function addDeliveryCharge() {
-                    const container = document.getElementById('deliveryChargesContainer');
-                    const newRow = document.createElement('div');
-                    newRow.className = 'delivery-charge-row';
-                    newRow.innerHTML = `
-                        <input type="text" name="state[]" placeholder="State" required>
-                        <input type="text" name="city[]" placeholder="City" required>
-                        <input type="number" name="charge[]" placeholder="Charge" min="0" required>
-                        <button type="button" class="btn btn-danger" onclick="removeDeliveryCharge(this)">
-                            <i class="fas fa-trash"></i>
-                        </button>
-                    `;
-                    container.appendChild(newRow);
-                }
-                
-                function removeDeliveryCharge(button) {
-                    const row = button.parentElement;
-                    row.remove();
-                }
-            </script>
-        </body>
-        </html>
-    ''', delivery_charges=DELIVERY_CHARGES, error=error if 'error' in locals() else None)
+            # States that have ever had an order, for the filter dropdown
+            c.execute("SELECT DISTINCT state FROM sales_daily ORDER BY state")
+            states = [row[0] for row in c.fetchall()]
+    except Exception as e:
+        print(f"Error building sales report: {e}")
+        rows, totals, states = [], {}, []
+    
+    return render_page('admin_analytics', '''
+        {% extends "admin_layout.html" %}
+        {% block title %}Analytics - CRONYZO Admin{% endblock %}
+        {% block page_styles %}<link rel="stylesheet" href="{{ asset_url('css/pages/admin_analytics.css') }}">{% endblock %}
+        {% block body %}
+            <div class="admin-header">
+                <h1>CRONYZO Admin</h1>
+                <div>
+                    <a href="{{ url_for('admin_logout') }}" class="btn btn-danger">
+                        <i class="fas fa-sign-out-alt"></i> Logout
+                    </a>
+                </div>
+            </div>
+
+            <div class="admin-container">
+                <div class="admin-sidebar">
+                    <ul class="sidebar-menu">
+                        <li><a href="{{ url_for('admin_dashboard') }}"><i class="fas fa-tachometer-alt"></i> Dashboard</a></li>
+                        <li><a href="{{ url_for('admin_products') }}"><i class="fas fa-box-open"></i> Products</a></li>
+                        <li><a href="{{ url_for('admin_orders') }}"><i class="fas fa-shopping-bag"></i> Orders</a></li>
+                        <li><a href="{{ url_for('admin_users') }}"><i class="fas fa-users"></i> Users</a></li>
+                        <li><a href="{{ url_for('admin_analytics') }}" class="active"><i class="fas fa-chart-line"></i> Analytics</a></li>
+                        <li><a href="{{ url_for('admin_settings') }}"><i class="fas fa-cog"></i> Settings</a></li>
+                        <li><a href="{{ url_for('admin_images') }}"><i class="fas fa-images"></i> Images</a></li>
+                    </ul>
+                </div>
+
+                <div class="admin-content">
+                    <div class="stats-container">
+                        <div class="stat-card">
+                            <h3>Orders</h3>
+                            <p>{{ totals.get('orders', 0) }}</p>
+                        </div>
+                        <div class="stat-card">
+                            <h3>Subtotal</h3>
+                            <p>₹{{ "{:,.0f}".format(totals.get('subtotal', 0)) }}</p>
+                        </div>
+                        <div class="stat-card">
+                            <h3>Delivery Charges</h3>
+                            <p>₹{{ "{:,.0f}".format(totals.get('delivery_charge', 0)) }}</p>
+                        </div>
+                        <div class="stat-card">
+                            <h3>Total Amount</h3>
+                            <p>₹{{ "{:,.0f}".format(totals.get('total_amount', 0)) }}</p>
+                        </div>
+                        <div class="stat-card">
+                            <h3>Advance Collected</h3>
+                            <p>₹{{ "{:,.0f}".format(totals.get('advance_payment', 0)) }}</p>
+                        </div>
+                    </div>
+
+                    <div class="card">
+                        <div class="card-header">
+                            <h2>Sales Report</h2>
+                            <a href="{{ url_for('admin_analytics_api', **request.args) }}" class="btn btn-sm">
+                                <i class="fas fa-code"></i> JSON
+                            </a>
+                        </div>
+
+                        <form method="get" class="report-filters">
+                            <label>From
+                                <input type="date" name="start" value="{{ filters.start }}">
+                            </label>
+                            <label>To
+                                <input type="date" name="end" value="{{ filters.end }}">
+                            </label>
+                            <label>Granularity
+                                <select name="granularity">
+                                    <option value="daily" {% if filters.granularity == "daily" %}selected{% endif %}>Daily</option>
+                                    <option value="hourly" {% if filters.granularity == "hourly" %}selected{% endif %}>Hourly</option>
+                                </select>
+                            </label>
+                            <label>Group by
+                                <select name="group">
+                                    <option value="period" {% if filters.group == "period" %}selected{% endif %}>Date</option>
+                                    <option value="state" {% if filters.group == "state" %}selected{% endif %}>State</option>
+                                    <option value="city" {% if filters.group == "city" %}selected{% endif %}>City</option>
+                                    <option value="status" {% if filters.group == "status" %}selected{% endif %}>Status</option>
+                                </select>
+                            </label>
+                            <label>Status
+                                <select name="status">
+                                    <option value="">All Statuses</option>
+                                    {% for status in statuses %}
+                                    <option value="{{ status }}" {% if filters.status == status %}selected{% endif %}>{{ status }}</option>
+                                    {% endfor %}
+                                </select>
+                            </label>
+                            <label>State
+                                <select name="state">
+                                    <option value="">All States</option>
+                                    {% for state in states %}
+                                    <option value="{{ state }}" {% if filters.state == state %}selected{% endif %}>{{ state }}</option>
+                                    {% endfor %}
+                                </select>
+                            </label>
+                            <button type="submit" class="btn">
+                                <i class="fas fa-filter"></i> Apply
+                            </button>
+                        </form>
+
+                        <table class="table">
+                            <thead>
+                                <tr>
+                                    {% if filters.group == "period" %}
+                                    <th>{{ "Hour" if filters.granularity == "hourly" else "Date" }}</th>
+                                    {% elif filters.group == "city" %}
+                                    <th>City</th>
+                                    <th>State</th>
+                                    {% else %}
+                                    <th>{{ filters.group|capitalize }}</th>
+                                    {% endif %}
+                                    <th class="text-right">Orders</th>
+                                    <th class="text-right">Subtotal</th>
+                                    <th class="text-right">Delivery</th>
+                                    <th class="text-right">Total</th>
+                                    <th class="text-right">Advance</th>
+                                </tr>
+                            </thead>
+                            <tbody>
+                                {% for row in rows %}
+                                <tr>
+                                    {% if filters.group == "period" %}
+                                    <td>{{ row.period }}{% if filters.granularity == "hourly" %}:00{% endif %}</td>
+                                    {% elif filters.group == "city" %}
+                                    <td>{{ row.city }}</td>
+                                    <td>{{ row.state }}</td>
+                                    {% else %}
+                                    <td>{{ row[filters.group] }}</td>
+                                    {% endif %}
+                                    <td class="text-right">{{ row.orders }}</td>
+                                    <td class="text-right">₹{{ "{:,.2f}".format(row.subtotal) }}</td>
+                                    <td class="text-right">₹{{ "{:,.2f}".format(row.delivery_charge) }}</td>
+                                    <td class="text-right">₹{{ "{:,.2f}".format(row.total_amount) }}</td>
+                                    <td class="text-right">₹{{ "{:,.2f}".format(row.advance_payment) }}</td>
+                                </tr>
+                                {% else %}
+                                <tr>
+                                    <td colspan="7" style="text-align: center;">No orders in this period</td>
+                                </tr>
+                                {% endfor %}
+                            </tbody>
+                        </table>
+                    </div>
+                </div>
+            </div>
+        {% endblock %}
+    ''', rows=rows, totals=totals, filters=filters, states=states, statuses=ORDER_STATUSES)
+
+@app.route('/admin/api/analytics')
+@admin_required
+def admin_analytics_api():
+    filters = sales_report_args(request.args)
+    try:
+        with get_db() as conn:
+            rows, totals = sales_report(conn.cursor(), **filters)
+    except Exception as e:
+        print(f"Error building sales report: {e}")
+        return jsonify({"error": "Error building sales report"}), 500
+    
+    return jsonify({**filters, "rows": rows, "totals": totals})
 
 
 
@@ -10131,74 +6510,50 @@ def admin_settings():
 @app.route('/admin/images')
 @admin_required
 def admin_images():
-    # Get list of images from static/images directory
+    search_query = request.args.get('search', '')
+    next_cursor = prev_cursor = None
+    
     try:
-        image_files = []
-        images_dir = os.path.join(app.static_folder, 'images')
-        
-        # Create images directory if it doesn't exist
-        if not os.path.exists(images_dir):
-            os.makedirs(images_dir)
+        with get_db() as conn:
+            c = conn.cursor()
             
-        for filename in os.listdir(images_dir):
-            if filename.lower().endswith(('.png', '.jpg', '.jpeg', '.gif', '.webp')):
-                image_files.append({
-                    'name': filename,
-                    'path': os.path.join('images', filename),
-                    'size': os.path.getsize(os.path.join(images_dir, filename)),
-                    'upload_time': datetime.fromtimestamp(
-                        os.path.getmtime(os.path.join(images_dir, filename))
-                    )
-                })
+            # Listing comes from image_catalog; the directory is only walked
+            # by the reconciliation job
+            query = """SELECT name, size, mtime, width, height, content_hash,
+                              'images/' || name AS path,
+                              datetime(mtime, 'unixepoch', 'localtime') AS upload_time
+                       FROM image_catalog
+                       WHERE folder = 'images'"""
+            params = []
+            
+            if search_query:
+                query += " AND name LIKE ? ESCAPE '\\'"
+                escaped = search_query.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+                params.append(f"%{escaped}%")
+            
+            image_files, next_cursor, prev_cursor = keyset_page(
+                c, query, params, ['mtime', 'name'],
+                after=request.args.get('after'), before=request.args.get('before'))
+            
+            # Products using each image on this page
+            names = [image['name'] for image in image_files]
+            product_counts = {}
+            if names:
+                c.execute(f"""SELECT name, COUNT(*) FROM product_images
+                              WHERE name IN ({','.join('?' * len(names))}) GROUP BY name""", names)
+                product_counts = dict(c.fetchall())
+            
+            c.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM image_catalog WHERE folder = 'images'")
+            total_images, total_size = c.fetchone()
     except Exception as e:
         print(f"Error listing images: {e}")
-        image_files = []
-
-    return render_template_string('''
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <title>Image Management - CRONYZO Admin</title>
-            <meta name="viewport" content="width=device-width, initial-scale=1.0">
-            <style>
-                .image-grid {
-                    display: grid;
-                    grid-template-columns: repeat(auto-fill, minmax(200px, 1fr));
-                    gap: 20px;
-                    margin-top: 20px;
-                }
-                .image-card {
-                    border: 1px solid #ddd;
-                    border-radius: 8px;
-                    padding: 10px;
-                    background: white;
-                }
-                .image-card img {
-                    width: 100%;
-                    height: 150px;
-                    object-fit: contain;
-                    border-radius: 4px;
-                }
-                .image-actions {
-                    display: flex;
-                    justify-content: space-between;
-                    margin-top: 10px;
-                }
-                .image-info {
-                    font-size: 12px;
-                    color: #666;
-                    margin-top: 5px;
-                }
-                .upload-form {
-                    background: #f8f9fa;
-                    padding: 20px;
-                    border-radius: 8px;
-                    margin-bottom: 20px;
-                }
-            </style>
-            <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0/css/all.min.css">
-        </head>
-        <body>
+        image_files, product_counts, total_images, total_size = [], {}, 0, 0
+
+    return render_page('admin_images', '''
+        {% extends "admin_layout.html" %}
+        {% block title %}Image Management - CRONYZO Admin{% endblock %}
+        {% block page_styles %}<link rel="stylesheet" href="{{ asset_url('css/pages/admin_images.css') }}">{% endblock %}
+        {% block body %}
             <div class="admin-header">
                 <h1>CRONYZO Admin</h1>
                 <div>
@@ -10207,7 +6562,7 @@ def admin_images():
                     </a>
                 </div>
             </div>
-            
+
             <div class="admin-container">
                 <div class="admin-sidebar">
                     <ul class="sidebar-menu">
@@ -10216,16 +6571,17 @@ def admin_images():
                         <li><a href="{{ url_for('admin_orders') }}"><i class="fas fa-shopping-bag"></i> Orders</a></li>
                         <li><a href="{{ url_for('admin_users') }}"><i class="fas fa-users"></i> Users</a></li>
                         <li><a href="{{ url_for('admin_images') }}" class="active"><i class="fas fa-images"></i> Images</a></li>
+                        <li><a href="{{ url_for('admin_analytics') }}"><i class="fas fa-chart-line"></i> Analytics</a></li>
                         <li><a href="{{ url_for('admin_settings') }}"><i class="fas fa-cog"></i> Settings</a></li>
                     </ul>
                 </div>
-                
+
                 <div class="admin-content">
                     <div class="card">
                         <div class="card-header">
                             <h2>Image Management</h2>
                         </div>
-                        
+
                         <div class="upload-form">
                             <h3>Upload New Image</h3>
                             <form method="post" action="{{ url_for('admin_upload_image') }}" enctype="multipart/form-data">
@@ -10238,19 +6594,28 @@ def admin_images():
                                 </div>
                             </form>
                         </div>
-                        
-                        <h3>Existing Images ({{ image_files|length }})</h3>
+
+                        <div style="display: flex; justify-content: space-between; align-items: center;">
+                            <h3>Existing Images ({{ total_images }}, {{ (total_size/1048576)|round(1) }} MB)</h3>
+                            <form method="get" style="display: flex; gap: 10px;">
+                                <input type="text" name="search" placeholder="Search images..." value="{{ search_query }}">
+                                <button type="submit" class="btn btn-sm">
+                                    <i class="fas fa-search"></i> Search
+                                </button>
+                            </form>
+                        </div>
                         {% if not image_files %}
                             <p>No images found in the system.</p>
                         {% else %}
                             <div class="image-grid">
                                 {% for image in image_files %}
                                 <div class="image-card">
-                                    <img src="{{ url_for('static', filename=image.path) }}" alt="{{ image.name }}">
+                                    <img src="{{ image_url(image.path, 'thumbnail') }}" alt="{{ image.name }}" loading="lazy">
                                     <div class="image-info">
                                         <div><strong>{{ image.name }}</strong></div>
-                                        <div>{{ (image.size/1024)|round(2) }} KB</div>
-                                        <div>Uploaded: {{ image.upload_time.strftime('%Y-%m-%d %H:%M') }}</div>
+                                        <div>{{ (image.size/1024)|round(2) }} KB{% if image.width %} &middot; {{ image.width }}&times;{{ image.height }}{% endif %}</div>
+                                        <div>Uploaded: {{ image.upload_time[:16] }}</div>
+                                        <div>Used by {{ product_counts.get(image.name, 0) }} product(s)</div>
                                     </div>
                                     <div class="image-actions">
                                         <button onclick="copyImagePath('{{ image.name }}')" class="btn btn-sm">
@@ -10259,7 +6624,7 @@ def admin_images():
                                         <form method="post" action="{{ url_for('admin_delete_image') }}" style="display: inline;">
                                             <input type="hidden" name="csrf_token" value="{{ csrf_token() }}">
                                             <input type="hidden" name="image_name" value="{{ image.name }}">
-                                            <button type="submit" class="btn btn-sm btn-danger" 
+                                            <button type="submit" class="btn btn-sm btn-danger"
                                                 onclick="return confirm('Are you sure you want to delete {{ image.name }}?')">
                                                 <i class="fas fa-trash"></i> Delete
                                             </button>
@@ -10269,21 +6634,27 @@ def admin_images():
                                 {% endfor %}
                             </div>
                         {% endif %}
+
+                        {% if prev_cursor or next_cursor %}
+                        <div class="pagination" style="display: flex; justify-content: space-between; margin-top: 20px;">
+                            {% if prev_cursor %}
+                            <a href="{{ url_for('admin_images', search=search_query or None, before=prev_cursor) }}" class="btn btn-sm">
+                                <i class="fas fa-chevron-left"></i> Newer
+                            </a>
+                            {% endif %}
+                            {% if next_cursor %}
+                            <a href="{{ url_for('admin_images', search=search_query or None, after=next_cursor) }}" class="btn btn-sm">
+                                Older <i class="fas fa-chevron-right"></i>
+                            </a>
+                            {% endif %}
+                        </div>
+                        {% endif %}
                     </div>
                 </div>
             </div>
-            
-            <script>
-                function copyImagePath(filename) {
-                    const path = `images/${filename}`;
-                    navigator.clipboard.writeText(path).then(() => {
-                        alert(`Copied to clipboard: ${path}`);
-                    });
-                }
-            </script>
-        </body>
-        </html>
-    ''', image_files=image_files)
+        {% endblock %}
+    ''', image_files=image_files, product_counts=product_counts, total_images=total_images,
+       total_size=total_size, search_query=search_query, next_cursor=next_cursor, prev_cursor=prev_cursor)
 
 @app.route('/admin/images/upload', methods=['POST'])
 @admin_required
@@ -10298,14 +6669,18 @@ def admin_upload_image():
         return redirect(url_for('admin_images'))
     
     if file and allowed_file(file.filename):
-        filename = secure_filename(file.filename)
-        base, ext = os.path.splitext(filename)
-        unique_filename = f"{base}_{secrets.token_hex(4)}{ext}"
-        
         try:
             images_dir = os.path.join(app.static_folder, 'images')
-            file.save(os.path.join(images_dir, unique_filename))
-            flash('Image uploaded successfully!', 'success')
+            filename, created = store_image(file, images_dir)
+            with get_db() as conn:
+                c = conn.cursor()
+                with transaction(conn):
+                    catalog_image(c, filename)
+            if created:
+                image_variants.submit(f'images/{filename}')
+                flash(f'Image uploaded as {filename}', 'success')
+            else:
+                flash(f'This image is already stored as {filename}', 'success')
         except Exception as e:
             flash(f'Error uploading image: {str(e)}', 'error')
         
@@ -10323,10 +6698,19 @@ def admin_delete_image():
         return redirect(url_for('admin_images'))
     
     try:
+        image_name = os.path.basename(image_name)
         image_path = os.path.join(app.static_folder, 'images', image_name)
         if os.path.exists(image_path):
-            os.remove(image_path)
-            flash('Image deleted successfully!', 'success')
+            with get_db() as conn:
+                c = conn.cursor()
+                with transaction(conn):
+                    # Products still pointing at the file would show a broken image
+                    references = image_reference_count(c, image_name)
+                    if references:
+                        flash(f'Image is used by {references} product(s)', 'error')
+                    else:
+                        delete_stored_image(c, image_name)
+                        flash('Image deleted successfully!', 'success')
         else:
             flash('Image not found', 'error')
     except Exception as e:
@@ -10,10 +10,98 @@ class Config:
     # Database configuration
     SQLALCHEMY_DATABASE_URI = 'sqlite:///ecommerce.db'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    DATABASE_PATH = os.environ.get('DATABASE_PATH') or 'ecommerce.db'
+
+    # SQLite connection pool (one pool per worker process)
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 5))
+    DB_POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', 10))  # seconds to wait for a free connection
+    DB_HEALTH_CHECK_INTERVAL = float(os.environ.get('DB_HEALTH_CHECK_INTERVAL', 30))  # ping connections idle longer than this
+
+    # SQLite storage profile, applied at startup and to every pooled connection.
+    # WAL lets readers keep going while a worker writes an order.
+    DB_JOURNAL_MODE = os.environ.get('DB_JOURNAL_MODE', 'WAL')
+    DB_SYNCHRONOUS = os.environ.get('DB_SYNCHRONOUS', 'NORMAL')  # NORMAL is durable enough with WAL
+    DB_BUSY_TIMEOUT = int(os.environ.get('DB_BUSY_TIMEOUT', 5000))  # milliseconds
+    DB_CACHE_SIZE = int(os.environ.get('DB_CACHE_SIZE', -20000))  # negative = KiB, so ~20MB per connection
+    DB_MMAP_SIZE = int(os.environ.get('DB_MMAP_SIZE', 256 * 1024 * 1024))
+    DB_TEMP_STORE = os.environ.get('DB_TEMP_STORE', 'MEMORY')
+    DB_CHECKPOINT_INTERVAL = float(os.environ.get('DB_CHECKPOINT_INTERVAL', 300))  # seconds, 0 disables
+    DB_CHECKPOINT_MODE = os.environ.get('DB_CHECKPOINT_MODE', 'PASSIVE')
+
+    # Templates are compiled once and cached; set TEMPLATES_AUTO_RELOAD=1 in
+    # development to recompile pages on every request (None follows debug mode)
+    TEMPLATES_AUTO_RELOAD = (os.environ['TEMPLATES_AUTO_RELOAD'].lower() in ('1', 'true', 'yes')
+                             if os.environ.get('TEMPLATES_AUTO_RELOAD') else None)
     
     # File upload configuration
     UPLOAD_FOLDER = 'static/uploads'
     ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
     
+    # Products per page of search results (storefront and admin)
+    SEARCH_PAGE_SIZE = int(os.environ.get('SEARCH_PAGE_SIZE', 24))
+    
+    # Order journal (human-readable orders.txt plus orders.jsonl), written by a
+    # background thread so checkout never waits on the disk
+    ORDER_JOURNAL_PATH = os.environ.get('ORDER_JOURNAL_PATH', 'orders.txt')
+    ORDER_JOURNAL_JSONL_PATH = os.environ.get('ORDER_JOURNAL_JSONL_PATH', 'orders.jsonl')
+    ORDER_JOURNAL_QUEUE_SIZE = int(os.environ.get('ORDER_JOURNAL_QUEUE_SIZE', 10000))
+    ORDER_JOURNAL_BATCH_SIZE = int(os.environ.get('ORDER_JOURNAL_BATCH_SIZE', 100))
+    ORDER_JOURNAL_FSYNC_INTERVAL = float(os.environ.get('ORDER_JOURNAL_FSYNC_INTERVAL', 1.0))  # seconds
+    ORDER_JOURNAL_MAX_BYTES = int(os.environ.get('ORDER_JOURNAL_MAX_BYTES', 10 * 1024 * 1024))
+    ORDER_JOURNAL_ROTATE_DAILY = os.environ.get('ORDER_JOURNAL_ROTATE_DAILY', '1').lower() in ('1', 'true', 'yes')
+    
+    # Recent orders remembered per worker so a resubmitted checkout form
+    # returns the original order without touching the database
+    IDEMPOTENCY_CACHE_SIZE = int(os.environ.get('IDEMPOTENCY_CACHE_SIZE', 1024))
+    
+    # Rows per page on the admin orders, users and products lists
+    ADMIN_PAGE_SIZE = int(os.environ.get('ADMIN_PAGE_SIZE', 50))
+    
+    # Seconds between full recounts of the dashboard counters (0 disables)
+    STATS_RECONCILE_INTERVAL = int(os.environ.get('STATS_RECONCILE_INTERVAL', 3600))
+    
+    # Sales rollups: seconds between rebuilds of the most recent days (0
+    # disables), how many days each rebuild covers, and the analytics page's
+    # default date range
+    SALES_ROLLUP_INTERVAL = int(os.environ.get('SALES_ROLLUP_INTERVAL', 3600))
+    SALES_ROLLUP_REBUILD_DAYS = int(os.environ.get('SALES_ROLLUP_REBUILD_DAYS', 2))
+    SALES_REPORT_DEFAULT_DAYS = int(os.environ.get('SALES_REPORT_DEFAULT_DAYS', 30))
+    
+    # Admin exports: rows fetched from the cursor per batch and approximate
+    # size of each chunk written to the response
+    EXPORT_BATCH_SIZE = int(os.environ.get('EXPORT_BATCH_SIZE', 500))
+    EXPORT_CHUNK_BYTES = int(os.environ.get('EXPORT_CHUNK_BYTES', 64 * 1024))
+    
+    # Bulk product import: rows per transaction and per-row errors reported
+    IMPORT_BATCH_SIZE = int(os.environ.get('IMPORT_BATCH_SIZE', 1000))
+    IMPORT_MAX_ERRORS = int(os.environ.get('IMPORT_MAX_ERRORS', 100))
+    
+    # Rate limiting: counters in a SQLite file shared by all workers (any
+    # flask_limiter storage URI works), the limiting strategy, and seconds
+    # between sweeps of expired counters
+    RATELIMIT_STORAGE_URI = os.environ.get('RATELIMIT_STORAGE_URI', 'sqlite:///ratelimit.db')
+    RATELIMIT_STRATEGY = os.environ.get('RATELIMIT_STRATEGY', 'sliding-window-counter')
+    RATELIMIT_PURGE_INTERVAL = int(os.environ.get('RATELIMIT_PURGE_INTERVAL', 600))
+    
+    # Background threads per worker that render resized image variants
+    IMAGE_VARIANT_WORKERS = int(os.environ.get('IMAGE_VARIANT_WORKERS', 2))
+    
+    # Seconds between rescans of static/images for the admin image catalog
+    IMAGE_CATALOG_RECONCILE_INTERVAL = int(os.environ.get('IMAGE_CATALOG_RECONCILE_INTERVAL', 600))
+    
+    # Unused content-addressed images: seconds between sweeps (0 disables)
+    # and how old an unreferenced image must be before it is deleted
+    IMAGE_GC_INTERVAL = int(os.environ.get('IMAGE_GC_INTERVAL', 3600))
+    IMAGE_GC_GRACE_SECONDS = int(os.environ.get('IMAGE_GC_GRACE_SECONDS', 86400))
+    
+    # Cache lifetime in seconds for fingerprinted static files (one year)
+    STATIC_MAX_AGE = int(os.environ.get('STATIC_MAX_AGE', 31536000))
+    
+    # Compression of HTML/JSON responses: bodies smaller than COMPRESS_MIN_SIZE
+    # bytes are sent as-is; gzip level is 1-9 and brotli quality 0-11
+    COMPRESS_MIN_SIZE = int(os.environ.get('COMPRESS_MIN_SIZE', 500))
+    COMPRESS_LEVEL = int(os.environ.get('COMPRESS_LEVEL', 6))
+    COMPRESS_BROTLI_QUALITY = int(os.environ.get('COMPRESS_BROTLI_QUALITY', 5))
+    
     # Other configuration settings
     MIN_ORDER_VALUE = 25000  # Minimum order amount in rupees
\ No newline at end of file
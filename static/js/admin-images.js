@@ -0,0 +1,6 @@
+function copyImagePath(filename) {
+    const path = `images/${filename}`;
+    navigator.clipboard.writeText(path).then(() => {
+        alert(`Copied to clipboard: ${path}`);
+    });
+}
@@ -0,0 +1,42 @@
+// Admin access functionality
+(function() {
+    const adminLock = document.getElementById('adminLock');
+    const clickCounter = document.getElementById('clickCounter');
+    if (!adminLock) return;
+
+    let adminClickCount = 0;
+    let resetTimer;
+
+    adminLock.addEventListener('click', function(e) {
+        e.preventDefault();
+        e.stopPropagation();
+
+        adminClickCount++;
+        clickCounter.textContent = adminClickCount;
+        clickCounter.style.display = 'flex';
+
+        // Reset counter after 3 seconds of inactivity
+        clearTimeout(resetTimer);
+        resetTimer = setTimeout(() => {
+            adminClickCount = 0;
+            clickCounter.style.display = 'none';
+        }, 3000);
+
+        if (adminClickCount >= 5) {
+            adminClickCount = 0;
+            clickCounter.style.display = 'none';
+            window.location.href = "/hidden-admin";
+        }
+    });
+
+    // Original hidden area still works as backup
+    document.addEventListener('click', function(e) {
+        if (e.clientX > window.innerWidth - 50 && e.clientY > window.innerHeight - 50) {
+            adminClickCount++;
+            if (adminClickCount >= 5) {
+                adminClickCount = 0;
+                window.location.href = "/hidden-admin";
+            }
+        }
+    });
+})();
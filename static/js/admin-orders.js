@@ -0,0 +1,30 @@
+function filterOrders() {
+    const filter = document.getElementById('statusFilter');
+    let url = filter.dataset.url;
+    if (filter.value) {
+        url += "?status=" + filter.value;
+    }
+    window.location.href = url;
+}
+
+function toggleAll(checkbox) {
+    document.querySelectorAll('.order-select').forEach(box => { box.checked = checkbox.checked; });
+}
+
+function toggleBulkDates() {
+    const byFilter = document.getElementById('bulkScope').value === 'filter';
+    document.querySelectorAll('.bulk-date').forEach(input => { input.disabled = !byFilter; });
+}
+
+function confirmBulkUpdate() {
+    const form = document.getElementById('bulkForm');
+    if (document.getElementById('bulkScope').value === 'selected') {
+        const count = document.querySelectorAll('.order-select:checked').length;
+        if (!count) {
+            alert('Select at least one order');
+            return false;
+        }
+        return confirm(`Mark ${count} order(s) as ${form.status.value}?`);
+    }
+    return confirm(`Mark every matching order as ${form.status.value}?`);
+}
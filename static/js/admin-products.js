@@ -0,0 +1,23 @@
+function importProducts(input) {
+    if (!input.files.length) return;
+    const data = new FormData();
+    data.append('file', input.files[0]);
+    data.append('csrf_token', input.dataset.csrfToken);
+
+    fetch(input.dataset.url, { method: 'POST', body: data })
+        .then(response => response.json())
+        .then(result => {
+            if (result.error) {
+                alert('Import failed: ' + result.error);
+                return;
+            }
+            let message = `Created ${result.created}, updated ${result.updated}, failed ${result.failed}`;
+            result.errors.slice(0, 10).forEach(error => {
+                message += `\nLine ${error.line}: ${error.error}`;
+            });
+            alert(message);
+            window.location.reload();
+        })
+        .catch(() => alert('Import failed'))
+        .finally(() => { input.value = ''; });
+}
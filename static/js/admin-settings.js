@@ -0,0 +1,19 @@
+function addDeliveryCharge() {
+    const container = document.getElementById('deliveryChargesContainer');
+    const newRow = document.createElement('div');
+    newRow.className = 'delivery-charge-row';
+    newRow.innerHTML = `
+        <input type="text" name="state[]" placeholder="State" required>
+        <input type="text" name="city[]" placeholder="City" required>
+        <input type="number" name="charge[]" placeholder="Charge" min="0" required>
+        <button type="button" class="btn btn-danger" onclick="removeDeliveryCharge(this)">
+            <i class="fas fa-trash"></i>
+        </button>
+    `;
+    container.appendChild(newRow);
+}
+
+function removeDeliveryCharge(button) {
+    const row = button.parentElement;
+    row.remove();
+}
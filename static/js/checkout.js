@@ -0,0 +1,140 @@
+let allCities = {};
+
+// Initialize all cities data
+document.addEventListener('DOMContentLoaded', function() {
+    if (!document.getElementById('state-search')) return;
+
+    // Store all cities data for each state
+    for (const state in deliveryCharges) {
+        allCities[state] = Object.keys(deliveryCharges[state]);
+    }
+
+    // If state is pre-selected, load its cities
+    const stateSelect = document.getElementById('state');
+    if (stateSelect.value) {
+        loadCities();
+    }
+
+    updateDeliveryCharge();
+
+    // Add event listeners for better UX
+    document.getElementById('state-search').addEventListener('focus', function() {
+        this.select();
+    });
+
+    document.getElementById('city-search').addEventListener('focus', function() {
+        this.select();
+    });
+});
+
+// Smart search function with fuzzy matching
+function filterDropdown(searchId, dropdownId) {
+    const input = document.getElementById(searchId);
+    const searchTerm = input.value.trim().toLowerCase().replace(/\s+/g, ' ');
+    const select = document.getElementById(dropdownId);
+    const options = select.options;
+
+    // Remove previous no-match message if exists
+    const existingNoMatch = select.querySelector('.no-match-message');
+    if (existingNoMatch) {
+        select.removeChild(existingNoMatch);
+    }
+
+    // Show all options when search is empty
+    if (searchTerm === '') {
+        for (let i = 0; i < options.length; i++) {
+            options[i].style.display = '';
+            options[i].classList.remove('no-match');
+            options[i].innerHTML = options[i].textContent; // Remove highlighting
+        }
+        return;
+    }
+
+    // Smart matching algorithm
+    let hasMatches = false;
+    for (let i = 0; i < options.length; i++) {
+        const option = options[i];
+        if (option.value === '') continue; // Skip the "Select" option
+
+        const optionText = (option.textContent || option.innerText)
+            .toLowerCase()
+            .normalize("NFD")
+            .replace(/[\u0300-\u036f]/g, "") // Remove accents
+            .replace(/\s+/g, ' '); // Normalize spaces
+
+        // Remove all non-alphanumeric characters for better matching
+        const cleanOptionText = optionText.replace(/[^a-z0-9\s]/g, '');
+        const cleanSearchTerm = searchTerm.replace(/[^a-z0-9\s]/g, '');
+
+        // Smart matching conditions:
+        const searchWords = cleanSearchTerm.split(' ');
+        const optionWords = cleanOptionText.split(' ');
+
+        // 1. Check if all search words are present in option (in any order)
+        const allWordsMatch = searchWords.every(word =>
+            word.length > 0 && optionWords.some(optionWord => optionWord.includes(word))
+        );
+
+        // 2. Check for fuzzy match (partial character sequence)
+        const fuzzyMatch = cleanSearchTerm.length > 2 &&
+            cleanSearchTerm.split('').every((char, index) =>
+                index === 0 || cleanOptionText.includes(char)
+            );
+
+        if (allWordsMatch || fuzzyMatch) {
+            option.style.display = '';
+            option.classList.remove('no-match');
+            hasMatches = true;
+
+            // Highlight matching parts
+            const regex = new RegExp(`(${searchWords.join('|')})`, 'gi');
+            option.innerHTML = option.textContent.replace(regex, '<strong>$1</strong>');
+        } else {
+            option.style.display = 'none';
+            option.classList.add('no-match');
+        }
+    }
+
+    // If no matches, show a helpful message
+    if (!hasMatches && searchTerm.length > 1) {
+        const noResults = document.createElement('option');
+        noResults.value = '';
+        noResults.innerHTML = 'No matching results found for "<strong>' +
+            searchTerm + '</strong>"';
+        noResults.classList.add('no-match-message');
+        noResults.style.display = '';
+        select.appendChild(noResults);
+    }
+}
+
+function loadCities() {
+    const stateSelect = document.getElementById('state');
+    const citySelect = document.getElementById('city');
+    const state = stateSelect.value;
+
+    citySelect.innerHTML = '<option value="">Select City</option>';
+
+    if (state && allCities[state]) {
+        allCities[state].forEach(city => {
+            const option = document.createElement('option');
+            option.value = city;
+            option.textContent = city;
+            citySelect.appendChild(option);
+        });
+    }
+
+    // Reset city search input
+    document.getElementById('city-search').value = '';
+}
+
+function updateDeliveryCharge() {
+    const state = document.getElementById('state').value;
+    const city = document.getElementById('city').value;
+    let charge = 0;
+
+    if (state && city && deliveryCharges[state] && deliveryCharges[state][city]) {
+        charge = deliveryCharges[state][city];
+    }
+
+    document.getElementById('delivery-charge-value').textContent = `₹${charge.toLocaleString('en-IN')}`;
+}
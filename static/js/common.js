@@ -0,0 +1,7 @@
+// Data rendered by the server as <script type="application/json" id="...">
+function pageData(id) {
+    const element = document.getElementById(id);
+    return element ? JSON.parse(element.textContent) : null;
+}
+
+const deliveryCharges = pageData('delivery-charges') || {};
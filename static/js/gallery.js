@@ -0,0 +1,31 @@
+function changeMainImage(src, element) {
+    document.querySelector('.product-image').src = src;
+    document.querySelectorAll('.thumbnail').forEach(thumb => {
+        thumb.classList.remove('active');
+    });
+    element.classList.add('active');
+}
+
+function zoomImage(src) {
+    const modal = document.getElementById('zoomModal');
+    const zoomedImg = document.getElementById('zoomedImage');
+    zoomedImg.src = src;
+    modal.style.display = 'block';
+    document.body.style.overflow = 'hidden';
+}
+
+function closeZoom() {
+    document.getElementById('zoomModal').style.display = 'none';
+    document.body.style.overflow = 'auto';
+}
+
+// Close modal when clicking outside the image
+(function() {
+    const modal = document.getElementById('zoomModal');
+    if (!modal) return;
+    modal.addEventListener('click', function(e) {
+        if (e.target === this) {
+            closeZoom();
+        }
+    });
+})();
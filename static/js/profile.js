@@ -0,0 +1,15 @@
+function updateCities() {
+    const state = document.getElementById('state').value;
+    const citySelect = document.getElementById('city');
+
+    citySelect.innerHTML = '<option value="">Select City</option>';
+
+    if (state && deliveryCharges[state]) {
+        for (const city in deliveryCharges[state]) {
+            const option = document.createElement('option');
+            option.value = city;
+            option.textContent = city;
+            citySelect.appendChild(option);
+        }
+    }
+}